@@ -14,11 +14,15 @@ import joblib
 import os
 from unittest.mock import patch, Mock
 from config import Config
+from parsers.lexicon_matcher import LexiconMatcher, LexiconMatches
 
 
 class ExtremistContentClassifier:
     """Система классификации экстремистского контента с использованием машинного обучения"""
     
+    # Слова эмоциональной окраски (ищутся как подстроки)
+    EMOTIONAL_WORDS = ['ярость', 'гнев', 'ненависть', 'злость', 'бешенство', 'ужас', 'страх']
+    
     def __init__(self, model_path: str = None):
         self.vectorizer = TfidfVectorizer(
             max_features=10000,
@@ -42,6 +46,7 @@ class ExtremistContentClassifier:
         self.extremist_keywords = self._load_extremist_keywords()
         self.hate_speech_patterns = self._load_hate_speech_patterns()
         self.threat_patterns = self._load_threat_patterns()
+        self.keyword_matcher = self._build_keyword_matcher()
         
         # Инициализация облачной модели из config.py
         self.cloud_model_url = Config.CLOUD_MODEL_URL
@@ -71,6 +76,15 @@ class ExtremistContentClassifier:
             'всю', 'между'
         ]
     
+    def _build_keyword_matcher(self) -> LexiconMatcher:
+        """Компиляция всех словарей в один поиск за проход по тексту"""
+        boundaries = {category: 'word' for category in self.extremist_keywords}
+        boundaries['emotional_words'] = None
+        return LexiconMatcher(
+            {**self.extremist_keywords, 'emotional_words': self.EMOTIONAL_WORDS},
+            boundary=boundaries
+        )
+    
     def _load_extremist_keywords(self) -> Dict[str, List[str]]:
         """
         Загрузка ключевых слов экстремистского контента согласно ФЗ-114 
@@ -220,19 +234,15 @@ class ExtremistContentClassifier:
             r'\b(?:в|на)\s+(?:школе|больнице|метро|вокзале|площади)\s+(?:взорву|устрою|нападу)\b'
         ]
     
-    def extract_features(self, text: str) -> Dict[str, float]:
+    def extract_features(self, text: str, matches: Optional[LexiconMatches] = None) -> Dict[str, float]:
         """Извлечение признаков из текста"""
         features = {}
         text_lower = text.lower()
+        matches = matches or self.keyword_matcher.match(text_lower)
         
         # Подсчет ключевых слов по категориям с использованием границ слов
-        for category, keywords in self.extremist_keywords.items():
-            count = 0
-            for keyword in keywords:
-                # Используем регулярные выражения с границами слов для точного поиска
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                matches = re.findall(pattern, text_lower)
-                count += len(matches)
+        for category in self.extremist_keywords:
+            count = matches.count(category)
             features[f'{category}_count'] = count
             features[f'{category}_density'] = count / len(text.split()) if text.split() else 0
         
@@ -258,14 +268,14 @@ class ExtremistContentClassifier:
         features['caps_ratio'] = sum(1 for c in text if c.isupper()) / len(text) if text else 0
         
         # Эмоциональная окраска
-        emotional_words = ['ярость', 'гнев', 'ненависть', 'злость', 'бешенство', 'ужас', 'страх']
-        features['emotional_words'] = sum(1 for word in emotional_words if word in text_lower)
+        features['emotional_words'] = matches.distinct('emotional_words')
         
         return features
     
     def analyze_text_rule_based(self, text: str) -> Dict[str, any]:
         """Анализ текста на основе правил с улучшенной логикой"""
-        features = self.extract_features(text)
+        matches = self.keyword_matcher.match(text)
+        features = self.extract_features(text, matches)
         
         # Подсчет общего риска с более точными весами
         risk_score = 0
@@ -295,10 +305,7 @@ class ExtremistContentClassifier:
                 
                 # Собираем найденные ключевые слова для выделения
                 if category_name in self.extremist_keywords:
-                    for keyword in self.extremist_keywords[category_name]:
-                        pattern = r'\b' + re.escape(keyword) + r'\b'
-                        if re.search(pattern, text.lower()):
-                            found_keywords.append(keyword)
+                    found_keywords.extend(matches.found(category_name))
         
         # Проверка паттернов с повышенным весом
         if features['hate_speech_patterns'] > 0:
@@ -544,16 +551,11 @@ class ExtremistContentClassifier:
         total_score = 0
         max_category_score = 0
         
-        # Анализ по категориям ФЗ-114
-        for category, keywords in self.extremist_keywords.items():
-            category_score = 0
-            found_keywords = []
-            
-            for keyword in keywords:
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                if re.search(pattern, text_lower):
-                    found_keywords.append(keyword)
-                    category_score += 1
+        # Анализ по категориям ФЗ-114 (все категории за один проход по тексту)
+        matches = self.keyword_matcher.match(text_lower)
+        for category in self.extremist_keywords:
+            found_keywords = matches.found(category)
+            category_score = len(found_keywords)
             
             if found_keywords:
                 analysis_result['detected_categories'][category] = {
@@ -934,6 +936,7 @@ class ExtremistContentClassifier:
         self.extremist_keywords = model_data['extremist_keywords']
         self.hate_speech_patterns = model_data['hate_speech_patterns']
         self.threat_patterns = model_data['threat_patterns']
+        self.keyword_matcher = self._build_keyword_matcher()
         
         self.logger.info(f"Model loaded from {filepath}")
     
@@ -25,6 +25,8 @@ from textblob import TextBlob
 import re
 from collections import Counter
 from app.utils.ukraine_sentiment_analyzer import get_ukraine_sentiment_analyzer
+from parsers.articles_table import ARTICLES_TABLE
+from parsers.story_index import collapse_stories_query, stories_available
 
 # РЎРѕР·РґР°РµРј Blueprint РґР»СЏ API РїСЂРѕРіРЅРѕР·РѕРІ
 forecast_api_bp = Blueprint('forecast_api', __name__, url_prefix='/api/forecast')
@@ -246,7 +248,7 @@ def perform_real_analysis(category, analysis_period, forecast_period):
         
         for table in custom_tables:
             table_name = table[0]
-            custom_unions.append(f"SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.{table_name}")
+            custom_unions.append(f"SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index, link FROM news.{table_name}")
         
         # Р¤РѕСЂРјРёСЂСѓРµРј Р·Р°РїСЂРѕСЃ РІ Р·Р°РІРёСЃРёРјРѕСЃС‚Рё РѕС‚ РєР°С‚РµРіРѕСЂРёРё
         if category == 'all':
@@ -257,36 +259,32 @@ def perform_real_analysis(category, analysis_period, forecast_period):
         # РџРѕР»СѓС‡Р°РµРј РґР°РЅРЅС‹Рµ Р·Р° РїРµСЂРёРѕРґ Р°РЅР°Р»РёР·Р° РёР· РІСЃРµС… С‚Р°Р±Р»РёС†
         # Р¤РѕСЂРјРёСЂСѓРµРј СЃРїРёСЃРѕРє РІСЃРµС… С‚Р°Р±Р»РёС† (СЃС‚Р°РЅРґР°СЂС‚РЅС‹Рµ + РїРѕР»СЊР·РѕРІР°С‚РµР»СЊСЃРєРёРµ)
         all_unions = [
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.ria_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.bbc_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.cnn_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.reuters_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.france24_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.aljazeera_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.euronews_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.dw_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.rt_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.gazeta_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.lenta_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.kommersant_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.rbc_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.tsn_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.unian_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.israil_headlines",
-            "SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index FROM news.telegram_headlines"
+            f"SELECT title, content, published_date, category, COALESCE(social_tension_index, 0) as social_tension_index, link FROM {ARTICLES_TABLE}"
         ]
         
         # Р”РѕР±Р°РІР»СЏРµРј РїРѕР»СЊР·РѕРІР°С‚РµР»СЊСЃРєРёРµ С‚Р°Р±Р»РёС†С‹
         all_unions.extend(custom_unions)
         
-        query = f"""
+        base_query = f"""
         SELECT title, content, published_date as published_date, category,
-               COALESCE(social_tension_index, 0) as social_tension_index
+               COALESCE(social_tension_index, 0) as social_tension_index, link
         FROM (
             {' UNION ALL '.join(all_unions)}
         ) as all_news
         WHERE published_date >= now() - INTERVAL {analysis_period} HOUR
         {category_filter}
+        """
+        
+        if stories_available(client):
+            # Одна статья на сюжет: публикации одного события в разных
+            # источниках не должны многократно учитываться в индексе
+            query = collapse_stories_query(
+                base_query,
+                "title, content, published_date, category, social_tension_index",
+                analysis_period
+            ) + "LIMIT 1000"
+        else:
+            query = base_query + """
         ORDER BY published_date DESC
         LIMIT 1000
         """
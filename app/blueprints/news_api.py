@@ -10,6 +10,13 @@
 from flask import Blueprint, request, jsonify
 import datetime
 from app.models import get_clickhouse_client
+from parsers.articles_rollup import ROLLUP_TABLE, rollup_filter
+from parsers.article_pagination import (
+    CURSOR_COLUMNS, ORDER_BY, ApproximateCounts, PageCursor, get_approximate_counts, split_page
+)
+from parsers.article_search import SearchQuery, format_snippet
+from parsers.articles_table import ARTICLES_TABLE, SOURCES, articles_filter
+from parsers.story_index import get_story_index
 
 # РЎРѕР·РґР°РµРј Blueprint РґР»СЏ API РЅРѕРІРѕСЃС‚РµР№
 news_api_bp = Blueprint('news_api', __name__, url_prefix='/api')
@@ -24,6 +31,7 @@ def get_news():
         limit (int): РљРѕР»РёС‡РµСЃС‚РІРѕ РЅРѕРІРѕСЃС‚РµР№ РґР»СЏ РІРѕР·РІСЂР°С‚Р° (РїРѕ СѓРјРѕР»С‡Р°РЅРёСЋ 100)
         offset (int): РЎРјРµС‰РµРЅРёРµ РґР»СЏ РїР°РіРёРЅР°С†РёРё (РїРѕ СѓРјРѕР»С‡Р°РЅРёСЋ 0)
         search (str): РџРѕРёСЃРєРѕРІС‹Р№ Р·Р°РїСЂРѕСЃ РїРѕ Р·Р°РіРѕР»РѕРІРєСѓ Рё СЃРѕРґРµСЂР¶РёРјРѕРјСѓ
+        cursor (str): Курсор следующей страницы (next_cursor предыдущего ответа), вместо offset
     
     Returns:
         JSON: РЎРїРёСЃРѕРє РЅРѕРІРѕСЃС‚РµР№ СЃ РјРµС‚Р°РґР°РЅРЅС‹РјРё РёР»Рё СЃРѕРѕР±С‰РµРЅРёРµ РѕР± РѕС€РёР±РєРµ
@@ -32,7 +40,12 @@ def get_news():
     category = request.args.get('category', 'all')
     limit = request.args.get('limit', 100, type=int)
     offset = request.args.get('offset', 0, type=int)
-    search = request.args.get('search', '')
+    search_query = SearchQuery(request.args.get('search', ''))
+    
+    try:
+        page_cursor = PageCursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
     
     # Проверка валидности источников
     valid_sources = ['all', 'ria', 'israil', 'telegram', 'twitter', 'lenta', 'rbc', 'cnn', 'aljazeera', 'tsn', 'unian', 'rt', 'euronews', 'reuters', 'france24', 'dw', 'bbc', 'gazeta', 'kommersant']
@@ -52,631 +65,69 @@ def get_news():
     try:
         client = get_clickhouse_client()
         
-        # РџРѕР»СѓС‡Р°РµРј СЃРїРёСЃРѕРє РїРѕР»СЊР·РѕРІР°С‚РµР»СЊСЃРєРёС… С‚Р°Р±Р»РёС† РґР»СЏ РІРєР»СЋС‡РµРЅРёСЏ РІ РѕР±С‰РёР№ Р·Р°РїСЂРѕСЃ
-        custom_tables_query = """
-            SELECT name 
-            FROM system.tables 
-            WHERE database = 'news' 
-            AND name LIKE 'custom_%_headlines'
-        """
-        custom_tables = client.query(custom_tables_query)
-        custom_tables_unions = []
-        
-        for table in custom_tables.result_rows:
-            table_name = table[0]
-            union_query = f"""
-                SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                FROM news.{table_name}
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-            """
-            custom_tables_unions.append(union_query)
+        # Таблицы запроса: (колонки, таблица, условие); курсор добавляется к условию каждой
+        plain_columns = "id, title, content, source, category, published_date, link, '' as telegram_channel"
+        rollup_where = None
         
-        # Р¤РѕСЂРјРёСЂСѓРµРј Р·Р°РїСЂРѕСЃ РІ Р·Р°РІРёСЃРёРјРѕСЃС‚Рё РѕС‚ РёСЃС‚РѕС‡РЅРёРєР° Рё РєР°С‚РµРіРѕСЂРёРё
         if source.startswith('universal_'):
-            # Р Р°Р±РѕС‚Р° СЃ universal С‚Р°Р±Р»РёС†Р°РјРё
-            table_name = source
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, '' as link,
-                    '' as telegram_channel
-                FROM news.{table_name}
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'all' and category == 'all':
-            # Все источники, все категории
-            # Для Telegram используем таблицу telegram_headlines
-            telegram_union_query = '''
-                SELECT id, title, message_link as link, content, source, category, published_date, message_link, channel 
-                FROM news.telegram_headlines
-            '''
-            
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date,
-                    CASE
-                        WHEN source = 'ria.ru' THEN link
-                        WHEN source = '7kanal.co.il' THEN link
-                        WHEN source = 'telegram' THEN message_link
-                        ELSE link
-                    END as link,
-                    if(source = 'telegram', channel, '') as telegram_channel
-                FROM (
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.ria_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.israil_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.lenta_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.rbc_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.cnn_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.aljazeera_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.tsn_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.unian_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.rt_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.euronews_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.reuters_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.france24_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.dw_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.bbc_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.gazeta_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                    FROM news.kommersant_headlines
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    
-                    UNION ALL
-                    
-                    SELECT id, title, '' as link, content, source, category, published_date, message_link, channel
-                    FROM (
-                        {telegram_union_query}
-                    )
-                    {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                )
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'all' and category != 'all':
-            # Все источники, конкретная категория
-            # Проверяем, какие таблицы категорий существуют
-            check_tables_query = f"""
-                SELECT name 
-                FROM system.tables 
-                WHERE database = 'news' 
-                AND (name = 'telegram_{category}' 
-                    OR name = 'israil_{category}'
-                    OR name = 'ria_{category}'
-                    OR name = 'lenta_{category}'
-                    OR name = 'rbc_{category}'
-                    OR name = 'cnn_{category}'
-                    OR name = 'aljazeera_{category}'
-                    OR name = 'tsn_{category}'
-                    OR name = 'unian_{category}'
-                    OR name = 'rt_{category}'
-                    OR name = 'euronews_{category}'
-                    OR name = 'reuters_{category}'
-                    OR name = 'france24_{category}'
-                    OR name = 'dw_{category}'
-                    OR name = 'bbc_{category}'
-                    OR name = 'gazeta_{category}'
-                    OR name = 'kommersant_{category}'
-                    OR name = 'universal_{category}'
-                    OR name = 'ukraine_universal_{category}')
-            """
+            # Статьи universal-таблицы
+            selects = [(
+                "id, title, content, source, category, published_date, '' as link, '' as telegram_channel",
+                f"news.{source}",
+                search_query.condition
+            )]
+        elif source == 'all' or source in SOURCES:
+            # Источники и категории - одна таблица news.articles: фильтр по
+            # source и category идет по первичному ключу, без UNION ALL
+            # Поиск по словам отсекает гранулы skip-индексами title/content
+            selects = [(
+                "id, title, content, source, category, published_date, link, "
+                "if(source = 'telegram', channel, '') as telegram_channel",
+                ARTICLES_TABLE,
+                f"{articles_filter(source, category)} AND {search_query.condition}"
+            )]
             
-            existing_tables_result = client.query(check_tables_query)
-            existing_tables = [row[0] for row in existing_tables_result.result_rows]
-            
-            unions = []
-            
-            # Добавляем запросы только для существующих таблиц
-            for table_name in existing_tables:
-                if table_name.startswith('telegram_'):
-                    unions.append(f'''
-                        SELECT id, title, '' as link, content, source, category, published_date, message_link, channel
-                        FROM news.{table_name}
-                        {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    ''')
-                else:
-                    unions.append(f'''
-                    SELECT id, title, link, content, source, category, published_date, '' as message_link, '' as channel
-                        FROM news.{table_name}
-                        {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                    ''')
-            
-            # Если нет ни одной таблицы, возвращаем пустой результат
-            if not unions:
-                return jsonify({
-                    'status': 'success',
-                    'data': [],
-                    'total': 0,
-                    'limit': limit,
-                    'offset': offset,
-                    'current_page': 1,
-                    'total_pages': 0
-                })
+            if source == 'all' and category != 'all':
+                # Статьи универсального парсера этой категории хранятся отдельно
+                universal_tables_query = f"""
+                    SELECT name
+                    FROM system.tables
+                    WHERE database = 'news'
+                    AND name IN ('universal_{category}', 'ukraine_universal_{category}')
+                """
+                selects += [
+                    (plain_columns, f"news.{row[0]}", search_query.condition)
+                    for row in client.query(universal_tables_query).result_rows
+                ]
             
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date,
-                    CASE
-                        WHEN source = 'ria.ru' THEN link
-                        WHEN source = '7kanal.co.il' THEN link
-                        WHEN source = 'telegram' THEN message_link
-                        ELSE link
-                    END as link,
-                    if(source = 'telegram', channel, '') as telegram_channel
-                FROM (
-                    {' UNION ALL '.join(unions)}
-                )
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'ria' and category == 'all':
-            # РўРѕР»СЊРєРѕ Р РРђ, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.ria_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'ria' and category != 'all':
-            # РўРѕР»СЊРєРѕ Р РРђ, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.ria_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'israil' and category == 'all':
-            # РўРѕР»СЊРєРѕ РР·СЂР°РёР»СЊ, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.israil_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'israil' and category != 'all':
-            # РўРѕР»СЊРєРѕ РР·СЂР°РёР»СЊ, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.israil_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'telegram' and category == 'all':
-            # Только Telegram, все категории - читаем из telegram_headlines
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, message_link as link,
-                    channel as telegram_channel
-                FROM news.telegram_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'telegram' and category != 'all':
-            # Только Telegram, конкретная категория - фильтруем по category
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, message_link as link,
-                    channel as telegram_channel
-                FROM news.telegram_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'lenta' and category == 'all':
-            # РўРѕР»СЊРєРѕ Lenta, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.lenta_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'lenta' and category != 'all':
-            # РўРѕР»СЊРєРѕ Lenta, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.lenta_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'rbc' and category == 'all':
-            # РўРѕР»СЊРєРѕ RBC, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.rbc_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'rbc' and category != 'all':
-            # РўРѕР»СЊРєРѕ RBC, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.rbc_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'cnn' and category == 'all':
-            # РўРѕР»СЊРєРѕ CNN, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.cnn_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'cnn' and category != 'all':
-            # РўРѕР»СЊРєРѕ CNN, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.cnn_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'aljazeera' and category == 'all':
-            # РўРѕР»СЊРєРѕ Al Jazeera, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.aljazeera_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'aljazeera' and category != 'all':
-            # РўРѕР»СЊРєРѕ Al Jazeera, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.aljazeera_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'tsn' and category == 'all':
-            # РўРѕР»СЊРєРѕ TSN, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.tsn_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'tsn' and category != 'all':
-            # РўРѕР»СЊРєРѕ TSN, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.tsn_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'unian' and category == 'all':
-            # РўРѕР»СЊРєРѕ UNIAN, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.unian_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'unian' and category != 'all':
-            # РўРѕР»СЊРєРѕ UNIAN, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.unian_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'rt' and category == 'all':
-            # РўРѕР»СЊРєРѕ RT, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.rt_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'rt' and category != 'all':
-            # РўРѕР»СЊРєРѕ RT, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.rt_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'euronews' and category == 'all':
-            # РўРѕР»СЊРєРѕ Euronews, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.euronews_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'euronews' and category != 'all':
-            # РўРѕР»СЊРєРѕ Euronews, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.euronews_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'reuters' and category == 'all':
-            # РўРѕР»СЊРєРѕ Reuters, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.reuters_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'reuters' and category != 'all':
-            # РўРѕР»СЊРєРѕ Reuters, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.reuters_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'france24' and category == 'all':
-            # РўРѕР»СЊРєРѕ France24, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.france24_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'france24' and category != 'all':
-            # РўРѕР»СЊРєРѕ France24, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.france24_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'dw' and category == 'all':
-            # РўРѕР»СЊРєРѕ DW, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.dw_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'dw' and category != 'all':
-            # РўРѕР»СЊРєРѕ DW, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.dw_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'bbc' and category == 'all':
-            # РўРѕР»СЊРєРѕ BBC, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.bbc_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'bbc' and category != 'all':
-            # РўРѕР»СЊРєРѕ BBC, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.bbc_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'gazeta' and category == 'all':
-            # РўРѕР»СЊРєРѕ Gazeta, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.gazeta_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'gazeta' and category != 'all':
-            # РўРѕР»СЊРєРѕ Gazeta, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.gazeta_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'kommersant' and category == 'all':
-            # РўРѕР»СЊРєРѕ Kommersant, РІСЃРµ РєР°С‚РµРіРѕСЂРёРё
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.kommersant_headlines
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
-        elif source == 'kommersant' and category != 'all':
-            # РўРѕР»СЊРєРѕ Kommersant, РєРѕРЅРєСЂРµС‚РЅР°СЏ РєР°С‚РµРіРѕСЂРёСЏ
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.kommersant_headlines
-                WHERE category = '{category}' {f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')" if search else ""}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
+            # Без поиска и таблиц универсального парсера итог берется из почасовых агрегатов
+            if len(selects) == 1 and not search_query:
+                rollup_where = rollup_filter(source, category)
         elif is_custom_table:
             # РџРѕР»СЊР·РѕРІР°С‚РµР»СЊСЃРєР°СЏ С‚Р°Р±Р»РёС†Р°
-            query = f'''
-                SELECT 
-                    id, title, content, source, category, published_date, link,
-                    '' as telegram_channel
-                FROM news.{category}
-                {f"WHERE title ILIKE '%{search}%' OR content ILIKE '%{search}%'" if search else "WHERE 1=1"}
-                ORDER BY published_date DESC
-                LIMIT {limit} OFFSET {offset}
-            '''
+            selects = [(plain_columns, f"news.{category}", search_query.condition)]
         else:
             return jsonify({'status': 'error', 'message': 'РќРµРґРѕРїСѓСЃС‚РёРјС‹Р№ РёСЃС‚РѕС‡РЅРёРє'}), 400
-            
-        result = client.query(query)
+        
+        # Страница: статьи после курсора (или со смещением offset), на одну больше
+        # лимита - чтобы узнать, есть ли следующая страница
+        page_union = ' UNION ALL '.join(
+            f"SELECT {columns}, {CURSOR_COLUMNS} FROM {table} WHERE {where} AND {page_cursor.condition}"
+            for columns, table, where in selects
+        )
+        query = f'''
+            SELECT * FROM ({page_union})
+            ORDER BY {ORDER_BY}
+            LIMIT {max(limit, 0) + 1} OFFSET {0 if page_cursor else offset}
+        '''
+        params = {**search_query.params, **page_cursor.params}
+        
+        result = client.query(query, parameters=params or None)
+        rows, next_cursor = split_page(result.result_rows, limit)
         
         # Р¤РѕСЂРјР°С‚РёСЂСѓРµРј РґР°РЅРЅС‹Рµ
         news = []
-        for row in result.result_rows:
+        for row in rows:
             news_item = {
                 'id': str(row[0]),
                 'title': row[1],
@@ -687,34 +138,43 @@ def get_news():
             }
             
             # Р”РѕР±Р°РІР»СЏРµРј СЃРїРµС†РёС„РёС‡РЅС‹Рµ РїРѕР»СЏ РІ Р·Р°РІРёСЃРёРјРѕСЃС‚Рё РѕС‚ РёСЃС‚РѕС‡РЅРёРєР°
-            if len(row) > 6 and row[6]:  # link
+            if row[6]:  # link
                 news_item['link'] = row[6]
-            if len(row) > 7 and row[7]:  # telegram_channel
+            if row[7]:  # telegram_channel
                 news_item['telegram_channel'] = row[7]
                 
             news.append(news_item)
         
-        # РџРѕРґСЃС‡РµС‚ РѕР±С‰РµРіРѕ РєРѕР»РёС‡РµСЃС‚РІР° Р·Р°РїРёСЃРµР№
-        count_query = f'''
-            SELECT COUNT(*) as count
-            FROM (
-                {query.split('ORDER BY')[0]}
-            ) as subquery
-        '''
-        total_count = client.query(count_query).result_rows[0][0]
+        # Общее количество записей - из агрегатов или приблизительный итог из
+        # кэша (пересчитывается в фоне), без второго сканирования на каждый запрос
+        if rollup_where is not None:
+            total_query = f"SELECT sum(news_count) FROM {ROLLUP_TABLE} WHERE {rollup_where}"
+            total_count = client.query(total_query).result_rows[0][0]
+        else:
+            count_query = 'SELECT count() FROM ({})'.format(' UNION ALL '.join(
+                f"SELECT 1 FROM {table} WHERE {where}" for _, table, where in selects
+            ))
+            count_params = search_query.params or None
+            total_count = get_approximate_counts().get(
+                ApproximateCounts.key(count_query, count_params),
+                lambda: get_clickhouse_client().query(count_query, parameters=count_params).result_rows[0][0]
+            )
         
-        # Р Р°СЃС‡РµС‚ РѕР±С‰РµРіРѕ РєРѕР»РёС‡РµСЃС‚РІР° СЃС‚СЂР°РЅРёС†
+        # Р Р°СЃС‡РµС‚ РѕР±С‰РµРіРѕ РєРѕР»РёС‡РµСЃС‚РІР° СЃС‚СЂР°РЅРёС†
         page_size = limit
-        total_pages = (total_count + page_size - 1) // page_size
-        current_page = (offset // page_size) + 1
+        total_pages = (total_count + page_size - 1) // page_size if total_count is not None else None
+        current_page = None if page_cursor else (offset // page_size) + 1
 
         return jsonify({
             'status': 'success',
             'data': news,
             'total_count': total_count,
+            'total_is_approximate': rollup_where is None,
             'total_pages': total_pages,
             'current_page': current_page,
-            'page_size': page_size
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
     except Exception as e:
         import traceback
@@ -878,54 +338,16 @@ def get_statistics():
         
         client = get_clickhouse_client()
         
-        # Формируем фильтр по категории
-        category_filter = f"AND category = '{category}'" if category != 'all' else ""
-        
-        # Получаем общее количество статей из всех источников за указанный период
+        # Общее количество статей всех источников за период - из почасовых агрегатов
         total_query = f"""
-            SELECT COUNT(*) as total FROM (
-                SELECT id FROM news.ria_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.lenta_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.rbc_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.gazeta_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.kommersant_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.tsn_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.unian_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.rt_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.cnn_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.aljazeera_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.reuters_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.france24_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.dw_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.euronews_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.bbc_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.israil_headlines WHERE published_date >= today() - {days} {category_filter}
-                UNION ALL
-                SELECT id FROM news.telegram_headlines WHERE published_date >= today() - {days} {category_filter}
-            )
+            SELECT sum(news_count) FROM {ROLLUP_TABLE}
+            WHERE {rollup_filter(categories=category, days=days)}
         """
         
         total_result = client.query(total_query)
         total_count = total_result.result_rows[0][0] if total_result.result_rows else 0
         
         # РџРѕР»СѓС‡Р°РµРј СЃС‚Р°С‚РёСЃС‚РёРєСѓ РїРѕ РєР°С‚РµРіРѕСЂРёСЏРј
-        categories_stats = {}
-        
         categories = {
             'military_operations': 'Военные операции',
             'humanitarian_crisis': 'Гуманитарный кризис',
@@ -934,49 +356,18 @@ def get_statistics():
             'information_social': 'Информационно-социальные аспекты'
         }
         
-        # РџРѕР»СѓС‡Р°РµРј СЃРїРёСЃРѕРє РІСЃРµС… СЃСѓС‰РµСЃС‚РІСѓСЋС‰РёС… С‚Р°Р±Р»РёС† РІ СЃС…РµРјРµ news
-        existing_tables_query = """
-            SELECT name FROM system.tables 
-            WHERE database = 'news'
-            ORDER BY name
+        # Все категории одним запросом с группировкой
+        category_query = f"""
+            SELECT category, sum(news_count) FROM {ROLLUP_TABLE}
+            WHERE {rollup_filter(categories=list(categories), days=days)}
+            GROUP BY category
         """
-        existing_tables_result = client.query(existing_tables_query)
-        existing_tables = {row[0] for row in existing_tables_result.result_rows}
+        category_counts = dict(client.query(category_query).result_rows)
         
-        for category_key, category_name in categories.items():
-            # РЎРїРёСЃРѕРє РёСЃС‚РѕС‡РЅРёРєРѕРІ РґР»СЏ РїСЂРѕРІРµСЂРєРё
-            sources = ['ria', 'lenta', 'rbc', 'gazeta', 'kommersant', 'tsn', 'unian', 'rt', 
-                      'cnn', 'aljazeera', 'reuters', 'france24', 'dw', 'euronews', 'bbc', 'israil']
-            
-            # РЎС‚СЂРѕРёРј Р·Р°РїСЂРѕСЃ С‚РѕР»СЊРєРѕ РґР»СЏ СЃСѓС‰РµСЃС‚РІСѓСЋС‰РёС… С‚Р°Р±Р»РёС†
-            # Считаем ТОЛЬКО из _headlines таблиц, так как они содержат все данные
-            union_parts = []
-            
-            # Добавляем основные таблицы _headlines с фильтром по category и времени
-            for source in sources:
-                table_name = f"{source}_headlines"
-                if table_name in existing_tables:
-                    union_parts.append(f"SELECT id FROM news.{table_name} WHERE category = '{category_key}' AND published_date >= today() - {days}")
-            
-            # Добавляем telegram_headlines с фильтром по category и времени
-            if 'telegram_headlines' in existing_tables:
-                union_parts.append(f"SELECT id FROM news.telegram_headlines WHERE category = '{category_key}' AND published_date >= today() - {days}")
-            
-            if union_parts:
-                category_query = f"""
-                    SELECT COUNT(*) as count FROM (
-                        {' UNION ALL '.join(union_parts)}
-                    )
-                """
-                category_result = client.query(category_query)
-                category_count = category_result.result_rows[0][0] if category_result.result_rows else 0
-            else:
-                category_count = 0
-                
-            categories_stats[category_key] = {
-                'name': category_name,
-                'count': category_count
-            }
+        categories_stats = {
+            category_key: {'name': category_name, 'count': category_counts.get(category_key, 0)}
+            for category_key, category_name in categories.items()
+        }
         
         # РџРѕР»СѓС‡Р°РµРј СЃС‚Р°С‚РёСЃС‚РёРєСѓ РїРѕ РїРѕР»СЊР·РѕРІР°С‚РµР»СЊСЃРєРёРј С‚Р°Р±Р»РёС†Р°Рј
         custom_tables_query = """
@@ -1077,60 +468,68 @@ def get_telegram_headlines():
         page (int): РќРѕРјРµСЂ СЃС‚СЂР°РЅРёС†С‹ РґР»СЏ РїР°РіРёРЅР°С†РёРё (РїРѕ СѓРјРѕР»С‡Р°РЅРёСЋ 1)
         channel (str): Р¤РёР»СЊС‚СЂ РїРѕ РєРѕРЅРєСЂРµС‚РЅРѕРјСѓ РєР°РЅР°Р»Сѓ (РѕРїС†РёРѕРЅР°Р»СЊРЅРѕ)
         days (int): РљРѕР»РёС‡РµСЃС‚РІРѕ РґРЅРµР№ РґР»СЏ РІС‹Р±РѕСЂРєРё (РїРѕ СѓРјРѕР»С‡Р°РЅРёСЋ 7)
+        search (str): Поисковый запрос (слова заголовка и текста)
+        cursor (str): Курсор следующей страницы (next_cursor предыдущего ответа), вместо page
     
     Returns:
         JSON: РЎРїРёСЃРѕРє Р·Р°РіРѕР»РѕРІРєРѕРІ Telegram РЅРѕРІРѕСЃС‚РµР№ СЃ РјРµС‚Р°РґР°РЅРЅС‹РјРё РїР°РіРёРЅР°С†РёРё
     """
+    try:
+        page_cursor = PageCursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
     try:
         page = int(request.args.get('page', 1))
         page_size = 10  # РљРѕР»РёС‡РµСЃС‚РІРѕ Р·Р°РїРёСЃРµР№ РЅР° СЃС‚СЂР°РЅРёС†Рµ
         channel = request.args.get('channel', None)
         days = int(request.args.get('days', 7))
+        search_query = SearchQuery(request.args.get('search', ''))
         
         client = get_clickhouse_client()
         
-        # Р‘Р°Р·РѕРІС‹Р№ Р·Р°РїСЂРѕСЃ
-        query = '''
-            SELECT id, title, content, channel, message_id, message_link, published_date
-            FROM (
-                SELECT id, title, content, channel, message_id, message_link, published_date FROM news.telegram_ukraine
-                UNION ALL
-                SELECT id, title, content, channel, message_id, message_link, published_date FROM news.telegram_middle_east
-                UNION ALL
-                SELECT id, title, content, channel, message_id, message_link, published_date FROM news.telegram_fake_news
-                UNION ALL
-                SELECT id, title, content, channel, message_id, message_link, published_date FROM news.telegram_info_war
-                UNION ALL
-                SELECT id, title, content, channel, message_id, message_link, published_date FROM news.telegram_europe
-                UNION ALL
-                SELECT id, title, content, channel, message_id, message_link, published_date FROM news.telegram_usa
-                UNION ALL
-                SELECT id, title, content, channel, message_id, message_link, published_date FROM news.telegram_other
-            )
-            WHERE published_date >= %(start_date)s
+        # Telegram-сообщения стандартных категорий - одна таблица news.articles
+        telegram_categories = ('ukraine', 'middle_east', 'fake_news', 'info_war', 'europe', 'usa', 'other')
+        telegram_filter = articles_filter('telegram', telegram_categories)
+        where = f'''
+            {telegram_filter} AND published_date >= %(start_date)s
+            AND {search_query.condition}
         '''
         
         # Р”РѕР±Р°РІР»СЏРµРј С„РёР»СЊС‚СЂ РїРѕ РєР°РЅР°Р»Сѓ, РµСЃР»Рё СѓРєР°Р·Р°РЅ
         if channel:
-            query += ' AND channel = %(channel)s'
-            
-        query += '''
-            ORDER BY published_date DESC
+            where += ' AND channel = %(channel)s'
+        
+        query = f'''
+            SELECT id, title, content, channel, message_id, message_link, published_date, {CURSOR_COLUMNS}
+            FROM {ARTICLES_TABLE}
+            WHERE {where} AND {page_cursor.condition}
+            ORDER BY {ORDER_BY}
             LIMIT %(limit)s OFFSET %(offset)s
         '''
         
-        # РџР°СЂР°РјРµС‚СЂС‹ Р·Р°РїСЂРѕСЃР°
-        start_date = datetime.datetime.now() - datetime.timedelta(days=days)
+        # Начало периода округляется до часа: так итог без поиска и канала
+        # совпадает с почасовыми агрегатами, а ключ приблизительного итога
+        # не меняется от запроса к запросу
+        start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        count_params = {'start_date': start_date}
+        if channel:
+            count_params['channel'] = channel
+        count_params.update(search_query.params)
+        
+        # Страница после курсора (или по номеру page), на одну запись больше
+        # - чтобы узнать, есть ли следующая
         params = {
-            'start_date': start_date,
-            'limit': page_size,
-            'offset': (page - 1) * page_size
+            **count_params,
+            **page_cursor.params,
+            'limit': page_size + 1,
+            'offset': 0 if page_cursor else (page - 1) * page_size
         }
-        
-        if channel:
-            params['channel'] = channel
             
         result = client.query(query, parameters=params)
+        rows, next_cursor = split_page(result.result_rows, page_size)
         
         # Р¤РѕСЂРјР°С‚РёСЂСѓРµРј РґР°РЅРЅС‹Рµ
         headlines = [
@@ -1143,61 +542,44 @@ def get_telegram_headlines():
                 'message_link': row[5],
                 'published_date': row[6].strftime('%Y-%m-%d %H:%M:%S') if hasattr(row[6], 'strftime') else row[6]
             }
-            for row in result.result_rows
+            for row in rows
         ]
         
-        # РџРѕРґСЃС‡РµС‚ РѕР±С‰РµРіРѕ РєРѕР»РёС‡РµСЃС‚РІР° Р·Р°РїРёСЃРµР№ РґР»СЏ РїР°РіРёРЅР°С†РёРё
-        count_query = '''
-            SELECT COUNT(*)
-            FROM (
-                SELECT id FROM news.telegram_ukraine WHERE published_date >= %(start_date)s
-                UNION ALL
-                SELECT id FROM news.telegram_middle_east WHERE published_date >= %(start_date)s
-                UNION ALL
-                SELECT id FROM news.telegram_fake_news WHERE published_date >= %(start_date)s
-                UNION ALL
-                SELECT id FROM news.telegram_info_war WHERE published_date >= %(start_date)s
-                UNION ALL
-                SELECT id FROM news.telegram_europe WHERE published_date >= %(start_date)s
-                UNION ALL
-                SELECT id FROM news.telegram_usa WHERE published_date >= %(start_date)s
-                UNION ALL
-                SELECT id FROM news.telegram_other WHERE published_date >= %(start_date)s
+        # Общее количество записей - из почасовых агрегатов, а с поиском или
+        # каналом - приблизительный итог из кэша (пересчитывается в фоне)
+        total_is_approximate = bool(channel or search_query)
+        if not total_is_approximate:
+            total_query = f'''
+                SELECT sum(news_count) FROM {ROLLUP_TABLE}
+                WHERE {rollup_filter('telegram', telegram_categories)} AND hour >= %(start_date)s
+            '''
+            total_count = client.query(total_query, parameters=count_params).result_rows[0][0]
+        else:
+            count_query = f"SELECT count() FROM {ARTICLES_TABLE} WHERE {where}"
+            total_count = get_approximate_counts().get(
+                ApproximateCounts.key(count_query, count_params),
+                lambda: get_clickhouse_client().query(count_query, parameters=count_params).result_rows[0][0]
             )
-        '''
-        
-        if channel:
-            count_query += ' AND channel = %(channel)s'
-            
-        total_count = client.query(count_query, parameters=params).result_rows[0][0]
-        total_pages = (total_count + page_size - 1) // page_size
+        total_pages = (total_count + page_size - 1) // page_size if total_count is not None else None
         
         # РџРѕР»СѓС‡Р°РµРј СЃРїРёСЃРѕРє РґРѕСЃС‚СѓРїРЅС‹С… РєР°РЅР°Р»РѕРІ РґР»СЏ С„РёР»СЊС‚СЂР°С†РёРё
-        channels_query = '''
-            SELECT DISTINCT channel FROM (
-                SELECT channel FROM news.telegram_ukraine
-                UNION ALL
-                SELECT channel FROM news.telegram_middle_east
-                UNION ALL
-                SELECT channel FROM news.telegram_fake_news
-                UNION ALL
-                SELECT channel FROM news.telegram_info_war
-                UNION ALL
-                SELECT channel FROM news.telegram_europe
-                UNION ALL
-                SELECT channel FROM news.telegram_usa
-                UNION ALL
-                SELECT channel FROM news.telegram_other
-            ) ORDER BY channel
+        channels_query = f'''
+            SELECT DISTINCT channel FROM {ARTICLES_TABLE}
+            WHERE {telegram_filter}
+            ORDER BY channel
         '''
         channels = [row[0] for row in client.query(channels_query).result_rows]
         
         return jsonify({
             'status': 'success',
             'data': headlines,
+            'total_count': total_count,
+            'total_is_approximate': total_is_approximate,
             'total_pages': total_pages,
-            'current_page': page,
-            'available_channels': channels
+            'current_page': None if page_cursor else page,
+            'available_channels': channels,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -1279,3 +661,131 @@ def get_available_sources():
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@news_api_bp.route('/search', methods=['GET'])
+def search_news():
+    """Полнотекстовый поиск статей по словам с ранжированием по релевантности.
+    
+    Все слова запроса должны встретиться в заголовке или тексте; последнее
+    слово ищется и как префикс (подстрока заголовка). Поиск использует
+    skip-индексы news.articles (parsers/article_search.py), пользовательский
+    текст передается параметрами запроса.
+    
+    Query Parameters:
+        q (str): Поисковый запрос
+        source (str): Источник ('all' или ключ источника, по умолчанию 'all')
+        category (str): Категория (по умолчанию 'all')
+        days (int): Только статьи за последние days дней (по умолчанию - за все время)
+        limit (int): Количество результатов (по умолчанию 20, не больше 100)
+        offset (int): Смещение для пагинации (по умолчанию 0)
+    
+    Returns:
+        JSON: Статьи с фрагментом текста и релевантностью, от более релевантных к менее
+    """
+    search_query = SearchQuery(request.args.get('q', ''))
+    source = request.args.get('source', 'all')
+    category = request.args.get('category', 'all')
+    days = request.args.get('days', None, type=int)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    if not search_query:
+        return jsonify({'status': 'error', 'message': 'Нужен параметр q (слова для поиска)'}), 400
+    if source != 'all' and source not in SOURCES:
+        return jsonify({'status': 'error', 'message': f'Недопустимый источник. Допустимые источники: {["all"] + list(SOURCES)}'}), 400
+    
+    try:
+        client = get_clickhouse_client()
+        
+        # Лишняя строка показывает, есть ли следующая страница (без подсчета всех совпадений)
+        query = f'''
+            SELECT
+                id, title, source, category, published_date, link,
+                if(source = 'telegram', channel, '') as telegram_channel,
+                {search_query.snippet} as snippet,
+                {search_query.match_position} as match_position,
+                lengthUTF8(content) as content_length,
+                {search_query.relevance} as relevance
+            FROM {ARTICLES_TABLE}
+            WHERE {articles_filter(source, category, days)}
+            AND {search_query.condition}
+            ORDER BY relevance DESC, published_date DESC
+            LIMIT %(limit)s OFFSET %(offset)s
+        '''
+        params = dict(search_query.params, limit=limit + 1, offset=offset)
+        rows = client.query(query, parameters=params).result_rows
+        
+        results = []
+        for row in rows[:limit]:
+            item = {
+                'id': str(row[0]),
+                'title': row[1],
+                'source': row[2],
+                'category': row[3],
+                'published_date': row[4].strftime('%Y-%m-%d %H:%M:%S') if hasattr(row[4], 'strftime') else row[4],
+                'link': row[5],
+                'snippet': format_snippet(row[7], row[8], row[9]),
+                'relevance': row[10]
+            }
+            if row[6]:
+                item['telegram_channel'] = row[6]
+            results.append(item)
+        
+        return jsonify({
+            'status': 'success',
+            'query': request.args.get('q', ''),
+            'terms': search_query.terms,
+            'data': results,
+            'offset': offset,
+            'limit': limit,
+            'has_more': len(rows) > limit
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@news_api_bp.route('/related', methods=['GET'])
+def get_related_coverage():
+    """Публикации других источников о том же событии (сюжете).
+    
+    Ответ строится по индексу сюжетов (parsers/story_index.py), без
+    сканирования таблиц новостей.
+    
+    Query Parameters:
+        link (str): URL статьи
+        title (str): Заголовок (если статьи нет в индексе - сюжет ищется по схожести)
+        limit (int): Максимум публикаций (по умолчанию 20)
+    
+    Returns:
+        JSON: Сюжет и список связанных публикаций
+    """
+    link = request.args.get('link', '')
+    title = request.args.get('title', '')
+    limit = request.args.get('limit', 20, type=int)
+    
+    if not link and not title:
+        return jsonify({'status': 'error', 'message': 'Нужен параметр link или title'}), 400
+    
+    try:
+        related = get_story_index().related(link=link or None, title=title or None, limit=limit)
+        story = related['story']
+        
+        if story is not None:
+            story = {
+                'story_id': story['story_id'],
+                'title': story['title'],
+                'category': story['category'],
+                'article_count': story['article_count'],
+                'sources': story['sources'],
+                'first_published': datetime.datetime.fromtimestamp(story['first_seen']).isoformat(),
+                'last_published': datetime.datetime.fromtimestamp(story['last_seen']).isoformat()
+            }
+        
+        return jsonify({
+            'status': 'success',
+            'story': story,
+            'data': related['articles'],
+            'total': len(related['articles'])
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -5,16 +5,18 @@
 - Мониторинга процесса парсинга через WebSocket
 - Управления активными процессами парсинга
 - Real-time логирования процесса парсинга
+
+Парсеры выполняются в пуле прогретых процессов (parsers/worker_pool.py),
+вывод заданий пула пересылается клиентам событием parser_log.
 """
 
 from flask import Blueprint, request, jsonify
 from flask_socketio import SocketIO, emit
 import threading
-import subprocess
 import os
 import sys
-from io import StringIO
-import time
+
+from parsers.worker_pool import PARSER_SPECS, get_worker_pool
 
 # Создаем Blueprint для API парсеров
 parser_api_bp = Blueprint('parser_api', __name__, url_prefix='/api')
@@ -22,314 +24,53 @@ parser_api_bp = Blueprint('parser_api', __name__, url_prefix='/api')
 # Глобальная переменная для SocketIO (будет инициализирована в main app)
 socketio = None
 
-# Глобальный словарь для отслеживания активных процессов парсинга
-active_parsers = {}
+def emit_parser_event(event):
+    """Пересылает событие пула парсеров клиентам через WebSocket.
+    
+    Args:
+        event (dict): Событие пула с полями job_id, source, status, type, message
+    """
+    if socketio:
+        socketio.emit('parser_log', event)
 
 def init_socketio(app_socketio):
     """Инициализация SocketIO для использования в parser_api.
     
+    Подписывает WebSocket на события пула парсеров (процессы пула
+    запускаются при первом задании).
+    
     Args:
         app_socketio: Экземпляр SocketIO из основного приложения
     """
     global socketio
     socketio = app_socketio
+    get_worker_pool().add_listener(emit_parser_event)
 
-def run_parser_with_logging(parser_path, source_name, test_mode=False):
-    """Запускает парсер и передает его вывод через WebSocket.
-    
-    Функция выполняет парсер в отдельном процессе и передает
-    все сообщения о ходе выполнения через WebSocket соединение
-    для real-time мониторинга.
-    
-    Args:
-        parser_path (str): Путь к файлу парсера
-        source_name (str): Название источника для логирования
-        test_mode (bool): Если True, добавляет --limit 2 для тестирования
-    """
-    try:
-        # Отправляем начальное сообщение
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Запуск парсера {source_name}...',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Проверяем существование файла парсера
-        if not os.path.exists(parser_path):
-            if socketio:
-                socketio.emit('parser_log', {
-                    'message': f'Ошибка: файл парсера {parser_path} не найден',
-                    'type': 'error',
-                    'source': source_name
-                })
-            return
-        
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Файл парсера найден: {parser_path}',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Запускаем процесс парсера
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Создание процесса для {source_name}...',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Формируем команду запуска
-        cmd = ['python', parser_path]
-        if test_mode:
-            cmd.extend(['--limit', '2'])
-            if socketio:
-                socketio.emit('parser_log', {
-                    'message': f'Тестовый режим: ограничение на 2 статьи',
-                    'type': 'info',
-                    'source': source_name
-                })
-        
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            bufsize=1
-        )
-        
-        # Сохраняем процесс в глобальном словаре
-        active_parsers[source_name] = process
-        
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Процесс {source_name} создан с PID: {process.pid}',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Читаем вывод построчно и отправляем через WebSocket
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Начинаем чтение вывода процесса {source_name}...',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        line_count = 0
-        for line in iter(process.stdout.readline, ''):
-            line_count += 1
-            if line.strip():
-                # Определяем тип сообщения на основе содержимого
-                message_type = 'info'
-                if 'Ошибка' in line or 'Error' in line:
-                    message_type = 'error'
-                elif 'Найдена новая статья' in line or 'Добавлено' in line or 'Получено' in line:
-                    message_type = 'success'
-                
-                if socketio:
-                    socketio.emit('parser_log', {
-                        'message': line.strip(),
-                        'type': message_type,
-                        'source': source_name
-                    })
-            
-            # Логируем каждые 10 строк для отладки
-            if line_count % 10 == 0 and socketio:
-                socketio.emit('parser_log', {
-                    'message': f'Обработано {line_count} строк вывода от {source_name}',
-                    'type': 'debug',
-                    'source': source_name
-                })
-        
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Завершено чтение вывода {source_name}. Всего строк: {line_count}',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Ждем завершения процесса
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Ожидание завершения процесса {source_name}...',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        process.wait()
-        
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Процесс {source_name} завершился с кодом: {process.returncode}',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Удаляем процесс из словаря активных процессов
-        if source_name in active_parsers:
-            del active_parsers[source_name]
-        
-        # Отправляем финальное сообщение
-        if socketio:
-            if process.returncode == 0:
-                socketio.emit('parser_log', {
-                    'message': f'Парсер {source_name} завершен успешно',
-                    'type': 'success',
-                    'source': source_name
-                })
-            else:
-                socketio.emit('parser_log', {
-                    'message': f'Парсер {source_name} завершен с ошибкой (код: {process.returncode})',
-                    'type': 'error',
-                    'source': source_name
-                })
-                
-    except Exception as e:
-        # Удаляем процесс из словаря в случае ошибки
-        if source_name in active_parsers:
-            del active_parsers[source_name]
-            
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Исключение при запуске парсера {source_name}: {str(e)}',
-                'type': 'error',
-                'source': source_name
-            })
-            socketio.emit('parser_log', {
-                'message': f'Тип исключения: {type(e).__name__}',
-                'type': 'error',
-                'source': source_name
-            })
-
-def run_universal_parser_with_logging(parser_path, site_url, test_mode=False):
-    """Запускает универсальный парсер с указанным URL и передает его вывод через WebSocket.
-    
-    Args:
-        parser_path (str): Путь к файлу универсального парсера
-        site_url (str): URL сайта для парсинга
-        test_mode (bool): Если True, добавляет --limit 2 для тестирования
-    """
-    try:
-        source_name = f"universal_{site_url}"
-        
-        # Отправляем начальное сообщение
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Запуск универсального парсера для {site_url}...',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Проверяем существование файла парсера
-        if not os.path.exists(parser_path):
-            if socketio:
-                socketio.emit('parser_log', {
-                    'message': f'Ошибка: файл универсального парсера {parser_path} не найден',
-                    'type': 'error',
-                    'source': source_name
-                })
-            return
-        
-        # Формируем команду запуска
-        cmd = ['python', parser_path, '--url', site_url]
-        if test_mode:
-            cmd.extend(['--limit', '2'])
-            if socketio:
-                socketio.emit('parser_log', {
-                    'message': f'Тестовый режим: ограничение на 2 статьи',
-                    'type': 'info',
-                    'source': source_name
-                })
-        
-        # Запускаем процесс универсального парсера с URL в качестве аргумента
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            bufsize=1
-        )
-        
-        # Сохраняем процесс в глобальном словаре
-        active_parsers[source_name] = process
-        
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Универсальный парсер для {site_url} создан с PID: {process.pid}',
-                'type': 'info',
-                'source': source_name
-            })
-        
-        # Читаем вывод построчно и отправляем через WebSocket
-        line_count = 0
-        for line in iter(process.stdout.readline, ''):
-            line_count += 1
-            if line.strip():
-                # Определяем тип сообщения на основе содержимого
-                message_type = 'info'
-                if 'Ошибка' in line or 'Error' in line:
-                    message_type = 'error'
-                elif 'Найдена новая статья' in line or 'Добавлено' in line or 'Получено' in line:
-                    message_type = 'success'
-                
-                if socketio:
-                    socketio.emit('parser_log', {
-                        'message': line.strip(),
-                        'type': message_type,
-                        'source': source_name
-                    })
-        
-        # Ждем завершения процесса
-        process.wait()
-        
-        # Удаляем процесс из словаря активных процессов
-        if source_name in active_parsers:
-            del active_parsers[source_name]
-        
-        # Отправляем финальное сообщение
-        if socketio:
-            if process.returncode == 0:
-                socketio.emit('parser_log', {
-                    'message': f'Универсальный парсер для {site_url} завершен успешно',
-                    'type': 'success',
-                    'source': source_name
-                })
-            else:
-                socketio.emit('parser_log', {
-                    'message': f'Универсальный парсер для {site_url} завершен с ошибкой (код: {process.returncode})',
-                    'type': 'error',
-                    'source': source_name
-                })
-                
-    except Exception as e:
-        # Удаляем процесс из словаря в случае ошибки
-        if source_name in active_parsers:
-            del active_parsers[source_name]
-            
-        if socketio:
-            socketio.emit('parser_log', {
-                'message': f'Исключение при запуске универсального парсера для {site_url}: {str(e)}',
-                'type': 'error',
-                'source': source_name
-            })
+def emit_log(message, message_type, source):
+    """Отправляет сообщение в журнал парсинга через WebSocket."""
+    if socketio:
+        socketio.emit('parser_log', {
+            'message': message,
+            'type': message_type,
+            'source': source
+        })
 
 # API-эндпоинт для запуска парсеров
 @parser_api_bp.route('/run_parser', methods=['POST'])
 def run_parser():
     """Запуск парсеров новостей из указанных источников.
     
-    Принимает JSON с массивом источников и запускает соответствующие
-    парсеры в отдельных потоках. Поддерживает real-time мониторинг
+    Принимает JSON с массивом источников и ставит соответствующие
+    парсеры в очередь пула процессов. Поддерживает real-time мониторинг
     через WebSocket.
     
     Request JSON:
         sources (list): Список источников для парсинга ['telegram', 'ria', 'israil']
         source (str): Альтернативный формат - строка с источниками через запятую
+        test_mode (bool): Ограничение на 2 статьи для тестирования
     
     Returns:
-        JSON: Статус запуска парсеров
+        JSON: Статус запуска парсеров и идентификаторы заданий
     """
     try:
         data = request.json
@@ -348,48 +89,32 @@ def run_parser():
         
         # Получаем параметр тестового режима
         test_mode = data.get('test_mode', False)
-        
-        # Словарь всех доступных парсеров
-        available_parsers = {
-            'lenta': 'parser_lenta.py',
-            'rbc': 'parser_rbc.py',
-            'gazeta': 'parser_gazeta.py',
-            'kommersant': 'parser_kommersant.py',
-            'ria': 'parser_ria.py',
-            'rt': 'parser_rt.py',
-            'tsn': 'parser_tsn.py',
-            'unian': 'parser_unian.py',
-            'israil': 'parser_israil.py',
-            'telegram': 'parser_telegram.py',
-            'twitter': 'parser_twitter.py',
-            'vk': 'parser_vk.py',
-            'ok': 'parser_ok.py'
-        }
+        limit = 2 if test_mode else None
         
         # Определяем, какие парсеры запустить
         parsers_to_run = []
         universal_sites = []
         
         if 'all' in sources:
-            parsers_to_run = list(available_parsers.keys())
+            parsers_to_run = [key for key in PARSER_SPECS if key != 'universal']
         else:
             for source in sources:
                 if isinstance(source, dict) and source.get('type') == 'universal':
                     universal_sites.append(source)
-                elif source in available_parsers:
+                elif source in PARSER_SPECS and source != 'universal':
                     parsers_to_run.append(source)
+                else:
+                    emit_log(f'Ошибка: парсер {source} не найден', 'error', str(source))
+        
+        pool = get_worker_pool()
+        jobs = []
+        
+        if test_mode and (parsers_to_run or universal_sites):
+            emit_log('Тестовый режим: ограничение на 2 статьи', 'info', 'all')
         
-        # Запускаем стандартные парсеры в отдельных потоках
+        # Ставим стандартные парсеры в очередь пула
         for parser_name in parsers_to_run:
-            parser_file = available_parsers[parser_name]
-            
-            def run_specific_parser(name, file):
-                parser_path = os.path.join(basedir, 'parsers', file)
-                run_parser_with_logging(parser_path, name, test_mode)
-            
-            thread = threading.Thread(target=run_specific_parser, args=(parser_name, parser_file))
-            thread.daemon = True
-            thread.start()
+            jobs.append(pool.submit(parser_name, limit=limit).job_id)
         
         # Запускаем универсальные парсеры для пользовательских сайтов
         for site_config in universal_sites:
@@ -404,33 +129,21 @@ def run_parser():
                     
                     # Создаем таблицу для пользовательского сайта
                     table_name = create_custom_table_for_site(url)
-                    
-                    if socketio:
-                        socketio.emit('parser_log', {
-                            'message': f'Создана таблица {table_name} для сайта {url}',
-                            'type': 'success',
-                            'source': 'universal'
-                        })
+                    emit_log(f'Создана таблица {table_name} для сайта {url}', 'success', 'universal')
                 except Exception as e:
-                    if socketio:
-                        socketio.emit('parser_log', {
-                            'message': f'Ошибка при создании таблицы для {url}: {str(e)}',
-                            'type': 'error',
-                            'source': 'universal'
-                        })
+                    emit_log(f'Ошибка при создании таблицы для {url}: {str(e)}', 'error', 'universal')
                 
-                # Затем запускаем парсер
-                parser_path = os.path.join(basedir, 'parsers', 'universal_parser.py')
-                run_universal_parser_with_logging(parser_path, url, test_mode)
+                # Затем ставим парсер в очередь
+                pool.submit('universal', limit=limit, url=url)
             
             thread = threading.Thread(target=run_universal_parser_with_category_creation, args=(site_url,))
             thread.daemon = True
             thread.start()
         
-
         return jsonify({
             'status': 'success',
-            'message': f'Парсеры для источников {sources} успешно запущены'
+            'message': f'Парсеры для источников {sources} успешно запущены',
+            'jobs': jobs
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -439,11 +152,12 @@ def run_parser():
 def stop_parser():
     """Остановка активных парсеров.
     
-    Принимает JSON с массивом источников и останавливает
-    соответствующие активные процессы парсинга.
+    Принимает JSON с массивом источников и отменяет соответствующие
+    задания пула: ожидающие снимаются с очереди, процессы выполняющихся
+    завершаются и заменяются новыми.
     
     Request JSON:
-        sources (list): Список источников для остановки ['telegram', 'ria', 'israil']
+        sources (list): Список источников или идентификаторов заданий ['telegram', 'ria', 'israil']
         source (str): Альтернативный формат - строка с источниками через запятую
     
     Returns:
@@ -461,50 +175,13 @@ def stop_parser():
             else:
                 sources = [source]
         
+        pool = get_worker_pool()
         stopped_parsers = []
         
         for source in sources:
-            if source == 'all':
-                # Останавливаем все активные парсеры
-                for parser_name, process in list(active_parsers.items()):
-                    try:
-                        process.terminate()
-                        stopped_parsers.append(parser_name)
-                        if socketio:
-                            socketio.emit('parser_log', {
-                                'message': f'Парсер {parser_name} остановлен пользователем',
-                                'type': 'info',
-                                'source': parser_name
-                            })
-                    except Exception as e:
-                        if socketio:
-                            socketio.emit('parser_log', {
-                                'message': f'Ошибка при остановке парсера {parser_name}: {str(e)}',
-                                'type': 'error',
-                                'source': parser_name
-                            })
-                active_parsers.clear()
-                break
-            elif source in active_parsers:
-                # Останавливаем конкретный парсер
-                try:
-                    process = active_parsers[source]
-                    process.terminate()
-                    del active_parsers[source]
-                    stopped_parsers.append(source)
-                    if socketio:
-                        socketio.emit('parser_log', {
-                            'message': f'Парсер {source} остановлен пользователем',
-                            'type': 'info',
-                            'source': source
-                        })
-                except Exception as e:
-                    if socketio:
-                        socketio.emit('parser_log', {
-                            'message': f'Ошибка при остановке парсера {source}: {str(e)}',
-                            'type': 'error',
-                            'source': source
-                        })
+            if isinstance(source, dict):
+                source = f"universal_{source.get('url')}"
+            stopped_parsers.extend(job.label for job in pool.cancel(source))
         
         if stopped_parsers:
             return jsonify({
@@ -526,12 +203,30 @@ def parser_status():
     """Получение статуса активных парсеров.
     
     Returns:
-        JSON: Список активных парсеров
+        JSON: Список активных парсеров, задания и процессы пула
     """
     try:
+        pool = get_worker_pool()
         return jsonify({
             'status': 'success',
-            'active_parsers': list(active_parsers.keys())
+            'active_parsers': pool.active_sources(),
+            'pool': pool.get_status()
         })
     except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
\ No newline at end of file
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# API-эндпоинт для получения задания пула с хвостом вывода
+@parser_api_bp.route('/parser_jobs/<job_id>', methods=['GET'])
+def parser_job(job_id):
+    """Получение задания пула парсеров.
+    
+    Args:
+        job_id (str): Идентификатор задания из ответа /api/run_parser
+    
+    Returns:
+        JSON: Состояние задания и последние строки вывода
+    """
+    job = get_worker_pool().get_job(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Задание не найдено'}), 404
+    return jsonify({'status': 'success', 'job': job.to_dict(with_log=True)})
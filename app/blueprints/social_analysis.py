@@ -21,6 +21,7 @@ from app.analytics.svo_visualizer import SVOVisualizer
 # ClickHouse для хранения данных
 import clickhouse_connect
 from config import Config
+from parsers.clickhouse_writer import BufferedClickHouseWriter
 import logging
 import json
 from datetime import datetime
@@ -273,33 +274,43 @@ def sources_management():
     """Отображение страницы управления источниками"""
     return render_template('sources.html')
 
+# Общий буфер записи результатов анализа (пакетная вставка, spool при недоступности БД)
+analysis_results_writer = None
+analysis_results_writer_lock = threading.Lock()
+
+def get_analysis_results_writer() -> BufferedClickHouseWriter:
+    """Возвращает общий буферизованный writer для social_analysis_results"""
+    global analysis_results_writer
+    
+    with analysis_results_writer_lock:
+        if analysis_results_writer is None:
+            analysis_results_writer = BufferedClickHouseWriter(create_new_clickhouse_client)
+        return analysis_results_writer
+
+def flush_analysis_results():
+    """Принудительно отправляет накопленные результаты анализа в ClickHouse"""
+    try:
+        get_analysis_results_writer().flush()
+    except Exception as e:
+        logger.error(f"Ошибка сброса результатов анализа в ClickHouse: {e}")
+
 def save_analysis_result(platform: str, account_url: str, content: str, 
                         classification: str, confidence: float, keywords: list, metadata: str,
                         author: str = '', source_url: str = ''):
-    """Сохранение результата анализа в ClickHouse"""
+    """Сохранение результата анализа в ClickHouse (через буфер пакетной записи)"""
     try:
-        client = create_new_clickhouse_client()
-        if client:
-            # Подготавливаем данные как список значений в правильном порядке
-            data_row = [
-                platform,
-                account_url,
-                author or '',
-                source_url or account_url,  # Используем account_url как fallback для source_url
-                content,
-                classification,
-                confidence,
-                keywords if isinstance(keywords, list) else [str(keywords)] if keywords else [],
-                datetime.now(),
-                metadata
-            ]
-            
-            logger.info(f"Сохранение данных в ClickHouse для {platform}: {account_url}")
-            # Указываем явно колонки для вставки (исключая id)
-            client.insert('social_analysis_results', [data_row], 
-                         column_names=['platform', 'account_url', 'author', 'source_url', 'content', 
-                                     'classification', 'confidence', 'keywords', 'analysis_date', 'metadata'])
-            logger.info(f"Результат анализа успешно сохранен для {platform}: {account_url}")
+        get_analysis_results_writer().add('social_analysis_results', {
+            'platform': platform,
+            'account_url': account_url,
+            'author': author or '',
+            'source_url': source_url or account_url,  # Используем account_url как fallback для source_url
+            'content': content,
+            'classification': classification,
+            'confidence': confidence,
+            'keywords': keywords if isinstance(keywords, list) else [str(keywords)] if keywords else [],
+            'analysis_date': datetime.now(),
+            'metadata': metadata
+        })
     except Exception as e:
         logger.error(f"Ошибка сохранения в ClickHouse: {e}")
         logger.error(f"Тип ошибки: {type(e).__name__}")
@@ -405,6 +416,7 @@ def analyze_account():
                     })
             
             results['posts_analyzed'] = len(messages)
+            flush_analysis_results()
             
         elif platform == 'twitter':
             # Анализ Twitter аккаунта
@@ -476,6 +488,7 @@ def analyze_account():
                         })
                 
                 results['posts_analyzed'] = len(tweets)
+                flush_analysis_results()
                 
             except Exception as e:
                 logger.error(f"Ошибка анализа Twitter: {e}")
@@ -735,6 +748,8 @@ def search_keywords():
                 'error': 'OK API не настроен. Требуются ключи приложения.'
             }
         
+        flush_analysis_results()
+        
         return jsonify({
             'success': True,
             'results': results
@@ -1378,31 +1393,27 @@ def analyze_twitter_content(keywords: List[str], time_range: int, analysis_depth
     return results
 
 def save_analysis_results(results: List[Dict], keywords: List[str], platforms: List[str]):
-    """Сохранение результатов анализа в ClickHouse"""
+    """Сохранение результатов анализа в ClickHouse одной колоночной вставкой"""
     try:
-        client = get_clickhouse_client()
-        if not client:
-            logger.error("Ошибка подключения к ClickHouse")
-            return
-        
-        # Подготовка данных для вставки
-        insert_data = []
+        writer = get_analysis_results_writer()
         current_time = datetime.now()
         
         for result in results:
-            # Подготовка данных для вставки в ClickHouse
-            row_data = {
+            post_date = result.get('date', current_time)
+            
+            writer.add('social_analysis_results', {
                 'platform': result.get('source', 'unknown'),
+                'account_url': result.get('url', ''),
+                'author': result.get('author', ''),
+                'source_url': result.get('url', ''),
                 'content': result.get('text', '')[:2000],  # Увеличенное ограничение длины
                 'classification': result.get('risk_level', 'normal'),
                 'confidence': float(result.get('risk_score', 0)),
-                'keywords': ', '.join(result.get('found_keywords', [])),
-                'source_url': result.get('url', ''),
-                'author': result.get('author', ''),
-                'post_date': result.get('date', current_time),
+                'keywords': list(result.get('found_keywords', [])),
                 'analysis_date': current_time,
                 'metadata': json.dumps({
                     'ai_analysis': result.get('ai_analysis'),
+                    'post_date': post_date.isoformat() if isinstance(post_date, datetime) else str(post_date),
                     'views': result.get('views', 0),
                     'likes': result.get('likes', 0),
                     'reposts': result.get('reposts', 0),
@@ -1410,41 +1421,10 @@ def save_analysis_results(results: List[Dict], keywords: List[str], platforms: L
                     'keywords_searched': keywords,
                     'platforms_analyzed': platforms
                 })
-            }
-            insert_data.append(row_data)
-        
-        if insert_data:
-            # Выполнение INSERT запроса
-            insert_query = """
-                INSERT INTO social_analysis_results (
-                    platform, content, classification, confidence, keywords,
-                    source_url, author, post_date, analysis_date, metadata
-                ) VALUES
-            """
-            
-            # Подготовка значений для вставки
-            values = []
-            for data in insert_data:
-                # Экранирование строк для SQL
-                platform = data['platform'].replace("'", "''")
-                content = data['content'].replace("'", "''")
-                classification = data['classification'].replace("'", "''")
-                keywords = data['keywords'].replace("'", "''")
-                source_url = data['source_url'].replace("'", "''")
-                author = data['author'].replace("'", "''")
-                metadata = data['metadata'].replace("'", "''")
-                
-                post_date_str = data['post_date'].strftime('%Y-%m-%d %H:%M:%S') if isinstance(data['post_date'], datetime) else str(data['post_date'])
-                analysis_date_str = data['analysis_date'].strftime('%Y-%m-%d %H:%M:%S')
-                
-                value = f"('{platform}', '{content}', '{classification}', {data['confidence']}, '{keywords}', '{source_url}', '{author}', '{post_date_str}', '{analysis_date_str}', '{metadata}')"
-                values.append(value)
-            
-            full_query = insert_query + ", ".join(values)
-            
-            # Выполнение запроса
-            client.command(full_query)
-            logger.info(f"Saved {len(insert_data)} analysis results to ClickHouse")
+            })
+        
+        writer.flush()
+        logger.info(f"Saved {len(results)} analysis results to ClickHouse")
         
     except Exception as e:
         logger.error(f"Error saving results to ClickHouse: {e}")
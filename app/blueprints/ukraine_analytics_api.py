@@ -27,10 +27,23 @@ from config import Config
 from app.utils.ukraine_sentiment_analyzer import get_ukraine_sentiment_analyzer
 from app.utils.social_tension_analyzer import get_tension_analyzer
 from app.analytics.tension_chart_generator import chart_generator
+from parsers.article_pagination import (
+    CURSOR_COLUMNS, ORDER_BY, ApproximateCounts, PageCursor, get_approximate_counts, split_page
+)
+from parsers.article_search import SearchQuery
+from parsers.articles_rollup import ROLLUP_TABLE, TENSION_LEVELS, TENSION_QUANTILES, rollup_filter
+from parsers.articles_table import ARTICLES_TABLE, articles_filter
+from parsers.story_index import collapse_stories_query, stories_available
 
 # Создаем Blueprint для API украинской аналитики
 ukraine_analytics_bp = Blueprint('ukraine_analytics', __name__, url_prefix='/api/ukraine_analytics')
 
+# Источники тепловой карты и диаграммы по территориям (все, кроме reuters)
+DASHBOARD_SOURCES = (
+    'ria', 'lenta', 'rbc', 'gazeta', 'kommersant', 'tsn', 'unian', 'rt',
+    'cnn', 'aljazeera', 'france24', 'dw', 'euronews', 'bbc', 'israil', 'telegram'
+)
+
 def safe_float(value):
     """Безопасное преобразование в float."""
     try:
@@ -40,6 +53,75 @@ def safe_float(value):
     except (ValueError, TypeError):
         return 0.0
 
+# Статистика напряженности из почасовых агрегатов (только статьи с индексом)
+TENSION_STATS_COLUMNS = f"""
+    sum(scored_count),
+    {', '.join(f'sum(tension_{level})' for level, _ in TENSION_LEVELS)},
+    avgIfMerge(scored_tension_avg),
+    avgIfMerge(scored_spike_avg),
+    minIfMerge(scored_tension_min),
+    maxIfMerge(scored_tension_max),
+    minIfMerge(scored_spike_min),
+    maxIfMerge(scored_spike_max)
+"""
+
+def tension_level(score):
+    """Уровень напряженности (low, medium, high, critical) для индекса 0-100."""
+    for level, upper in TENSION_LEVELS:
+        if upper is None or score < upper:
+            return level
+
+class TensionStats:
+    """Статистика напряженности по агрегатам статей с индексом и оценкам статей без него.
+    
+    Статьи с social_tension_index > 0 учитываются строкой агрегатов
+    (TENSION_STATS_COLUMNS), статьи без индекса - по одной через add()
+    после оценки текста.
+    """
+    
+    def __init__(self, row=None):
+        """
+        Args:
+            row: Строка запроса с TENSION_STATS_COLUMNS (None - нет статей с индексом)
+        """
+        self.news_count = 0
+        self.distribution = {level: 0 for level, _ in TENSION_LEVELS}
+        self.tension_sum = 0.0
+        self.spike_sum = 0.0
+        self.min_tension = self.max_tension = None
+        self.min_spike = self.max_spike = None
+        
+        if row and row[0]:
+            count = row[0]
+            levels = row[1:1 + len(TENSION_LEVELS)]
+            avg_tension, avg_spike, min_tension, max_tension, min_spike, max_spike = row[1 + len(TENSION_LEVELS):]
+            
+            self.news_count = count
+            self.distribution = {level: value for (level, _), value in zip(TENSION_LEVELS, levels)}
+            self.tension_sum = safe_float(avg_tension) * count
+            self.spike_sum = safe_float(avg_spike) * count
+            self.min_tension, self.max_tension = safe_float(min_tension), safe_float(max_tension)
+            self.min_spike, self.max_spike = safe_float(min_spike), safe_float(max_spike)
+    
+    def add(self, tension, spike):
+        """Учитывает статью без индекса (оценку по тексту)."""
+        self.news_count += 1
+        self.distribution[tension_level(tension)] += 1
+        self.tension_sum += tension
+        self.spike_sum += spike
+        self.min_tension = tension if self.min_tension is None else min(self.min_tension, tension)
+        self.max_tension = tension if self.max_tension is None else max(self.max_tension, tension)
+        self.min_spike = spike if self.min_spike is None else min(self.min_spike, spike)
+        self.max_spike = spike if self.max_spike is None else max(self.max_spike, spike)
+    
+    @property
+    def avg_tension(self):
+        return self.tension_sum / self.news_count if self.news_count else 0.0
+    
+    @property
+    def avg_spike(self):
+        return self.spike_sum / self.news_count if self.news_count else 0.0
+
 def get_clickhouse_client():
     """Получение клиента ClickHouse."""
     return Client(
@@ -76,40 +158,24 @@ def get_table_for_category(category):
         # Для остальных категорий используем lenta_headlines как основную таблицу
         return "news.lenta_headlines"
 
-def build_union_query_for_category(category, days):
-    """Построение UNION ALL запроса для категории из всех таблиц источников.
+def build_articles_query_for_category(category, days):
+    """Построение запроса к единой таблице статей для категории по всем источникам.
     
     Args:
         category (str): Код категории
         days (int): Количество дней для анализа
     
     Returns:
-        str: UNION ALL запрос
+        str: SELECT из news.articles
     """
-    # Список основных таблиц источников
-    source_tables = [
-        'telegram_headlines',
-        'lenta_headlines',
-        'rbc_headlines',
-        'gazeta_headlines',
-        'kommersant_headlines',
-        'ria_headlines',
-        'rt_headlines',
-        'tsn_headlines',
-        'unian_headlines',
-        'israil_headlines',
-    ]
-    
-    union_parts = []
-    for table in source_tables:
-        union_parts.append(f"""
-            SELECT title, content, published_date, category, source, COALESCE(link, '') as link
-            FROM news.{table}
-            WHERE published_date >= today() - {days}
-            AND category = '{category}'
-        """)
+    # Основные источники раздела аналитики
+    sources = ('telegram', 'lenta', 'rbc', 'gazeta', 'kommersant', 'ria', 'rt', 'tsn', 'unian', 'israil')
     
-    return " UNION ALL ".join(union_parts)
+    return f"""
+        SELECT title, content, published_date, category, source, link
+        FROM {ARTICLES_TABLE}
+        WHERE {articles_filter(sources, category, days)}
+    """
 
 def get_table_columns(category):
     """Получение правильных столбцов для таблицы категории.
@@ -157,11 +223,11 @@ def get_statistics():
         
         # Формируем запрос в зависимости от типа таблицы
         if table_source == "all_sources":
-            # Используем UNION ALL запрос для всех источников
+            # Используем запрос к единой таблице по всем источникам
             query = f"""
             SELECT COUNT(*) as total_news
             FROM (
-                {build_union_query_for_category(category, days)}
+                {build_articles_query_for_category(category, days)}
             )
             """
         else:
@@ -216,24 +282,15 @@ def get_tension_chart():
         
         client = get_clickhouse_client()
         
-        # Получаем правильную таблицу для категории
-        table_source = get_table_for_category(category)
-        
-        # Формируем условие для категории
-        category_condition = ""
-        if category != 'all':
-            category_condition = f"AND category = '{category}'"
-        
-        # Запрос для получения данных по дням с новыми полями
+        # Дневные значения из почасовых агрегатов всех источников
         query = f"""
         SELECT 
-            toDate(published_date) as day,
-            AVG(COALESCE(social_tension_index, 0)) as avg_tension,
-            AVG(COALESCE(spike_index, 0)) as avg_spike,
-            COUNT(*) as news_count
-        FROM {table_source}
-        WHERE published_date >= today() - {days}
-        {category_condition}
+            toDate(hour) as day,
+            avgMerge(tension_avg) as avg_tension,
+            avgMerge(spike_avg) as avg_spike,
+            sum(news_count) as news_count
+        FROM {ROLLUP_TABLE}
+        WHERE {rollup_filter(categories=category, days=days)}
         GROUP BY day
         ORDER BY day
         """
@@ -303,47 +360,14 @@ def get_category_chart():
         
         client = get_clickhouse_client()
         
-        # Получаем список всех существующих таблиц
-        existing_tables_query = """
-        SELECT name 
-        FROM system.tables 
-        WHERE database = 'news' 
-        AND name LIKE '%_headlines'
-        ORDER BY name
-        """
-        
-        existing_tables_result = client.execute(existing_tables_query)
-        existing_tables = [row[0] for row in existing_tables_result]
-        
-        # Строим UNION запрос для всех таблиц
-        union_parts = []
-        for table_name in existing_tables:
-            union_parts.append(f"""
-                SELECT 
-                    category,
-                    count() AS news_count,
-                    avg(sentiment_score) AS avg_sentiment
-                FROM news.{table_name}
-                WHERE published_date >= today() - {days}
-                GROUP BY category
-            """)
-        
-        if not union_parts:
-            return jsonify({
-                'status': 'success',
-                'chart_url': None,
-                'message': 'Нет данных для отображения'
-            })
-        
-        # Объединяем все запросы
+        # Почасовые агрегаты всех источников
         query = f"""
         SELECT 
             category,
             sum(news_count) AS news_count,
-            avg(avg_sentiment) AS avg_sentiment
-        FROM (
-            {' UNION ALL '.join(union_parts)}
-        )
+            avgMerge(sentiment_avg) AS avg_sentiment
+        FROM {ROLLUP_TABLE}
+        WHERE {rollup_filter(days=days)}
         GROUP BY category 
         ORDER BY news_count DESC
         """
@@ -515,11 +539,11 @@ def get_recent_news():
         
         # Формируем запрос в зависимости от типа таблицы
         if table_source == "all_sources":
-            # Используем UNION ALL запрос для всех источников
+            # Используем запрос к единой таблице по всем источникам
             query = f"""
             SELECT published_date, title, content, category, source, link
             FROM (
-                {build_union_query_for_category(category, days)}
+                {build_articles_query_for_category(category, days)}
             )
             ORDER BY published_date DESC
             LIMIT {limit}
@@ -787,22 +811,16 @@ def get_sentiment_analysis():
         
         client = get_clickhouse_client()
         
-        # Используем UNION для получения данных из всех таблиц
-        table_source = get_table_for_category('all')
-        
-        # Запрос для получения детальной статистики тональности
+        # Детальная статистика тональности из почасовых агрегатов всех источников
         query = f"""
         SELECT 
             category,
-            COUNT(*) as total_news,
-            AVG(sentiment_score) as avg_sentiment,
-            AVG(positive_score) as avg_positive,
-            AVG(negative_score) as avg_negative,
-            AVG(neutral_score) as avg_neutral,
-            AVG(military_intensity) as avg_military_intensity,
-            AVG(humanitarian_focus) as avg_humanitarian_focus
-        FROM {table_source}
-        WHERE published_date >= today() - {days}
+            sum(news_count) as total_news,
+            avgMerge(sentiment_avg) as avg_sentiment,
+            avgMerge(positive_avg) as avg_positive,
+            avgMerge(negative_avg) as avg_negative
+        FROM {ROLLUP_TABLE}
+        WHERE {rollup_filter(days=days)}
         GROUP BY category
         ORDER BY total_news DESC
         """
@@ -823,7 +841,7 @@ def get_sentiment_analysis():
         
         analysis_data = []
         for row in result:
-            category, total, avg_sentiment, avg_pos, avg_neg, avg_neu, avg_mil, avg_hum = row
+            category, total, avg_sentiment, avg_pos, avg_neg = row
             
             analysis_data.append({
                 'category': category,
@@ -832,9 +850,11 @@ def get_sentiment_analysis():
                 'avg_sentiment': safe_float(avg_sentiment),
                 'avg_positive': safe_float(avg_pos),
                 'avg_negative': safe_float(avg_neg),
-                'avg_neutral': safe_float(avg_neu),
-                'avg_military_intensity': safe_float(avg_mil),
-                'avg_humanitarian_focus': safe_float(avg_hum)
+                # Нейтральной оценки, военной и гуманитарной интенсивности
+                # в схеме статей нет - поля оставлены для совместимости ответа
+                'avg_neutral': 0.0,
+                'avg_military_intensity': 0.0,
+                'avg_humanitarian_focus': 0.0
             })
         
         return jsonify({
@@ -866,39 +886,37 @@ def get_social_tension_statistics():
         client = get_clickhouse_client()
         tension_analyzer = get_tension_analyzer()
         
-        # Получаем правильную таблицу для категории
-        table_source = get_table_for_category(category)
+        where_clause = rollup_filter(categories=category, days=days)
         
-        # Формируем условие для категории
-        category_condition = ""
-        if category != 'all':
-            category_condition = f"AND category = '{category}'"
+        # Статьи с индексом напряженности - из почасовых агрегатов
+        stats_row = client.execute(f"""
+        SELECT {TENSION_STATS_COLUMNS},
+               quantilesIfMerge({', '.join(map(str, TENSION_QUANTILES))})(tension_quantiles)
+        FROM {ROLLUP_TABLE}
+        WHERE {where_clause}
+        """)
+        stats = TensionStats(stats_row[0][:-1] if stats_row else None)
+        tension_quantiles = stats_row[0][-1] if stats_row and stats.news_count else []
+        
+        # Средняя напряженность по дням для анализа тренда
+        daily_result = client.execute(f"""
+        SELECT toDate(hour) as day, avgIfMerge(scored_tension_avg) as avg_tension
+        FROM {ROLLUP_TABLE}
+        WHERE {where_clause}
+        GROUP BY day
+        HAVING sum(scored_count) > 0
+        ORDER BY day
+        """)
         
-        # Запрос для получения новостей с новыми полями
-        query = f"""
-        SELECT title, content, published_date, category, source,
-               COALESCE(social_tension_index, 0) as tension_index,
-               COALESCE(spike_index, 0) as spike_index,
-               COALESCE(ai_category, category) as ai_category,
-               COALESCE(ai_confidence, 0) as ai_confidence
-        FROM {table_source}
-        WHERE published_date >= today() - {days}
-        {category_condition}
+        # Статьи без индекса (не оцененные парсером) - анализ текста
+        unscored_results = client.execute(f"""
+        SELECT title, content
+        FROM {ARTICLES_TABLE}
+        WHERE {articles_filter(categories=category, days=days)}
+        AND social_tension_index = 0
         ORDER BY published_date DESC
         LIMIT 5000
-        """
-        
-        results = client.execute(query)
-        
-        if not results:
-            return jsonify({
-                'status': 'success',
-                'total_news': 0,
-                'avg_tension': 0.0,
-                'avg_spike': 0.0,
-                'tension_distribution': {},
-                'trend': 'stable'
-            })
+        """)
         
         def safe_float(value):
             """Безопасное преобразование в float с защитой от NaN."""
@@ -912,54 +930,32 @@ def get_social_tension_statistics():
             except (ValueError, TypeError):
                 return 0.0
         
-        # Анализ напряженности для каждой новости
-        tension_scores = []
-        spike_scores = []
-        tension_history = []
+        for title, content in unscored_results:
+            text = f"{title} {content or ''}"
+            metrics = tension_analyzer.analyze_text_tension(text, title)
+            safe_tension = safe_float(metrics.tension_score) * 100
+            stats.add(safe_tension, safe_tension * 0.8)  # Примерное соотношение
         
-        for title, content, pub_date, cat, site_name, tension_idx, spike_idx, ai_cat, ai_conf in results:
-            # Используем данные из базы, если они есть, иначе анализируем
-            if tension_idx > 0:
-                safe_tension = safe_float(tension_idx)
-                safe_spike = safe_float(spike_idx)
-            else:
-                # Fallback к анализу текста
-                text = f"{title} {content or ''}"
-                metrics = tension_analyzer.analyze_text_tension(text, title)
-                safe_tension = safe_float(metrics.tension_score) * 100
-                safe_spike = safe_tension * 0.8  # Примерное соотношение
-            
-            tension_scores.append(safe_tension)
-            spike_scores.append(safe_spike)
-            tension_history.append((pub_date, safe_tension))
-        
-        # Расчет статистики
-        avg_tension = safe_float(sum(tension_scores) / len(tension_scores)) if tension_scores else 0.0
-        avg_spike = safe_float(sum(spike_scores) / len(spike_scores)) if spike_scores else 0.0
-        
-        # Подсчет распределения по уровням напряженности (значения уже в процентах)
-        tension_distribution = {
-            'low': len([s for s in tension_scores if s < 30]),
-            'medium': len([s for s in tension_scores if 30 <= s < 60]),
-            'high': len([s for s in tension_scores if 60 <= s < 80]),
-            'critical': len([s for s in tension_scores if s >= 80])
-        }
+        if not stats.news_count:
+            return jsonify({
+                'status': 'success',
+                'total_news': 0,
+                'avg_tension': 0.0,
+                'avg_spike': 0.0,
+                'tension_distribution': {},
+                'trend': 'stable'
+            })
         
-        # Анализ тренда
-        if len(tension_history) >= 2:
-            recent_scores = [score for _, score in tension_history[-10:]]
-            earlier_scores = [score for _, score in tension_history[:-10]] if len(tension_history) > 10 else []
+        # Анализ тренда: последний день против среднего за предыдущие
+        daily_scores = [safe_float(avg) for _, avg in daily_result]
+        if len(daily_scores) >= 2:
+            recent_avg = daily_scores[-1]
+            earlier_avg = sum(daily_scores[:-1]) / len(daily_scores[:-1])
             
-            if earlier_scores:
-                recent_avg = sum(recent_scores) / len(recent_scores)
-                earlier_avg = sum(earlier_scores) / len(earlier_scores)
-                
-                if recent_avg > earlier_avg + 0.1:
-                    trend = 'rising'
-                elif recent_avg < earlier_avg - 0.1:
-                    trend = 'falling'
-                else:
-                    trend = 'stable'
+            if recent_avg > earlier_avg + 0.1:
+                trend = 'rising'
+            elif recent_avg < earlier_avg - 0.1:
+                trend = 'falling'
             else:
                 trend = 'stable'
         else:
@@ -967,15 +963,20 @@ def get_social_tension_statistics():
         
         return jsonify({
             'status': 'success',
-            'total_news': len(results),
-            'avg_tension': round(safe_float(avg_tension), 2),
-            'avg_spike': round(safe_float(avg_spike), 2),
-            'tension_distribution': tension_distribution,
+            'total_news': stats.news_count,
+            'avg_tension': round(safe_float(stats.avg_tension), 2),
+            'avg_spike': round(safe_float(stats.avg_spike), 2),
+            'tension_distribution': stats.distribution,
             'trend': trend,
-            'max_tension': round(safe_float(max(tension_scores)), 2) if tension_scores else 0.0,
-            'min_tension': round(safe_float(min(tension_scores)), 2) if tension_scores else 0.0,
-            'max_spike': round(safe_float(max(spike_scores)), 2) if spike_scores else 0.0,
-            'min_spike': round(safe_float(min(spike_scores)), 2) if spike_scores else 0.0
+            'max_tension': round(safe_float(stats.max_tension), 2),
+            'min_tension': round(safe_float(stats.min_tension), 2),
+            'max_spike': round(safe_float(stats.max_spike), 2),
+            'min_spike': round(safe_float(stats.min_spike), 2),
+            # Квантили напряженности статей с индексом (без оценок по тексту)
+            'tension_quantiles': {
+                f'p{int(level * 100)}': round(safe_float(value), 2)
+                for level, value in zip(TENSION_QUANTILES, tension_quantiles)
+            }
         })
         
     except Exception as e:
@@ -986,96 +987,50 @@ def get_social_tension_statistics():
 @ukraine_analytics_bp.route('/latest_news', methods=['GET'])
 def get_latest_news():
     """Получение последних новостей для отображения в разделе аналитики"""
+    try:
+        page_cursor = PageCursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
     try:
         days = request.args.get('days', 7, type=int)
         category = request.args.get('category', 'all')
         source = request.args.get('source', None)
         limit = request.args.get('limit', 20, type=int)
         offset = request.args.get('offset', 0, type=int)
-        search = request.args.get('search', '')
+        search_query = SearchQuery(request.args.get('search', ''))
         
         # Инициализируем клиент ClickHouse и анализатор напряженности
         client = get_clickhouse_client()
         tension_analyzer = get_tension_analyzer()
         
-        # Определяем таблицу для запроса
-        source_table_map = {
-            'lenta': 'news.lenta_headlines',
-            'rbc': 'news.rbc_headlines',
-            'gazeta': 'news.gazeta_headlines',
-            'kommersant': 'news.kommersant_headlines',
-            'ria': 'news.ria_headlines',
-            'rt': 'news.rt_headlines',
-            'tsn': 'news.tsn_headlines',
-            'unian': 'news.unian_headlines',
-            'israil': 'news.israil_headlines',
-            'telegram': 'news.telegram_headlines'
-        }
-        
-        if source and source != 'all' and source in source_table_map:
-            # Используем конкретную таблицу для выбранного источника
-            table_source = source_table_map[source]
-        else:
-            # UNION ALL из всех таблиц для 'all' или неизвестного источника
-            table_source = 'UNION_ALL'
+        # Источники раздела аналитики ('all' или неизвестный источник - все они)
+        analytics_sources = ('lenta', 'rbc', 'gazeta', 'kommersant', 'ria', 'rt', 'tsn', 'unian', 'israil', 'telegram')
+        sources = source if source in analytics_sources else analytics_sources
         
-        # Условие для категории
-        category_condition = ""
-        if category != 'all':
-            category_condition = f"AND category = '{category}'"
+        # Поиск по словам (параметры запроса, skip-индексы title/content)
+        where_clause = f"{articles_filter(sources, category, days)} AND {search_query.condition}"
         
-        # Условие для поиска
-        search_condition = ""
-        if search:
-            search_condition = f"AND (title ILIKE '%{search}%' OR content ILIKE '%{search}%')"
-        
-        
-        # Запрос для получения последних новостей с новыми полями
-        if table_source == 'UNION_ALL':
-            # UNION ALL запрос из всех таблиц
-            union_parts = []
-            for source_name, table_name in source_table_map.items():
-                union_parts.append(f"""
-                    SELECT title, content, published_date, category, source,
-                           COALESCE(social_tension_index, 0) as tension_index,
-                           COALESCE(spike_index, 0) as spike_index,
-                           COALESCE(ai_category, category) as ai_category,
-                           COALESCE(ai_confidence, 0) as ai_confidence
-                    FROM {table_name}
-                    WHERE published_date >= today() - {days}
-                    {category_condition}
-                    {search_condition}
-                """)
-            
-            query = f"""
-            SELECT title, content, published_date, category, source,
-                   tension_index, spike_index, ai_category, ai_confidence
-            FROM (
-                {' UNION ALL '.join(union_parts)}
-            )
-            ORDER BY published_date DESC
-            LIMIT {limit} OFFSET {offset}
-            """
-        else:
-            # Запрос к конкретной таблице
-            query = f"""
-            SELECT title, content, published_date, category, source,
-                   COALESCE(social_tension_index, 0) as tension_index,
-                   COALESCE(spike_index, 0) as spike_index,
-                   COALESCE(ai_category, category) as ai_category,
-                   COALESCE(ai_confidence, 0) as ai_confidence
-            FROM {table_source}
-            WHERE published_date >= today() - {days}
-            {category_condition}
-            {search_condition}
-            ORDER BY published_date DESC
-            LIMIT {limit} OFFSET {offset}
-            """
+        # Запрос страницы: статьи после курсора (или со смещением offset),
+        # на одну больше лимита - чтобы узнать, есть ли следующая страница
+        query = f"""
+        SELECT title, content, published_date, category, source,
+               COALESCE(social_tension_index, 0) as tension_index,
+               COALESCE(spike_index, 0) as spike_index,
+               COALESCE(ai_category, category) as ai_category,
+               COALESCE(ai_confidence, 0) as ai_confidence,
+               {CURSOR_COLUMNS}
+        FROM {ARTICLES_TABLE}
+        WHERE {where_clause} AND {page_cursor.condition}
+        ORDER BY {ORDER_BY}
+        LIMIT {max(limit, 0) + 1} OFFSET {0 if page_cursor else offset}
+        """
+        params = {**search_query.params, **page_cursor.params}
         
-        result = client.execute(query)
+        result, next_cursor = split_page(client.execute(query, params or None), limit)
         
         latest_news = []
-        for title, content, pub_date, cat, site_name, tension_idx, spike_idx, ai_cat, ai_conf in result:
+        for title, content, pub_date, cat, site_name, tension_idx, spike_idx, ai_cat, ai_conf, _, _ in result:
             # Используем данные из базы, если они есть и больше 0, иначе анализируем
             if tension_idx > 0:
                 calculated_tension = safe_float(tension_idx)
@@ -1098,43 +1053,30 @@ def get_latest_news():
                 'ai_confidence': round(safe_float(ai_conf), 2)
             })
         
-        # Получаем общее количество записей для пагинации
-        if table_source == 'UNION_ALL':
-            # UNION ALL запрос для подсчета
-            union_count_parts = []
-            for source_name, table_name in source_table_map.items():
-                union_count_parts.append(f"""
-                    SELECT COUNT(*) as cnt
-                    FROM {table_name}
-                    WHERE published_date >= today() - {days}
-                    {category_condition}
-                    {search_condition}
-                """)
-            
-            count_query = f"""
-            SELECT SUM(cnt) as total
-            FROM (
-                {' UNION ALL '.join(union_count_parts)}
-            )
-            """
+        # Общее количество записей для пагинации - из почасовых агрегатов, а с
+        # поиском - приблизительный итог из кэша (пересчитывается в фоне)
+        if not search_query:
+            total_count = client.execute(f"""
+            SELECT sum(news_count)
+            FROM {ROLLUP_TABLE}
+            WHERE {rollup_filter(sources, category, days)}
+            """)[0][0]
         else:
-            # Запрос к конкретной таблице для подсчета
-            count_query = f"""
-            SELECT COUNT(*)
-            FROM {table_source}
-            WHERE published_date >= today() - {days}
-            {category_condition}
-            {search_condition}
-            """
-        total_count_result = client.execute(count_query)
-        total_count = total_count_result[0][0] if total_count_result else len(latest_news)
+            count_query = f"SELECT count() FROM {ARTICLES_TABLE} WHERE {where_clause}"
+            total_count = get_approximate_counts().get(
+                ApproximateCounts.key(count_query, search_query.params),
+                lambda: get_clickhouse_client().execute(count_query, search_query.params)[0][0]
+            )
         
         return jsonify({
             'status': 'success',
             'latest_news': latest_news,
             'total_count': total_count,
-            'current_page': (offset // limit) + 1,
-            'total_pages': math.ceil(total_count / limit) if total_count > 0 else 1
+            'total_is_approximate': bool(search_query),
+            'current_page': None if page_cursor else (offset // limit) + 1,
+            'total_pages': max(math.ceil(total_count / limit), 1) if total_count is not None else None,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
         
     except Exception as e:
@@ -1233,56 +1175,42 @@ def get_tension_by_category():
         client = get_clickhouse_client()
         tension_analyzer = get_tension_analyzer()
         
-        # Используем UNION для получения данных из всех таблиц
-        table_source = get_table_for_category('all')
-        
-        # Запрос для получения новостей по категориям
-        query = f"""
-        SELECT category, title, content, published_date
-        FROM {table_source}
-        WHERE published_date >= today() - {days}
+        # Статьи с индексом напряженности - из почасовых агрегатов всех источников
+        rollup_result = client.execute(f"""
+        SELECT category, {TENSION_STATS_COLUMNS}
+        FROM {ROLLUP_TABLE}
+        WHERE {rollup_filter(days=days)}
+        GROUP BY category
+        """)
+        categories_data = {row[0]: TensionStats(row[1:]) for row in rollup_result}
+        
+        # Статьи без индекса (не оцененные парсером) - анализ текста
+        unscored_results = client.execute(f"""
+        SELECT category, title, content
+        FROM {ARTICLES_TABLE}
+        WHERE {articles_filter(days=days)}
+        AND social_tension_index = 0
         ORDER BY category, published_date DESC
         LIMIT 5000
-        """
-        
-        results = client.execute(query)
-        
-        if not results:
-            return jsonify({
-                'status': 'success',
-                'categories': []
-            })
+        """)
         
-        # Группировка по категориям
-        categories_data = {}
-        for category, title, content, pub_date in results:
-            if category not in categories_data:
-                categories_data[category] = []
-            
+        for category, title, content in unscored_results:
             text = f"{title} {content or ''}"
             metrics = tension_analyzer.analyze_text_tension(text, title)
-            categories_data[category].append(metrics.tension_score)
+            categories_data.setdefault(category, TensionStats()).add(metrics.tension_score, 0.0)
         
         # Расчет статистики по категориям
         category_stats = []
-        for category, tensions in categories_data.items():
-            if tensions:
-                # Подсчет распределения по уровням напряженности
-                distribution = {
-                    'low': len([s for s in tensions if s < 30]),
-                    'medium': len([s for s in tensions if 30 <= s < 60]),
-                    'high': len([s for s in tensions if 60 <= s < 80]),
-                    'critical': len([s for s in tensions if s >= 80])
-                }
-                
+        for category, stats in categories_data.items():
+            if stats.news_count:
                 category_stats.append({
                     'category': category,
                     'category_name': get_category_name(category),
-                    'avg_tension': round(sum(tensions) / len(tensions), 2),
-                    'max_tension': round(max(tensions), 2),
-                    'min_tension': round(min(tensions), 2),
-                    'news_count': len(tensions),
-                    'distribution': distribution
+                    'avg_tension': round(stats.avg_tension, 2),
+                    'max_tension': round(stats.max_tension, 2),
+                    'min_tension': round(stats.min_tension, 2),
+                    'news_count': stats.news_count,
+                    'distribution': stats.distribution
                 })
         
         # Сортировка по средней напряженности
@@ -1817,47 +1745,14 @@ def get_category_data():
         
         client = get_clickhouse_client()
         
-        # Получаем список всех существующих таблиц
-        existing_tables_query = """
-        SELECT name 
-        FROM system.tables 
-        WHERE database = 'news' 
-        AND name LIKE '%_headlines'
-        ORDER BY name
-        """
-        
-        existing_tables_result = client.execute(existing_tables_query)
-        existing_tables = [row[0] for row in existing_tables_result]
-        
-        # Строим UNION запрос для всех таблиц
-        union_parts = []
-        for table_name in existing_tables:
-            union_parts.append(f"""
-                SELECT 
-                    category,
-                    count() AS news_count,
-                    avg(sentiment_score) AS avg_sentiment
-                FROM news.{table_name}
-                WHERE published_date >= today() - {days}
-                GROUP BY category
-            """)
-        
-        if not union_parts:
-            return jsonify({
-                'status': 'success',
-                'data': [],
-                'total_news': 0
-            })
-        
-        # Объединяем все запросы
+        # Почасовые агрегаты всех источников
         query = f"""
         SELECT 
             category,
             sum(news_count) AS news_count,
-            avg(avg_sentiment) AS avg_sentiment
-        FROM (
-            {' UNION ALL '.join(union_parts)}
-        )
+            avgMerge(sentiment_avg) AS avg_sentiment
+        FROM {ROLLUP_TABLE}
+        WHERE {rollup_filter(days=days)}
         GROUP BY category 
         ORDER BY news_count DESC
         """
@@ -1924,55 +1819,17 @@ def get_heatmap_data():
         # Получаем правильную таблицу для категории
         table_source = get_table_for_category(category)
         
-        # Формируем условие для категории
-        category_condition = ""
-        if category != 'all':
-            category_condition = f"AND category = '{category}'"
+        where_clause = rollup_filter(DASHBOARD_SOURCES, category, days)
         
-        # Получаем данные по источникам и дням с нормализацией названий источников
-        # Используем тот же набор таблиц что и в /api/statistics для консистентности
+        # Получаем данные по источникам и дням из почасовых агрегатов
+        # Используем тот же набор источников что и в /api/statistics для консистентности
         query = f"""
         SELECT 
-            CASE 
-                WHEN source = 'lenta.ru' THEN 'lenta'
-                WHEN source = 'gazeta.ru' THEN 'gazeta'
-                ELSE source
-            END as normalized_source,
-            toDate(published_date) as day,
-            count() as news_count
-        FROM (
-            SELECT source, published_date, category FROM news.ria_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.lenta_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.rbc_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.gazeta_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.kommersant_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.tsn_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.unian_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.rt_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.cnn_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.aljazeera_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.france24_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.dw_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.euronews_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.bbc_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.israil_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.telegram_headlines WHERE published_date >= today() - {days} {category_condition}
-        )
+            source as normalized_source,
+            toDate(hour) as day,
+            sum(news_count) as news_count
+        FROM {ROLLUP_TABLE}
+        WHERE {where_clause}
         GROUP BY normalized_source, day
         ORDER BY normalized_source, day
         """
@@ -1991,40 +1848,9 @@ def get_heatmap_data():
         # Подсчитываем общее количество новостей для совместимости с другими эндпоинтами
         # Используем тот же подход что и в /api/statistics
         total_news_query = f"""
-        SELECT count() as total_count
-        FROM (
-            SELECT source, published_date, category FROM news.ria_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.lenta_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.rbc_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.gazeta_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.kommersant_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.tsn_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.unian_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.rt_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.cnn_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.aljazeera_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.france24_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.dw_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.euronews_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.bbc_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.israil_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT source, published_date, category FROM news.telegram_headlines WHERE published_date >= today() - {days} {category_condition}
-        )
+        SELECT sum(news_count) as total_count
+        FROM {ROLLUP_TABLE}
+        WHERE {where_clause}
         """
         
         total_result = client.execute(total_news_query)
@@ -2116,15 +1942,14 @@ def get_tension_data():
         
         # Формируем запрос в зависимости от типа таблицы
         if table_source == "all_sources":
-            # Используем UNION ALL запрос для всех источников с новыми полями
+            # Используем запрос к единой таблице по всем источникам с новыми полями
             query = f"""
             SELECT title, content, published_date, category, source,
                    COALESCE(social_tension_index, 0) as tension_index,
-                   COALESCE(spike_index, 0) as spike_index
+                   COALESCE(spike_index, 0) as spike_index, link
             FROM (
-                {build_union_query_for_category(category, days)}
+                {build_articles_query_for_category(category, days)}
             )
-            ORDER BY published_date ASC
             """
         else:
             # Формируем условие для категории
@@ -2136,13 +1961,20 @@ def get_tension_data():
             query = f"""
             SELECT title, content, published_date, category, source,
                    COALESCE(social_tension_index, 0) as tension_index,
-                   COALESCE(spike_index, 0) as spike_index
+                   COALESCE(spike_index, 0) as spike_index, link
             FROM {table_source}
             WHERE published_date >= now() - INTERVAL {days} DAY
             {category_filter}
-            ORDER BY published_date ASC
             """
         
+        columns = "title, content, published_date, category, source, tension_index, spike_index"
+        if stories_available(client):
+            # Одна статья на сюжет: копии события из разных источников
+            # не должны многократно входить в средний индекс дня
+            query = collapse_stories_query(query, columns, days * 24, order='published_date ASC')
+        else:
+            query = f"SELECT {columns} FROM ({query}) ORDER BY published_date ASC"
+        
         results = client.execute(query)
         
         if not results or len(results) == 0:
@@ -2322,49 +2154,13 @@ def get_territory_data():
         
         client = get_clickhouse_client()
         
-        # Формируем условие для категории
-        category_condition = ""
-        if category != 'all':
-            category_condition = f"AND category = '{category}'"
-        
-        # Получаем данные из всех таблиц с учетом категории
-        # Используем тот же набор таблиц что и в /api/statistics для консистентности
+        # Получаем данные всех источников с учетом категории
+        # Используем тот же набор источников что и в /api/statistics для консистентности
         query = f"""
         SELECT 
             title, content, published_date, category, source
-        FROM (
-            SELECT title, content, published_date, category, source FROM news.ria_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.lenta_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.rbc_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.gazeta_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.kommersant_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.tsn_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.unian_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.rt_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.cnn_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.aljazeera_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.france24_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.dw_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.euronews_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.bbc_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.israil_headlines WHERE published_date >= today() - {days} {category_condition}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.telegram_headlines WHERE published_date >= today() - {days} {category_condition}
-        )
+        FROM {ARTICLES_TABLE}
+        WHERE {articles_filter(DASHBOARD_SOURCES, category, days)}
         ORDER BY published_date DESC
         """
         
@@ -2462,46 +2258,11 @@ def get_full_statistics():
         # Получаем правильную таблицу для категории
         table_source = get_table_for_category(category)
         
-        # ВСЕГДА используем UNION ALL запрос для всех источников для консистентности
-        # Используем тот же набор таблиц что и в /api/statistics для консистентности
-        category_filter = f"AND category = '{category}'" if category != 'all' else ""
+        # ВСЕГДА используем все источники для консистентности
         query = f"""
             SELECT title, content, published_date, category, source
-            FROM (
-            SELECT title, content, published_date, category, source FROM news.ria_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.lenta_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.rbc_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.gazeta_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.kommersant_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.tsn_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.unian_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.rt_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.cnn_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.aljazeera_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.reuters_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.france24_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.dw_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.euronews_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.bbc_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.israil_headlines WHERE published_date >= today() - {days} {category_filter}
-            UNION ALL
-            SELECT title, content, published_date, category, source FROM news.telegram_headlines WHERE published_date >= today() - {days} {category_filter}
-            )
+            FROM {ARTICLES_TABLE}
+            WHERE {articles_filter(categories=category, days=days)}
             ORDER BY published_date DESC
             """
         
@@ -4,7 +4,6 @@ from flask import jsonify, request, render_template, current_app
 import clickhouse_connect
 import datetime
 import threading
-import subprocess
 import random
 from app import app
 from app.models import get_clickhouse_client
@@ -62,13 +61,14 @@ def api_parser_status():
         from parsers.parser_manager import ParserManager
         
         manager = ParserManager()
+        status = manager.get_status()
         
         # Получаем статистику парсеров
         parsers_data = []
-        for parser_key, parser_info in manager.parsers.items():
+        for parser_key, parser_info in status['parsers'].items():
             parser_data = {
                 'name': parser_info['name'],
-                'status': 'idle',  # По умолчанию
+                'status': 'running' if parser_info['status'] == 'running' else 'idle',
                 'articles_processed': 0,
                 'articles_saved': 0,
                 'validation_rejected': 0,
@@ -130,7 +130,7 @@ def api_parser_start_all():
         # Запускаем все парсеры в отдельном потоке
         def run_parsers():
             try:
-                result = manager.run_all_parsers_with_callback(max_workers=4)
+                result = manager.run_all_parsers_with_callback()
                 print(f"Парсинг завершен: {result['successful']} успешно, {result['failed']} с ошибками")
             except Exception as e:
                 print(f"Ошибка при запуске парсеров: {e}")
@@ -155,11 +155,13 @@ def api_parser_start_all():
 def api_parser_stop_all():
     """API для остановки всех парсеров"""
     try:
-        # Здесь должна быть логика остановки парсеров
-        # Пока что просто возвращаем успех
+        from parsers.worker_pool import get_worker_pool
+        
+        stopped = get_worker_pool().cancel('all')
         return jsonify({
             'success': True,
-            'message': 'Все парсеры остановлены'
+            'message': 'Все парсеры остановлены',
+            'stopped': [job.label for job in stopped]
         })
         
     except Exception as e:
@@ -175,13 +177,7 @@ def run_parser():
         data = request.json
         source = data.get('source', 'all')
         
-        # Импортируем необходимые модули
-        import threading
-        import subprocess
-        import os
-        
-        # Получаем базовый путь проекта
-        basedir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+        from parsers.worker_pool import get_worker_pool
         
         # Обрабатываем случай, когда источники переданы в виде строки с разделителями
         if isinstance(source, str) and ',' in source:
@@ -189,36 +185,11 @@ def run_parser():
         else:
             sources = [source]
         
-        # Определяем, какой парсер запустить в зависимости от источника
-        if 'telegram' in sources or 'all' in sources:
-            # Запускаем парсер Telegram в отдельном потоке
-            def run_telegram_parser():
-                parser_path = os.path.join(basedir, 'parser_telegram.py')
-                subprocess.run(['python', parser_path])
-            
-            thread = threading.Thread(target=run_telegram_parser)
-            thread.daemon = True
-            thread.start()
-        
-        if 'israil' in sources or 'all' in sources:
-            # Запускаем парсер Израиль в отдельном потоке
-            def run_israil_parser():
-                parser_path = os.path.join(basedir, 'parser_israil.py')
-                subprocess.run(['python', parser_path])
-            
-            thread = threading.Thread(target=run_israil_parser)
-            thread.daemon = True
-            thread.start()
-        
-        if 'ria' in sources or 'all' in sources:
-            # Запускаем парсер РИА в отдельном потоке
-            def run_ria_parser():
-                parser_path = os.path.join(basedir, 'parser_ria.py')
-                subprocess.run(['python', parser_path])
-            
-            thread = threading.Thread(target=run_ria_parser)
-            thread.daemon = True
-            thread.start()
+        # Ставим парсеры в очередь пула прогретых процессов
+        pool = get_worker_pool()
+        for parser_name in ('telegram', 'israil', 'ria'):
+            if parser_name in sources or 'all' in sources:
+                pool.submit(parser_name)
         
         return jsonify({
             'status': 'success',
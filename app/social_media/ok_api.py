@@ -1,10 +1,10 @@
 import requests
 import json
 import hashlib
-import time
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import logging
+from parsers.http_client import get_http_client
 from ..ai.content_classifier import ExtremistContentClassifier
 
 class OKAnalyzer:
@@ -94,7 +94,7 @@ class OKAnalyzer:
             
             params['sig'] = signature
             
-            response = requests.post(self.base_url, data=params, timeout=30)
+            response = get_http_client().post(self.base_url, data=params)
             response.raise_for_status()
             data = response.json()
             
@@ -393,9 +393,6 @@ class OKAnalyzer:
                     analyzed_comments = self.analyze_content_batch(comments, keywords)
                     all_content.extend(analyzed_comments)
                     
-                    # Пауза между запросами
-                    time.sleep(0.5)
-                    
             except Exception as e:
                 self.logger.error(f"Error monitoring group {group_id}: {e}")
                 continue
@@ -423,8 +420,6 @@ class OKAnalyzer:
                     analyzed_topics = self.analyze_content_batch(topics, keywords)
                     all_content.extend(analyzed_topics)
                     
-                    time.sleep(0.5)
-                    
                 except Exception as e:
                     self.logger.error(f"Error getting content from group {group['id']}: {e}")
                     continue
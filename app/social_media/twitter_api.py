@@ -5,6 +5,7 @@ from typing import List, Dict, Optional, Set
 from datetime import datetime, timedelta
 import logging
 import re
+from parsers.http_client import get_http_client
 from ..ai.content_classifier import ExtremistContentClassifier
 
 class TwitterAnalyzer:
@@ -38,11 +39,14 @@ class TwitterAnalyzer:
         """Выполнение запроса к Twitter API v2"""
         try:
             url = f"{self.base_url}/{endpoint}"
-            response = requests.get(url, headers=self.headers, params=params)
+            response = get_http_client().get(url, headers=self.headers, params=params)
             
             if response.status_code == 429:  # Rate limit
-                self.logger.warning("Rate limit reached, waiting...")
-                time.sleep(900)  # Ждем 15 минут
+                # Ждем до сброса окна лимита, если API его сообщил, иначе 15 минут
+                reset_at = response.headers.get('x-rate-limit-reset', '')
+                wait_time = max(1, int(reset_at) - int(time.time())) if reset_at.isdigit() else 900
+                self.logger.warning(f"Rate limit reached, waiting {wait_time}s...")
+                time.sleep(wait_time)
                 return self._make_request(endpoint, params)
             
             response.raise_for_status()
@@ -223,9 +227,6 @@ class TwitterAnalyzer:
                     
                     if len(marginal_accounts) >= max_accounts:
                         break
-                
-                # Пауза между запросами для соблюдения лимитов
-                time.sleep(1)
             
             if len(marginal_accounts) >= max_accounts:
                 break
@@ -265,9 +266,6 @@ class TwitterAnalyzer:
                             'extracted_at': datetime.now().isoformat()
                         }
                         propaganda_content.append(content_item)
-                
-                # Пауза между пользователями
-                time.sleep(2)
         
         return propaganda_content
     
@@ -299,8 +297,6 @@ class TwitterAnalyzer:
                                     'propaganda_keywords': propaganda_words,
                                     'detected_at': datetime.now().isoformat()
                                 })
-                
-                time.sleep(5)  # Пауза между пользователями
             
             # Пауза между циклами мониторинга
             time.sleep(300)  # 5 минут
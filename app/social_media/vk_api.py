@@ -4,6 +4,7 @@ import time
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import logging
+from parsers.http_client import get_http_client
 from ..ai.content_classifier import ExtremistContentClassifier
 
 class VKAnalyzer:
@@ -23,7 +24,7 @@ class VKAnalyzer:
         })
         
         try:
-            response = requests.get(f"{self.base_url}{method}", params=params)
+            response = get_http_client().get(f"{self.base_url}{method}", params=params)
             response.raise_for_status()
             data = response.json()
             
@@ -300,9 +301,6 @@ class VKAnalyzer:
                 ]
                 
                 all_posts.extend(suspicious_posts)
-                
-                # Пауза между запросами для соблюдения лимитов API
-                time.sleep(1)
             
             # Пауза между циклами мониторинга
             time.sleep(30)
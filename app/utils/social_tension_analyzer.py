@@ -9,7 +9,6 @@
 - Классификации уровней напряженности
 """
 
-import re
 import math
 import requests
 import json
@@ -20,6 +19,7 @@ from dataclasses import dataclass
 from textblob import TextBlob
 import logging
 from config import Config
+from parsers.lexicon_matcher import LexiconMatcher, LexiconMatches
 
 @dataclass
 class TensionMetrics:
@@ -76,6 +76,16 @@ class SocialTensionAnalyzer:
         'breaking', 'urgent', 'alert', 'внимание', 'важно'
     ]
     
+    # Ключевые слова конфликтности
+    CONFLICT_KEYWORDS = [
+        'против', 'враг', 'противник', 'борьба', 'сражение', 'битва',
+        'столкновение', 'противостояние', 'конфронтация', 'агрессия',
+        'нападение', 'захват', 'оккупация', 'вторжение', 'наступление'
+    ]
+    
+    # Временные маркеры (ищутся как подстроки)
+    TIME_MARKERS = ['сегодня', 'вчера', 'сейчас', 'только что', 'минуту назад']
+    
     def __init__(self):
         """Инициализация анализатора."""
         self.tension_weights = {
@@ -97,6 +107,15 @@ class SocialTensionAnalyzer:
         )
         self.logger = logging.getLogger(__name__)
         
+        # Все словари ищутся за один проход по тексту
+        lexicons = {'conflict': self.CONFLICT_KEYWORDS, 'urgency': self.URGENCY_MARKERS, 'time': self.TIME_MARKERS}
+        lexicons.update(self.TENSION_KEYWORDS)
+        lexicons.update({f'emotional_{category}': markers for category, markers in self.EMOTIONAL_MARKERS.items()})
+        self.keyword_matcher = LexiconMatcher(
+            lexicons,
+            boundary={name: None if name == 'time' else 'word' for name in lexicons}
+        )
+        
         # Логируем статус API_CLOUD
         if self.api_cloud_enabled:
             self.logger.info("API_CLOUD интеграция включена")
@@ -120,11 +139,12 @@ class SocialTensionAnalyzer:
         # Объединяем заголовок и текст для анализа
         full_text = f"{title} {text}".lower()
         
-        # Расчет базовых метрик
-        tension_score = self._calculate_tension_score(full_text)
-        emotional_intensity = self._calculate_emotional_intensity(full_text)
-        conflict_level = self._calculate_conflict_level(full_text)
-        urgency_factor = self._calculate_urgency_factor(full_text)
+        # Расчет базовых метрик по результату одного прохода по тексту
+        matches = self.keyword_matcher.match(full_text)
+        tension_score = self._calculate_tension_score(full_text, matches)
+        emotional_intensity = self._calculate_emotional_intensity(full_text, matches)
+        conflict_level = self._calculate_conflict_level(full_text, matches)
+        urgency_factor = self._calculate_urgency_factor(full_text, matches)
         
         # Общий индекс напряженности
         overall_tension = self._calculate_overall_tension(
@@ -154,7 +174,7 @@ class SocialTensionAnalyzer:
             trend="stable"  # Тренд определяется при анализе временных рядов
         )
     
-    def _calculate_tension_score(self, text: str) -> float:
+    def _calculate_tension_score(self, text: str, matches: Optional[LexiconMatches] = None) -> float:
         """Расчет базового индекса напряженности."""
         score = 0.0
         word_count = len(text.split())
@@ -162,17 +182,15 @@ class SocialTensionAnalyzer:
         if word_count == 0:
             return 0.0
         
-        for category, keywords in self.TENSION_KEYWORDS.items():
-            weight = self.tension_weights[category]
-            for keyword in keywords:
-                count = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
-                score += count * weight
+        matches = matches or self.keyword_matcher.match(text)
+        for category in self.TENSION_KEYWORDS:
+            score += matches.count(category) * self.tension_weights[category]
         
         # Нормализация по количеству слов
         normalized_score = (score / word_count) * 100
         return min(max(normalized_score, 0), 100)
     
-    def _calculate_emotional_intensity(self, text: str) -> float:
+    def _calculate_emotional_intensity(self, text: str, matches: Optional[LexiconMatches] = None) -> float:
         """Расчет эмоциональной интенсивности."""
         score = 0.0
         word_count = len(text.split())
@@ -180,11 +198,9 @@ class SocialTensionAnalyzer:
         if word_count == 0:
             return 0.0
         
-        for category, markers in self.EMOTIONAL_MARKERS.items():
-            weight = self.emotional_weights[category]
-            for marker in markers:
-                count = len(re.findall(r'\b' + re.escape(marker) + r'\b', text))
-                score += count * weight
+        matches = matches or self.keyword_matcher.match(text)
+        for category in self.EMOTIONAL_MARKERS:
+            score += matches.count(f'emotional_{category}') * self.emotional_weights[category]
         
         # Учитываем восклицательные знаки и заглавные буквы
         exclamation_count = text.count('!')
@@ -195,28 +211,21 @@ class SocialTensionAnalyzer:
         normalized_score = (score / word_count) * 100
         return min(max(normalized_score, 0), 100)
     
-    def _calculate_conflict_level(self, text: str) -> float:
+    def _calculate_conflict_level(self, text: str, matches: Optional[LexiconMatches] = None) -> float:
         """Расчет уровня конфликтности."""
-        conflict_keywords = [
-            'против', 'враг', 'противник', 'борьба', 'сражение', 'битва',
-            'столкновение', 'противостояние', 'конфронтация', 'агрессия',
-            'нападение', 'захват', 'оккупация', 'вторжение', 'наступление'
-        ]
-        
         score = 0.0
         word_count = len(text.split())
         
         if word_count == 0:
             return 0.0
         
-        for keyword in conflict_keywords:
-            count = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
-            score += count * 2.0
+        matches = matches or self.keyword_matcher.match(text)
+        score += matches.count('conflict') * 2.0
         
         normalized_score = (score / word_count) * 100
         return min(max(normalized_score, 0), 100)
     
-    def _calculate_urgency_factor(self, text: str) -> float:
+    def _calculate_urgency_factor(self, text: str, matches: Optional[LexiconMatches] = None) -> float:
         """Расчет фактора срочности."""
         score = 0.0
         word_count = len(text.split())
@@ -224,15 +233,11 @@ class SocialTensionAnalyzer:
         if word_count == 0:
             return 0.0
         
-        for marker in self.URGENCY_MARKERS:
-            count = len(re.findall(r'\b' + re.escape(marker) + r'\b', text))
-            score += count * 1.5
+        matches = matches or self.keyword_matcher.match(text)
+        score += matches.count('urgency') * 1.5
         
         # Учитываем временные маркеры
-        time_markers = ['сегодня', 'вчера', 'сейчас', 'только что', 'минуту назад']
-        for marker in time_markers:
-            if marker in text:
-                score += 2.0
+        score += matches.distinct('time') * 2.0
         
         normalized_score = (score / word_count) * 100
         return min(max(normalized_score, 0), 100)
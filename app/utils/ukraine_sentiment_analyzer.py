@@ -12,6 +12,8 @@ from typing import Dict, List, Tuple
 from textblob import TextBlob
 import logging
 
+from parsers.lexicon_matcher import LexiconMatcher
+
 logger = logging.getLogger(__name__)
 
 class UkraineSentimentAnalyzer:
@@ -25,6 +27,15 @@ class UkraineSentimentAnalyzer:
         self.military_keywords = self._load_military_keywords()
         self.humanitarian_keywords = self._load_humanitarian_keywords()
         
+        # Все словари ищутся за один проход по тексту (целые слова)
+        self.keyword_matcher = LexiconMatcher({
+            'positive': self.positive_keywords,
+            'negative': self.negative_keywords,
+            'neutral': self.neutral_keywords,
+            'military': self.military_keywords,
+            'humanitarian': self.humanitarian_keywords
+        }, boundary='word')
+        
     def _load_positive_keywords(self) -> List[str]:
         """Загрузка позитивных ключевых слов"""
         return [
@@ -161,11 +172,12 @@ class UkraineSentimentAnalyzer:
             normalized_text = self._normalize_text(text)
             
             # Подсчет ключевых слов
-            positive_count = self._count_keywords(normalized_text, self.positive_keywords)
-            negative_count = self._count_keywords(normalized_text, self.negative_keywords)
-            neutral_count = self._count_keywords(normalized_text, self.neutral_keywords)
-            military_count = self._count_keywords(normalized_text, self.military_keywords)
-            humanitarian_count = self._count_keywords(normalized_text, self.humanitarian_keywords)
+            matches = self.keyword_matcher.match(normalized_text)
+            positive_count = matches.count('positive')
+            negative_count = matches.count('negative')
+            neutral_count = matches.count('neutral')
+            military_count = matches.count('military')
+            humanitarian_count = matches.count('humanitarian')
             
             # Анализ с помощью TextBlob (базовый)
             try:
@@ -235,16 +247,6 @@ class UkraineSentimentAnalyzer:
         
         return text.strip()
     
-    def _count_keywords(self, text: str, keywords: List[str]) -> int:
-        """Подсчет ключевых слов в тексте"""
-        count = 0
-        for keyword in keywords:
-            # Ищем точные совпадения слов
-            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-            matches = re.findall(pattern, text)
-            count += len(matches)
-        return count
-    
     def _get_default_sentiment(self) -> Dict[str, float]:
         """Возвращает нейтральную тональность по умолчанию"""
         return {
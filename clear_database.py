@@ -8,23 +8,9 @@ def clear_all_tables():
     
     # Список всех таблиц для очистки
     tables = [
-        # Основные таблицы новостей
-        'ria_headlines',
-        'israil_headlines',
-        'lenta_headlines',
-        'rbc_headlines',
-        'cnn_headlines',
-        'aljazeera_headlines',
-        'tsn_headlines',
-        'unian_headlines',
-        'rt_headlines',
-        'euronews_headlines',
-        'reuters_headlines',
-        'france24_headlines',
-        'dw_headlines',
-        'bbc_headlines',
-        'gazeta_headlines',
-        'kommersant_headlines',
+        # Единая таблица статей (таблицы источников и категорий - представления над ней)
+        'articles',
+        'articles_hourly',
         
         # Universal таблицы
         'universal_military_operations',
@@ -33,14 +19,6 @@ def clear_all_tables():
         'universal_political_decisions',
         'universal_information_social',
         
-        # Telegram таблицы
-        'telegram_military_operations',
-        'telegram_humanitarian_crisis',
-        'telegram_economic_consequences',
-        'telegram_political_decisions',
-        'telegram_information_social',
-        'telegram_headlines',
-        
         # Социальные сети
         'twitter_posts',
         'vk_posts',
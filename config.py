@@ -85,6 +85,136 @@ class Config:
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
     
+    # Настройки конкурентной загрузки статей парсерами
+    PARSER_MAX_WORKERS = int(os.environ.get('PARSER_MAX_WORKERS', '8'))
+    PARSER_PER_HOST_CONCURRENCY = int(os.environ.get('PARSER_PER_HOST_CONCURRENCY', '2'))
+    # Частота запросов к хосту ограничивается HTTP-клиентом (HTTP_HOST_RATES),
+    # дополнительная пауза между статьями по умолчанию не нужна
+    PARSER_POLITENESS_DELAY_MIN = float(os.environ.get('PARSER_POLITENESS_DELAY_MIN', '0'))
+    PARSER_POLITENESS_DELAY_MAX = float(os.environ.get('PARSER_POLITENESS_DELAY_MAX', '0'))
+    
+    # Пул прогретых процессов-исполнителей парсеров (parsers/worker_pool.py)
+    PARSER_POOL_WORKERS = int(os.environ.get('PARSER_POOL_WORKERS', '4'))
+    # Сколько запусков одного источника может выполняться одновременно
+    PARSER_POOL_PER_SOURCE = int(os.environ.get('PARSER_POOL_PER_SOURCE', '1'))
+    # Максимальная длительность запуска в секундах, после нее процесс перезапускается
+    PARSER_POOL_JOB_TIMEOUT = float(os.environ.get('PARSER_POOL_JOB_TIMEOUT', '3600'))
+    # Сколько секунд остановленный парсер может сбрасывать буфер записи до завершения процесса
+    PARSER_POOL_CANCEL_GRACE = float(os.environ.get('PARSER_POOL_CANCEL_GRACE', '15'))
+    PARSER_POOL_PRELOAD = os.environ.get('PARSER_POOL_PRELOAD', 'True').lower() in ('true', '1', 't')
+    PARSER_POOL_START_METHOD = os.environ.get('PARSER_POOL_START_METHOD', 'spawn')
+    
+    # Настройки общего HTTP-клиента (parsers/http_client.py)
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '5'))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', '20'))
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', '3'))
+    HTTP_BACKOFF_BASE = float(os.environ.get('HTTP_BACKOFF_BASE', '0.5'))
+    HTTP_BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', '30'))
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '10'))
+    # Лимит запросов в секунду к одному хосту и размер всплеска
+    HTTP_DEFAULT_RATE = float(os.environ.get('HTTP_DEFAULT_RATE', '2'))
+    HTTP_DEFAULT_BURST = float(os.environ.get('HTTP_DEFAULT_BURST', '4'))
+    # Лимиты отдельных хостов: "api.vk.com=3,api.gen-api.ru=5/10"
+    HTTP_HOST_RATES = os.environ.get('HTTP_HOST_RATES', 'api.vk.com=3,api.ok.ru=2,api.twitter.com=1,api.gen-api.ru=5/10')
+    HTTP_ENABLE_HTTP2 = os.environ.get('HTTP_ENABLE_HTTP2', 'True').lower() in ('true', '1', 't')
+    # Максимальный размер страницы (байт после распаковки), тело читается потоком
+    HTTP_MAX_PAGE_BYTES = int(os.environ.get('HTTP_MAX_PAGE_BYTES', str(5 * 1024 * 1024)))
+    # Лимиты отдельных источников: "universal=2M,rbc=8M" (суффиксы K и M)
+    HTTP_SOURCE_MAX_PAGE_BYTES = os.environ.get('HTTP_SOURCE_MAX_PAGE_BYTES', 'universal=3M')
+    
+    # Буферизованная запись в ClickHouse (parsers/clickhouse_writer.py)
+    CLICKHOUSE_WRITER_BATCH_SIZE = int(os.environ.get('CLICKHOUSE_WRITER_BATCH_SIZE', '500'))
+    CLICKHOUSE_WRITER_FLUSH_INTERVAL = float(os.environ.get('CLICKHOUSE_WRITER_FLUSH_INTERVAL', '5'))
+    CLICKHOUSE_SPOOL_DIR = os.environ.get('CLICKHOUSE_SPOOL_DIR', os.path.join(basedir, 'spool'))
+    
+    # Кэш AI-классификации (parsers/classification_cache.py)
+    CLASSIFIER_CACHE_PATH = os.environ.get('CLASSIFIER_CACHE_PATH', os.path.join(basedir, 'gen_api_classifier_cache.sqlite3'))
+    CLASSIFIER_CACHE_LEGACY_JSON = os.path.join(basedir, 'gen_api_classifier_cache.json')
+    CLASSIFIER_CACHE_MAX_ENTRIES = int(os.environ.get('CLASSIFIER_CACHE_MAX_ENTRIES', '200000'))
+    CLASSIFIER_CACHE_TTL_DAYS = float(os.environ.get('CLASSIFIER_CACHE_TTL_DAYS', '180'))
+    # accessed_at обновляется при попадании, только если старше (сек)
+    CLASSIFIER_CACHE_TOUCH_INTERVAL = float(os.environ.get('CLASSIFIER_CACHE_TOUCH_INTERVAL', '3600'))
+    # Счетчики попаданий сбрасываются в общую статистику не чаще (сек)
+    CLASSIFIER_CACHE_STATS_FLUSH_INTERVAL = float(os.environ.get('CLASSIFIER_CACHE_STATS_FLUSH_INTERVAL', '60'))
+    
+    # Асинхронные задачи gen-api (parsers/gen_api_scheduler.py)
+    GEN_API_POLL_INITIAL_INTERVAL = float(os.environ.get('GEN_API_POLL_INITIAL_INTERVAL', '1'))
+    GEN_API_POLL_MAX_INTERVAL = float(os.environ.get('GEN_API_POLL_MAX_INTERVAL', '5'))
+    GEN_API_POLL_TIMEOUT = float(os.environ.get('GEN_API_POLL_TIMEOUT', '60'))
+    GEN_API_SCHEDULER_WORKERS = int(os.environ.get('GEN_API_SCHEDULER_WORKERS', '4'))
+    # Сколько классификаций парсер держит в работе одновременно
+    GEN_API_MAX_IN_FLIGHT = int(os.environ.get('GEN_API_MAX_IN_FLIGHT', '32'))
+    # Сколько новостей объединяется в один пакетный промпт классификации
+    GEN_API_BATCH_SIZE = int(os.environ.get('GEN_API_BATCH_SIZE', '10'))
+    
+    # Локальная модель классификации перед gen-api (parsers/local_classifier.py)
+    LOCAL_CLASSIFIER_ENABLED = os.environ.get('LOCAL_CLASSIFIER_ENABLED', 'True').lower() in ('true', '1', 't')
+    LOCAL_CLASSIFIER_MODEL_PATH = os.environ.get('LOCAL_CLASSIFIER_MODEL_PATH', os.path.join(basedir, 'models', 'local_news_classifier.joblib'))
+    # Минимальная вероятность, при которой ответ модели принимается без запроса к API
+    LOCAL_CLASSIFIER_THRESHOLD = float(os.environ.get('LOCAL_CLASSIFIER_THRESHOLD', '0.85'))
+    LOCAL_CLASSIFIER_MIN_SAMPLES = int(os.environ.get('LOCAL_CLASSIFIER_MIN_SAMPLES', '200'))
+    
+    # Индекс похожих заголовков MinHash/LSH (parsers/title_index.py)
+    TITLE_INDEX_ENABLED = os.environ.get('TITLE_INDEX_ENABLED', 'True').lower() in ('true', '1', 't')
+    TITLE_INDEX_PATH = os.environ.get('TITLE_INDEX_PATH', os.path.join(basedir, 'title_index.sqlite3'))
+    # Порог коэффициента Жаккара по символьным n-граммам и окно поиска
+    TITLE_INDEX_THRESHOLD = float(os.environ.get('TITLE_INDEX_THRESHOLD', '0.7'))
+    TITLE_INDEX_WINDOW_DAYS = float(os.environ.get('TITLE_INDEX_WINDOW_DAYS', '7'))
+    TITLE_INDEX_NUM_PERM = int(os.environ.get('TITLE_INDEX_NUM_PERM', '128'))
+    TITLE_INDEX_SHINGLE_SIZE = int(os.environ.get('TITLE_INDEX_SHINGLE_SIZE', '4'))
+    # Сколько первых символов текста статьи учитывать вместе с заголовком (0 - только заголовок)
+    TITLE_INDEX_LEAD_CHARS = int(os.environ.get('TITLE_INDEX_LEAD_CHARS', '0'))
+    # Как часто (секунды) подгружать в индекс строки, сохраненные другими процессами
+    TITLE_INDEX_REFRESH_INTERVAL = float(os.environ.get('TITLE_INDEX_REFRESH_INTERVAL', '60'))
+    
+    # Кластеризация статей разных источников в сюжеты (parsers/story_index.py)
+    STORY_CLUSTERING_ENABLED = os.environ.get('STORY_CLUSTERING_ENABLED', 'True').lower() in ('true', '1', 't')
+    STORY_INDEX_PATH = os.environ.get('STORY_INDEX_PATH', os.path.join(basedir, 'story_index.sqlite3'))
+    # Порог Жаккара для отнесения статьи к сюжету и сколько дней сюжет может пополняться
+    STORY_SIMILARITY_THRESHOLD = float(os.environ.get('STORY_SIMILARITY_THRESHOLD', '0.45'))
+    STORY_WINDOW_DAYS = float(os.environ.get('STORY_WINDOW_DAYS', '3'))
+    STORY_LEAD_CHARS = int(os.environ.get('STORY_LEAD_CHARS', '0'))
+    
+    # Фильтр уже сохраненных ссылок до загрузки статей (parsers/seen_links.py)
+    SEEN_LINKS_ENABLED = os.environ.get('SEEN_LINKS_ENABLED', 'True').lower() in ('true', '1', 't')
+    SEEN_LINKS_PATH = os.environ.get('SEEN_LINKS_PATH', os.path.join(basedir, 'seen_links.bloom'))
+    # Емкость фильтра и доля ложных срабатываний (5 млн ссылок при 0.1% - около 9 МБ)
+    SEEN_LINKS_CAPACITY = int(os.environ.get('SEEN_LINKS_CAPACITY', '5000000'))
+    SEEN_LINKS_ERROR_RATE = float(os.environ.get('SEEN_LINKS_ERROR_RATE', '0.001'))
+    
+    # Приблизительные итоги списков статей (parsers/article_pagination.py)
+    # Через сколько секунд итог пересчитывается в фоне и сколько итогов хранится
+    COUNT_CACHE_TTL = float(os.environ.get('COUNT_CACHE_TTL', '300'))
+    COUNT_CACHE_MAX_ENTRIES = int(os.environ.get('COUNT_CACHE_MAX_ENTRIES', '1000'))
+    COUNT_CACHE_WORKERS = int(os.environ.get('COUNT_CACHE_WORKERS', '2'))
+    
+    # Инкрементальный обход листингов с верхними отметками (parsers/crawl_state.py)
+    CRAWL_STATE_ENABLED = os.environ.get('CRAWL_STATE_ENABLED', 'True').lower() in ('true', '1', 't')
+    CRAWL_STATE_PATH = os.environ.get('CRAWL_STATE_PATH', os.path.join(basedir, 'crawl_state.sqlite3'))
+    # Сколько известных ссылок подряд завершают обход листинга и сколько ссылок хранить на листинг
+    CRAWL_STATE_STOP_AFTER_KNOWN = int(os.environ.get('CRAWL_STATE_STOP_AFTER_KNOWN', '3'))
+    CRAWL_STATE_KNOWN_LINKS = int(os.environ.get('CRAWL_STATE_KNOWN_LINKS', '200'))
+    
+    # Обнаружение статей по RSS/Atom-лентам и news-sitemap до HTML-листингов (parsers/feed_discovery.py)
+    FEED_DISCOVERY_ENABLED = os.environ.get('FEED_DISCOVERY_ENABLED', 'True').lower() in ('true', '1', 't')
+    # Полный текст из ленты используется без загрузки страницы, если он не короче (символов)
+    FEED_FULL_TEXT_MIN_CHARS = int(os.environ.get('FEED_FULL_TEXT_MIN_CHARS', '500'))
+    # Рубрики лент, статьи которых не загружаются (через запятую, без учета регистра)
+    FEED_SKIP_RUBRICS = os.environ.get('FEED_SKIP_RUBRICS', 'Спорт,Путешествия,Ценности,Из жизни,Забота о себе,Стиль,Авто')
+    # Сколько вложенных sitemap из индекса загружается за обход (самые свежие)
+    FEED_MAX_CHILD_SITEMAPS = int(os.environ.get('FEED_MAX_CHILD_SITEMAPS', '3'))
+    
+    # Обход сайтов универсальным парсером (parsers/crawl_frontier.py)
+    UNIVERSAL_CRAWL_WORKERS = int(os.environ.get('UNIVERSAL_CRAWL_WORKERS', '4'))
+    UNIVERSAL_CRAWL_PER_HOST = int(os.environ.get('UNIVERSAL_CRAWL_PER_HOST', '2'))
+    # Максимум загружаемых страниц за обход, емкость фильтра повторов URL и размер очереди
+    UNIVERSAL_CRAWL_MAX_PAGES = int(os.environ.get('UNIVERSAL_CRAWL_MAX_PAGES', '500'))
+    UNIVERSAL_CRAWL_MAX_URLS = int(os.environ.get('UNIVERSAL_CRAWL_MAX_URLS', '100000'))
+    UNIVERSAL_CRAWL_MAX_QUEUED = int(os.environ.get('UNIVERSAL_CRAWL_MAX_QUEUED', '10000'))
+    
+    # Бэкенд разбора HTML (parsers/html_parsing.py): auto, selectolax, lxml, html.parser
+    HTML_PARSER_BACKEND = os.environ.get('HTML_PARSER_BACKEND', 'auto')
+    
     # Настройки сайта
     SITE_URL = os.environ.get('SITE_URL')
     SITE_NAME = os.environ.get('SITE_NAME')
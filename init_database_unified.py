@@ -21,6 +21,12 @@ logger = logging.getLogger(__name__)
 # Добавляем корневую директорию проекта в sys.path для импорта config
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import Config
+from parsers.articles_rollup import create_rollup_schema
+from parsers.articles_table import create_articles_schema
+from parsers.universal_tables import (
+    FANOUT_CATEGORIES, UNIVERSAL_CATEGORIES, create_category_table_sql, create_fanout_view_sql,
+    create_universal_table_sql, fanout_view_name
+)
 
 
 def create_databases(client):
@@ -40,371 +46,30 @@ def create_databases(client):
     return True
 
 
-def create_main_news_tables(client):
-    """Создает основные таблицы источников новостей"""
-    logger.info("\n=== СОЗДАНИЕ ОСНОВНЫХ ТАБЛИЦ ИСТОЧНИКОВ НОВОСТЕЙ ===")
-    
-    sources = {
-        'ria': {
-            'table': 'ria_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                source String DEFAULT 'ria.ru',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'israil': {
-            'table': 'israil_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                source_links String,
-                source String DEFAULT '7kanal.co.il',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'telegram': {
-            'table': 'telegram_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                content String,
-                channel String,
-                message_id Int64,
-                message_link String,
-                source String DEFAULT 'telegram',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'lenta': {
-            'table': 'lenta_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'lenta.ru',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'rbc': {
-            'table': 'rbc_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'rbc.ru',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'cnn': {
-            'table': 'cnn_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'cnn.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'aljazeera': {
-            'table': 'aljazeera_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'aljazeera.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'tsn': {
-            'table': 'tsn_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'tsn.ua',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'unian': {
-            'table': 'unian_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'unian.net',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'rt': {
-            'table': 'rt_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'rt.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'euronews': {
-            'table': 'euronews_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'euronews.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'reuters': {
-            'table': 'reuters_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'reuters.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'france24': {
-            'table': 'france24_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'france24.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'dw': {
-            'table': 'dw_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'dw.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'bbc': {
-            'table': 'bbc_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'bbc.com',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'gazeta': {
-            'table': 'gazeta_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'gazeta.ru',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        },
-        'kommersant': {
-            'table': 'kommersant_headlines',
-            'structure': '''
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String,
-                source String DEFAULT 'kommersant.ru',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            '''
-        }
-    }
+def create_articles_tables(client):
+    """
+    Создает единую таблицу статей news.articles и представления
+    с прежними именами {source}_headlines и {source}_{category}
+    """
+    logger.info("\n=== СОЗДАНИЕ ЕДИНОЙ ТАБЛИЦЫ СТАТЕЙ ===")
     
-    created_count = 0
-    for source_name, source_info in sources.items():
-        try:
-            query = f'''
-                CREATE TABLE IF NOT EXISTS news.{source_info["table"]} (
-                    {source_info["structure"]}
-                ) ENGINE = MergeTree()
-                ORDER BY (published_date, id)
-            '''
-            client.execute(query)
-            logger.info(f"✓ Таблица {source_info['table']} создана")
-            created_count += 1
-        except Exception as e:
-            logger.error(f"✗ Ошибка при создании таблицы {source_info['table']}: {e}")
+    try:
+        views, legacy = create_articles_schema(client)
+    except Exception as e:
+        logger.error(f"✗ Ошибка при создании таблицы articles: {e}")
+        return 0, 0
     
-    logger.info(f"Создано {created_count} из {len(sources)} основных таблиц")
-    return created_count
+    logger.info("✓ Таблица articles создана (партиции по месяцам, ключ source, category, published_date)")
+    logger.info(f"✓ Создано {views} представлений с прежними именами таблиц")
+    logger.info("  Индексы поиска в существующей таблице: python migrations/add_search_indexes.py")
 
-
-def create_category_tables(client):
-    """Создает таблицы категорий для всех источников"""
-    logger.info("\n=== СОЗДАНИЕ ТАБЛИЦ КАТЕГОРИЙ ===")
-    
-    # Стандартные категории
-    categories = ['ukraine', 'middle_east', 'fake_news', 'info_war', 'europe', 'usa', 'other']
-    
-    # Расширенные категории для украинского конфликта
-    ukraine_categories = [
-        'military_operations',
-        'humanitarian_crisis',
-        'economic_consequences',
-        'political_decisions',
-        'information_social',
-        'other'
-    ]
-    
-    sources = {
-        'ria': {'table_suffix': 'ria', 'default_source': 'ria.ru'},
-        'israil': {'table_suffix': 'israil', 'default_source': '7kanal.co.il'},
-        'telegram': {'table_suffix': 'telegram', 'default_source': 'telegram'},
-        'lenta': {'table_suffix': 'lenta', 'default_source': 'lenta.ru'},
-        'rbc': {'table_suffix': 'rbc', 'default_source': 'rbc.ru'},
-        'cnn': {'table_suffix': 'cnn', 'default_source': 'cnn.com'},
-        'aljazeera': {'table_suffix': 'aljazeera', 'default_source': 'aljazeera.com'},
-        'tsn': {'table_suffix': 'tsn', 'default_source': 'tsn.ua'},
-        'unian': {'table_suffix': 'unian', 'default_source': 'unian.net'},
-        'rt': {'table_suffix': 'rt', 'default_source': 'rt.com'},
-        'euronews': {'table_suffix': 'euronews', 'default_source': 'euronews.com'},
-        'reuters': {'table_suffix': 'reuters', 'default_source': 'reuters.com'},
-        'france24': {'table_suffix': 'france24', 'default_source': 'france24.com'},
-        'dw': {'table_suffix': 'dw', 'default_source': 'dw.com'},
-        'bbc': {'table_suffix': 'bbc', 'default_source': 'bbc.com'},
-        'gazeta': {'table_suffix': 'gazeta', 'default_source': 'gazeta.ru'},
-        'kommersant': {'table_suffix': 'kommersant', 'default_source': 'kommersant.ru'}
-    }
+    if legacy:
+        logger.warning(
+            f"⚠ {len(legacy)} прежних таблиц источников не заменены представлениями - "
+            f"перенесите данные: python migrations/unify_articles_table.py"
+        )
     
-    created_count = 0
-    all_categories = list(set(categories + ukraine_categories))
-    
-    logger.info(f"Создание таблиц для {len(all_categories)} категорий и {len(sources)} источников...")
-    
-    for source_key, source_info in sources.items():
-        for category in all_categories:
-            try:
-                # Специальная обработка для telegram
-                if source_key == 'telegram':
-                    query = f'''
-                        CREATE TABLE IF NOT EXISTS news.telegram_{category} (
-                            id UUID DEFAULT generateUUIDv4(),
-                            title String,
-                            content String,
-                            channel String,
-                            message_id Int64,
-                            message_link String,
-                            source String DEFAULT 'telegram',
-                            category String DEFAULT '{category}',
-                            relevance_score Float32 DEFAULT 0.0,
-                            ai_confidence Float32 DEFAULT 0.0,
-                            keywords_found Array(String) DEFAULT [],
-                            sentiment_score Float32 DEFAULT 0.0,
-                            tension_score Float32 DEFAULT 0.0,
-                            published_date DateTime DEFAULT now()
-                        ) ENGINE = MergeTree()
-                        ORDER BY (published_date, id)
-                    '''
-                # Специальная обработка для israil
-                elif source_key == 'israil':
-                    query = f'''
-                        CREATE TABLE IF NOT EXISTS news.israil_{category} (
-                            id UUID DEFAULT generateUUIDv4(),
-                            title String,
-                            link String,
-                            content String,
-                            source_links String,
-                            source String DEFAULT '7kanal.co.il',
-                            category String DEFAULT '{category}',
-                            relevance_score Float32 DEFAULT 0.0,
-                            ai_confidence Float32 DEFAULT 0.0,
-                            keywords_found Array(String) DEFAULT [],
-                            sentiment_score Float32 DEFAULT 0.0,
-                            tension_score Float32 DEFAULT 0.0,
-                            published_date DateTime DEFAULT now()
-                        ) ENGINE = MergeTree()
-                        ORDER BY (published_date, id)
-                    '''
-                # Стандартная структура для остальных источников
-                else:
-                    query = f'''
-                        CREATE TABLE IF NOT EXISTS news.{source_info["table_suffix"]}_{category} (
-                            id UUID DEFAULT generateUUIDv4(),
-                            title String,
-                            link String,
-                            content String,
-                            source String DEFAULT '{source_info["default_source"]}',
-                            category String DEFAULT '{category}',
-                            relevance_score Float32 DEFAULT 0.0,
-                            ai_confidence Float32 DEFAULT 0.0,
-                            keywords_found Array(String) DEFAULT [],
-                            sentiment_score Float32 DEFAULT 0.0,
-                            tension_score Float32 DEFAULT 0.0,
-                            published_date DateTime DEFAULT now()
-                        ) ENGINE = MergeTree()
-                        ORDER BY (published_date, id)
-                    '''
-                
-                client.execute(query)
-                created_count += 1
-                
-                # Логируем только каждую 10-ю таблицу, чтобы не загромождать вывод
-                if created_count % 10 == 0:
-                    logger.info(f"✓ Создано {created_count} таблиц категорий...")
-                    
-            except Exception as e:
-                logger.error(f"✗ Ошибка при создании таблицы {source_info['table_suffix']}_{category}: {e}")
-    
-    logger.info(f"✓ Всего создано {created_count} таблиц категорий")
-    return created_count
+    return 1, views
 
 
 def create_universal_tables(client):
@@ -415,22 +80,7 @@ def create_universal_tables(client):
     
     # Основная универсальная таблица
     try:
-        query = '''
-            CREATE TABLE IF NOT EXISTS news.universal_news (
-                id UUID DEFAULT generateUUIDv4(),
-                site_name String,
-                url String,
-                title String,
-                content String,
-                category String,
-                published_date DateTime DEFAULT now(),
-                language String DEFAULT 'unknown',
-                tags Array(String) DEFAULT [],
-                metadata String DEFAULT '{}'
-            ) ENGINE = MergeTree()
-            ORDER BY (site_name, published_date)
-        '''
-        client.execute(query)
+        client.execute(create_universal_table_sql())
         logger.info("✓ Таблица universal_news создана")
         created_count += 1
     except Exception as e:
@@ -465,28 +115,23 @@ def create_universal_tables(client):
         logger.error(f"✗ Ошибка при создании таблицы ukraine_universal_news: {e}")
     
     # Универсальные таблицы для стандартных категорий
-    categories = ['ukraine', 'middle_east', 'fake_news', 'info_war', 'europe', 'usa', 'other']
-    
-    for category in categories:
+    for category in UNIVERSAL_CATEGORIES:
         try:
-            query = f'''
-                CREATE TABLE IF NOT EXISTS news.universal_{category} (
-                    id UUID DEFAULT generateUUIDv4(),
-                    title String,
-                    link String,
-                    content String,
-                    source String,
-                    category String DEFAULT '{category}',
-                    published_date DateTime DEFAULT now()
-                ) ENGINE = MergeTree()
-                ORDER BY (published_date, id)
-            '''
-            client.execute(query)
+            client.execute(create_category_table_sql(category))
             logger.info(f"✓ Таблица universal_{category} создана")
             created_count += 1
         except Exception as e:
             logger.error(f"✗ Ошибка при создании таблицы universal_{category}: {e}")
     
+    # Материализованные представления: статьи из universal_news попадают
+    # в таблицы категорий без отдельной вставки из парсера
+    for category in FANOUT_CATEGORIES:
+        try:
+            client.execute(create_fanout_view_sql(category))
+            logger.info(f"✓ Представление {fanout_view_name(category)} создано")
+        except Exception as e:
+            logger.error(f"✗ Ошибка при создании представления {fanout_view_name(category)}: {e}")
+    
     # Универсальные таблицы для украинских категорий
     ukraine_categories = [
         'military_operations',
@@ -603,6 +248,59 @@ def create_analytics_tables(client):
     except Exception as e:
         logger.error(f"✗ Ошибка при создании таблицы ukraine_key_events: {e}")
     
+    # Сюжеты: центроиды (последняя версия по updated_at) и принадлежность статей
+    try:
+        query = '''
+            CREATE TABLE IF NOT EXISTS news.story_centroids (
+                story_id String,
+                title String,
+                category String,
+                first_published DateTime,
+                last_published DateTime,
+                article_count UInt32,
+                source_count UInt16,
+                sources Array(String),
+                updated_at DateTime DEFAULT now()
+            ) ENGINE = ReplacingMergeTree(updated_at)
+            ORDER BY story_id
+        '''
+        client.execute(query)
+        logger.info("✓ Таблица story_centroids создана")
+        created_count += 1
+    except Exception as e:
+        logger.error(f"✗ Ошибка при создании таблицы story_centroids: {e}")
+    
+    try:
+        query = '''
+            CREATE TABLE IF NOT EXISTS news.story_members (
+                story_id String,
+                link String,
+                source String,
+                title String,
+                category String,
+                similarity Float32,
+                published_date DateTime,
+                INDEX idx_link link TYPE bloom_filter GRANULARITY 4,
+                INDEX idx_story_id story_id TYPE bloom_filter GRANULARITY 4
+            ) ENGINE = MergeTree()
+            ORDER BY (published_date, story_id)
+            PARTITION BY toYYYYMM(published_date)
+        '''
+        client.execute(query)
+        logger.info("✓ Таблица story_members создана")
+        created_count += 1
+    except Exception as e:
+        logger.error(f"✗ Ошибка при создании таблицы story_members: {e}")
+    
+    # Почасовые агрегаты статей (заполняются представлением из news.articles)
+    try:
+        create_rollup_schema(client)
+        logger.info("✓ Таблица articles_hourly и представление articles_hourly_mv созданы")
+        logger.info("  Агрегаты уже сохраненных статей: python migrations/add_articles_rollup.py")
+        created_count += 1
+    except Exception as e:
+        logger.error(f"✗ Ошибка при создании таблицы articles_hourly: {e}")
+    
     # Таблица логов миграции
     try:
         query = '''
@@ -873,8 +571,7 @@ def main():
         )
         
         # Создаем все таблицы
-        main_tables = create_main_news_tables(client)
-        category_tables = create_category_tables(client)
+        main_tables, view_count = create_articles_tables(client)
         universal_tables = create_universal_tables(client)
         analytics_tables = create_analytics_tables(client)
         social_tables = create_social_media_tables(client)
@@ -888,12 +585,12 @@ def main():
         print("=" * 80)
         print("\n[СТАТИСТИКА] СОЗДАННЫЕ ОБЪЕКТЫ:")
         print(f"  - Базы данных: 2 (news, social_media)")
-        print(f"  - Основные таблицы источников: {main_tables}")
-        print(f"  - Таблицы категорий: {category_tables}")
+        print(f"  - Единая таблица статей: {main_tables}")
+        print(f"  - Представления источников и категорий: {view_count}")
         print(f"  - Универсальные таблицы: {universal_tables}")
         print(f"  - Аналитические таблицы: {analytics_tables}")
         print(f"  - Таблицы социальных сетей: {social_tables}")
-        print(f"\n  ВСЕГО ТАБЛИЦ: {main_tables + category_tables + universal_tables + analytics_tables + social_tables}")
+        print(f"\n  ВСЕГО ТАБЛИЦ: {main_tables + universal_tables + analytics_tables + social_tables}")
         
         print("\n[КАТЕГОРИИ] НОВОСТЕЙ:")
         print("  Стандартные: ukraine, middle_east, fake_news, info_war, europe, usa, other")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Миграция базы данных для почасовых агрегатов статей
+
+Этот скрипт:
+- создает AggregatingMergeTree-таблицу news.articles_hourly и
+  материализованное представление news.articles_hourly_mv, которое
+  заполняет ее при вставках в news.articles (parsers/articles_rollup.py)
+- заново строит агрегаты по всем уже сохраненным статьям
+
+Построение очищает news.articles_hourly и агрегирует news.articles
+целиком, поэтому его можно повторять (--rebuild), например после
+массового удаления статей. Статьи, вставленные во время построения,
+могут попасть в агрегаты дважды или не попасть вовсе - запускайте
+миграцию при остановленных парсерах.
+"""
+
+import os
+import sys
+import logging
+from clickhouse_driver import Client
+from datetime import datetime
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from parsers.articles_rollup import ROLLUP_TABLE, ROLLUP_VIEW, create_rollup_schema, rollup_select_sql
+from parsers.articles_table import ARTICLES_TABLE
+
+CLICKHOUSE_CONFIG = Config.CLICKHOUSE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class ArticlesRollupMigration:
+    """Класс для создания и заполнения почасовых агрегатов статей"""
+
+    def __init__(self):
+        self.client = Client(
+            host=CLICKHOUSE_CONFIG['host'],
+            port=CLICKHOUSE_CONFIG['port'],
+            user=CLICKHOUSE_CONFIG['user'],
+            password=CLICKHOUSE_CONFIG['password'],
+            database=CLICKHOUSE_CONFIG['database']
+        )
+
+        # Агрегаты за весь период попадают в партиции всех месяцев сразу
+        self.settings = {'max_partitions_per_insert_block': 1000}
+
+    def rebuild_rollup(self) -> bool:
+        """
+        Строит агрегаты заново по всем статьям news.articles
+
+        Returns:
+            bool: True если построение успешно
+        """
+        try:
+            self.client.execute(f"TRUNCATE TABLE IF EXISTS {ROLLUP_TABLE}")
+            self.client.execute(
+                f"INSERT INTO {ROLLUP_TABLE} {rollup_select_sql()}",
+                settings=self.settings
+            )
+            logger.info(f"✅ Агрегаты {ROLLUP_TABLE} построены")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Ошибка построения агрегатов: {e}")
+            return False
+
+    def migrate(self) -> bool:
+        """
+        Создает таблицу агрегатов и представление, затем строит агрегаты
+
+        Returns:
+            bool: True если миграция успешна
+        """
+        logger.info("Начинаем создание почасовых агрегатов статей")
+        start_time = datetime.now()
+
+        try:
+            create_rollup_schema(self.client)
+            logger.info(f"✅ Таблица {ROLLUP_TABLE} и представление {ROLLUP_VIEW} созданы")
+        except Exception as e:
+            logger.error(f"❌ Ошибка создания таблицы агрегатов: {e}")
+            return False
+
+        success = self.rebuild_rollup()
+
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Время выполнения: {duration:.2f} секунд")
+
+        return success
+
+    def verify_migration(self) -> bool:
+        """
+        Проверяет успешность миграции
+
+        Returns:
+            bool: True если число статей в агрегатах совпадает с news.articles по каждому источнику
+        """
+        logger.info("Проверяем результаты миграции")
+
+        engines = dict(self.client.execute(
+            "SELECT name, engine FROM system.tables WHERE database = 'news'"
+        ))
+        if engines.get(ROLLUP_TABLE.split('.')[1]) != 'AggregatingMergeTree':
+            logger.error(f"❌ Таблица {ROLLUP_TABLE} не создана")
+            return False
+        if engines.get(ROLLUP_VIEW.split('.')[1]) != 'MaterializedView':
+            logger.error(f"❌ Представление {ROLLUP_VIEW} не создано")
+            return False
+
+        articles = dict(self.client.execute(
+            f"SELECT source, count() FROM {ARTICLES_TABLE} GROUP BY source"
+        ))
+        rollup = dict(self.client.execute(
+            f"SELECT source, sum(news_count) FROM {ROLLUP_TABLE} GROUP BY source"
+        ))
+
+        all_sources_ok = True
+        for source in sorted(set(articles) | set(rollup)):
+            expected, actual = articles.get(source, 0), rollup.get(source, 0)
+            if expected == actual:
+                logger.info(f"✅ {source}: {actual} статей")
+            else:
+                logger.error(f"❌ {source}: в news.articles {expected} статей, в агрегатах {actual}")
+                all_sources_ok = False
+
+        return all_sources_ok
+
+    def rollback_migration(self):
+        """
+        Откатывает миграцию (удаляет представление и таблицу агрегатов)
+        ВНИМАНИЕ: эндпоинты аналитики читают агрегаты и перестанут работать!
+        """
+        logger.warning("ВНИМАНИЕ: Выполняется откат миграции!")
+        logger.warning("Эндпоинты аналитики, читающие агрегаты, перестанут работать!")
+
+        confirm = input("Вы уверены? Введите 'yes' для подтверждения: ")
+        if confirm.lower() != 'yes':
+            logger.info("Откат отменен")
+            return
+
+        try:
+            self.client.execute(f"DROP VIEW IF EXISTS {ROLLUP_VIEW}")
+            self.client.execute(f"DROP TABLE IF EXISTS {ROLLUP_TABLE}")
+            logger.info(f"✅ {ROLLUP_VIEW} и {ROLLUP_TABLE} удалены")
+        except Exception as e:
+            logger.error(f"❌ Ошибка отката: {e}")
+
+
+def main():
+    """Основная функция для выполнения миграции"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    logger.info("Запуск миграции почасовых агрегатов статей")
+
+    try:
+        migration = ArticlesRollupMigration()
+
+        if not migration.migrate():
+            logger.error("❌ Миграция завершена с ошибками")
+            return False
+
+        if not migration.verify_migration():
+            logger.error("❌ Проверка миграции выявила проблемы")
+            return False
+
+        logger.info("🎉 Миграция базы данных завершена!")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Критическая ошибка при выполнении миграции: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Миграция почасовых агрегатов статей')
+    parser.add_argument('--rollback', action='store_true', help='Откатить миграцию')
+    parser.add_argument('--verify', action='store_true', help='Только проверить состояние миграции')
+    parser.add_argument('--rebuild', action='store_true', help='Только построить агрегаты заново')
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        migration = ArticlesRollupMigration()
+        migration.rollback_migration()
+    elif args.verify:
+        migration = ArticlesRollupMigration()
+        if migration.verify_migration():
+            print("✅ Миграция выполнена корректно")
+        else:
+            print("❌ Миграция выполнена некорректно")
+    elif args.rebuild:
+        migration = ArticlesRollupMigration()
+        sys.exit(0 if migration.rebuild_rollup() else 1)
+    else:
+        success = main()
+        sys.exit(0 if success else 1)
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Миграция базы данных для индексированной проверки дубликатов
+
+Этот скрипт для всех таблиц новостей (таблицы базы news с колонками title и content):
+- добавляет колонку content_hash: String - SHA256 заголовка и содержимого,
+  которую парсеры вычисляют при вставке (parsers/duplicate_checker.py)
+- заполняет content_hash для уже сохраненных строк тем же выражением на SQL
+- делает это выражение значением колонки по умолчанию, чтобы вставки
+  без content_hash (парсеры-функции) тоже получали хеш
+- добавляет skip-индексы bloom_filter idx_content_hash и idx_link
+  (для telegram-таблиц индекс строится по message_link) и строит их
+  для существующих кусков данных
+"""
+
+import os
+import sys
+import logging
+from clickhouse_driver import Client
+from datetime import datetime
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from parsers.articles_table import CONTENT_HASH_EXPR
+
+CLICKHOUSE_CONFIG = Config.CLICKHOUSE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+INDEX_GRANULARITY = 4
+
+
+class ContentHashMigration:
+    """Класс для добавления content_hash и skip-индексов дедупликации"""
+
+    def __init__(self):
+        self.client = Client(
+            host=CLICKHOUSE_CONFIG['host'],
+            port=CLICKHOUSE_CONFIG['port'],
+            user=CLICKHOUSE_CONFIG['user'],
+            password=CLICKHOUSE_CONFIG['password'],
+            database=CLICKHOUSE_CONFIG['database']
+        )
+
+        # Мутации выполняем синхронно, чтобы проверка видела результат
+        self.settings = {'mutations_sync': 1}
+
+    def get_news_tables(self) -> dict:
+        """
+        Находит таблицы новостей и колонку ссылки в каждой
+
+        Представления (прежние таблицы источников над news.articles) не
+        входят: колонка и индексы есть в самой news.articles.
+
+        Returns:
+            dict: {имя таблицы: колонка ссылки (link или message_link)}
+        """
+        result = self.client.execute(
+            """
+            SELECT table, groupArray(name) AS columns
+            FROM system.columns
+            WHERE database = 'news'
+            AND table IN (SELECT name FROM system.tables WHERE database = 'news' AND engine NOT LIKE '%View')
+            GROUP BY table
+            HAVING has(columns, 'title') AND has(columns, 'content')
+            ORDER BY table
+            """
+        )
+
+        tables = {}
+        for table_name, columns in result:
+            if 'link' in columns:
+                tables[table_name] = 'link'
+            elif 'message_link' in columns:
+                tables[table_name] = 'message_link'
+            else:
+                tables[table_name] = None
+        return tables
+
+    def get_table_indices(self, table_name: str) -> list:
+        """
+        Получает список skip-индексов таблицы
+
+        Args:
+            table_name: Имя таблицы
+
+        Returns:
+            list: Имена индексов
+        """
+        result = self.client.execute(
+            "SELECT name FROM system.data_skipping_indices WHERE database = 'news' AND table = %(table)s",
+            {'table': table_name}
+        )
+        return [row[0] for row in result]
+
+    def migrate_table(self, table_name: str, link_column: str) -> bool:
+        """
+        Мигрирует одну таблицу
+
+        Args:
+            table_name: Имя таблицы
+            link_column: Колонка ссылки для индекса idx_link (None - без индекса)
+
+        Returns:
+            bool: True если миграция успешна
+        """
+        logger.info(f"Начинаем миграцию таблицы: {table_name}")
+
+        statements = [
+            ("колонка content_hash",
+             f"ALTER TABLE news.{table_name} ADD COLUMN IF NOT EXISTS content_hash String DEFAULT ''"),
+            ("индекс idx_content_hash",
+             f"ALTER TABLE news.{table_name} ADD INDEX IF NOT EXISTS idx_content_hash content_hash "
+             f"TYPE bloom_filter GRANULARITY {INDEX_GRANULARITY}"),
+        ]
+
+        if link_column:
+            statements.append((
+                "индекс idx_link",
+                f"ALTER TABLE news.{table_name} ADD INDEX IF NOT EXISTS idx_link {link_column} "
+                f"TYPE bloom_filter GRANULARITY {INDEX_GRANULARITY}"
+            ))
+
+        # Заполнение хешей пересобирает idx_content_hash в затронутых кусках,
+        # idx_link для старых кусков строится отдельно
+        statements.append((
+            "заполнение content_hash",
+            f"ALTER TABLE news.{table_name} UPDATE content_hash = {CONTENT_HASH_EXPR} WHERE content_hash = ''"
+        ))
+
+        # Значение по умолчанию меняем после заполнения: иначе строки старых
+        # кусков без колонки читались бы уже с хешем и мутация их пропустила
+        statements.append((
+            "content_hash по умолчанию",
+            f"ALTER TABLE news.{table_name} MODIFY COLUMN content_hash String DEFAULT {CONTENT_HASH_EXPR}"
+        ))
+
+        if link_column:
+            statements.append((
+                "построение idx_link",
+                f"ALTER TABLE news.{table_name} MATERIALIZE INDEX idx_link"
+            ))
+
+        for description, sql in statements:
+            try:
+                self.client.execute(sql, settings=self.settings)
+                logger.info(f"✅ {table_name}: {description}")
+            except Exception as e:
+                logger.error(f"❌ {table_name}: ошибка ({description}): {e}")
+                return False
+
+        logger.info(f"✅ Миграция таблицы {table_name} завершена успешно")
+        return True
+
+    def migrate_all_tables(self) -> bool:
+        """
+        Мигрирует все таблицы новостей
+
+        Returns:
+            bool: True если все миграции успешны
+        """
+        logger.info("Начинаем миграцию всех таблиц новостей")
+        start_time = datetime.now()
+
+        tables = self.get_news_tables()
+        success_count = sum(
+            1 for table_name, link_column in tables.items()
+            if self.migrate_table(table_name, link_column)
+        )
+
+        duration = (datetime.now() - start_time).total_seconds()
+
+        logger.info(f"Миграция завершена: {success_count}/{len(tables)} таблиц успешно")
+        logger.info(f"Время выполнения: {duration:.2f} секунд")
+
+        return success_count == len(tables)
+
+    def verify_migration(self) -> bool:
+        """
+        Проверяет успешность миграции
+
+        Returns:
+            bool: True если во всех таблицах есть колонка, индексы и заполненные хеши
+        """
+        logger.info("Проверяем результаты миграции")
+
+        all_tables_ok = True
+
+        for table_name, link_column in self.get_news_tables().items():
+            required = ['idx_content_hash'] + (['idx_link'] if link_column else [])
+            missing = [name for name in required if name not in self.get_table_indices(table_name)]
+
+            try:
+                empty = self.client.execute(
+                    f"SELECT count() FROM news.{table_name} WHERE content_hash = ''"
+                )[0][0]
+            except Exception as e:
+                logger.error(f"❌ В таблице {table_name} нет колонки content_hash: {e}")
+                all_tables_ok = False
+                continue
+
+            if missing:
+                logger.error(f"❌ В таблице {table_name} отсутствуют индексы: {missing}")
+                all_tables_ok = False
+            elif empty:
+                logger.error(f"❌ В таблице {table_name} {empty} строк без content_hash")
+                all_tables_ok = False
+            else:
+                logger.info(f"✅ Таблица {table_name} готова к индексированной проверке дубликатов")
+
+        return all_tables_ok
+
+    def rollback_migration(self):
+        """
+        Откатывает миграцию (удаляет индексы и колонку content_hash)
+        """
+        logger.warning("ВНИМАНИЕ: Выполняется откат миграции!")
+
+        confirm = input("Вы уверены? Введите 'yes' для подтверждения: ")
+        if confirm.lower() != 'yes':
+            logger.info("Откат отменен")
+            return
+
+        for table_name in self.get_news_tables():
+            for sql in (
+                f"ALTER TABLE news.{table_name} DROP INDEX IF EXISTS idx_link",
+                f"ALTER TABLE news.{table_name} DROP INDEX IF EXISTS idx_content_hash",
+                f"ALTER TABLE news.{table_name} DROP COLUMN IF EXISTS content_hash",
+            ):
+                try:
+                    self.client.execute(sql)
+                except Exception as e:
+                    logger.error(f"❌ Ошибка отката таблицы {table_name}: {e}")
+                    break
+            else:
+                logger.info(f"✅ Таблица {table_name} возвращена к исходной структуре")
+
+
+def main():
+    """Основная функция для выполнения миграции"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    logger.info("Запуск миграции content_hash и индексов дедупликации")
+
+    try:
+        migration = ContentHashMigration()
+
+        if not migration.migrate_all_tables():
+            logger.error("❌ Миграция завершена с ошибками")
+            return False
+
+        if not migration.verify_migration():
+            logger.error("❌ Проверка миграции выявила проблемы")
+            return False
+
+        logger.info("🎉 Миграция базы данных завершена!")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Критическая ошибка при выполнении миграции: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Миграция content_hash и индексов дедупликации')
+    parser.add_argument('--rollback', action='store_true', help='Откатить миграцию')
+    parser.add_argument('--verify', action='store_true', help='Только проверить состояние миграции')
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        migration = ContentHashMigration()
+        migration.rollback_migration()
+    elif args.verify:
+        migration = ContentHashMigration()
+        if migration.verify_migration():
+            print("✅ Миграция выполнена корректно")
+        else:
+            print("❌ Миграция выполнена некорректно")
+    else:
+        success = main()
+        sys.exit(0 if success else 1)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Миграция базы данных для полнотекстового поиска по статьям
+
+Этот скрипт добавляет в news.articles skip-индексы SEARCH_INDEXES
+(parsers/articles_table.py), которые использует поиск
+parsers/article_search.py:
+- idx_title_words, idx_content_words - tokenbf_v1 по словам заголовка
+  и текста (hasToken)
+- idx_title_word_ngrams - ngrambf_v1 по 4-граммам заголовка (LIKE '%префикс%')
+
+и строит их для уже сохраненных кусков данных. Индексы строятся по
+search_text(колонка) - тексту, в котором все знаки кроме букв и цифр
+заменены пробелами. Прежние индексы по lowerUTF8(title|content)
+(OBSOLETE_SEARCH_INDEXES) поиск больше не использует, они удаляются.
+
+Таблицы, созданные после этой версии, получают индексы сразу в CREATE TABLE.
+"""
+
+import os
+import sys
+import logging
+from clickhouse_driver import Client
+from datetime import datetime
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from parsers.articles_table import ARTICLES_TABLE, OBSOLETE_SEARCH_INDEXES, SEARCH_INDEXES
+
+CLICKHOUSE_CONFIG = Config.CLICKHOUSE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+INDEX_GRANULARITY = 1
+
+
+class SearchIndexesMigration:
+    """Класс для добавления skip-индексов полнотекстового поиска"""
+
+    def __init__(self):
+        self.client = Client(
+            host=CLICKHOUSE_CONFIG['host'],
+            port=CLICKHOUSE_CONFIG['port'],
+            user=CLICKHOUSE_CONFIG['user'],
+            password=CLICKHOUSE_CONFIG['password'],
+            database=CLICKHOUSE_CONFIG['database']
+        )
+
+        # Мутации выполняем синхронно, чтобы проверка видела результат
+        self.settings = {'mutations_sync': 1}
+
+    def get_table_indices(self) -> list:
+        """
+        Получает список skip-индексов news.articles
+
+        Returns:
+            list: Имена индексов
+        """
+        result = self.client.execute(
+            "SELECT name FROM system.data_skipping_indices WHERE database = 'news' AND table = %(table)s",
+            {'table': ARTICLES_TABLE.split('.')[1]}
+        )
+        return [row[0] for row in result]
+
+    def migrate(self) -> bool:
+        """
+        Добавляет индексы поиска и строит их для существующих данных
+
+        Returns:
+            bool: True если миграция успешна
+        """
+        logger.info(f"Начинаем добавление индексов поиска в {ARTICLES_TABLE}")
+        start_time = datetime.now()
+
+        for name in OBSOLETE_SEARCH_INDEXES:
+            try:
+                self.client.execute(f"ALTER TABLE {ARTICLES_TABLE} DROP INDEX IF EXISTS {name}", settings=self.settings)
+                logger.info(f"✅ {name}: прежний индекс удален")
+            except Exception as e:
+                logger.error(f"❌ {name}: ошибка удаления прежнего индекса: {e}")
+                return False
+
+        for name, expression, index_type in SEARCH_INDEXES:
+            for description, sql in (
+                ("добавление",
+                 f"ALTER TABLE {ARTICLES_TABLE} ADD INDEX IF NOT EXISTS {name} {expression} "
+                 f"TYPE {index_type} GRANULARITY {INDEX_GRANULARITY}"),
+                ("построение",
+                 f"ALTER TABLE {ARTICLES_TABLE} MATERIALIZE INDEX {name}"),
+            ):
+                try:
+                    self.client.execute(sql, settings=self.settings)
+                    logger.info(f"✅ {name}: {description}")
+                except Exception as e:
+                    logger.error(f"❌ {name}: ошибка ({description}): {e}")
+                    return False
+
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Время выполнения: {duration:.2f} секунд")
+
+        return True
+
+    def verify_migration(self) -> bool:
+        """
+        Проверяет успешность миграции
+
+        Returns:
+            bool: True если все индексы поиска есть в news.articles
+        """
+        logger.info("Проверяем результаты миграции")
+
+        indices = self.get_table_indices()
+        missing = [name for name, _, _ in SEARCH_INDEXES if name not in indices]
+        obsolete = [name for name in OBSOLETE_SEARCH_INDEXES if name in indices]
+
+        if missing:
+            logger.error(f"❌ В таблице {ARTICLES_TABLE} отсутствуют индексы: {missing}")
+            return False
+        if obsolete:
+            logger.error(f"❌ В таблице {ARTICLES_TABLE} остались прежние индексы: {obsolete}")
+            return False
+
+        logger.info(f"✅ Таблица {ARTICLES_TABLE} готова к полнотекстовому поиску")
+        return True
+
+    def rollback_migration(self):
+        """
+        Откатывает миграцию (удаляет индексы поиска)
+        ВНИМАНИЕ: поиск продолжит работать, но будет читать title и content целиком!
+        """
+        logger.warning("ВНИМАНИЕ: Выполняется откат миграции!")
+        logger.warning("Поиск по статьям будет читать title и content целиком!")
+
+        confirm = input("Вы уверены? Введите 'yes' для подтверждения: ")
+        if confirm.lower() != 'yes':
+            logger.info("Откат отменен")
+            return
+
+        for name, _, _ in SEARCH_INDEXES:
+            try:
+                self.client.execute(f"ALTER TABLE {ARTICLES_TABLE} DROP INDEX IF EXISTS {name}")
+                logger.info(f"✅ Индекс {name} удален")
+            except Exception as e:
+                logger.error(f"❌ Ошибка удаления индекса {name}: {e}")
+
+
+def main():
+    """Основная функция для выполнения миграции"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    logger.info("Запуск миграции индексов полнотекстового поиска")
+
+    try:
+        migration = SearchIndexesMigration()
+
+        if not migration.migrate():
+            logger.error("❌ Миграция завершена с ошибками")
+            return False
+
+        if not migration.verify_migration():
+            logger.error("❌ Проверка миграции выявила проблемы")
+            return False
+
+        logger.info("🎉 Миграция базы данных завершена!")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Критическая ошибка при выполнении миграции: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Миграция индексов полнотекстового поиска')
+    parser.add_argument('--rollback', action='store_true', help='Откатить миграцию')
+    parser.add_argument('--verify', action='store_true', help='Только проверить состояние миграции')
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        migration = SearchIndexesMigration()
+        migration.rollback_migration()
+    elif args.verify:
+        migration = SearchIndexesMigration()
+        if migration.verify_migration():
+            print("✅ Миграция выполнена корректно")
+        else:
+            print("❌ Миграция выполнена некорректно")
+    else:
+        success = main()
+        sys.exit(0 if success else 1)
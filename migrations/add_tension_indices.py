@@ -87,6 +87,25 @@ class DatabaseMigration:
             logger.error(f"Ошибка при проверке существования таблицы {table_name}: {e}")
             return False
     
+    def is_view(self, table_name: str) -> bool:
+        """
+        Проверяет, является ли таблица представлением
+        
+        Прежние таблицы источников - представления над news.articles,
+        в которой колонки миграции есть с момента создания.
+        
+        Args:
+            table_name: Имя таблицы
+            
+        Returns:
+            bool: True если это представление
+        """
+        result = self.client.execute(
+            "SELECT engine FROM system.tables WHERE database = 'news' AND name = %(table)s",
+            {'table': table_name}
+        )
+        return bool(result) and result[0][0].endswith('View')
+    
     def get_table_columns(self, table_name: str) -> list:
         """
         Получает список колонок таблицы
@@ -154,6 +173,10 @@ class DatabaseMigration:
             logger.warning(f"Таблица {table_name} не существует, пропускаем")
             return True
         
+        if self.is_view(table_name):
+            logger.info(f"{table_name} - представление над news.articles, пропускаем")
+            return True
+        
         success = True
         
         # Добавляем новые колонки
@@ -278,7 +301,7 @@ class DatabaseMigration:
         ]
         
         for table_name in self.news_tables + self.category_tables:
-            if not self.check_table_exists(table_name):
+            if not self.check_table_exists(table_name) or self.is_view(table_name):
                 continue
                 
             for column_name in columns_to_remove:
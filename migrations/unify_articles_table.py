@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Миграция базы данных на единую таблицу статей news.articles
+
+Для каждой прежней таблицы источника ({source}_headlines) и категории
+({source}_{category}):
+- таблица переименовывается в {имя}_legacy
+- ее строки переносятся в news.articles (source - ключ источника вместо
+  домена, link для telegram - message_link, пустой content_hash
+  вычисляется тем же выражением, что в add_content_hash.py)
+- на месте прежней таблицы создается представление над news.articles
+
+Основные и категорийные таблицы содержат одни и те же статьи, поэтому
+строка переносится, только если ее ссылки еще нет в news.articles для
+этого источника. По той же причине миграцию можно безопасно запускать
+повторно (например, после сбоя посередине).
+"""
+
+import os
+import sys
+import logging
+from clickhouse_driver import Client
+from datetime import datetime
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from parsers.articles_table import (
+    ARTICLES_TABLE, CONTENT_HASH_EXPR, create_articles_table_sql, create_view_sql, legacy_tables, sql_string, view_name
+)
+
+CLICKHOUSE_CONFIG = Config.CLICKHOUSE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+LEGACY_SUFFIX = '_legacy'
+
+
+class UnifyArticlesMigration:
+    """Класс для переноса таблиц источников и категорий в news.articles"""
+
+    def __init__(self):
+        self.client = Client(
+            host=CLICKHOUSE_CONFIG['host'],
+            port=CLICKHOUSE_CONFIG['port'],
+            user=CLICKHOUSE_CONFIG['user'],
+            password=CLICKHOUSE_CONFIG['password'],
+            database=CLICKHOUSE_CONFIG['database']
+        )
+
+        # Прежние таблицы не партиционированы: строки одного INSERT ... SELECT
+        # могут попасть в партиции всех месяцев, за которые есть статьи
+        self.settings = {'max_partitions_per_insert_block': 1000}
+
+    def get_engines(self) -> dict:
+        """
+        Движки объектов базы news
+
+        Returns:
+            dict: {имя: движок} (View для представлений)
+        """
+        return dict(self.client.execute(
+            "SELECT name, engine FROM system.tables WHERE database = 'news'"
+        ))
+
+    def get_columns(self, table_name: str) -> list:
+        """
+        Получает список колонок таблицы
+
+        Args:
+            table_name: Имя таблицы
+
+        Returns:
+            list: Имена колонок в порядке таблицы
+        """
+        result = self.client.execute(
+            "SELECT name FROM system.columns WHERE database = 'news' AND table = %(table)s ORDER BY position",
+            {'table': table_name}
+        )
+        return [row[0] for row in result]
+
+    def select_list(self, legacy_columns: list, source: str, category: str = None) -> list:
+        """
+        Пары (колонка news.articles, выражение над прежней таблицей)
+
+        Колонки, которых в прежней таблице нет, не перечисляются -
+        news.articles заполняет их значениями по умолчанию.
+
+        Args:
+            legacy_columns: Колонки прежней таблицы
+            source: Ключ источника
+            category: Категория таблицы (None - основная таблица источника)
+
+        Returns:
+            list: [(колонка, выражение)]
+        """
+        pairs = []
+        for column in self.get_columns('articles'):
+            if column == 'source':
+                pairs.append((column, sql_string(source)))
+            elif column == 'category' and category:
+                pairs.append((column, sql_string(category)))
+            elif column == 'content_hash':
+                expression = CONTENT_HASH_EXPR
+                if 'content_hash' in legacy_columns:
+                    expression = f"if(content_hash = '', {CONTENT_HASH_EXPR}, content_hash)"
+                pairs.append((column, expression))
+            elif column == 'link' and 'link' not in legacy_columns:
+                if 'message_link' in legacy_columns:
+                    pairs.append((column, 'message_link'))
+            elif column in legacy_columns:
+                pairs.append((column, column))
+        return pairs
+
+    def backfill(self, legacy_table: str, source: str, category: str = None) -> int:
+        """
+        Переносит в news.articles строки прежней таблицы, ссылок которых там еще нет
+
+        Args:
+            legacy_table: Переименованная прежняя таблица
+            source: Ключ источника
+            category: Категория таблицы (None - основная таблица источника)
+
+        Returns:
+            int: Количество перенесенных строк
+        """
+        legacy_columns = self.get_columns(legacy_table)
+        link_column = 'link' if 'link' in legacy_columns else 'message_link'
+        pairs = self.select_list(legacy_columns, source, category)
+
+        before = self.client.execute(
+            f"SELECT count() FROM {ARTICLES_TABLE} WHERE source = {sql_string(source)}"
+        )[0][0]
+
+        self.client.execute(
+            f"""
+            INSERT INTO {ARTICLES_TABLE} ({', '.join(column for column, _ in pairs)})
+            SELECT {', '.join(expression for _, expression in pairs)}
+            FROM news.{legacy_table}
+            WHERE {link_column} NOT IN (
+                SELECT link FROM {ARTICLES_TABLE} WHERE source = {sql_string(source)}
+            )
+            """,
+            settings=self.settings
+        )
+
+        after = self.client.execute(
+            f"SELECT count() FROM {ARTICLES_TABLE} WHERE source = {sql_string(source)}"
+        )[0][0]
+        return after - before
+
+    def migrate_table(self, source: str, category: str, engines: dict) -> bool:
+        """
+        Мигрирует одну прежнюю таблицу
+
+        Args:
+            source: Ключ источника
+            category: Категория (None - основная таблица источника)
+            engines: Движки объектов базы news
+
+        Returns:
+            bool: True если миграция успешна
+        """
+        name = view_name(source, category)
+        legacy = name + LEGACY_SUFFIX
+
+        try:
+            if engines.get(name, 'View') != 'View':
+                if legacy in engines:
+                    logger.error(f"❌ {name}: таблица {legacy} уже существует, пропускаем")
+                    return False
+                self.client.execute(f"RENAME TABLE news.{name} TO news.{legacy}")
+                engines[legacy] = engines.pop(name)
+                logger.info(f"✅ {name}: переименована в {legacy}")
+
+            if legacy in engines:
+                moved = self.backfill(legacy, source, category)
+                logger.info(f"✅ {name}: перенесено строк: {moved}")
+
+            self.client.execute(create_view_sql(source, category))
+            engines[name] = 'View'
+        except Exception as e:
+            logger.error(f"❌ {name}: ошибка миграции: {e}")
+            return False
+
+        return True
+
+    def migrate_all_tables(self) -> bool:
+        """
+        Мигрирует все таблицы источников и категорий
+
+        Returns:
+            bool: True если все миграции успешны
+        """
+        logger.info("Начинаем перенос таблиц источников в news.articles")
+        start_time = datetime.now()
+
+        self.client.execute(create_articles_table_sql())
+        engines = self.get_engines()
+
+        # Сначала основные таблицы источников: в них все статьи, категорийные
+        # таблицы добавляют только строки, не попавшие в основные
+        tables = list(legacy_tables())
+        success_count = sum(
+            1 for source, category in tables
+            if self.migrate_table(source, category, engines)
+        )
+
+        duration = (datetime.now() - start_time).total_seconds()
+
+        logger.info(f"Миграция завершена: {success_count}/{len(tables)} таблиц успешно")
+        logger.info(f"Время выполнения: {duration:.2f} секунд")
+
+        return success_count == len(tables)
+
+    def verify_migration(self) -> bool:
+        """
+        Проверяет успешность миграции
+
+        Returns:
+            bool: True если прежние имена - представления, а все ссылки прежних таблиц есть в news.articles
+        """
+        logger.info("Проверяем результаты миграции")
+
+        engines = self.get_engines()
+        if engines.get('articles') != 'MergeTree':
+            logger.error("❌ Таблица news.articles не создана")
+            return False
+
+        all_tables_ok = True
+
+        for source, category in legacy_tables():
+            name = view_name(source, category)
+            legacy = name + LEGACY_SUFFIX
+
+            if engines.get(name) != 'View':
+                logger.error(f"❌ {name}: не представление ({engines.get(name, 'отсутствует')})")
+                all_tables_ok = False
+                continue
+
+            if legacy not in engines:
+                continue
+
+            link_column = 'link' if 'link' in self.get_columns(legacy) else 'message_link'
+            missing = self.client.execute(
+                f"""
+                SELECT count() FROM news.{legacy}
+                WHERE {link_column} NOT IN (
+                    SELECT link FROM {ARTICLES_TABLE} WHERE source = {sql_string(source)}
+                )
+                """
+            )[0][0]
+
+            if missing:
+                logger.error(f"❌ {name}: {missing} строк {legacy} нет в news.articles")
+                all_tables_ok = False
+            else:
+                logger.info(f"✅ {name}: данные перенесены")
+
+        return all_tables_ok
+
+    def rollback_migration(self):
+        """
+        Откатывает миграцию (возвращает прежние таблицы на место представлений)
+        ВНИМАНИЕ: статьи, сохраненные после миграции, останутся только в news.articles!
+        """
+        logger.warning("ВНИМАНИЕ: Выполняется откат миграции!")
+        logger.warning("Статьи, сохраненные после миграции, останутся только в news.articles!")
+
+        confirm = input("Вы уверены? Введите 'yes' для подтверждения: ")
+        if confirm.lower() != 'yes':
+            logger.info("Откат отменен")
+            return
+
+        engines = self.get_engines()
+
+        for source, category in legacy_tables():
+            name = view_name(source, category)
+            legacy = name + LEGACY_SUFFIX
+            if legacy not in engines:
+                continue
+
+            try:
+                if engines.get(name) == 'View':
+                    self.client.execute(f"DROP VIEW news.{name}")
+                self.client.execute(f"RENAME TABLE news.{legacy} TO news.{name}")
+                logger.info(f"✅ Таблица {name} возвращена на место представления")
+            except Exception as e:
+                logger.error(f"❌ Ошибка отката таблицы {name}: {e}")
+
+
+def main():
+    """Основная функция для выполнения миграции"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    logger.info("Запуск миграции на единую таблицу статей news.articles")
+
+    try:
+        migration = UnifyArticlesMigration()
+
+        if not migration.migrate_all_tables():
+            logger.error("❌ Миграция завершена с ошибками")
+            return False
+
+        if not migration.verify_migration():
+            logger.error("❌ Проверка миграции выявила проблемы")
+            return False
+
+        logger.info("🎉 Миграция базы данных завершена! Таблицы *_legacy можно удалить после проверки")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Критическая ошибка при выполнении миграции: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Миграция на единую таблицу статей news.articles')
+    parser.add_argument('--rollback', action='store_true', help='Откатить миграцию')
+    parser.add_argument('--verify', action='store_true', help='Только проверить состояние миграции')
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        migration = UnifyArticlesMigration()
+        migration.rollback_migration()
+    elif args.verify:
+        migration = UnifyArticlesMigration()
+        if migration.verify_migration():
+            print("✅ Миграция выполнена корректно")
+        else:
+            print("❌ Миграция выполнена некорректно")
+    else:
+        success = main()
+        sys.exit(0 if success else 1)
@@ -0,0 +1,46 @@
+"""
+Контекст обработки одной статьи
+
+Объект проходит через все этапы BaseNewsParser.process_article
+(предобработка, валидация, классификация, тональность, индексы
+напряженности) и хранит их результаты, чтобы каждый этап выполнялся
+один раз, а результаты переиспользовались при записи во все таблицы.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+
+@dataclass
+class ArticleContext:
+    """Состояние статьи на этапах обработки"""
+    title: str
+    content: str
+    link: str
+    rubric: str = ""
+    published_date: Optional[datetime] = None
+
+    # Результаты этапов (None - этап еще не выполнялся)
+    is_valid: Optional[bool] = None
+    classification: Optional[Dict] = None
+    sentiment: Optional[Dict] = None
+    ai_data: Optional[Dict] = None
+    row: Optional[Dict] = None
+    story_id: Optional[str] = None
+
+    # Произвольные данные этапов (причины отклонения и т.п.)
+    extra: Dict = field(default_factory=dict)
+
+    @property
+    def category(self) -> Optional[str]:
+        """Категория из результата классификации"""
+        if not self.classification:
+            return None
+        return self.classification.get('category_name')
+
+    @property
+    def confidence(self) -> float:
+        """Уверенность классификации"""
+        if not self.classification:
+            return 0.0
+        return self.classification.get('confidence', 0.0)
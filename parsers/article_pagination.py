@@ -0,0 +1,230 @@
+"""
+Постраничная выдача статей по курсору и приблизительные итоги
+
+LIMIT N OFFSET M заставляет ClickHouse прочитать и отсортировать M + N
+строк, поэтому каждая следующая страница дороже предыдущей. Курсор -
+ключ (published_date, id) последней статьи страницы; следующая
+страница отбирает статьи раньше него:
+
+    published_date <= d AND (published_date < d OR id < u)
+
+Первое условие ограничивает партиции и гранулы по дате, поэтому любая
+страница читает примерно столько же, сколько первая. Порядок
+ORDER BY published_date DESC, id DESC однозначен и при равных датах.
+
+Курсор непрозрачен для клиента: base64 от "unix-время:uuid". Время
+берется из toUnixTimestamp(published_date) в самом запросе, поэтому
+курсор не зависит от часовых поясов клиента и сервера.
+
+Общее количество статей не пересчитывается вторым сканированием на
+каждый запрос: эндпоинты берут его из почасовых агрегатов
+(articles_rollup.py), а если фильтр агрегатам недоступен (поиск, канал,
+таблицы вне news.articles) - из ApproximateCounts: последнее известное
+значение, которое пересчитывается в фоне раз в COUNT_CACHE_TTL секунд.
+"""
+import base64
+import binascii
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Порядок выдачи статей
+ORDER_BY = 'published_date DESC, id DESC'
+
+# Колонки курсора - последние в SELECT страницы (см. split_page)
+CURSOR_COLUMNS = 'toUnixTimestamp(published_date) AS cursor_ts, toString(id) AS cursor_id'
+
+_CURSOR_DATE = 'toDateTime(%(cursor_ts)s)'
+
+
+def encode_cursor(timestamp: int, article_id: str) -> str:
+    """
+    Курсор следующей страницы
+
+    Args:
+        timestamp: toUnixTimestamp(published_date) последней статьи страницы
+        article_id: id последней статьи страницы
+
+    Returns:
+        Строка курсора для параметра cursor
+    """
+    raw = f"{int(timestamp)}:{article_id}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """
+    Ключ статьи из курсора
+
+    Args:
+        cursor: Значение параметра cursor
+
+    Returns:
+        (unix-время, id)
+
+    Raises:
+        ValueError: Курсор поврежден
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        timestamp, article_id = raw.split(':', 1)
+        return int(timestamp), str(uuid.UUID(article_id))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Некорректный курсор страницы')
+
+
+class PageCursor:
+    """Условие страницы статей после курсора"""
+
+    def __init__(self, cursor: Optional[str]):
+        """
+        Args:
+            cursor: Значение параметра cursor (пустое - первая страница)
+
+        Raises:
+            ValueError: Курсор поврежден
+        """
+        self.key = decode_cursor(cursor) if cursor else None
+
+    def __bool__(self) -> bool:
+        return self.key is not None
+
+    @property
+    def params(self) -> Dict[str, object]:
+        """Параметры запроса для условия курсора"""
+        if self.key is None:
+            return {}
+        timestamp, article_id = self.key
+        return {'cursor_ts': timestamp, 'cursor_id': article_id}
+
+    @property
+    def condition(self) -> str:
+        """Условие WHERE (без WHERE); '1' для первой страницы"""
+        if self.key is None:
+            return '1'
+        return (
+            f"published_date <= {_CURSOR_DATE} "
+            f"AND (published_date < {_CURSOR_DATE} OR id < toUUID(%(cursor_id)s))"
+        )
+
+
+def split_page(rows: Sequence[Sequence], limit: int) -> Tuple[List[Sequence], Optional[str]]:
+    """
+    Строки страницы и курсор следующей
+
+    Запрос страницы выбирает limit + 1 строк с CURSOR_COLUMNS в конце:
+    лишняя строка означает, что следующая страница есть.
+
+    Args:
+        rows: Результат запроса
+        limit: Размер страницы
+
+    Returns:
+        (не больше limit строк, курсор следующей страницы или None)
+    """
+    rows = list(rows)
+    if len(rows) <= limit or limit <= 0:
+        return rows[:max(limit, 0)], None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last[-2], last[-1])
+
+
+class ApproximateCounts:
+    """Итоги COUNT-запросов из памяти, пересчитываемые в фоне"""
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        workers: Optional[int] = None
+    ):
+        """
+        Args:
+            ttl: Через сколько секунд итог пересчитывается
+            max_entries: Сколько итогов хранится (вытеснение по LRU)
+            workers: Потоков пересчета
+        """
+        self.ttl = Config.COUNT_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.COUNT_CACHE_MAX_ENTRIES
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or Config.COUNT_CACHE_WORKERS,
+            thread_name_prefix='count-cache'
+        )
+        self._entries: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(sql: str, params: Optional[Dict[str, object]] = None) -> str:
+        """Ключ итога: текст запроса и значения параметров"""
+        return f"{' '.join(sql.split())}|{sorted((params or {}).items())!r}"
+
+    def get(self, key: str, count: Callable[[], int]) -> Optional[int]:
+        """
+        Последний известный итог; отсутствующий или устаревший пересчитывается в фоне
+
+        count выполняется в потоке пересчета, поэтому должен открывать
+        собственное соединение с ClickHouse, а не использовать клиент запроса.
+
+        Args:
+            key: Ключ итога (ApproximateCounts.key)
+            count: Функция, выполняющая COUNT-запрос
+
+        Returns:
+            Итог (None - еще не посчитан)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            stale = entry is None or time.monotonic() - entry[1] >= self.ttl
+            if stale and key not in self._pending:
+                self._pending.add(key)
+                self._executor.submit(self._refresh, key, count)
+        return entry[0] if entry is not None else None
+
+    def _refresh(self, key: str, count: Callable[[], int]):
+        """Пересчитывает итог"""
+        try:
+            value = int(count())
+        except Exception as e:
+            logger.warning(f"Ошибка подсчета итога: {e}")
+            value = None
+
+        with self._lock:
+            self._pending.discard(key)
+            if value is None:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_counts_instance = None
+_counts_instance_lock = threading.Lock()
+
+
+def get_approximate_counts() -> ApproximateCounts:
+    """Возвращает общий для процесса кэш итогов"""
+    global _counts_instance
+
+    if _counts_instance is None:
+        with _counts_instance_lock:
+            if _counts_instance is None:
+                _counts_instance = ApproximateCounts()
+    return _counts_instance
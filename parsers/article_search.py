@@ -0,0 +1,165 @@
+"""
+Полнотекстовый поиск по news.articles
+
+Запрос разбивается на слова (в нижнем регистре). Статья подходит, если
+содержит все слова - в заголовке или тексте; последнее слово ищется
+и как префикс (подстрока заголовка), чтобы поиск работал во время ввода.
+
+Условия записаны так, чтобы ClickHouse отсекал гранулы skip-индексами
+SEARCH_INDEXES из articles_table.py:
+- hasToken(search_text(title|content), слово) - индексы tokenbf_v1
+- search_text(title) LIKE '%префикс%' - индекс ngrambf_v1
+а не сканировал title и content целиком, как title ILIKE '%q%'.
+
+search_text - тот же текст, что в индексах: нижний регистр, знаки кроме
+букв и цифр заменены пробелами. Слова запроса выделяются так же (буквы и
+цифры Unicode), поэтому слово в кавычках-елочках, через тире или
+неразрывный пробел находится, хотя hasToken сам делит текст только по
+ASCII-символам.
+
+Слова передаются параметрами запроса (%(search_term_0)s ...) - в SQL
+не подставляется пользовательский текст. Формат параметров один и тот же
+для clickhouse_driver (execute) и clickhouse_connect (query).
+
+Релевантность: совпадение слова в заголовке весит 3, префикса в
+заголовке - 2, слова в тексте - 1; при равной релевантности выше
+более свежие статьи.
+"""
+import re
+from typing import Dict, List, Optional
+
+try:
+    from parsers.articles_table import search_text
+except ImportError:
+    from articles_table import search_text
+
+# Слова: буквы и цифры, как в search_text
+_TERM_RE = re.compile(r'[^\W_]+')
+
+# Максимум слов в запросе
+MAX_TERMS = 8
+
+# Фрагмент текста вокруг первого совпадения (в символах)
+SNIPPET_BEFORE = 80
+SNIPPET_LENGTH = 240
+
+TITLE_WEIGHT = 3
+PREFIX_WEIGHT = 2
+CONTENT_WEIGHT = 1
+
+_TITLE = search_text('title')
+_CONTENT = search_text('content')
+
+
+def tokenize(query: Optional[str]) -> List[str]:
+    """
+    Слова поискового запроса в нижнем регистре (без повторов, не больше MAX_TERMS)
+
+    Args:
+        query: Поисковый запрос
+
+    Returns:
+        Список слов в порядке запроса
+    """
+    terms = []
+    for term in _TERM_RE.findall((query or '').lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+class SearchQuery:
+    """Условие, релевантность и фрагменты поиска по словам запроса"""
+
+    def __init__(self, query: Optional[str], prefix: bool = True):
+        """
+        Args:
+            query: Поисковый запрос (пустой - без условия поиска)
+            prefix: Искать последнее слово и как префикс
+        """
+        self.terms = tokenize(query)
+        self.prefix = prefix and bool(self.terms)
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def _term(self, index: int) -> str:
+        return f"%(search_term_{index})s"
+
+    @property
+    def params(self) -> Dict[str, object]:
+        """Параметры запроса для условий этого поиска"""
+        if not self.terms:
+            return {}
+        params = {f"search_term_{index}": term for index, term in enumerate(self.terms)}
+        params['search_terms'] = self.terms
+        if self.prefix:
+            params['search_prefix'] = f"%{self.terms[-1]}%"
+        return params
+
+    @property
+    def condition(self) -> str:
+        """Условие WHERE (без WHERE); '1' если запрос пустой"""
+        if not self.terms:
+            return '1'
+
+        conditions = []
+        for index in range(len(self.terms)):
+            term = self._term(index)
+            condition = f"hasToken({_TITLE}, {term}) OR hasToken({_CONTENT}, {term})"
+            if self.prefix and index == len(self.terms) - 1:
+                # Подстрока заголовка включает и целое слово заголовка
+                condition = f"{_TITLE} LIKE %(search_prefix)s OR hasToken({_CONTENT}, {term})"
+            conditions.append(f"({condition})")
+        return ' AND '.join(conditions)
+
+    @property
+    def relevance(self) -> str:
+        """Выражение релевантности статьи; 0 если запрос пустой"""
+        if not self.terms:
+            return '0'
+
+        parts = []
+        for index in range(len(self.terms)):
+            term = self._term(index)
+            parts.append(f"{TITLE_WEIGHT} * hasToken({_TITLE}, {term})")
+            parts.append(f"{CONTENT_WEIGHT} * hasToken({_CONTENT}, {term})")
+        if self.prefix:
+            parts.append(f"{PREFIX_WEIGHT} * ({_TITLE} LIKE %(search_prefix)s)")
+        return ' + '.join(parts)
+
+    @property
+    def match_position(self) -> str:
+        """Позиция (в символах, с 1) первого совпадения в тексте; 0 - совпадений нет"""
+        if not self.terms:
+            return '0'
+        return "multiSearchFirstPositionCaseInsensitiveUTF8(content, %(search_terms)s)"
+
+    @property
+    def snippet(self) -> str:
+        """Выражение фрагмента текста вокруг первого совпадения"""
+        return (
+            f"substringUTF8(content, greatest(1, toInt64({self.match_position}) - {SNIPPET_BEFORE}), "
+            f"{SNIPPET_LENGTH})"
+        )
+
+
+def format_snippet(fragment: str, match_position: int, content_length: int) -> str:
+    """
+    Фрагмент с многоточиями там, где текст обрезан
+
+    Args:
+        fragment: Значение SearchQuery.snippet
+        match_position: Значение SearchQuery.match_position
+        content_length: Длина текста в символах
+
+    Returns:
+        Фрагмент для выдачи
+    """
+    start = max(1, match_position - SNIPPET_BEFORE)
+    fragment = fragment.strip()
+    if start > 1:
+        fragment = '…' + fragment
+    if start - 1 + SNIPPET_LENGTH < content_length:
+        fragment += '…'
+    return fragment
@@ -0,0 +1,174 @@
+"""
+Почасовые агрегаты статей news.articles_hourly
+
+Материализованное представление news.articles_hourly_mv при каждой
+вставке в news.articles добавляет в AggregatingMergeTree-таблицу
+news.articles_hourly строку на (час, источник, категория): количество
+статей, состояния средних индекса напряженности, индекса всплеска и
+тональности, квантили напряженности и распределение по уровням
+напряженности. Слияния кусков таблицы сворачивают строки одного ключа,
+поэтому размер агрегатов зависит от числа часов, а не статей.
+
+Счетчики - SimpleAggregateFunction(sum): их читают обычным sum().
+Средние, минимумы/максимумы и квантили - состояния AggregateFunction:
+их читают функциями -Merge (avgMerge, quantilesIfMerge ...).
+
+Агрегаты "scored_*" считаются только по статьям с индексом
+напряженности (social_tension_index > 0): статьи без индекса
+эндпоинты по-прежнему оценивают по тексту.
+
+Представление видит только новые вставки: статьи, сохраненные до его
+создания, переносит migrations/add_articles_rollup.py.
+"""
+from typing import Optional
+
+try:
+    from parsers.articles_table import ARTICLES_TABLE, articles_filter
+except ImportError:
+    from articles_table import ARTICLES_TABLE, articles_filter
+
+ROLLUP_TABLE = 'news.articles_hourly'
+ROLLUP_VIEW = 'news.articles_hourly_mv'
+
+# Границы уровней напряженности (индекс 0-100): low < 30 <= medium < 60 <= high < 80 <= critical
+TENSION_LEVELS = (('low', 30), ('medium', 60), ('high', 80), ('critical', None))
+
+# Квантили напряженности
+TENSION_QUANTILES = (0.5, 0.9)
+
+_SCORED = 'social_tension_index > 0'
+
+ROLLUP_COLUMNS = f'''
+    hour DateTime,
+    source LowCardinality(String),
+    category LowCardinality(String),
+    news_count SimpleAggregateFunction(sum, UInt64),
+    scored_count SimpleAggregateFunction(sum, UInt64),
+    {', '.join(f'tension_{level} SimpleAggregateFunction(sum, UInt64)' for level, _ in TENSION_LEVELS)},
+    tension_avg AggregateFunction(avg, Float32),
+    spike_avg AggregateFunction(avg, Float32),
+    sentiment_avg AggregateFunction(avg, Float32),
+    positive_avg AggregateFunction(avg, Float32),
+    negative_avg AggregateFunction(avg, Float32),
+    scored_tension_avg AggregateFunction(avgIf, Float32, UInt8),
+    scored_spike_avg AggregateFunction(avgIf, Float32, UInt8),
+    scored_tension_min AggregateFunction(minIf, Float32, UInt8),
+    scored_tension_max AggregateFunction(maxIf, Float32, UInt8),
+    scored_spike_min AggregateFunction(minIf, Float32, UInt8),
+    scored_spike_max AggregateFunction(maxIf, Float32, UInt8),
+    tension_quantiles AggregateFunction(quantilesIf({', '.join(map(str, TENSION_QUANTILES))}), Float32, UInt8)
+'''
+
+
+def _level_condition(lower: Optional[float], upper: Optional[float]) -> str:
+    """Условие уровня напряженности для статьи с индексом"""
+    conditions = [_SCORED]
+    if lower is not None:
+        conditions.append(f"social_tension_index >= {lower}")
+    if upper is not None:
+        conditions.append(f"social_tension_index < {upper}")
+    return ' AND '.join(conditions)
+
+
+def rollup_select_sql(where: str = '1') -> str:
+    """
+    Агрегирующий SELECT из news.articles в формате news.articles_hourly
+
+    Args:
+        where: Условие отбора статей (для переноса существующих данных)
+
+    Returns:
+        SELECT ... GROUP BY hour, source, category
+    """
+    levels = []
+    lower = None
+    for level, upper in TENSION_LEVELS:
+        levels.append(f"countIf({_level_condition(lower, upper)}) AS tension_{level}")
+        lower = upper
+
+    return f'''
+        SELECT
+            toStartOfHour(published_date) AS hour,
+            source,
+            category,
+            count() AS news_count,
+            countIf({_SCORED}) AS scored_count,
+            {', '.join(levels)},
+            avgState(social_tension_index) AS tension_avg,
+            avgState(spike_index) AS spike_avg,
+            avgState(sentiment_score) AS sentiment_avg,
+            avgState(positive_score) AS positive_avg,
+            avgState(negative_score) AS negative_avg,
+            avgIfState(social_tension_index, {_SCORED}) AS scored_tension_avg,
+            avgIfState(spike_index, {_SCORED}) AS scored_spike_avg,
+            minIfState(social_tension_index, {_SCORED}) AS scored_tension_min,
+            maxIfState(social_tension_index, {_SCORED}) AS scored_tension_max,
+            minIfState(spike_index, {_SCORED}) AS scored_spike_min,
+            maxIfState(spike_index, {_SCORED}) AS scored_spike_max,
+            quantilesIfState({', '.join(map(str, TENSION_QUANTILES))})(social_tension_index, {_SCORED}) AS tension_quantiles
+        FROM {ARTICLES_TABLE}
+        WHERE {where}
+        GROUP BY hour, source, category
+    '''
+
+
+def create_rollup_table_sql() -> str:
+    """DDL таблицы почасовых агрегатов"""
+    return f'''
+        CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} ({ROLLUP_COLUMNS})
+        ENGINE = AggregatingMergeTree()
+        PARTITION BY toYYYYMM(hour)
+        ORDER BY (source, category, hour)
+    '''
+
+
+def create_rollup_view_sql() -> str:
+    """DDL материализованного представления news.articles -> news.articles_hourly"""
+    return f"CREATE MATERIALIZED VIEW IF NOT EXISTS {ROLLUP_VIEW} TO {ROLLUP_TABLE} AS {rollup_select_sql()}"
+
+
+def create_rollup_schema(client):
+    """
+    Создает таблицу агрегатов и представление, которое ее заполняет
+
+    Args:
+        client: clickhouse_driver.Client
+    """
+    client.execute(create_rollup_table_sql())
+    client.execute(create_rollup_view_sql())
+
+
+def rollup_filter(sources=None, categories=None, days: Optional[int] = None) -> str:
+    """
+    Условие WHERE для news.articles_hourly (как articles_filter для news.articles)
+
+    hour - начало часа публикации, поэтому hour >= today() - days отбирает
+    те же статьи, что published_date >= today() - days.
+    """
+    return articles_filter(sources, categories, days, date_column='hour')
+
+
+def refresh_rollup(client, sources=None, categories=None):
+    """
+    Пересчитывает агрегаты источников после удаления или изменения статей
+
+    Представление учитывает только вставки: ALTER TABLE ... DELETE/UPDATE
+    и легковесный DELETE в news.articles агрегаты не меняют. Строки
+    агрегатов выбранных источников и категорий удаляются и строятся
+    заново по текущим статьям. Статьи, вставленные во время пересчета,
+    могут учесться дважды, поэтому пересчет выполняют, когда парсеры
+    этих источников остановлены.
+
+    Args:
+        client: clickhouse_driver.Client
+        sources: Ключ источника или список ключей (None - все источники)
+        categories: Категория или список категорий (None - все категории)
+    """
+    client.execute(
+        f"ALTER TABLE {ROLLUP_TABLE} DELETE WHERE {rollup_filter(sources, categories)}",
+        settings={'mutations_sync': 1}
+    )
+    client.execute(
+        f"INSERT INTO {ROLLUP_TABLE} {rollup_select_sql(articles_filter(sources, categories))}",
+        settings={'max_partitions_per_insert_block': 1000}
+    )
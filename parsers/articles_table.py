@@ -0,0 +1,233 @@
+"""
+Единая таблица статей news.articles
+
+Статьи всех источников и категорий хранятся в одной MergeTree-таблице:
+- PARTITION BY toYYYYMM(published_date): запрос за последние дни читает
+  только партиции нужных месяцев
+- ORDER BY (source, category, published_date): фильтр по источнику
+  и категории сужается по первичному ключу, а не по всей таблице
+- source, category, rubric, ai_category, channel - LowCardinality
+  (словарное кодирование повторяющихся значений)
+
+Прежние имена news.{source}_headlines и news.{source}_{category}
+остаются обычными представлениями (VIEW) над news.articles: запросы
+к ним работают как раньше, условие представления подставляется в запрос
+к единой таблице. Запись идет только в news.articles - в обычное
+представление вставлять нельзя.
+"""
+from typing import Iterable, List, Optional, Tuple
+
+ARTICLES_TABLE = 'news.articles'
+
+# Источники: ключ (колонка source и префикс прежних таблиц) -> домен,
+# который прежние парсеры записывали в колонку source
+SOURCES = {
+    'ria': 'ria.ru',
+    'israil': '7kanal.co.il',
+    'telegram': 'telegram',
+    'lenta': 'lenta.ru',
+    'rbc': 'rbc.ru',
+    'cnn': 'cnn.com',
+    'aljazeera': 'aljazeera.com',
+    'tsn': 'tsn.ua',
+    'unian': 'unian.net',
+    'rt': 'rt.com',
+    'euronews': 'euronews.com',
+    'reuters': 'reuters.com',
+    'france24': 'france24.com',
+    'dw': 'dw.com',
+    'bbc': 'bbc.com',
+    'gazeta': 'gazeta.ru',
+    'kommersant': 'kommersant.ru'
+}
+
+# Стандартные категории и категории украинского конфликта
+CATEGORIES = (
+    'ukraine', 'middle_east', 'fake_news', 'info_war', 'europe', 'usa', 'other',
+    'military_operations', 'humanitarian_crisis', 'economic_consequences',
+    'political_decisions', 'information_social'
+)
+
+def search_text(column: str) -> str:
+    """
+    Текст колонки для поиска: нижний регистр, все символы кроме букв и цифр
+    (Unicode) заменены пробелами
+
+    hasToken и tokenbf_v1 делят текст на слова только по ASCII-символам,
+    поэтому «Ростех», "Киев—Москва" или слова через неразрывный пробел
+    остались бы одним словом вместе с кавычками и тире.
+    """
+    return f"replaceRegexpAll(lowerUTF8({column}), '[^\\\\p{{L}}\\\\p{{N}}]+', ' ')"
+
+
+# Skip-индексы полнотекстового поиска (parsers/article_search.py) по
+# search_text: tokenbf - целые слова заголовка и текста (hasToken),
+# ngrambf - подстроки и префиксы слов заголовка (LIKE).
+# Гранулы без искомых слов не читаются.
+SEARCH_INDEXES = (
+    ('idx_title_words', search_text('title'), 'tokenbf_v1(32768, 3, 0)'),
+    ('idx_title_word_ngrams', search_text('title'), 'ngrambf_v1(4, 65536, 3, 0)'),
+    ('idx_content_words', search_text('content'), 'tokenbf_v1(65536, 3, 0)')
+)
+
+# Прежние индексы поиска по lowerUTF8(title|content), удаляются миграцией
+OBSOLETE_SEARCH_INDEXES = ('idx_title_tokens', 'idx_title_ngrams', 'idx_content_tokens')
+
+
+def normalized(column: str) -> str:
+    """SQL-аналог title.lower().strip() из duplicate_checker.content_hash"""
+    return rf"replaceRegexpAll(lowerUTF8({column}), '^\\s+|\\s+$', '')"
+
+
+# То же значение, что duplicate_checker.content_hash(title, content):
+# значение content_hash по умолчанию, поэтому вставки без хеша (парсеры-
+# функции) тоже находятся проверкой точных дубликатов
+CONTENT_HASH_EXPR = f"lower(hex(SHA256(concat({normalized('title')}, {normalized('content')}))))"
+
+# Объединение колонок прежних основных и категорийных таблиц.
+# Для telegram link по умолчанию равен message_link, поэтому индекс
+# idx_link и проверка дубликатов по ссылке работают для всех источников.
+ARTICLES_COLUMNS = f'''
+    id UUID DEFAULT generateUUIDv4(),
+    title String,
+    link String DEFAULT message_link,
+    content String,
+    rubric LowCardinality(String) DEFAULT '',
+    source LowCardinality(String),
+    category LowCardinality(String) DEFAULT 'other',
+    published_date DateTime DEFAULT now(),
+    channel LowCardinality(String) DEFAULT '',
+    message_id Int64 DEFAULT 0,
+    message_link String DEFAULT '',
+    source_links String DEFAULT '',
+    content_validated UInt8 DEFAULT 0,
+    sentiment_score Float32 DEFAULT 0.0,
+    positive_score Float32 DEFAULT 0.0,
+    negative_score Float32 DEFAULT 0.0,
+    social_tension_index Float32 DEFAULT 0.0,
+    spike_index Float32 DEFAULT 0.0,
+    ai_classification_metadata String DEFAULT '',
+    ai_category LowCardinality(String) DEFAULT '',
+    ai_confidence Float32 DEFAULT 0.0,
+    relevance_score Float32 DEFAULT 0.0,
+    keywords_found Array(String) DEFAULT [],
+    tension_score Float32 DEFAULT 0.0,
+    content_hash String DEFAULT {CONTENT_HASH_EXPR},
+    INDEX idx_content_hash content_hash TYPE bloom_filter GRANULARITY 4,
+    INDEX idx_link link TYPE bloom_filter GRANULARITY 4,
+''' + ',\n'.join(
+    f'    INDEX {name} {expression} TYPE {index_type} GRANULARITY 1'
+    for name, expression, index_type in SEARCH_INDEXES
+) + '\n'
+
+
+def create_articles_table_sql(table: str = ARTICLES_TABLE) -> str:
+    """DDL единой таблицы статей"""
+    return f'''
+        CREATE TABLE IF NOT EXISTS {table} ({ARTICLES_COLUMNS})
+        ENGINE = MergeTree()
+        PARTITION BY toYYYYMM(published_date)
+        ORDER BY (source, category, published_date)
+    '''
+
+
+def view_name(source: str, category: Optional[str] = None) -> str:
+    """Прежнее имя таблицы: {source}_headlines или {source}_{category}"""
+    return f"{source}_{category or 'headlines'}"
+
+
+def create_view_sql(source: str, category: Optional[str] = None) -> str:
+    """
+    DDL представления с прежним именем таблицы над news.articles
+
+    Args:
+        source: Ключ источника
+        category: Категория (None - основная таблица источника)
+
+    Returns:
+        CREATE OR REPLACE VIEW
+    """
+    return (
+        f"CREATE OR REPLACE VIEW news.{view_name(source, category)} AS "
+        f"SELECT * FROM {ARTICLES_TABLE} WHERE {articles_filter(source, category)}"
+    )
+
+
+def sql_string(value: str) -> str:
+    """Строковый литерал ClickHouse"""
+    return "'" + value.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def articles_filter(
+    sources=None,
+    categories=None,
+    days: Optional[int] = None,
+    date_column: str = 'published_date'
+) -> str:
+    """
+    Условие WHERE для news.articles по источникам, категориям и периоду
+
+    Условия идут в порядке ключа сортировки, а период ограничивает и
+    партиции, поэтому запрос читает только нужные куски таблицы.
+
+    Args:
+        sources: Ключ источника или список ключей (None - все источники)
+        categories: Категория или список категорий (None - все категории)
+        days: Только статьи за последние days дней (как today() - days)
+        date_column: Колонка даты (hour для почасовых агрегатов)
+
+    Returns:
+        Условие (без WHERE); '1' если фильтров нет
+    """
+    conditions = []
+    for column, values in (('source', sources), ('category', categories)):
+        if values is None or values == 'all':
+            continue
+        values = [values] if isinstance(values, str) else list(values)
+        if len(values) == 1:
+            conditions.append(f"{column} = {sql_string(values[0])}")
+        else:
+            conditions.append(f"{column} IN ({', '.join(sql_string(value) for value in values)})")
+
+    if days is not None:
+        conditions.append(f"{date_column} >= today() - {int(days)}")
+
+    return ' AND '.join(conditions) or '1'
+
+
+def legacy_tables(include_categories: bool = True) -> Iterable[Tuple[str, Optional[str]]]:
+    """Источник и категория прежних таблиц (основные, затем категорийные)"""
+    for source in SOURCES:
+        yield source, None
+    if include_categories:
+        for source in SOURCES:
+            for category in CATEGORIES:
+                yield source, category
+
+
+def create_articles_schema(client) -> Tuple[int, List[str]]:
+    """
+    Создает news.articles и представления с прежними именами таблиц
+
+    Имена, занятые прежними таблицами (база не мигрирована), не
+    трогаются - их переносит migrations/unify_articles_table.py.
+
+    Args:
+        client: clickhouse_driver.Client
+
+    Returns:
+        Tuple (создано представлений, прежние таблицы, оставленные как есть)
+    """
+    client.execute(create_articles_table_sql())
+
+    engines = dict(client.execute("SELECT name, engine FROM system.tables WHERE database = 'news'"))
+
+    created, skipped = 0, []
+    for source, category in legacy_tables():
+        name = view_name(source, category)
+        if engines.get(name, 'View') != 'View':
+            skipped.append(name)
+            continue
+        client.execute(create_view_sql(source, category))
+        created += 1
+    return created, skipped
@@ -5,9 +5,12 @@
 import sys
 import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-import requests
+from typing import Callable, Iterable, List, Dict, Optional, Sequence, Tuple, Union
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from itertools import chain
 from bs4 import BeautifulSoup
+import requests
 
 # Добавляем путь к корневой директории
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -16,7 +19,18 @@ from clickhouse_driver import Client
 from config import Config
 from parsers.news_preprocessor import preprocessor
 from parsers.gen_api_classifier import GenApiNewsClassifier
-from parsers.duplicate_checker import create_duplicate_checker
+from parsers.duplicate_checker import content_hash, create_duplicate_checker
+from parsers.concurrent_fetcher import ConcurrentFetcher
+from parsers.http_client import get_http_client, max_page_bytes
+from parsers.clickhouse_writer import BufferedClickHouseWriter
+from parsers.content_validator import ContentValidator
+from parsers.article_context import ArticleContext
+from parsers.articles_table import ARTICLES_TABLE
+from parsers.story_index import get_story_index
+from parsers.seen_links import get_seen_link_filter
+from parsers.crawl_state import get_crawl_state, take_new_items
+from parsers.html_parsing import HtmlDocument, make_soup, parse_document
+from parsers.feed_discovery import FEEDPARSER_AVAILABLE, newest_first, parse_feed, parse_sitemap
 
 # Импортируем анализатор тональности
 try:
@@ -41,6 +55,10 @@ def get_clickhouse_client():
 class BaseNewsParser:
     """Базовый класс для парсеров новостей"""
     
+    # RSS/Atom-ленты и sitemap источника: обходятся до HTML-листингов (crawl_feeds)
+    FEEDS: Sequence[str] = ()
+    SITEMAPS: Sequence[str] = ()
+    
     def __init__(
         self,
         source_name: str,
@@ -50,7 +68,9 @@ class BaseNewsParser:
         enable_duplicate_check: bool = True,
         enable_classification: bool = True,
         enable_preprocessing: bool = True,
-        min_confidence: float = 0.15
+        min_confidence: float = 0.15,
+        max_workers: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None
     ):
         """
         Args:
@@ -62,6 +82,8 @@ class BaseNewsParser:
             enable_classification: Включить классификацию
             enable_preprocessing: Включить предобработку текста
             min_confidence: Минимальная уверенность классификации
+            max_workers: Количество потоков загрузки статей (по умолчанию из Config)
+            per_host_concurrency: Максимум параллельных запросов к одному хосту
         """
         self.source_name = source_name
         self.base_url = base_url
@@ -84,53 +106,167 @@ class BaseNewsParser:
             'by_category': {}
         }
         
+        self._stats_lock = threading.Lock()
+        
+        # Пул конкурентной загрузки статей
+        self.fetcher = ConcurrentFetcher(
+            max_workers=max_workers or Config.PARSER_MAX_WORKERS,
+            per_host_concurrency=per_host_concurrency or Config.PARSER_PER_HOST_CONCURRENCY,
+            delay_range=(Config.PARSER_POLITENESS_DELAY_MIN, Config.PARSER_POLITENESS_DELAY_MAX)
+        )
+        
+        # Общие для всех статей экземпляры этапов обработки
+        self.validator = ContentValidator()
+        self._classifier = None
+        
+        # Сколько статей может одновременно ждать ответа классификатора
+        self.max_in_flight = Config.GEN_API_MAX_IN_FLIGHT
+        
         self.client = None
+        self.writer = None
+        self.duplicate_checker = None
+        self.story_index = None
+        self.seen_links = None
+        self.crawl_state = None
+        
+        # Обходить листинги только до уже обработанных материалов (crawl_state.py)
+        self.incremental = True
+        
+        # Страницы больше лимита источника не загружаются (HTTP_SOURCE_MAX_PAGE_BYTES)
+        self.max_page_bytes = max_page_bytes(source_name)
+        
+        # Статьи находятся по лентам источника, HTML-листинги - только если ленты недоступны
+        self.feed_discovery = Config.FEED_DISCOVERY_ENABLED
+        self.skip_rubrics = {
+            rubric.strip().lower() for rubric in Config.FEED_SKIP_RUBRICS.split(',') if rubric.strip()
+        }
+        
+        # Ссылки, уже записанные в буфер за этот запуск (еще могут быть не в БД)
+        self._buffered_links = set()
+        
+        # Ссылки, которые не удалось загрузить (не считаются обработанными)
+        self._failed_links = set()
+        
+        # Обойденные, но еще не зафиксированные листинги: {листинг: (отметка, ETag, Last-Modified, статьи)}
+        self._pending_listings = {}
     
     def __enter__(self):
         """Контекстный менеджер - открываем соединение"""
         self.client = get_clickhouse_client()
+        self.writer = BufferedClickHouseWriter(get_clickhouse_client)
+        # Проверка дубликатов идет в текущем потоке через соединение парсера
+        self.duplicate_checker = create_duplicate_checker(client=self.client)
+        
+        try:
+            self.seen_links = get_seen_link_filter()
+        except Exception as e:
+            print(f"Warning: Seen link filter not available: {e}")
+        
+        try:
+            self.crawl_state = get_crawl_state()
+        except Exception as e:
+            print(f"Warning: Crawl state not available: {e}")
+        
+        if Config.STORY_CLUSTERING_ENABLED:
+            try:
+                self.story_index = get_story_index()
+            except Exception as e:
+                print(f"Warning: Story index not available: {e}")
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Закрываем соединение"""
+        """Сбрасываем буфер записи и закрываем соединение"""
+        if self.writer:
+            self.writer.close()
+            if self.writer.stats['rows_spooled']:
+                print(f"⚠️  ClickHouse недоступен: {self.writer.stats['rows_spooled']} строк сохранено в spool")
+            if self.writer.stats['rows_quarantined']:
+                print(f"❌ ClickHouse отклонил {self.writer.stats['rows_quarantined']} строк, они сохранены в deadletter")
+        
+        self.duplicate_checker = None
         if self.client:
             self.client.close()
         
         # Выводим статистику
         self.print_stats()
     
-    def fetch_url(self, url: str, timeout: int = 10) -> Optional[str]:
+    def fetch_page(self, url: str, timeout: Optional[float] = None) -> Optional[requests.Response]:
         """
-        Загружает содержимое URL
+        Загружает страницу потоком через общий HTTP-клиент (не больше max_page_bytes)
         
         Args:
             url: URL для загрузки
-            timeout: Таймаут в секундах
+            timeout: Таймаут в секундах (по умолчанию - политика HTTP-клиента)
             
         Returns:
-            HTML содержимое или None
+            Ответ с телом (content) и определенной кодировкой (encoding) или None
         """
         try:
-            response = requests.get(url, headers=self.headers, timeout=timeout)
+            kwargs = {'timeout': timeout} if timeout else {}
+            response = get_http_client().download(url, self.max_page_bytes, headers=self.headers, **kwargs)
             response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            return response.text
+            return response
         except Exception as e:
             print(f"Ошибка загрузки {url}: {e}")
-            self.stats['errors'] += 1
+            with self._stats_lock:
+                self.stats['errors'] += 1
+                self._failed_links.add(url)
             return None
     
-    def parse_html(self, html: str) -> BeautifulSoup:
+    def fetch_url(self, url: str, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Загружает содержимое URL и декодирует его
+        
+        Для разбора лучше fetch_page: тело передается парсеру без
+        промежуточной строки.
+        
+        Args:
+            url: URL для загрузки
+            timeout: Таймаут в секундах (по умолчанию - политика HTTP-клиента)
+            
+        Returns:
+            HTML содержимое или None
+        """
+        response = self.fetch_page(url, timeout)
+        return response.text if response is not None else None
+    
+    def parse_html(
+        self,
+        html: Union[str, bytes],
+        only: Optional[Sequence[str]] = None,
+        encoding: Optional[str] = None
+    ) -> BeautifulSoup:
         """
-        Парсит HTML с помощью BeautifulSoup
+        Парсит HTML с помощью BeautifulSoup (построитель lxml, если установлен)
         
         Args:
-            html: HTML строка
+            html: HTML строка или тело ответа
+            only: Селекторы контейнеров, которые нужны парсеру (частичный разбор)
+            encoding: Кодировка тела ответа (response.encoding)
             
         Returns:
             BeautifulSoup объект
         """
-        return BeautifulSoup(html, 'html.parser')
+        return make_soup(html, only, encoding)
+    
+    def parse_document(
+        self,
+        html: Union[str, bytes],
+        only: Optional[Sequence[str]] = None,
+        encoding: Optional[str] = None
+    ) -> HtmlDocument:
+        """
+        Разбирает HTML для извлечения по CSS-селекторам (selectolax, если установлен)
+        
+        Args:
+            html: HTML строка или тело ответа
+            only: Селекторы контейнеров, которые нужны парсеру
+            encoding: Кодировка тела ответа (response.encoding)
+            
+        Returns:
+            HtmlDocument
+        """
+        return parse_document(html, only, encoding)
     
     def preprocess_article(self, title: str, content: str) -> Tuple[str, str]:
         """
@@ -148,6 +284,17 @@ class BaseNewsParser:
         
         return preprocessor.preprocess_article(title, content)
     
+    def get_classifier(self) -> GenApiNewsClassifier:
+        """
+        Возвращает классификатор парсера (создается один раз на запуск)
+        
+        Returns:
+            GenApiNewsClassifier
+        """
+        if self._classifier is None:
+            self._classifier = GenApiNewsClassifier()
+        return self._classifier
+    
     def classify_article(self, title: str, content: str) -> Tuple[Optional[str], float, Dict]:
         """
         Классифицирует статью
@@ -159,27 +306,119 @@ class BaseNewsParser:
         Returns:
             Tuple (category, confidence, all_scores)
         """
-        if not self.enable_classification:
+        ctx = ArticleContext(title=title, content=content, link="")
+        self._classify(ctx)
+        
+        if not ctx.classification:
             return None, 0.0, {}
         
+        return ctx.category, ctx.confidence, {
+            'social_tension_index': ctx.classification['social_tension_index'],
+            'spike_index': ctx.classification['spike_index']
+        }
+    
+    def _validate(self, ctx: ArticleContext) -> bool:
+        """
+        Этап валидации: проверяет и очищает контент
+        
+        Args:
+            ctx: Контекст статьи
+            
+        Returns:
+            True если контент прошел валидацию
+        """
+        is_valid, cleaned_title, cleaned_content = self.validator.validate_content(ctx.title, ctx.content)
+        ctx.is_valid = is_valid
+        
+        if is_valid:
+            ctx.title, ctx.content = cleaned_title, cleaned_content
+        
+        return is_valid
+    
+    def _classify(self, ctx: ArticleContext):
+        """
+        Этап классификации: один запрос к классификатору на статью
+        
+        Args:
+            ctx: Контекст статьи
+        """
+        if not self.enable_classification:
+            return
+        
         try:
-            classifier = GenApiNewsClassifier()
-            result = classifier.classify(title, content)
+            ctx.classification = self.get_classifier().classify(ctx.title, ctx.content)
+        except Exception as e:
+            print(f"Ошибка классификации: {e}")
+            ctx.extra['classification_error'] = str(e)
+    
+    def _classify_async(self, ctx: ArticleContext) -> Future:
+        """
+        Этап классификации без ожидания ответа API
+        
+        Args:
+            ctx: Контекст статьи
             
-            return result['category_name'], result['confidence'], {
-                'social_tension_index': result['social_tension_index'],
-                'spike_index': result['spike_index']
+        Returns:
+            Future, который завершается после записи результата в ctx.classification
+        """
+        done = Future()
+        done.set_running_or_notify_cancel()
+        
+        if not self.enable_classification:
+            done.set_result(ctx)
+            return done
+        
+        def on_classified(future: Future):
+            try:
+                ctx.classification = future.result()
+            except Exception as e:
+                print(f"Ошибка классификации: {e}")
+                ctx.extra['classification_error'] = str(e)
+            done.set_result(ctx)
+        
+        try:
+            self.get_classifier().classify_async(ctx.title, ctx.content).add_done_callback(on_classified)
+        except Exception as e:
+            print(f"Ошибка классификации: {e}")
+            ctx.extra['classification_error'] = str(e)
+            done.set_result(ctx)
+        
+        return done
+    
+    def _analyze_sentiment(self, ctx: ArticleContext):
+        """
+        Этап анализа тональности
+        
+        Args:
+            ctx: Контекст статьи
+        """
+        ctx.sentiment = {
+            'sentiment_score': 0.0,
+            'positive_score': 0.0,
+            'negative_score': 0.0
+        }
+        
+        if not SENTIMENT_ANALYZER_AVAILABLE:
+            return
+        
+        try:
+            analyzer = get_ukraine_sentiment_analyzer()
+            sentiment_result = analyzer.analyze_sentiment(f"{ctx.title} {ctx.content}")
+            
+            ctx.sentiment = {
+                'sentiment_score': sentiment_result.get('sentiment_score', 0.0),
+                'positive_score': sentiment_result.get('positive_score', 0.0),
+                'negative_score': sentiment_result.get('negative_score', 0.0)
             }
         except Exception as e:
-            logger.error(f"Ошибка классификации: {e}")
-            return None, 0.0, {}
+            print(f"Warning: Sentiment analysis failed: {e}")
     
     def check_duplicate(
         self,
         title: str,
         content: str,
         link: str,
-        table_name: str
+        table_name: Union[str, List[str]]
     ) -> Tuple[bool, str]:
         """
         Проверяет статью на дубликат
@@ -188,7 +427,7 @@ class BaseNewsParser:
             title: Заголовок
             content: Содержимое
             link: URL
-            table_name: Таблица для проверки
+            table_name: Таблица (или список таблиц) для проверки - один запрос на все
             
         Returns:
             Tuple (is_duplicate, reason)
@@ -196,115 +435,182 @@ class BaseNewsParser:
         if not self.enable_duplicate_check:
             return False, ""
         
+        # Статья уже сохранена в этом запуске, но может еще лежать в буфере записи
+        if link in self._buffered_links:
+            return True, "Дубликат по URL"
+        
+        if self.duplicate_checker is not None:
+            return self.duplicate_checker.is_duplicate(title, content, link, table_name)
+        
         with create_duplicate_checker() as checker:
             return checker.is_duplicate(title, content, link, table_name)
     
-    def save_article(
-        self,
-        title: str,
-        content: str,
-        link: str,
-        category: str,
-        table_name: str,
-        published_date: Optional[datetime] = None,
-        rubric: str = "",
-        confidence: float = 1.0
-    ) -> bool:
+    def filter_known_articles(self, articles: List[Dict]) -> List[Dict]:
         """
-        Сохраняет статью в базу данных с анализом тональности и валидацией контента
+        Отбрасывает статьи, ссылки которых уже сохранены, до загрузки их содержимого
+        
+        Ссылки сначала проверяются по фильтру сохраненных ссылок (seen_links.py):
+        новые ссылки отсеиваются без запроса к БД, а положительные ответы фильтра
+        подтверждаются одним запросом по индексу idx_link основной таблицы источника.
         
         Args:
-            title: Заголовок
-            content: Содержимое
-            link: URL
-            category: Категория
-            table_name: Таблица для сохранения
-            published_date: Дата публикации
-            rubric: Рубрика
-            confidence: Уверенность классификации
+            articles: Список словарей с ключом link
+            
+        Returns:
+            Статьи, которые нужно загрузить
+        """
+        if not self.enable_duplicate_check or not articles:
+            return articles
+        
+        # Повторяющиеся ссылки в самом списке и уже сохраненные в этом запуске
+        unique = {}
+        for article in articles:
+            link = article.get('link')
+            if link not in unique and link not in self._buffered_links:
+                unique[link] = article
+        candidates = list(unique.values())
+        
+        headlines_table = f"{self.source_name}_headlines"
+        positives = candidates
+        if self.seen_links is not None:
+            try:
+                self.seen_links.seed(self.client, headlines_table)
+                hits = self.seen_links.contains_many([article['link'] for article in candidates])
+                positives = [article for article, hit in zip(candidates, hits) if hit]
+            except Exception as e:
+                print(f"Warning: Seen link filter failed: {e}")
+        
+        if not positives:
+            known = {}
+        elif self.duplicate_checker is not None:
+            known = self.duplicate_checker.check_batch(positives, headlines_table, check_methods=('link',))
+        else:
+            with create_duplicate_checker() as checker:
+                known = checker.check_batch(positives, headlines_table, check_methods=('link',))
+        known_links = {positives[index]['link'] for index in known}
+        
+        skipped = len(articles) - len(candidates) + len(known)
+        if skipped:
+            print(f"⏭️  Пропущено уже сохраненных ссылок: {skipped}")
+            self.stats['total_found'] += skipped
+            self.stats['duplicates_skipped'] += skipped
+        
+        return [article for article in candidates if article['link'] not in known_links]
+    
+    def filter_similar_titles(self, articles: List[Dict]) -> List[Dict]:
+        """
+        Отбрасывает статьи с заголовками, похожими на уже сохраненные, до загрузки их содержимого
+        
+        Args:
+            articles: Список словарей с ключом title
             
         Returns:
-            True если успешно сохранено
+            Статьи, которые нужно загрузить
         """
-        if not self.client:
+        if not self.enable_duplicate_check or not articles:
+            return articles
+        
+        headlines_table = f"{self.source_name}_headlines"
+        try:
+            if self.duplicate_checker is not None:
+                duplicates = self.duplicate_checker.check_batch(articles, headlines_table, check_methods=('title',))
+            else:
+                with create_duplicate_checker() as checker:
+                    duplicates = checker.check_batch(articles, headlines_table, check_methods=('title',))
+        except Exception as e:
+            print(f"Warning: Title check failed: {e}")
+            return articles
+        
+        if duplicates:
+            print(f"⏭️  Пропущено похожих заголовков: {len(duplicates)}")
+            self.stats['total_found'] += len(duplicates)
+            self.stats['duplicates_skipped'] += len(duplicates)
+        
+        return [article for index, article in enumerate(articles) if index not in duplicates]
+    
+    def save_article(self, ctx: ArticleContext) -> bool:
+        """
+        Сохраняет обработанную статью в единую таблицу news.articles
+        
+        Все этапы анализа уже выполнены в process_article, здесь только
+        формируется строка и добавляется в буфер записи, который отправляет
+        ее в ClickHouse пакетом. Таблицы {source}_headlines и
+        {source}_{category} - представления над news.articles.
+        
+        Args:
+            ctx: Контекст статьи
+            
+        Returns:
+            True если статья принята к сохранению
+        """
+        if not self.writer:
             print("Ошибка: соединение с БД не установлено")
+            self._failed_links.add(ctx.link)
             return False
         
         try:
-            # Валидация контента
-            from parsers.content_validator import ContentValidator
-            
-            validator = ContentValidator()
-            source_domain = self._extract_domain(link)
-            is_valid, cleaned_content = validator.validate_content(content, source_domain)
-            
-            if not is_valid:
-                print(f"Статья отклонена валидатором: {cleaned_content}")
-                self.stats['validation_rejected'] = self.stats.get('validation_rejected', 0) + 1
-                return False
-            
-            # Используем очищенный контент
-            content = cleaned_content
-            
-            # AI-классификация и расчет индексов напряженности
-            ai_data = self._perform_ai_classification(title, content)
-            
-            # Анализируем тональность текста
-            sentiment_data = {
-                'sentiment_score': 0.0,
-                'positive_score': 0.0,
-                'negative_score': 0.0
-            }
-            
-            if SENTIMENT_ANALYZER_AVAILABLE:
-                try:
-                    analyzer = get_ukraine_sentiment_analyzer()
-                    text_for_analysis = f"{title} {content}"
-                    sentiment_result = analyzer.analyze_sentiment(text_for_analysis)
-                    
-                    sentiment_data = {
-                        'sentiment_score': sentiment_result.get('sentiment_score', 0.0),
-                        'positive_score': sentiment_result.get('positive_score', 0.0),
-                        'negative_score': sentiment_result.get('negative_score', 0.0)
-                    }
-                except Exception as e:
-                    print(f"Warning: Sentiment analysis failed: {e}")
-            
-            # Формируем данные для вставки
-            insert_data = {
-                'title': title,
-                'link': link,
-                'content': content,
-                'rubric': rubric,
-                'source': self.source_name,
-                'category': category,
-                'published_date': published_date or datetime.now(),
-                'content_validated': 1,  # Флаг валидации контента
-                **sentiment_data,
-                **ai_data
-            }
-            
-            # SQL запрос с полями sentiment, валидации и AI-классификации
-            query = f"""
-            INSERT INTO news.{table_name}
-            (title, link, content, rubric, source, category, published_date, sentiment_score, positive_score, negative_score, content_validated, social_tension_index, spike_index, ai_classification_metadata, ai_category, ai_confidence)
-            VALUES
-            (%(title)s, %(link)s, %(content)s, %(rubric)s, %(source)s, %(category)s, %(published_date)s, %(sentiment_score)s, %(positive_score)s, %(negative_score)s, %(content_validated)s, %(social_tension_index)s, %(spike_index)s, %(ai_classification_metadata)s, %(ai_category)s, %(ai_confidence)s)
-            """
-            
-            self.client.execute(query, insert_data)
+            if ctx.row is None:
+                ctx.row = {
+                    'title': ctx.title,
+                    'link': ctx.link,
+                    'content': ctx.content,
+                    'rubric': ctx.rubric,
+                    'source': self.source_name,
+                    'category': ctx.category,
+                    'published_date': ctx.published_date or datetime.now(),
+                    'content_validated': 1,  # Флаг валидации контента
+                    'content_hash': content_hash(ctx.title, ctx.content),
+                    **ctx.sentiment,
+                    **ctx.ai_data
+                }
             
-            # Обновляем статистику
-            self.stats['successfully_saved'] += 1
-            self.stats['by_category'][category] = self.stats['by_category'].get(category, 0) + 1
+            # Поля sentiment, валидации и AI-классификации пишутся пакетной вставкой
+            self.writer.add(ARTICLES_TABLE, ctx.row)
+            self._buffered_links.add(ctx.link)
             
             return True
             
         except Exception as e:
-            print(f"Ошибка сохранения статьи '{title[:50]}...': {e}")
+            print(f"Ошибка сохранения статьи '{ctx.title[:50]}...': {e}")
             self.stats['errors'] += 1
+            self._failed_links.add(ctx.link)
             return False
     
+    def _assign_story(self, ctx: ArticleContext):
+        """
+        Относит сохраненную статью к сюжету (общему для всех источников)
+        
+        Принадлежность и обновленный центроид сюжета пишутся в
+        news.story_members и news.story_centroids через буфер записи.
+        
+        Args:
+            ctx: Контекст сохраненной статьи
+        """
+        if self.story_index is None:
+            return
+        
+        try:
+            assignment = self.story_index.assign(
+                ctx.link, ctx.title, self.source_name,
+                ctx.published_date, ctx.content, ctx.category
+            )
+        except Exception as e:
+            print(f"Warning: Story clustering failed: {e}")
+            return
+        
+        ctx.story_id = assignment.story_id
+        if assignment.existing:
+            return
+        
+        self.writer.add("news.story_members", assignment.member_row(
+            ctx.link, self.source_name, ctx.title, ctx.category, ctx.published_date
+        ))
+        self.writer.add("news.story_centroids", assignment.centroid_row())
+        
+        with self._stats_lock:
+            self.stats['stories_new'] = self.stats.get('stories_new', 0) + assignment.is_new
+            self.stats['stories_joined'] = self.stats.get('stories_joined', 0) + (not assignment.is_new)
+    
     def _extract_domain(self, url: str) -> str:
         """
         Извлекает домен из URL
@@ -322,77 +628,71 @@ class BaseNewsParser:
         except Exception:
             return ""
     
-    def _perform_ai_classification(self, title: str, content: str) -> dict:
+    def _perform_ai_classification(self, ctx: ArticleContext):
         """
-        Выполняет AI-классификацию новости и расчет индексов напряженности
+        Формирует данные AI-классификации и индексы напряженности
+        
+        Использует уже полученный результат классификации; индексы
+        рассчитываются вручную только если классификации нет.
         
         Args:
-            title: Заголовок новости
-            content: Содержимое новости
-            
-        Returns:
-            dict: Данные AI-классификации
+            ctx: Контекст статьи
         """
-        try:
-            # Используем Gen-API классификатор
-            classifier = GenApiNewsClassifier()
-            result = classifier.classify(title, content)
-            
-            # Формируем метаданные
+        result = ctx.classification
+        
+        if result:
             metadata = {
                 'gen_api_category': result['category_name'],
                 'gen_api_category_id': result['category_id'],
                 'gen_api_confidence': result['confidence'],
-                'processing_time': 'gen_api',
+                # gen_api, local (локальная модель) или keywords (ключевые слова при сбое API)
+                'classifier': result.get('classifier', 'gen_api'),
                 'cached': result.get('cached', False)
             }
             
-            return {
+            ctx.ai_data = {
                 'social_tension_index': result['social_tension_index'],
                 'spike_index': result['spike_index'],
                 'ai_classification_metadata': str(metadata),
                 'ai_category': result['category_name'],
                 'ai_confidence': result['confidence']
             }
+            return
+        
+        # Fallback: используем только ручной расчет индексов
+        try:
+            from parsers.tension_calculator import calculate_both_indices
+            
+            category = ctx.category or 'information_social'
+            social_tension, spike_index = calculate_both_indices(
+                category, ctx.title, ctx.content
+            )
+            
+            metadata = {
+                'fallback': True,
+                'error': ctx.extra.get('classification_error', ''),
+                'default_category': category
+            }
+            
+            ctx.ai_data = {
+                'social_tension_index': social_tension,
+                'spike_index': spike_index,
+                'ai_classification_metadata': str(metadata),
+                'ai_category': category,
+                'ai_confidence': 0.1  # Низкая уверенность для fallback
+            }
             
         except Exception as e:
-            print(f"Warning: AI classification failed: {e}")
+            print(f"Warning: Fallback classification also failed: {e}")
             
-            # Fallback: используем только ручной расчет индексов
-            try:
-                from parsers.tension_calculator import calculate_both_indices
-                
-                # Используем категорию по умолчанию
-                default_category = 'information_social'
-                social_tension, spike_index = calculate_both_indices(
-                    default_category, title, content
-                )
-                
-                metadata = {
-                    'fallback': True,
-                    'error': str(e),
-                    'default_category': default_category
-                }
-                
-                return {
-                    'social_tension_index': social_tension,
-                    'spike_index': spike_index,
-                    'ai_classification_metadata': str(metadata),
-                    'ai_category': default_category,
-                    'ai_confidence': 0.1  # Низкая уверенность для fallback
-                }
-                
-            except Exception as e2:
-                print(f"Warning: Fallback classification also failed: {e2}")
-                
-                # Последний fallback: нулевые значения
-                return {
-                    'social_tension_index': 0.0,
-                    'spike_index': 0.0,
-                    'ai_classification_metadata': f"{{'error': '{str(e2)}', 'fallback': True}}",
-                    'ai_category': 'unknown',
-                    'ai_confidence': 0.0
-                }
+            # Последний fallback: нулевые значения
+            ctx.ai_data = {
+                'social_tension_index': 0.0,
+                'spike_index': 0.0,
+                'ai_classification_metadata': f"{{'error': '{str(e)}', 'fallback': True}}",
+                'ai_category': 'unknown',
+                'ai_confidence': 0.0
+            }
     
     def process_article(
         self,
@@ -403,11 +703,14 @@ class BaseNewsParser:
         published_date: Optional[datetime] = None
     ) -> bool:
         """
-        Полный цикл обработки статьи:
+        Полный цикл обработки статьи (каждый этап выполняется один раз):
         1. Предобработка
-        2. Проверка дубликатов
+        2. Валидация контента
         3. Классификация
-        4. Сохранение
+        4. Проверка дубликатов
+        5. Тональность и индексы напряженности
+        6. Сохранение одной строки в news.articles (основная и категорийные
+           таблицы источника - представления над ней)
         
         Args:
             title: Заголовок
@@ -419,84 +722,468 @@ class BaseNewsParser:
         Returns:
             True если статья успешно обработана и сохранена
         """
+        ctx = self._prepare_article(title, content, link, rubric, published_date)
+        if ctx is None:
+            return False
+        
+        # 3. Классификация
+        self._classify(ctx)
+        return self._finish_article(ctx)
+    
+    def _prepare_article(
+        self,
+        title: str,
+        content: str,
+        link: str,
+        rubric: str = "",
+        published_date: Optional[datetime] = None
+    ) -> Optional[ArticleContext]:
+        """
+        Этапы до классификации: предобработка и валидация
+        
+        Args:
+            title: Заголовок
+            content: Содержимое
+            link: URL
+            rubric: Рубрика
+            published_date: Дата публикации
+            
+        Returns:
+            Контекст статьи или None, если статья отклонена
+        """
         self.stats['total_found'] += 1
         
         # 1. Предобработка
         clean_title, clean_content = self.preprocess_article(title, content)
+        ctx = ArticleContext(
+            title=clean_title,
+            content=clean_content,
+            link=link,
+            rubric=rubric,
+            published_date=published_date
+        )
         
-        # 2. Классификация
-        category, confidence, scores = self.classify_article(clean_title, clean_content)
+        # 2. Валидация (до классификации, чтобы не тратить запросы к API)
+        if not self._validate(ctx):
+            print(f"❌ Статья отклонена валидатором: {ctx.title[:60]}...")
+            self.stats['validation_rejected'] = self.stats.get('validation_rejected', 0) + 1
+            return None
+        
+        return ctx
+    
+    def _finish_article(self, ctx: ArticleContext) -> bool:
+        """
+        Этапы после классификации: проверка дубликатов, тональность, сохранение
+        
+        Args:
+            ctx: Контекст статьи с результатом классификации
+            
+        Returns:
+            True если статья сохранена
+        """
+        category, confidence = ctx.category, ctx.confidence
         
         if category is None or confidence < self.min_confidence:
-            print(f"❌ Пропущено (низкая уверенность {confidence:.2f}): {clean_title[:60]}...")
+            print(f"❌ Пропущено (низкая уверенность {confidence:.2f}): {ctx.title[:60]}...")
             self.stats['low_confidence_skipped'] += 1
             return False
         
         # Пропускаем статьи с категорией 'other' - они не нужны в БД
         if category == 'other':
-            print(f"❌ Пропущено (категория 'other'): {clean_title[:60]}...")
+            print(f"❌ Пропущено (категория 'other'): {ctx.title[:60]}...")
             self.stats['low_confidence_skipped'] += 1
             return False
         
-        # 3. Определяем таблицу для сохранения
-        # Сначала пробуем категорийную таблицу
-        category_table = f"{self.source_name}_{category}"
+        # 4. Проверка дубликатов по всем статьям источника (категорийные
+        # представления - подмножества основного)
+        headlines_table = f"{self.source_name}_headlines"
         
-        # 4. Проверка дубликатов (в категорийной таблице)
         is_dup, dup_reason = self.check_duplicate(
-            clean_title,
-            clean_content,
-            link,
-            category_table
+            ctx.title, ctx.content, ctx.link, headlines_table
         )
         
         if is_dup:
-            print(f"⚠️  Дубликат: {clean_title[:60]}... ({dup_reason})")
+            print(f"⚠️  Дубликат: {ctx.title[:60]}... ({dup_reason})")
             self.stats['duplicates_skipped'] += 1
             return False
         
-        # Также проверяем в основной таблице источника
-        headlines_table = f"{self.source_name}_headlines"
-        is_dup_main, _ = self.check_duplicate(
-            clean_title,
-            clean_content,
-            link,
-            headlines_table
-        )
+        # 5. Тональность и индексы напряженности
+        self._analyze_sentiment(ctx)
+        self._perform_ai_classification(ctx)
         
-        if is_dup_main:
-            print(f"⚠️  Дубликат в основной таблице: {clean_title[:60]}...")
-            self.stats['duplicates_skipped'] += 1
-            return False
+        # 6. Сохраняем одну строку в news.articles
+        if self.save_article(ctx):
+            # Похожие заголовки этого и следующих запусков находятся по индексу сразу,
+            # не дожидаясь записи буфера в ClickHouse
+            if self.duplicate_checker is not None:
+                self.duplicate_checker.remember(
+                    ctx.title, ctx.content, ctx.link, headlines_table, ctx.published_date
+                )
+            if self.seen_links is not None:
+                self.seen_links.add(ctx.link)
+            
+            self._assign_story(ctx)
+            
+            self.stats['successfully_saved'] += 1
+            self.stats['by_category'][category] = self.stats['by_category'].get(category, 0) + 1
+            print(f"✅ Сохранено ({category}, {confidence:.2f}): {ctx.title[:60]}...")
+            return True
+        
+        return False
+    
+    def get_article_content(self, url: str) -> str:
+        """
+        Извлекает содержимое статьи - должен быть переопределен в дочерних классах
         
-        # 5. Сохраняем в обе таблицы
-        success_category = self.save_article(
-            clean_title,
-            clean_content,
-            link,
-            category,
-            category_table,
-            published_date,
-            rubric,
-            confidence
+        Args:
+            url: URL статьи
+            
+        Returns:
+            Текст статьи
+        """
+        raise NotImplementedError("Метод get_article_content() должен быть реализован в дочернем классе")
+    
+    def process_articles_concurrently(self, articles: List[Dict], filter_known: bool = True) -> int:
+        """
+        Параллельно загружает и классифицирует статьи, обрабатывая их по мере готовности
+        
+        Загрузка идет в пуле потоков с лимитом запросов на хост, классификация -
+        асинхронно (до GEN_API_MAX_IN_FLIGHT задач gen-api одновременно),
+        а проверка дубликатов и сохранение - в текущем потоке, поэтому
+        соединение с ClickHouse не разделяется между потоками.
+        
+        Args:
+            articles: Список словарей с ключами title, link, rubric, published_date
+                      (и content, если текст уже известен - тогда статья не загружается)
+            filter_known: Отбросить уже сохраненные ссылки (False - список уже
+                          прошел filter_known_articles)
+            
+        Returns:
+            Количество сохраненных статей
+        """
+        saved = 0
+        # Задача классификации -> ссылка статьи (для отметки неудачных)
+        in_flight = {}
+        
+        # Уже сохраненные ссылки не загружаем
+        if filter_known:
+            articles = self.filter_known_articles(articles)
+        
+        def finish_completed(block: bool):
+            nonlocal saved
+            done, _ = wait(
+                in_flight,
+                timeout=None if block else 0,
+                return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                link = in_flight.pop(future)
+                try:
+                    if self._finish_article(future.result()):
+                        saved += 1
+                except Exception as e:
+                    print(f"⚠️  Ошибка обработки статьи: {e}")
+                    self.stats['errors'] += 1
+                    self._failed_links.add(link)
+        
+        # Статьи с полным текстом из ленты не загружаются
+        ready = [(article, article['content'], None) for article in articles if article.get('content')]
+        to_fetch = [article for article in articles if not article.get('content')]
+        
+        for article, content, error in chain(ready, self.fetcher.fetch(to_fetch, self.get_article_content)):
+            if error is not None:
+                print(f"⚠️  Ошибка загрузки статьи {article['link']}: {error}")
+                self.stats['errors'] += 1
+                self._failed_links.add(article['link'])
+                continue
+            
+            try:
+                ctx = self._prepare_article(
+                    title=article['title'],
+                    content=content,
+                    link=article['link'],
+                    rubric=article.get('rubric', ""),
+                    published_date=article.get('published_date')
+                )
+                if ctx is not None:
+                    in_flight[self._classify_async(ctx)] = ctx.link
+            except Exception as e:
+                print(f"⚠️  Ошибка обработки статьи: {e}")
+                self.stats['errors'] += 1
+                self._failed_links.add(article['link'])
+            
+            # Сохраняем готовые статьи, не дожидаясь остальных классификаций
+            if in_flight:
+                finish_completed(block=len(in_flight) >= self.max_in_flight)
+        
+        while in_flight:
+            finish_completed(block=True)
+        
+        return saved
+    
+    def fetch_listing(self, listing: str, url: str) -> Optional[requests.Response]:
+        """
+        Загружает листинг условным запросом по сохраненным ETag/Last-Modified
+        
+        Args:
+            listing: Имя листинга (main, rubric:world...)
+            url: URL листинга
+            
+        Returns:
+            Ответ с телом листинга или None (листинг не изменился или ошибка загрузки)
+        """
+        state = None
+        if self.crawl_state is not None:
+            try:
+                state = self.crawl_state.get(self.source_name, listing)
+            except Exception as e:
+                print(f"Warning: Crawl state failed: {e}")
+        
+        headers = dict(self.headers)
+        if state is not None and self.incremental:
+            headers.update(state.conditional_headers())
+        
+        try:
+            response = get_http_client().download(url, self.max_page_bytes, headers=headers)
+            if response.status_code == 304:
+                print(f"⏭️  Листинг {listing} не изменился с прошлого обхода")
+                self.stats['listings_unchanged'] = self.stats.get('listings_unchanged', 0) + 1
+                return None
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Ошибка загрузки {url}: {e}")
+            self.stats['errors'] += 1
+            return None
+        
+        self._pending_listings[listing] = (
+            state,
+            response.headers.get('ETag', ''),
+            response.headers.get('Last-Modified', ''),
+            []
         )
+        return response
+    
+    def new_listing_items(self, listing: str, items: Iterable[Dict]) -> List[Dict]:
+        """
+        Проходит листинг до материалов, обработанных в прошлых обходах
+        
+        Обход останавливается на CRAWL_STATE_STOP_AFTER_KNOWN известных
+        ссылках подряд или на статье старше get_cutoff_date().
         
-        success_main = self.save_article(
-            clean_title,
-            clean_content,
-            link,
-            category,
-            headlines_table,
-            published_date,
-            rubric,
-            confidence
+        Args:
+            listing: Имя листинга (после fetch_listing)
+            items: Статьи листинга от новых к старым (может быть генератором)
+            
+        Returns:
+            Новые статьи
+        """
+        state, etag, last_modified, _ = self._pending_listings.get(listing, (None, '', '', []))
+        new_items = take_new_items(
+            items,
+            state if self.incremental else None,
+            Config.CRAWL_STATE_STOP_AFTER_KNOWN,
+            cutoff=self.get_cutoff_date()
         )
+        self._pending_listings[listing] = (state, etag, last_modified, new_items)
+        return new_items
+    
+    def commit_listing(self, listing: str):
+        """
+        Сдвигает отметку листинга после обработки его статей
         
-        if success_category and success_main:
-            print(f"✅ Сохранено ({category}, {confidence:.2f}): {clean_title[:60]}...")
-            return True
+        Ссылки, которые не удалось загрузить, обработать или сохранить,
+        не становятся известными, а ETag при неудачах не сохраняется,
+        чтобы следующий запуск их повторил.
         
-        return False
+        Args:
+            listing: Имя листинга
+        """
+        pending = self._pending_listings.pop(listing, None)
+        if pending is None or self.crawl_state is None:
+            return
+        
+        state, etag, last_modified, items = pending
+        if state is None:
+            return
+        
+        processed = [item for item in items if item['link'] not in self._failed_links]
+        if len(processed) < len(items):
+            etag, last_modified = '', ''
+        
+        try:
+            state.advance(
+                [item['link'] for item in processed],
+                [item.get('published_date') for item in processed],
+                etag=etag,
+                last_modified=last_modified,
+                limit=self.crawl_state.known_links_limit
+            )
+            self.crawl_state.save(state)
+        except Exception as e:
+            print(f"Warning: Crawl state failed: {e}")
+    
+    def crawl_listing(
+        self,
+        listing: str,
+        url: str,
+        extract_items: Callable[[BeautifulSoup], Iterable[Dict]],
+        only: Optional[Sequence[str]] = None
+    ) -> int:
+        """
+        Инкрементальный обход листинга: условный запрос, разбор до известных
+        материалов, обработка новых статей и сдвиг отметки
+        
+        Args:
+            listing: Имя листинга (main, rubric:world...)
+            url: URL листинга
+            extract_items: Функция, возвращающая статьи листинга от новых к старым
+            only: Селекторы контейнеров статей листинга (остальная страница не разбирается)
+            
+        Returns:
+            Количество сохраненных статей
+        """
+        response = self.fetch_listing(listing, url)
+        if response is None:
+            return 0
+        
+        soup = self.parse_html(response.content, only, response.encoding)
+        items = self.new_listing_items(listing, extract_items(soup))
+        print(f"📰 Новых статей в листинге {listing}: {len(items)}")
+        
+        saved = self.process_articles_concurrently(items)
+        self.commit_listing(listing)
+        return saved
+    
+    def is_relevant_entry(self, item: Dict) -> bool:
+        """
+        Отбор элемента ленты до загрузки страницы (парсеры источников могут переопределить)
+        
+        По умолчанию отбрасываются рубрики из FEED_SKIP_RUBRICS.
+        
+        Args:
+            item: Элемент ленты (title, link, rubric, published_date, summary)
+            
+        Returns:
+            True если статью нужно обработать
+        """
+        return (item.get('rubric') or '').strip().lower() not in self.skip_rubrics
+    
+    def crawl_feeds(self) -> Optional[int]:
+        """
+        Обход RSS/Atom-лент и sitemap источника (FEEDS, SITEMAPS) вместо HTML-листингов
+        
+        Ленты загружаются условным запросом и проходятся до уже обработанных
+        материалов, как листинги. Заголовок, ссылка, дата, рубрика и анонс
+        берутся из ленты; страница загружается только для элементов,
+        прошедших отбор по рубрике, ссылке и заголовку, и только если
+        лента не содержит полного текста статьи.
+        
+        Returns:
+            Количество сохраненных статей или None, если лент нет или ни одна
+            не загрузилась (тогда нужен обход HTML-листингов)
+        """
+        feeds = self.FEEDS if FEEDPARSER_AVAILABLE else ()
+        if not self.feed_discovery or not (feeds or self.SITEMAPS):
+            return None
+        
+        print(f"\n📡 Обход лент {self.source_name} (период: {self.parse_period_hours} часов)...")
+        results = [self._crawl_feed('feed', url) for url in feeds]
+        results += [self._crawl_sitemap(url) for url in self.SITEMAPS]
+        
+        reached = [saved for saved in results if saved is not None]
+        if not reached:
+            print("⚠️  Ни одна лента не загрузилась, обходим HTML-листинги")
+            return None
+        return sum(reached)
+    
+    def _crawl_sitemap(self, url: str, nested: bool = False) -> Optional[int]:
+        """
+        Обход sitemap; из индекса загружаются FEED_MAX_CHILD_SITEMAPS самых свежих вложенных
+        
+        Args:
+            url: URL sitemap или индекса sitemap
+            nested: Sitemap из индекса (вложенные индексы не обходятся)
+            
+        Returns:
+            Количество сохраненных статей или None при ошибке
+        """
+        children = []
+        saved = self._crawl_feed('sitemap', url, children)
+        if saved is None or nested or not children:
+            return saved
+        
+        cutoff = self.get_cutoff_date()
+        recent = sorted(
+            (child for child in children if child[1] is None or child[1] >= cutoff),
+            key=lambda child: child[1] or datetime.min,
+            reverse=True
+        )[:Config.FEED_MAX_CHILD_SITEMAPS]
+        
+        for child_url, _ in recent:
+            saved += self._crawl_sitemap(child_url, nested=True) or 0
+        return saved
+    
+    def _crawl_feed(self, kind: str, url: str, children: Optional[List] = None) -> Optional[int]:
+        """
+        Загрузка ленты условным запросом, отбор новых элементов и их обработка
+        
+        Args:
+            kind: feed (RSS/Atom) или sitemap; листинг в crawl_state - "kind:URL"
+            url: URL ленты
+            children: Список, в который добавляются вложенные sitemap индекса
+            
+        Returns:
+            Количество сохраненных статей (0 - лента не изменилась) или None при ошибке
+        """
+        listing = f"{kind}:{url}"
+        unchanged = self.stats.get('listings_unchanged', 0)
+        response = self.fetch_listing(listing, url)
+        if response is None:
+            return 0 if self.stats.get('listings_unchanged', 0) > unchanged else None
+        
+        try:
+            if kind == 'sitemap':
+                items, nested = parse_sitemap(response.content, url)
+            else:
+                items, nested = parse_feed(response.content, url, response.headers.get('Content-Type')), []
+        except Exception as e:
+            print(f"Ошибка разбора ленты {url}: {e}")
+            items, nested = [], []
+        
+        if not items and not nested:
+            # Не лента (например, HTML-заглушка): отметку не сдвигаем
+            self._pending_listings.pop(listing, None)
+            print(f"⚠️  В ленте {url} нет статей")
+            return None
+        if children is not None:
+            children.extend(nested)
+        if not items:
+            # Индекс sitemap: статьи во вложенных sitemap
+            self.commit_listing(listing)
+            return 0
+        
+        # Без заголовка (обычный sitemap без news:title) статью не отобрать до загрузки
+        items = self.new_listing_items(listing, [item for item in newest_first(items) if item.get('title')])
+        self.stats['feed_items'] = self.stats.get('feed_items', 0) + len(items)
+        
+        relevant = [item for item in items if self.is_relevant_entry(item)]
+        if len(relevant) < len(items):
+            print(f"⏭️  Пропущено статей нерелевантных рубрик: {len(items) - len(relevant)}")
+            self.stats['feed_irrelevant'] = self.stats.get('feed_irrelevant', 0) + len(items) - len(relevant)
+        
+        for item in relevant:
+            if len(item.get('content') or '') < Config.FEED_FULL_TEXT_MIN_CHARS:
+                item.pop('content', None)
+        relevant = self.filter_similar_titles(self.filter_known_articles(relevant))
+        
+        full_text = sum(1 for item in relevant if item.get('content'))
+        self.stats['feed_full_text'] = self.stats.get('feed_full_text', 0) + full_text
+        print(f"📰 Новых статей в ленте {url}: {len(items)}, к обработке {len(relevant)} "
+              f"(полный текст из ленты: {full_text})")
+        
+        saved = self.process_articles_concurrently(relevant, filter_known=False)
+        self.commit_listing(listing)
+        return saved
     
     def get_cutoff_date(self) -> datetime:
         """
@@ -518,6 +1205,18 @@ class BaseNewsParser:
         print(f"❌ Низкая уверенность: {self.stats['low_confidence_skipped']}")
         print(f"🚫 Ошибок: {self.stats['errors']}")
         
+        if self.stats.get('listings_unchanged'):
+            print(f"⏭️  Листингов без изменений: {self.stats['listings_unchanged']}")
+        
+        if self.stats.get('feed_items'):
+            print(f"📡 Из лент: {self.stats['feed_items']} новых статей, "
+                  f"нерелевантных рубрик {self.stats.get('feed_irrelevant', 0)}, "
+                  f"полный текст без загрузки страницы {self.stats.get('feed_full_text', 0)}")
+        
+        if self.stats.get('stories_new') or self.stats.get('stories_joined'):
+            print(f"🧩 Сюжеты: новых {self.stats.get('stories_new', 0)}, "
+                  f"присоединено к существующим {self.stats.get('stories_joined', 0)}")
+        
         if self.stats['by_category']:
             print("\n📑 По категориям:")
             for cat, count in sorted(self.stats['by_category'].items()):
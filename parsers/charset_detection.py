@@ -0,0 +1,162 @@
+"""
+Определение кодировки HTML-страниц
+
+Порядок (как в браузерах, HTML Living Standard):
+1. BOM в начале тела
+2. charset из заголовка Content-Type
+3. <meta charset> / <meta http-equiv="Content-Type"> или объявление <?xml
+   в первых килобайтах страницы
+4. Проверка начала страницы на корректный UTF-8
+5. Статистическое определение (charset_normalizer) по началу страницы -
+   только если ничего из перечисленного не сработало
+
+В отличие от response.apparent_encoding, статистика не запускается для
+страниц с объявленной кодировкой и никогда не проходит по всему телу.
+"""
+import codecs
+import logging
+import re
+from typing import Optional, Tuple
+
+try:
+    from charset_normalizer import from_bytes
+    CHARSET_NORMALIZER_AVAILABLE = True
+except ImportError:
+    CHARSET_NORMALIZER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Сколько байт начала страницы просматривается в поисках <meta charset>
+META_SNIFF_BYTES = 4096
+
+# Сколько байт начала страницы используется для проверки UTF-8 и статистики
+DETECT_SAMPLE_BYTES = 65536
+
+DEFAULT_ENCODING = 'utf-8'
+
+# UTF-32 проверяется раньше UTF-16: BOM UTF-32-LE начинается с BOM UTF-16-LE
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+_XML_DECLARATION_RE = re.compile(rb'^\s*<\?xml[^>]+encoding\s*=\s*["\']([\w.:-]+)', re.I)
+
+# Объявления, которые браузеры читают как другую кодировку
+_ENCODING_ALIASES = {
+    'latin-1': 'cp1252',
+    'iso8859-1': 'cp1252',
+    'ascii': 'cp1252',
+}
+
+
+def normalize_encoding(name: Optional[str], declared_in_markup: bool = False) -> Optional[str]:
+    """
+    Каноническое имя кодировки Python или None, если кодировка неизвестна
+
+    Args:
+        name: Имя кодировки из заголовка или разметки
+        declared_in_markup: Объявление из <meta> (UTF-16 в <meta> означает UTF-8)
+
+    Returns:
+        Имя кодека или None
+    """
+    if not name:
+        return None
+    try:
+        encoding = codecs.lookup(name.strip().strip('"\'')).name
+    except LookupError:
+        return None
+
+    if declared_in_markup and encoding.startswith('utf-16'):
+        return 'utf-8'
+    return _ENCODING_ALIASES.get(encoding, encoding)
+
+
+def bom_encoding(content: bytes) -> Optional[str]:
+    """Кодировка по BOM в начале тела"""
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding
+    return None
+
+
+def header_encoding(content_type: Optional[str]) -> Optional[str]:
+    """Кодировка из заголовка Content-Type"""
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def markup_encoding(content: bytes) -> Optional[str]:
+    """Кодировка из <meta> или объявления <?xml в начале страницы"""
+    head = content[:META_SNIFF_BYTES]
+    match = _XML_DECLARATION_RE.match(head) or _META_CHARSET_RE.search(head)
+    return normalize_encoding(match.group(1).decode('ascii', 'ignore'), declared_in_markup=True) if match else None
+
+
+def _is_utf8(sample: bytes) -> bool:
+    """Начало страницы - корректный UTF-8 (обрезанный последний символ допустим)"""
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_encoding(content: bytes, content_type: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Определяет кодировку страницы
+
+    Args:
+        content: Тело ответа
+        content_type: Заголовок Content-Type
+
+    Returns:
+        Tuple (кодировка, источник: bom, header, meta, utf-8, detected или default)
+    """
+    encoding = bom_encoding(content)
+    if encoding:
+        return encoding, 'bom'
+
+    encoding = header_encoding(content_type)
+    if encoding:
+        return encoding, 'header'
+
+    encoding = markup_encoding(content)
+    if encoding:
+        return encoding, 'meta'
+
+    sample = content[:DETECT_SAMPLE_BYTES]
+    if _is_utf8(sample):
+        return 'utf-8', 'utf-8'
+
+    if CHARSET_NORMALIZER_AVAILABLE:
+        best = from_bytes(sample).best()
+        encoding = normalize_encoding(best.encoding) if best is not None else None
+        if encoding:
+            logger.debug(f"Кодировка определена статистически: {encoding}")
+            return encoding, 'detected'
+
+    return DEFAULT_ENCODING, 'default'
+
+
+def decode_html(content: bytes, content_type: Optional[str] = None, encoding: Optional[str] = None) -> str:
+    """
+    Декодирует страницу (нераспознанные байты заменяются)
+
+    Args:
+        content: Тело ответа
+        content_type: Заголовок Content-Type
+        encoding: Уже определенная кодировка (например, response.encoding)
+
+    Returns:
+        Текст страницы без BOM
+    """
+    encoding = encoding or detect_encoding(content, content_type)[0]
+    text = content.decode(encoding, errors='replace')
+    return text[1:] if text.startswith('\ufeff') else text
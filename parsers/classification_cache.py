@@ -0,0 +1,379 @@
+"""
+Персистентный кэш результатов AI-классификации на SQLite
+
+- Поиск и запись за O(1) по первичному ключу, без перезаписи всего файла
+- Безопасный доступ из нескольких потоков (соединение на поток)
+  и процессов (режим WAL + ожидание блокировки)
+- Вытеснение по LRU (ограничение числа записей) и по TTL
+- Статистика попаданий, общая для всех процессов
+- Чтение без записи в базу: счетчики попаданий копятся в памяти и
+  сбрасываются в cache_meta раз в CLASSIFIER_CACHE_STATS_FLUSH_INTERVAL
+  секунд, accessed_at обновляется, только если старше
+  CLASSIFIER_CACHE_TOUCH_INTERVAL (порядок LRU - с этой точностью)
+- Однократный импорт старого JSON-кэша gen_api_classifier_cache.json
+- Хранение текста новости рядом с меткой (обучающая выборка для
+  локальной модели, см. local_classifier.py)
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS classification_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_classification_cache_accessed
+    ON classification_cache (accessed_at);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class ClassificationCache:
+    """Кэш классификаций в SQLite с LRU/TTL вытеснением"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl_days: Optional[float] = None,
+        legacy_json_path: Optional[str] = None,
+        touch_interval: Optional[float] = None,
+        stats_flush_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            path: Путь к файлу базы SQLite
+            max_entries: Максимальное количество записей (0 - без ограничения)
+            ttl_days: Время жизни записи в днях (0 - без ограничения)
+            legacy_json_path: Путь к старому JSON-кэшу для однократного импорта
+            touch_interval: Через сколько секунд попадание обновляет accessed_at
+            stats_flush_interval: Как часто счетчики попаданий пишутся в cache_meta (сек)
+        """
+        self.path = path or Config.CLASSIFIER_CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else Config.CLASSIFIER_CACHE_MAX_ENTRIES
+        ttl_days = ttl_days if ttl_days is not None else Config.CLASSIFIER_CACHE_TTL_DAYS
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else 0
+        self.legacy_json_path = legacy_json_path or Config.CLASSIFIER_CACHE_LEGACY_JSON
+        self.touch_interval = (
+            touch_interval if touch_interval is not None else Config.CLASSIFIER_CACHE_TOUCH_INTERVAL
+        )
+        self.stats_flush_interval = (
+            stats_flush_interval if stats_flush_interval is not None
+            else Config.CLASSIFIER_CACHE_STATS_FLUSH_INTERVAL
+        )
+
+        self._local = threading.local()
+
+        # Статистика текущего процесса
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+        # Счетчики, еще не записанные в cache_meta
+        self._pending_meta = {'hits': 0, 'misses': 0}
+        self._meta_flushed_at = time.monotonic()
+        self._meta_lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._ensure_text_column(conn)
+        self._migrate_legacy_json()
+
+        atexit.register(self.flush_stats)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    def _ensure_text_column(self, conn: sqlite3.Connection):
+        """Добавляет колонку text в базы, созданные до ее появления"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(classification_cache)")}
+        if 'text' not in columns:
+            try:
+                conn.execute("ALTER TABLE classification_cache ADD COLUMN text TEXT")
+            except sqlite3.OperationalError:
+                # Колонку уже добавил другой процесс
+                pass
+
+    def _bump_meta(self, conn: sqlite3.Connection, name: str, delta: int = 1):
+        """Увеличивает общий счетчик в таблице cache_meta"""
+        conn.execute(
+            "INSERT INTO cache_meta (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, delta)
+        )
+
+    def _count(self, name: str):
+        """Учитывает попадание или промах, раз в stats_flush_interval сбрасывает счетчики"""
+        self.stats[name] += 1
+        with self._meta_lock:
+            self._pending_meta[name] += 1
+            due = time.monotonic() - self._meta_flushed_at >= self.stats_flush_interval
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Записывает накопленные счетчики попаданий в общую статистику cache_meta"""
+        with self._meta_lock:
+            pending = {name: delta for name, delta in self._pending_meta.items() if delta}
+            self._pending_meta = {'hits': 0, 'misses': 0}
+            self._meta_flushed_at = time.monotonic()
+
+        if not pending:
+            return
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for name, delta in pending.items():
+                    self._bump_meta(conn, name, delta)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            # Счетчики вернутся в следующий сброс
+            logger.warning(f"Не удалось записать статистику кэша: {e}")
+            with self._meta_lock:
+                for name, delta in pending.items():
+                    self._pending_meta[name] += delta
+
+    def _migrate_legacy_json(self):
+        """Однократно импортирует записи из старого JSON-кэша"""
+        conn = self._connect()
+        migrated = conn.execute(
+            "SELECT value FROM cache_meta WHERE name = 'legacy_json_migrated'"
+        ).fetchone()
+
+        if migrated or not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return
+
+        try:
+            with open(self.legacy_json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.warning(f"Не удалось прочитать JSON-кэш {self.legacy_json_path}: {e}")
+            return
+
+        now = time.time()
+        rows = [
+            (key, json.dumps(value, ensure_ascii=False), now, now)
+            for key, value in legacy.items()
+            if isinstance(value, dict)
+        ]
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Повторная проверка внутри транзакции - импорт мог сделать другой процесс
+            if not conn.execute(
+                "SELECT value FROM cache_meta WHERE name = 'legacy_json_migrated'"
+            ).fetchone():
+                conn.executemany(
+                    "INSERT OR IGNORE INTO classification_cache (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._bump_meta(conn, 'legacy_json_migrated')
+                logger.info(f"Импортировано {len(rows)} записей из {self.legacy_json_path}")
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Возвращает результат из кэша
+
+        Args:
+            key: Ключ кэша
+
+        Returns:
+            Словарь результата или None
+        """
+        conn = self._connect()
+        now = time.time()
+
+        row = conn.execute(
+            "SELECT value, created_at, accessed_at FROM classification_cache WHERE key = ?",
+            (key,)
+        ).fetchone()
+
+        if row is not None and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+            conn.execute("DELETE FROM classification_cache WHERE key = ?", (key,))
+            self.stats['evictions'] += 1
+            row = None
+
+        if row is None:
+            self._count('misses')
+            return None
+
+        # Запись только для давно не использованных ключей: для LRU
+        # достаточно точности touch_interval
+        if now - row[2] >= self.touch_interval:
+            conn.execute(
+                "UPDATE classification_cache SET accessed_at = ? WHERE key = ?",
+                (now, key)
+            )
+        self._count('hits')
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict, text: Optional[str] = None):
+        """
+        Сохраняет результат в кэш
+
+        Args:
+            key: Ключ кэша
+            value: Словарь результата
+            text: Текст новости (для обучения локальной модели)
+        """
+        conn = self._connect()
+        now = time.time()
+
+        conn.execute(
+            "INSERT INTO classification_cache (key, value, created_at, accessed_at, text) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+            "created_at = excluded.created_at, accessed_at = excluded.accessed_at, "
+            "text = COALESCE(excluded.text, text)",
+            (key, json.dumps(value, ensure_ascii=False), now, now, text)
+        )
+        self.stats['writes'] += 1
+
+        # Вытесняем пачкой, чтобы не проверять размер на каждой записи
+        if self.max_entries and self.stats['writes'] % 100 == 0:
+            self.evict()
+
+    def iter_labelled(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        Перебирает записи, для которых сохранен текст новости
+
+        Returns:
+            Итератор пар (текст, результат классификации)
+        """
+        cursor = self._connect().execute(
+            "SELECT text, value FROM classification_cache WHERE text IS NOT NULL"
+        )
+        for text, value in cursor:
+            yield text, json.loads(value)
+
+    def __contains__(self, key: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM classification_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT count(*) FROM classification_cache").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        Удаляет просроченные записи и самые давно использованные сверх лимита
+
+        Returns:
+            Количество удаленных записей
+        """
+        conn = self._connect()
+        removed = 0
+
+        if self.ttl_seconds:
+            removed += conn.execute(
+                "DELETE FROM classification_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            ).rowcount
+
+        if self.max_entries:
+            removed += conn.execute(
+                "DELETE FROM classification_cache WHERE key IN ("
+                "SELECT key FROM classification_cache ORDER BY accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+
+        self.stats['evictions'] += removed
+        return removed
+
+    def clear(self):
+        """Очищает кэш и общую статистику (отметка об импорте JSON сохраняется)"""
+        with self._meta_lock:
+            self._pending_meta = {'hits': 0, 'misses': 0}
+
+        conn = self._connect()
+        conn.execute("DELETE FROM classification_cache")
+        conn.execute("DELETE FROM cache_meta WHERE name IN ('hits', 'misses')")
+
+    def get_stats(self) -> Dict:
+        """
+        Возвращает статистику кэша
+
+        Returns:
+            Словарь со статистикой процесса и общей статистикой всех процессов
+        """
+        self.flush_stats()
+
+        conn = self._connect()
+        meta = dict(conn.execute("SELECT name, value FROM cache_meta").fetchall())
+
+        hits, misses = meta.get('hits', 0), meta.get('misses', 0)
+        local_total = self.stats['hits'] + self.stats['misses']
+
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / local_total if local_total else 0.0,
+            'entries': len(self),
+            'total_hits': hits,
+            'total_misses': misses,
+            'total_hit_rate': hits / (hits + misses) if hits + misses else 0.0
+        }
+
+    def close(self):
+        """Закрывает соединение текущего потока"""
+        self.flush_stats()
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_cache_instance = None
+_cache_instance_lock = threading.Lock()
+
+
+def get_classification_cache() -> ClassificationCache:
+    """Возвращает общий для процесса экземпляр кэша классификаций"""
+    global _cache_instance
+
+    if _cache_instance is None:
+        with _cache_instance_lock:
+            if _cache_instance is None:
+                _cache_instance = ClassificationCache()
+    return _cache_instance
@@ -0,0 +1,351 @@
+"""
+Буферизованная пакетная запись в ClickHouse
+
+Строки накапливаются по таблицам и отправляются одним колоночным INSERT
+при достижении размера пакета или по таймеру. Если ClickHouse недоступен
+(ошибка сети или соединения), пакет сохраняется в локальный spool-файл и
+отправляется повторно после следующей успешной записи. Пакеты, которые
+ClickHouse отклонил по другой причине (нет таблицы, не та схема или типы),
+повтор не исправит: они переносятся в файл deadletter-*.jsonl того же
+каталога и не мешают записи остальных пакетов.
+
+Поддерживаются оба клиента, используемые в проекте:
+- clickhouse_driver.Client (нативный протокол, execute(..., columnar=True))
+- clickhouse_connect (HTTP, insert(..., column_oriented=True))
+"""
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+try:
+    from clickhouse_driver.errors import NetworkError, SocketTimeoutError
+    _DRIVER_CONNECTION_ERRORS = (NetworkError, SocketTimeoutError)
+except ImportError:
+    _DRIVER_CONNECTION_ERRORS = ()
+
+try:
+    from clickhouse_connect.driver.exceptions import OperationalError
+    _CONNECT_CONNECTION_ERRORS = (OperationalError,)
+except ImportError:
+    _CONNECT_CONNECTION_ERRORS = ()
+
+# Ошибки, при которых пакет стоит повторить позже: ClickHouse недоступен
+CONNECTION_ERRORS = (ConnectionError, TimeoutError) + _DRIVER_CONNECTION_ERRORS + _CONNECT_CONNECTION_ERRORS
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_value(value):
+    """Приводит значение к виду, сериализуемому в JSON"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    return value
+
+
+def _decode_value(value):
+    """Восстанавливает значение, сохраненное _encode_value"""
+    if isinstance(value, dict):
+        if '__datetime__' in value:
+            return datetime.fromisoformat(value['__datetime__'])
+        if '__date__' in value:
+            return date.fromisoformat(value['__date__'])
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+def _process_alive(pid: int) -> bool:
+    """Проверяет, работает ли процесс с данным pid"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю
+        return True
+    return True
+
+
+class BufferedClickHouseWriter:
+    """Буфер строк с пакетной колоночной вставкой и локальным spool"""
+
+    def __init__(
+        self,
+        client_factory: Callable,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        spool_dir: Optional[str] = None,
+        background_flush: bool = True
+    ):
+        """
+        Args:
+            client_factory: Функция, создающая клиент ClickHouse
+            batch_size: Количество строк таблицы, при котором буфер сбрасывается
+            flush_interval: Максимальное время хранения строк в буфере (сек)
+            spool_dir: Каталог для строк, которые не удалось записать
+            background_flush: Сбрасывать буфер по таймеру в фоновом потоке
+        """
+        self.client_factory = client_factory
+        self.batch_size = batch_size or Config.CLICKHOUSE_WRITER_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.CLICKHOUSE_WRITER_FLUSH_INTERVAL
+        self.spool_dir = spool_dir or Config.CLICKHOUSE_SPOOL_DIR
+
+        self.client = None
+        self._buffers: Dict[Tuple[str, Tuple[str, ...]], List[list]] = {}
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+        self._spool_pending = bool(self._spool_files())
+
+        self.stats = {
+            'rows_buffered': 0,
+            'rows_written': 0,
+            'batches_written': 0,
+            'rows_spooled': 0,
+            'rows_replayed': 0,
+            'rows_quarantined': 0
+        }
+
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+        if background_flush:
+            self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flush_thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, table: str, row: Dict):
+        """
+        Добавляет строку в буфер таблицы
+
+        Args:
+            table: Имя таблицы (можно с базой: news.lenta_headlines)
+            row: Словарь {колонка: значение}
+        """
+        columns = tuple(row.keys())
+        key = (table, columns)
+
+        with self._lock:
+            buffer = self._buffers.setdefault(key, [])
+            buffer.append([row[c] for c in columns])
+            self.stats['rows_buffered'] += 1
+
+            if len(buffer) >= self.batch_size:
+                self._flush_key(key)
+
+    def add_many(self, table: str, rows: Sequence[Dict]):
+        """Добавляет несколько строк в буфер таблицы"""
+        for row in rows:
+            self.add(table, row)
+
+    def flush(self):
+        """Сбрасывает все буферы в ClickHouse"""
+        with self._lock:
+            for key in list(self._buffers.keys()):
+                self._flush_key(key)
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        """Сбрасывает буферы, останавливает таймер и закрывает соединение"""
+        self._stop_event.set()
+        if self._flush_thread is not None and self._flush_thread is not threading.current_thread():
+            self._flush_thread.join(timeout=self.flush_interval + 1)
+
+        self.flush()
+
+        with self._lock:
+            if self.client is not None:
+                try:
+                    self.client.close()
+                except Exception:
+                    pass
+                self.client = None
+
+    def _flush_loop(self):
+        """Фоновый сброс буферов по таймеру"""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                if time.monotonic() - self._last_flush >= self.flush_interval:
+                    self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка фонового сброса буфера ClickHouse: {e}")
+
+    def _get_client(self):
+        """Возвращает клиент, создавая его при необходимости"""
+        if self.client is None:
+            self.client = self.client_factory()
+            if self.client is None:
+                raise ConnectionError("Не удалось создать клиент ClickHouse")
+        return self.client
+
+    def _insert(self, table: str, columns: Sequence[str], rows: List[list]):
+        """Выполняет одну колоночную вставку"""
+        client = self._get_client()
+        data = [list(column) for column in zip(*rows)]
+
+        if hasattr(client, 'insert'):
+            # clickhouse_connect
+            client.insert(table, data, column_names=list(columns), column_oriented=True)
+        else:
+            # clickhouse_driver
+            client.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES",
+                data,
+                columnar=True
+            )
+
+    def _flush_key(self, key: Tuple[str, Tuple[str, ...]]):
+        """
+        Сбрасывает буфер одной таблицы
+
+        Если ClickHouse недоступен, пакет сохраняется в spool, если отклонил
+        пакет - в deadletter. После успешной вставки отправляются пакеты
+        из spool; их ошибки не влияют на текущую запись.
+        """
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+
+        table, columns = key
+
+        try:
+            self._insert(table, columns, rows)
+        except CONNECTION_ERRORS as e:
+            logger.warning(f"ClickHouse недоступен, {len(rows)} строк для {table} сохранены в spool: {e}")
+            self._drop_client()
+            self._spool(table, columns, rows)
+            return
+        except Exception as e:
+            logger.error(f"ClickHouse отклонил {len(rows)} строк для {table}, пакет перенесен в deadletter: {e}")
+            self._quarantine(table, columns, rows, e)
+            return
+
+        self.stats['rows_written'] += len(rows)
+        self.stats['batches_written'] += 1
+
+        if self._spool_pending:
+            try:
+                self._replay_spool()
+            except Exception as e:
+                logger.warning(f"Ошибка повторной отправки spool: {e}")
+
+    def _drop_client(self):
+        """Сбрасывает соединение, чтобы переподключиться при следующей записи"""
+        if self.client is not None:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+            self.client = None
+
+    def _spool_files(self) -> List[str]:
+        """
+        Возвращает spool-файлы, ожидающие повторной отправки
+
+        Кроме spool-*.jsonl это файлы spool-*.jsonl.replay-{pid}, которые
+        забрал на отправку процесс, завершившийся раньше, чем удалил их.
+        """
+        files = glob.glob(os.path.join(self.spool_dir, 'spool-*.jsonl'))
+        for path in glob.glob(os.path.join(self.spool_dir, 'spool-*.jsonl.replay-*')):
+            pid = path.rsplit('.replay-', 1)[1]
+            if pid.isdigit() and int(pid) != os.getpid() and not _process_alive(int(pid)):
+                files.append(path)
+        return sorted(files)
+
+    def _append_record(self, prefix: str, record: Dict):
+        """Дописывает пакет в файл {prefix}-{pid}.jsonl каталога spool"""
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f"{prefix}-{os.getpid()}.jsonl")
+
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _spool(self, table: str, columns: Sequence[str], rows: List[list]):
+        """Дописывает пакет в spool-файл текущего процесса"""
+        self._append_record('spool', {
+            'table': table,
+            'columns': list(columns),
+            'rows': [_encode_value(row) for row in rows]
+        })
+
+        self.stats['rows_spooled'] += len(rows)
+        self._spool_pending = True
+
+    def _quarantine(self, table: str, columns: Sequence[str], rows: List[list], error: Exception):
+        """Переносит отклоненный пакет в deadletter-файл текущего процесса"""
+        self._append_record('deadletter', {
+            'table': table,
+            'columns': list(columns),
+            'rows': [_encode_value(row) for row in rows],
+            'error': str(error),
+            'failed_at': datetime.now().isoformat()
+        })
+
+        self.stats['rows_quarantined'] += len(rows)
+
+    def _replay_spool(self):
+        """
+        Отправляет накопленные в spool пакеты
+
+        Файл сначала переименовывается, поэтому его забирает только один
+        процесс; файл, оставшийся от завершившегося процесса, забирается
+        так же. Если ClickHouse снова недоступен, неотправленные пакеты
+        возвращаются в spool; пакет, который ClickHouse отклонил, переносится
+        в deadletter, и отправка продолжается.
+        """
+        for path in self._spool_files():
+            claimed = f"{path.split('.replay-')[0]}.replay-{os.getpid()}"
+            if os.path.exists(claimed):
+                # Незавершенная отправка этого же процесса: не перезаписываем
+                continue
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                # Файл уже забрал другой процесс
+                continue
+
+            with open(claimed, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+
+            for index, record in enumerate(records):
+                rows = [_decode_value(row) for row in record['rows']]
+                try:
+                    self._insert(record['table'], record['columns'], rows)
+                except CONNECTION_ERRORS:
+                    # Возвращаем неотправленные пакеты и прекращаем попытки
+                    for rest in records[index:]:
+                        self._spool(rest['table'], rest['columns'], [_decode_value(r) for r in rest['rows']])
+                    os.remove(claimed)
+                    self._drop_client()
+                    raise
+                except Exception as e:
+                    logger.error(
+                        f"ClickHouse отклонил {len(rows)} строк spool для {record['table']}, "
+                        f"пакет перенесен в deadletter: {e}"
+                    )
+                    self._quarantine(record['table'], record['columns'], rows, e)
+                    continue
+                self.stats['rows_replayed'] += len(rows)
+
+            os.remove(claimed)
+            logger.info(f"Spool {os.path.basename(path)} отправлен в ClickHouse")
+
+        self._spool_pending = False
@@ -0,0 +1,132 @@
+"""
+Конкурентная загрузка статей для парсеров новостей
+Ограниченный пул потоков с лимитом параллельных запросов на хост
+и паузой вежливости между запросами к одному хосту
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class HostLimiter:
+    """Ограничитель запросов к одному хосту"""
+
+    def __init__(self, max_concurrency: int = 2, delay_range: Tuple[float, float] = (0.5, 1.5)):
+        """
+        Args:
+            max_concurrency: Максимум одновременных запросов к хосту
+            delay_range: Диапазон паузы (сек) между стартами запросов к хосту
+        """
+        self.semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.delay_range = delay_range
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def _wait_turn(self):
+        """Ждет, пока не пройдет пауза с момента предыдущего старта"""
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + random.uniform(*self.delay_range)
+
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        self._wait_turn()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.semaphore.release()
+
+
+class ConcurrentFetcher:
+    """Пул потоков для параллельной загрузки статей"""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        per_host_concurrency: int = 2,
+        delay_range: Tuple[float, float] = (0.5, 1.5)
+    ):
+        """
+        Args:
+            max_workers: Общее количество потоков загрузки
+            per_host_concurrency: Максимум одновременных запросов к одному хосту
+            delay_range: Диапазон паузы (сек) между запросами к одному хосту
+        """
+        self.max_workers = max(1, max_workers)
+        self.per_host_concurrency = per_host_concurrency
+        self.delay_range = delay_range
+
+        self._limiters: Dict[str, HostLimiter] = {}
+        self._limiters_lock = threading.Lock()
+
+    def get_limiter(self, url: str) -> HostLimiter:
+        """
+        Возвращает ограничитель для хоста URL
+
+        Args:
+            url: URL запроса
+
+        Returns:
+            HostLimiter для хоста
+        """
+        host = urlparse(url).netloc.lower()
+
+        with self._limiters_lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = HostLimiter(self.per_host_concurrency, self.delay_range)
+                self._limiters[host] = limiter
+            return limiter
+
+    def _fetch_one(self, url: str, fetch_func: Callable[[str], Any]) -> Any:
+        """Загружает один URL с учетом лимитов хоста"""
+        with self.get_limiter(url):
+            return fetch_func(url)
+
+    def fetch(
+        self,
+        items: Iterable[Dict],
+        fetch_func: Callable[[str], Any],
+        url_key: str = 'link'
+    ) -> Iterator[Tuple[Dict, Any, Optional[Exception]]]:
+        """
+        Загружает элементы параллельно и отдает результаты по мере готовности
+
+        Args:
+            items: Элементы со ссылками (словари)
+            fetch_func: Функция загрузки, принимает URL
+            url_key: Ключ, под которым в элементе хранится URL
+
+        Yields:
+            Tuple (item, result, error) в порядке завершения загрузки
+        """
+        items = [item for item in items if item.get(url_key)]
+        if not items:
+            return
+
+        workers = min(self.max_workers, len(items))
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                executor.submit(self._fetch_one, item[url_key], fetch_func): item
+                for item in items
+            }
+
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            # Если потребитель прервал обход - не запускаем оставшиеся загрузки
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -8,14 +8,40 @@
 - Очистки от эмодзи, спама и призывов подписаться
 - Фильтрации некачественного контента
 - Проверки минимальных требований к тексту
+
+Все проверки линейны по длине текста: регулярные выражения компилируются
+один раз, повторяющиеся фразы ищутся скользящим хэшем за один проход,
+проверка останавливается на первой причине отказа.
 """
 
 import re
 import logging
-from typing import Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional
+
+try:
+    from parsers.lexicon_matcher import trie_pattern
+except ImportError:
+    from lexicon_matcher import trie_pattern
 
 logger = logging.getLogger(__name__)
 
+# Длина фразы (в словах) и число повторов, после которого контент считается спамом
+SPAM_NGRAM_SIZE = 5
+SPAM_NGRAM_MAX_REPEATS = 2
+
+# Модуль и основание полиномиального скользящего хэша n-грамм
+_HASH_MOD = (1 << 61) - 1
+_HASH_BASE = 1000003
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_GLUED_CYRILLIC_RE = re.compile(r'([а-я])([А-Я])')
+_GLUED_LATIN_RE = re.compile(r'([a-z])([A-Z])')
+_REPEATED_EXCLAMATION_RE = re.compile(r'[!]{2,}')
+_REPEATED_QUESTION_RE = re.compile(r'[?]{2,}')
+_REPEATED_DOTS_RE = re.compile(r'[.]{3,}')
+_FORMATTING_RE = re.compile(r'[_\*#]+')
+
 class ContentValidator:
     """Класс для валидации и очистки контента новостей"""
     
@@ -97,6 +123,14 @@ class ContentValidator:
         # Минимальные требования к контенту
         self.min_content_length = 100  # Минимальная длина контента
         self.min_title_length = 10     # Минимальная длина заголовка
+        self.max_emojis = 3            # Максимум эмодзи
+        self.max_upper_ratio = 0.3     # Максимальная доля заглавных букв
+        self.max_exclamation_ratio = 0.05  # Максимальная доля восклицательных знаков
+        
+        # Каждый набор паттернов компилируется в одно выражение
+        self._emoji_re = re.compile('|'.join(self.emoji_patterns))
+        self._link_re = re.compile('|'.join(f'(?:{pattern})' for pattern in self.link_patterns))
+        self._bad_phrase_re = re.compile(trie_pattern(phrase.lower() for phrase in self.bad_content_phrases))
         
     def validate_content(self, title: str, content: str) -> Tuple[bool, str, str]:
         """
@@ -122,31 +156,9 @@ class ContentValidator:
             cleaned_title = self._clean_text(title)
             cleaned_content = self._clean_text(content)
             
-            # Проверяем минимальную длину
-            if len(cleaned_title) < self.min_title_length:
-                logger.warning(f"Заголовок слишком короткий: {len(cleaned_title)} символов")
-                return False, cleaned_title, cleaned_content
-                
-            if len(cleaned_content) < self.min_content_length:
-                logger.warning(f"Контент слишком короткий: {len(cleaned_content)} символов")
-                return False, cleaned_title, cleaned_content
-            
-            # Проверяем на плохие фразы
-            full_text = f"{cleaned_title} {cleaned_content}".lower()
-            for phrase in self.bad_content_phrases:
-                if phrase.lower() in full_text:
-                    logger.warning(f"Найдена плохая фраза: '{phrase}'")
-                    return False, cleaned_title, cleaned_content
-            
-            # Проверяем на слишком много эмодзи
-            emoji_count = self._count_emojis(full_text)
-            if emoji_count > 3:  # Максимум 3 эмодзи
-                logger.warning(f"Слишком много эмодзи: {emoji_count}")
-                return False, cleaned_title, cleaned_content
-            
-            # Проверяем на спам (повторяющиеся фразы)
-            if self._is_spam(cleaned_content):
-                logger.warning("Контент похож на спам")
+            reason = self.get_rejection_reason(cleaned_title, cleaned_content)
+            if reason:
+                logger.warning(reason)
                 return False, cleaned_title, cleaned_content
             
             logger.info(f"Контент валиден: {len(cleaned_title)} символов в заголовке, {len(cleaned_content)} в контенте")
@@ -156,6 +168,45 @@ class ContentValidator:
             logger.error(f"Ошибка при валидации контента: {e}")
             return False, title, content
     
+    def get_rejection_reason(self, cleaned_title: str, cleaned_content: str) -> Optional[str]:
+        """
+        Возвращает первую причину отказа для очищенного текста
+        
+        Проверки идут от самых дешевых к самым дорогим и
+        останавливаются на первой сработавшей.
+        
+        Args:
+            cleaned_title: Очищенный заголовок
+            cleaned_content: Очищенное содержимое
+            
+        Returns:
+            Optional[str]: Причина отказа или None, если контент валиден
+        """
+        # Проверяем минимальную длину
+        if len(cleaned_title) < self.min_title_length:
+            return f"Заголовок слишком короткий: {len(cleaned_title)} символов"
+        
+        if len(cleaned_content) < self.min_content_length:
+            return f"Контент слишком короткий: {len(cleaned_content)} символов"
+        
+        # Проверяем на плохие фразы
+        full_text = f"{cleaned_title} {cleaned_content}".lower()
+        bad_phrase = self._bad_phrase_re.search(full_text)
+        if bad_phrase:
+            return f"Найдена плохая фраза: '{bad_phrase.group(0)}'"
+        
+        # Проверяем на слишком много эмодзи
+        emoji_count = self._count_emojis(full_text, limit=self.max_emojis + 1)
+        if emoji_count > self.max_emojis:
+            return f"Слишком много эмодзи: {emoji_count}"
+        
+        # Проверяем на спам (повторяющиеся фразы)
+        spam_reason = self._spam_reason(cleaned_content)
+        if spam_reason:
+            return f"Контент похож на спам: {spam_reason}"
+        
+        return None
+    
     def _clean_text(self, text: str) -> str:
         """
         Очищает текст от эмодзи, лишних ссылок и форматирования
@@ -169,33 +220,29 @@ class ContentValidator:
         if not text:
             return ""
         
-        cleaned = text
-        
         # Удаляем эмодзи
-        for pattern in self.emoji_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.UNICODE)
+        cleaned = self._emoji_re.sub('', text)
         
         # Удаляем лишние ссылки (кроме разрешенных доменов)
         cleaned = self._remove_unwanted_links(cleaned)
         
-        # Удаляем лишние пробелы и переносы строк
-        cleaned = re.sub(r'\s+', ' ', cleaned)  # Множественные пробелы в один
-        cleaned = re.sub(r'\n+', '\n', cleaned)  # Множественные переносы в один
+        # Множественные пробелы и переносы строк в один пробел
+        cleaned = _WHITESPACE_RE.sub(' ', cleaned)
         
         # Удаляем HTML теги
-        cleaned = re.sub(r'<[^>]+>', '', cleaned)
+        cleaned = _HTML_TAG_RE.sub('', cleaned)
         
         # Добавить исправление склеенных слов
-        cleaned = re.sub(r'([а-я])([А-Я])', r'\1 \2', cleaned)
-        cleaned = re.sub(r'([a-z])([A-Z])', r'\1 \2', cleaned)
+        cleaned = _GLUED_CYRILLIC_RE.sub(r'\1 \2', cleaned)
+        cleaned = _GLUED_LATIN_RE.sub(r'\1 \2', cleaned)
         
         # Удаляем лишние знаки препинания
-        cleaned = re.sub(r'[!]{2,}', '!', cleaned)  # Множественные восклицательные знаки
-        cleaned = re.sub(r'[?]{2,}', '?', cleaned)  # Множественные вопросительные знаки
-        cleaned = re.sub(r'[.]{3,}', '...', cleaned)  # Множественные точки
+        cleaned = _REPEATED_EXCLAMATION_RE.sub('!', cleaned)  # Множественные восклицательные знаки
+        cleaned = _REPEATED_QUESTION_RE.sub('?', cleaned)  # Множественные вопросительные знаки
+        cleaned = _REPEATED_DOTS_RE.sub('...', cleaned)  # Множественные точки
         
         # Удаляем специальные символы для форматирования
-        cleaned = re.sub(r'[_\*#]+', '', cleaned)  # Подчеркивания, звездочки, решетки
+        cleaned = _FORMATTING_RE.sub('', cleaned)  # Подчеркивания, звездочки, решетки
         
         return cleaned.strip()
     
@@ -209,68 +256,128 @@ class ContentValidator:
         Returns:
             str: Текст без нежелательных ссылок
         """
-        cleaned = text
-        
-        # Находим все ссылки
-        for pattern in self.link_patterns:
-            links = re.findall(pattern, cleaned)
-            for link in links:
-                # Проверяем, является ли домен разрешенным
-                is_allowed = any(domain in link.lower() for domain in self.allowed_domains)
-                if not is_allowed:
-                    # Удаляем нежелательную ссылку
-                    cleaned = cleaned.replace(link, '')
-        
-        return cleaned
+        def replace(match: re.Match) -> str:
+            link = match.group(0)
+            # Ссылки на разрешенные домены оставляем
+            link_lower = link.lower()
+            if any(domain in link_lower for domain in self.allowed_domains):
+                return link
+            return ''
+        
+        # Все виды ссылок находятся за один проход
+        return self._link_re.sub(replace, text)
     
-    def _count_emojis(self, text: str) -> int:
+    def _count_emojis(self, text: str, limit: Optional[int] = None) -> int:
         """
         Подсчитывает количество эмодзи в тексте
         
         Args:
             text: Исходный текст
+            limit: Остановить подсчет, достигнув этого количества
             
         Returns:
             int: Количество эмодзи
         """
         count = 0
-        for pattern in self.emoji_patterns:
-            matches = re.findall(pattern, text, flags=re.UNICODE)
-            count += len(matches)
+        for _ in self._emoji_re.finditer(text):
+            count += 1
+            if limit is not None and count >= limit:
+                break
         return count
     
-    def _is_spam(self, content: str) -> bool:
+    def _has_repeated_phrase(self, words: List[str]) -> bool:
         """
-        Проверяет, является ли контент спамом
+        Ищет фразу из SPAM_NGRAM_SIZE слов, повторенную больше
+        SPAM_NGRAM_MAX_REPEATS раз (без перекрытий)
+        
+        Окна слов хэшируются скользящим полиномиальным хэшем
+        за один проход, поэтому время линейно по числу слов.
         
         Args:
-            content: Контент для проверки
+            words: Слова текста в нижнем регистре
             
         Returns:
-            bool: True если контент похож на спам
+            bool: True если найдена повторяющаяся фраза
         """
-        # Проверяем на повторяющиеся фразы
-        words = content.lower().split()
-        if len(words) < 10:
+        n = SPAM_NGRAM_SIZE
+        if len(words) < n:
             return False
         
-        # Ищем повторяющиеся последовательности слов
-        for i in range(len(words) - 5):
-            phrase = ' '.join(words[i:i+5])
-            if content.lower().count(phrase) > 2:
+        word_hashes = [hash(word) & 0xFFFFFFFFFFFF for word in words]
+        high_power = pow(_HASH_BASE, n - 1, _HASH_MOD)
+        
+        window_hash = 0
+        for value in word_hashes[:n]:
+            window_hash = (window_hash * _HASH_BASE + value) % _HASH_MOD
+        
+        # Хэш окна -> (начало первого окна, начало последнего засчитанного, количество)
+        seen: Dict[int, List[int]] = {}
+        
+        for start in range(len(words) - n + 1):
+            if start:
+                # Сдвигаем окно: убираем первое слово и добавляем следующее
+                window_hash = (
+                    (window_hash - word_hashes[start - 1] * high_power) * _HASH_BASE
+                    + word_hashes[start + n - 1]
+                ) % _HASH_MOD
+            
+            entry = seen.get(window_hash)
+            if entry is None:
+                seen[window_hash] = [start, start, 1]
+                continue
+            
+            # Перекрывающиеся повторы не засчитываются (как str.count)
+            if start - entry[1] < n:
+                continue
+            
+            entry[1] = start
+            entry[2] += 1
+            if entry[2] > SPAM_NGRAM_MAX_REPEATS and words[entry[0]:entry[0] + n] == words[start:start + n]:
                 return True
         
+        return False
+    
+    def _spam_reason(self, content: str) -> Optional[str]:
+        """
+        Возвращает признак спама или None
+        
+        Args:
+            content: Контент для проверки
+            
+        Returns:
+            Optional[str]: Описание признака спама
+        """
+        if not content:
+            return None
+        
         # Проверяем на слишком много заглавных букв
-        upper_ratio = sum(1 for c in content if c.isupper()) / len(content) if content else 0
-        if upper_ratio > 0.3:  # Более 30% заглавных букв
-            return True
+        upper_ratio = sum(map(str.isupper, content)) / len(content)
+        if upper_ratio > self.max_upper_ratio:
+            return f"доля заглавных букв {upper_ratio:.2f}"
         
         # Проверяем на слишком много восклицательных знаков
-        exclamation_ratio = content.count('!') / len(content) if content else 0
-        if exclamation_ratio > 0.05:  # Более 5% восклицательных знаков
-            return True
+        exclamation_ratio = content.count('!') / len(content)
+        if exclamation_ratio > self.max_exclamation_ratio:
+            return f"доля восклицательных знаков {exclamation_ratio:.2f}"
         
-        return False
+        # Проверяем на повторяющиеся фразы
+        words = content.lower().split()
+        if len(words) >= 10 and self._has_repeated_phrase(words):
+            return "повторяющиеся фразы"
+        
+        return None
+    
+    def _is_spam(self, content: str) -> bool:
+        """
+        Проверяет, является ли контент спамом
+        
+        Args:
+            content: Контент для проверки
+            
+        Returns:
+            bool: True если контент похож на спам
+        """
+        return self._spam_reason(content) is not None
     
     def get_validation_stats(self, title: str, content: str) -> dict:
         """
@@ -297,16 +404,13 @@ class ContentValidator:
             full_text = f"{title} {content}".lower()
             
             # Проверяем плохие фразы
-            for phrase in self.bad_content_phrases:
-                if phrase.lower() in full_text:
-                    stats['has_bad_phrases'] = True
-                    break
+            stats['has_bad_phrases'] = self._bad_phrase_re.search(full_text) is not None
             
             # Проверяем спам
             stats['is_spam'] = self._is_spam(content)
             
             # Статистика символов
-            stats['upper_ratio'] = sum(1 for c in content if c.isupper()) / len(content)
+            stats['upper_ratio'] = sum(map(str.isupper, content)) / len(content)
             stats['exclamation_ratio'] = content.count('!') / len(content)
         
         return stats
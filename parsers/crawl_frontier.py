@@ -0,0 +1,224 @@
+"""
+Очередь обхода сайта (crawl frontier) для универсального парсера
+
+- Приоритетная очередь: сначала меньшая глубина (обход в ширину),
+  внутри уровня - URL, больше похожие на статью
+- Повторные URL отсекаются по нормализованной форме (без фрагмента,
+  utm-меток, порта по умолчанию, завершающего слеша) через Bloom-фильтр
+  фиксированного размера вместо растущего множества посещенных URL
+- Размер самой очереди ограничен. Очередь - корзины FIFO по ключу
+  (глубина, похожесть на статью), поэтому и следующий, и наименее
+  приоритетный URL находятся за O(число корзин), без просмотра очереди.
+  При переполнении новый URL не хуже худшего в очереди вытесняет его,
+  иначе не ставится и не запоминается в фильтре (его можно найти снова,
+  когда очередь освободится). Вытеснение уже стоявшего в очереди URL
+  окончательное: из Bloom-фильтра ключ не удалить, этот URL за обход
+  больше не ставится
+"""
+import bisect
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+try:
+    from parsers.seen_links import bloom_parameters, bloom_positions
+except ImportError:
+    from seen_links import bloom_parameters, bloom_positions
+
+# Параметры запроса, не влияющие на содержимое страницы
+TRACKING_PARAMS = {'fbclid', 'gclid', 'yclid', 'ysclid', 'mc_cid', 'mc_eid', '_ga', 'ref', 'from'}
+
+_DEFAULT_PORTS = {'http': '80', 'https': '443'}
+_DATE_PATH_RE = re.compile(r'/20\d\d[/-]\d{1,2}([/-]\d{1,2})?/')
+_ARTICLE_ID_RE = re.compile(r'[-_/]\d{5,}')
+_ARTICLE_WORDS = ('news', 'article', 'story', 'post')
+
+
+def normalize_url(url: str) -> str:
+    """
+    Нормализованная форма URL для отсечения повторов
+
+    Схема и хост в нижнем регистре, без порта по умолчанию, фрагмента,
+    меток отслеживания и завершающего слеша; параметры отсортированы.
+
+    Args:
+        url: Абсолютный URL
+
+    Returns:
+        Нормализованный URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def article_score(url: str) -> int:
+    """Насколько URL похож на статью (дата или числовой id в пути, ключевые слова)"""
+    lowered = url.lower()
+    score = 0
+    if _DATE_PATH_RE.search(lowered):
+        score += 2
+    if _ARTICLE_ID_RE.search(urlsplit(lowered).path):
+        score += 1
+    if any(word in lowered for word in _ARTICLE_WORDS):
+        score += 1
+    return score
+
+
+class UrlBloomFilter:
+    """Bloom-фильтр URL в памяти фиксированного размера"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: Ожидаемое количество URL
+            error_rate: Доля ложных срабатываний при заполнении до емкости
+        """
+        self.num_bits, self.num_hashes = bloom_parameters(max(1, capacity), error_rate)
+        self._bits = np.zeros(self.num_bits // 8, dtype=np.uint8)
+        self.count = 0
+
+    def add(self, key: str) -> bool:
+        """Добавляет ключ; True если его не было в фильтре"""
+        positions = bloom_positions([key], self.num_bits, self.num_hashes)[0]
+        byte_index = (positions >> np.uint64(3)).astype(np.intp)
+        masks = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+
+        if ((self._bits[byte_index] & masks) != 0).all():
+            return False
+        np.bitwise_or.at(self._bits, byte_index, masks)
+        self.count += 1
+        return True
+
+    def __contains__(self, key: str) -> bool:
+        positions = bloom_positions([key], self.num_bits, self.num_hashes)[0]
+        bits = self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return bool((bits & 1).all())
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bits.nbytes
+
+
+@dataclass(order=True)
+class FrontierItem:
+    """URL в очереди обхода"""
+    priority: Tuple[int, int, int]
+    url: str = field(compare=False)
+    depth: int = field(compare=False, default=0)
+    parent: Optional[str] = field(compare=False, default=None)
+
+
+class CrawlFrontier:
+    """Потокобезопасная приоритетная очередь обхода с отсечением повторов"""
+
+    def __init__(self, max_depth: int, max_urls: int = 100000, max_queued: int = 10000):
+        """
+        Args:
+            max_depth: Максимальная глубина (стартовые URL - глубина 0)
+            max_urls: Емкость фильтра повторов (сколько разных URL ожидается за обход)
+            max_queued: Максимальный размер очереди
+        """
+        self.max_depth = max_depth
+        self.max_queued = max(1, max_queued)
+        self._seen = UrlBloomFilter(max_urls)
+        # Корзины по (глубина, -похожесть на статью) и их ключи по возрастанию
+        self._buckets: Dict[Tuple[int, int], Deque[FrontierItem]] = {}
+        self._keys: List[Tuple[int, int]] = []
+        self._size = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self.stats = {'queued': 0, 'duplicates': 0, 'too_deep': 0, 'evicted': 0, 'rejected': 0}
+
+    def push(self, url: str, depth: int = 0, parent: Optional[str] = None) -> bool:
+        """
+        Добавляет URL в очередь
+
+        Args:
+            url: Абсолютный URL
+            depth: Глубина (количество переходов от стартовой страницы)
+            parent: Страница, на которой найдена ссылка
+
+        Returns:
+            True если URL добавлен (не повтор, не глубже max_depth и
+            очередь не заполнена более приоритетными URL)
+        """
+        if depth >= self.max_depth:
+            self.stats['too_deep'] += 1
+            return False
+
+        key = (depth, -article_score(url))
+        normalized = normalize_url(url)
+
+        with self._lock:
+            if self._size >= self.max_queued and key >= self._keys[-1]:
+                # Новый URL был бы вытеснен сразу же - в фильтр его не записываем
+                self.stats['rejected'] += 1
+                return False
+
+            if not self._seen.add(normalized):
+                self.stats['duplicates'] += 1
+                return False
+
+            self._sequence += 1
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = deque()
+                bisect.insort(self._keys, key)
+            bucket.append(FrontierItem((*key, self._sequence), url, depth, parent))
+            self._size += 1
+            self.stats['queued'] += 1
+
+            if self._size > self.max_queued:
+                # Наименее приоритетный URL - последний в худшей корзине
+                self._take(self._keys[-1], last=True)
+                self.stats['evicted'] += 1
+            return True
+
+    def _take(self, key: Tuple[int, int], last: bool = False) -> FrontierItem:
+        """Извлекает первый (last - последний) URL корзины, пустую корзину удаляет"""
+        bucket = self._buckets[key]
+        item = bucket.pop() if last else bucket.popleft()
+        if not bucket:
+            del self._buckets[key]
+            self._keys.remove(key)
+        self._size -= 1
+        return item
+
+    def seen(self, url: str) -> bool:
+        """URL уже был поставлен в очередь (с точностью фильтра)"""
+        return normalize_url(url) in self._seen
+
+    def pop(self) -> Optional[FrontierItem]:
+        """Следующий URL по приоритету или None, если очередь пуста"""
+        with self._lock:
+            return self._take(self._keys[0]) if self._keys else None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_stats(self) -> dict:
+        """Статистика очереди"""
+        return {
+            **self.stats,
+            'pending': self._size,
+            'filter_bytes': self._seen.size_bytes,
+            'filter_urls': self._seen.count
+        }
@@ -0,0 +1,282 @@
+"""
+Состояние инкрементального обхода листингов (главных страниц и рубрик)
+
+Для каждой пары (источник, листинг) в SQLite хранится "верхняя отметка"
+прошлого обхода:
+
+- last_link и last_published - самая свежая ссылка листинга и самая
+  поздняя дата публикации среди обработанных статей
+- known_links - ссылки из головы листинга, уже обработанные ранее
+  (CRAWL_STATE_KNOWN_LINKS последних); обход листинга прекращается,
+  как только подряд встречаются CRAWL_STATE_STOP_AFTER_KNOWN известных
+  ссылок (допуск на закрепленные материалы вверху страницы)
+- etag и last_modified - валидаторы ответа для условного запроса;
+  на 304 Not Modified листинг не разбирается вовсе
+
+Отметка сдвигается только после обработки статей, а ссылки, которые
+не удалось загрузить, не считаются известными, поэтому прерванный
+запуск повторяется со следующего.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_state (
+    source TEXT NOT NULL,
+    listing TEXT NOT NULL,
+    last_link TEXT NOT NULL DEFAULT '',
+    last_published REAL NOT NULL DEFAULT 0,
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    known_links TEXT NOT NULL DEFAULT '[]',
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, listing)
+);
+"""
+
+
+@dataclass
+class ListingState:
+    """Верхняя отметка одного листинга"""
+    source: str
+    listing: str
+    last_link: str = ''
+    last_published: float = 0.0
+    etag: str = ''
+    last_modified: str = ''
+    known_links: List[str] = field(default_factory=list)
+    updated_at: float = 0.0
+
+    def __post_init__(self):
+        self._known: Set[str] = set(self.known_links)
+
+    def is_known(self, link: str) -> bool:
+        """Ссылка обработана в одном из прошлых обходов"""
+        return link in self._known
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Заголовки условного запроса по сохраненным валидаторам"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def advance(
+        self,
+        links: List[str],
+        published: Iterable[Optional[datetime]] = (),
+        etag: str = '',
+        last_modified: str = '',
+        limit: int = 200
+    ):
+        """
+        Сдвигает отметку после обработки листинга
+
+        Args:
+            links: Обработанные ссылки в порядке листинга (без неудачных)
+            published: Даты публикации обработанных статей
+            etag: ETag ответа ('' - не сохранять, например при неудачных загрузках)
+            last_modified: Last-Modified ответа
+            limit: Сколько известных ссылок хранить
+        """
+        merged = list(dict.fromkeys(list(links) + self.known_links))[:limit]
+        self.known_links = merged
+        self._known = set(merged)
+
+        if links:
+            self.last_link = links[0]
+        for value in published:
+            if isinstance(value, datetime):
+                self.last_published = max(self.last_published, value.timestamp())
+
+        self.etag = etag
+        self.last_modified = last_modified
+        self.updated_at = time.time()
+
+    def to_dict(self) -> Dict:
+        """Состояние для API и логов (без списка ссылок)"""
+        return {
+            'source': self.source,
+            'listing': self.listing,
+            'last_link': self.last_link,
+            'last_published': datetime.fromtimestamp(self.last_published).isoformat() if self.last_published else None,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'known_links': len(self.known_links),
+            'updated_at': datetime.fromtimestamp(self.updated_at).isoformat() if self.updated_at else None
+        }
+
+
+class CrawlState:
+    """Хранилище верхних отметок листингов в SQLite"""
+
+    def __init__(self, path: Optional[str] = None, known_links_limit: Optional[int] = None):
+        """
+        Args:
+            path: Путь к файлу базы SQLite
+            known_links_limit: Сколько известных ссылок хранить на листинг
+        """
+        self.path = path or Config.CRAWL_STATE_PATH
+        self.known_links_limit = known_links_limit or Config.CRAWL_STATE_KNOWN_LINKS
+        self._local = threading.local()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    def get(self, source: str, listing: str) -> ListingState:
+        """
+        Возвращает отметку листинга (пустую, если листинг еще не обходился)
+
+        Args:
+            source: Источник (lenta, rbc...)
+            listing: Имя листинга (main, rubric:world...)
+
+        Returns:
+            ListingState
+        """
+        row = self._connect().execute(
+            "SELECT last_link, last_published, etag, last_modified, known_links, updated_at "
+            "FROM crawl_state WHERE source = ? AND listing = ?",
+            (source, listing)
+        ).fetchone()
+        if row is None:
+            return ListingState(source, listing)
+        return ListingState(
+            source, listing,
+            last_link=row[0],
+            last_published=row[1],
+            etag=row[2],
+            last_modified=row[3],
+            known_links=json.loads(row[4]),
+            updated_at=row[5]
+        )
+
+    def save(self, state: ListingState):
+        """Сохраняет отметку листинга"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO crawl_state "
+            "(source, listing, last_link, last_published, etag, last_modified, known_links, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (state.source, state.listing, state.last_link, state.last_published, state.etag,
+             state.last_modified, json.dumps(state.known_links[:self.known_links_limit]),
+             state.updated_at or time.time())
+        )
+
+    def list_states(self, source: Optional[str] = None) -> List[ListingState]:
+        """Отметки всех листингов (или листингов одного источника)"""
+        query = "SELECT source, listing FROM crawl_state"
+        params = ()
+        if source:
+            query += " WHERE source = ?"
+            params = (source,)
+        rows = self._connect().execute(query + " ORDER BY source, listing", params).fetchall()
+        return [self.get(row[0], row[1]) for row in rows]
+
+    def reset(self, source: Optional[str] = None, listing: Optional[str] = None) -> int:
+        """
+        Сбрасывает отметки, чтобы следующий обход прошел листинги полностью
+
+        Args:
+            source: Источник (None - все)
+            listing: Листинг источника (None - все листинги)
+
+        Returns:
+            Количество удаленных отметок
+        """
+        query = "DELETE FROM crawl_state"
+        params = ()
+        if source and listing:
+            query += " WHERE source = ? AND listing = ?"
+            params = (source, listing)
+        elif source:
+            query += " WHERE source = ?"
+            params = (source,)
+        return self._connect().execute(query, params).rowcount
+
+
+def take_new_items(
+    items: Iterable[Dict],
+    state: Optional[ListingState],
+    stop_after_known: int,
+    cutoff: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Проходит листинг (от новых к старым) до уже обработанных материалов
+
+    Обход прекращается после stop_after_known известных ссылок подряд или на
+    первой статье старше cutoff. Известные ссылки в результат не попадают.
+    items может быть генератором - остаток листинга тогда не разбирается.
+
+    Args:
+        items: Словари с ключами link и (необязательно) published_date
+        state: Отметка листинга (None - обход без отметки)
+        stop_after_known: Сколько известных ссылок подряд означает конец новых
+        cutoff: Самая ранняя дата публикации
+
+    Returns:
+        Новые статьи в порядке листинга
+    """
+    new_items = []
+    known_streak = 0
+
+    for item in items:
+        published = item.get('published_date')
+        if cutoff is not None and isinstance(published, datetime) and published < cutoff:
+            break
+
+        if state is not None and state.is_known(item['link']):
+            known_streak += 1
+            if known_streak >= stop_after_known:
+                break
+            continue
+
+        known_streak = 0
+        new_items.append(item)
+
+    return new_items
+
+
+_state_instance = None
+_state_instance_lock = threading.Lock()
+
+
+def get_crawl_state() -> Optional[CrawlState]:
+    """Возвращает общее для процесса хранилище отметок (None, если выключено)"""
+    global _state_instance
+
+    if not Config.CRAWL_STATE_ENABLED:
+        return None
+
+    if _state_instance is None:
+        with _state_instance_lock:
+            if _state_instance is None:
+                _state_instance = CrawlState()
+    return _state_instance
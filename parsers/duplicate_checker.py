@@ -2,12 +2,17 @@
 Модуль для проверки дубликатов статей в базе данных
 Использует несколько методов:
 1. Проверка по точному совпадению URL
-2. Проверка по схожести заголовков (Levenshtein distance)
-3. Проверка по хешу содержимого
+2. Проверка по схожести заголовков (MinHash/LSH индекс parsers/title_index.py,
+   при отключенном индексе - SequenceMatcher по последним заголовкам)
+3. Проверка по хешу содержимого (колонка content_hash, вычисляется при вставке)
+
+Ссылки и хеши проверяются по skip-индексам idx_link и idx_content_hash
+(migrations/add_content_hash.py); пакет статей проверяется одним запросом.
 """
 import hashlib
+import time
 from difflib import SequenceMatcher
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 from datetime import datetime, timedelta
 import sys
 import os
@@ -18,6 +23,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from clickhouse_driver import Client
 from config import Config
 
+try:
+    from parsers.title_index import TitleIndex, get_title_index
+except ImportError:
+    from title_index import TitleIndex, get_title_index
+
 
 def get_clickhouse_client():
     """Получение клиента ClickHouse"""
@@ -30,26 +40,81 @@ def get_clickhouse_client():
     )
 
 
+def content_hash(title: str, content: str) -> str:
+    """
+    Вычисляет хеш контента (заголовок + содержимое)
+    
+    Хеш вычисляется один раз при сохранении статьи и хранится в колонке
+    content_hash; то же выражение на SQL (articles_table.CONTENT_HASH_EXPR)
+    - значение колонки по умолчанию для вставок без хеша.
+    
+    Args:
+        title: Заголовок статьи
+        content: Содержимое статьи
+        
+    Returns:
+        SHA256 хеш строки
+    """
+    combined = f"{(title or '').lower().strip()}{(content or '').lower().strip()}"
+    return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+
+
+def _table_list(table_name: Union[str, Sequence[str]]) -> List[str]:
+    """Одна таблица или список таблиц -> список таблиц"""
+    return [table_name] if isinstance(table_name, str) else list(table_name)
+
+
 class DuplicateChecker:
     """Класс для проверки дубликатов статей"""
     
-    def __init__(self, similarity_threshold: float = 0.85):
+    def __init__(
+        self,
+        similarity_threshold: float = 0.85,
+        client: Optional[Client] = None,
+        title_index: Optional[TitleIndex] = None
+    ):
         """
         Args:
-            similarity_threshold: Порог схожести заголовков (0-1)
+            similarity_threshold: Порог схожести заголовков для SequenceMatcher (0-1),
+                                  используется при отключенном индексе заголовков
+            client: Открытое соединение с ClickHouse (например, соединение парсера);
+                    если не передано, проверщик открывает свое при первом запросе
+            title_index: Индекс похожих заголовков (по умолчанию - общий индекс процесса,
+                         если TITLE_INDEX_ENABLED)
         """
         self.similarity_threshold = similarity_threshold
-        self.client = None
+        self.client = client
+        # Переданное снаружи соединение закрывает его владелец
+        self._owns_client = client is None
+        
+        self.title_index = title_index
+        if self.title_index is None and Config.TITLE_INDEX_ENABLED:
+            try:
+                self.title_index = get_title_index()
+            except Exception as e:
+                print(f"Индекс заголовков недоступен, используется перебор: {e}")
     
     def __enter__(self):
         """Контекстный менеджер - открываем соединение с БД"""
-        self.client = get_clickhouse_client()
+        self._get_client()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Закрываем соединение с БД"""
-        if self.client:
-            self.client.close()
+        self.close()
+    
+    def _get_client(self) -> Client:
+        """Возвращает соединение, открывая его один раз на весь срок жизни проверщика"""
+        if self.client is None:
+            self.client = get_clickhouse_client()
+            self._owns_client = True
+        return self.client
+    
+    def close(self):
+        """Закрывает собственное соединение проверщика"""
+        if self.client is not None and self._owns_client:
+            self.client.disconnect()
+            self.client = None
     
     def _calculate_text_similarity(self, text1: str, text2: str) -> float:
         """
@@ -73,42 +138,194 @@ class DuplicateChecker:
         return SequenceMatcher(None, t1, t2).ratio()
     
     def _calculate_content_hash(self, title: str, content: str) -> str:
+        """SHA256 хеш контента (см. content_hash)"""
+        return content_hash(title, content)
+    
+    def _find_exact(
+        self,
+        table_name: Union[str, Sequence[str]],
+        links: Iterable[str] = (),
+        hashes: Iterable[str] = (),
+        days_back: Optional[int] = None
+    ) -> Tuple[Set[str], Set[str]]:
         """
-        Вычисляет хеш контента (заголовок + содержимое)
+        Ищет уже сохраненные ссылки и хеши контента одним запросом
+        
+        Условия link IN (...) и content_hash IN (...) отсекают гранулы по
+        skip-индексам idx_link и idx_content_hash, поэтому строки с
+        содержимым статей не читаются.
         
         Args:
-            title: Заголовок статьи
-            content: Содержимое статьи
+            table_name: Таблица или список таблиц для проверки
+            links: URL статей
+            hashes: Хеши контента (content_hash)
+            days_back: Ограничение поиска по хешу последними N днями (None - все время)
             
         Returns:
-            SHA256 хеш строки
+            Tuple (найденные ссылки, найденные хеши)
         """
-        combined = f"{title.lower().strip()}{content.lower().strip()}"
-        return hashlib.sha256(combined.encode('utf-8')).hexdigest()
+        links = tuple(link for link in set(links) if link)
+        hashes = tuple(h for h in set(hashes) if h)
+        
+        conditions = []
+        if links:
+            conditions.append("link IN %(links)s")
+        if hashes:
+            period = f" AND published_date >= now() - INTERVAL {int(days_back)} DAY" if days_back else ""
+            conditions.append(f"(content_hash IN %(hashes)s{period})")
+        
+        if not conditions:
+            return set(), set()
+        
+        where = " OR ".join(conditions)
+        query = " UNION ALL ".join(
+            f"SELECT link, content_hash FROM news.{table} WHERE {where}"
+            for table in _table_list(table_name)
+        )
+        
+        rows = self._get_client().execute(query, {'links': links, 'hashes': hashes})
+        
+        found_links = {link for link, _ in rows if link in links}
+        found_hashes = {h for _, h in rows if h in hashes}
+        return found_links, found_hashes
     
-    def check_by_link(self, link: str, table_name: str) -> bool:
+    def _recent_titles(self, table_name: Union[str, Sequence[str]], days_back: int = 7) -> List[str]:
+        """
+        Последние заголовки за N дней (до 1000 из каждой таблицы) одним запросом
+        
+        Args:
+            table_name: Таблица или список таблиц
+            days_back: Сколько дней назад искать
+            
+        Returns:
+            Список заголовков
+        """
+        query = " UNION ALL ".join(
+            f"""(
+            SELECT title
+            FROM news.{table}
+            WHERE published_date >= now() - INTERVAL {int(days_back)} DAY
+            ORDER BY published_date DESC
+            LIMIT 1000
+            )"""
+            for table in _table_list(table_name)
+        )
+        return [title for (title,) in self._get_client().execute(query)]
+    
+    def _find_similar_title(self, title: str, existing_titles: Iterable[str]) -> Optional[str]:
+        """Возвращает первый заголовок со схожестью не ниже порога"""
+        for existing_title in existing_titles:
+            if self._calculate_text_similarity(title, existing_title) >= self.similarity_threshold:
+                return existing_title
+        return None
+    
+    def index_tables(self, table_name: Union[str, Sequence[str]], force: bool = False) -> int:
+        """
+        Загружает в индекс заголовков новые записи окна из таблиц
+        
+        Первая загрузка читает все окно, следующие - только строки новее
+        метки loaded_until таблицы (не чаще TITLE_INDEX_REFRESH_INTERVAL):
+        так в индекс попадают статьи, сохраненные другими парсерами и
+        процессами. Свои статьи добавляются сразу через remember.
+        
+        Args:
+            table_name: Таблица или список таблиц
+            force: Перечитать все окно без учета метки и интервала
+            
+        Returns:
+            Количество добавленных записей
+        """
+        if self.title_index is None:
+            return 0
+        
+        index = self.title_index
+        lead = f", substring(content, 1, {int(index.lead_chars)})" if index.lead_chars else ", ''"
+        added = 0
+        
+        for table in _table_list(table_name):
+            since = time.time() - index.window_days * 86400
+            state = None if force else index.scope_state(table)
+            if state is not None:
+                loaded_at, loaded_until = state
+                if time.time() - loaded_at < Config.TITLE_INDEX_REFRESH_INTERVAL:
+                    continue
+                since = max(since, loaded_until)
+            
+            # Сравнение включает границу: строки с той же секундой, что и метка,
+            # могли быть вставлены после прошлой загрузки (повторы игнорируются)
+            rows = self._get_client().execute(f"""
+            SELECT link, title, toUnixTimestamp(published_date){lead}
+            FROM news.{table}
+            WHERE published_date >= toDateTime(%(since)s)
+            """, {'since': int(since)})
+            added += index.add_many(
+                (link, title, table, published_at, content)
+                for link, title, published_at, content in rows
+            )
+            index.mark_loaded(table, max((row[2] for row in rows), default=since))
+        
+        return added
+    
+    def _find_similar_indexed(
+        self,
+        title: str,
+        table_name: Union[str, Sequence[str]],
+        content: Optional[str] = None,
+        days_back: Optional[float] = None
+    ) -> Optional[str]:
+        """Ищет похожий заголовок по индексу (новые строки таблиц подгружаются через index_tables)"""
+        self.index_tables(table_name)
+        similar = self.title_index.find_similar(
+            title,
+            scopes=_table_list(table_name),
+            content=content,
+            window_days=days_back
+        )
+        return similar[0].title if similar else None
+    
+    def remember(
+        self,
+        title: str,
+        content: str,
+        link: str,
+        table_name: Union[str, Sequence[str]],
+        published_date: Optional[datetime] = None
+    ):
+        """
+        Добавляет сохраненную статью в индекс заголовков
+        
+        Args:
+            title: Заголовок
+            content: Содержимое
+            link: URL
+            table_name: Таблица или список таблиц, в которые сохранена статья
+            published_date: Дата публикации
+        """
+        if self.title_index is None:
+            return
+        
+        try:
+            self.title_index.add(link, title, _table_list(table_name), published_date, content)
+        except Exception as e:
+            print(f"Ошибка записи в индекс заголовков: {e}")
+    
+    def check_by_link(self, link: str, table_name: Union[str, Sequence[str]]) -> bool:
         """
         Проверяет наличие статьи по URL
         
         Args:
             link: URL статьи
-            table_name: Название таблицы для проверки
+            table_name: Название таблицы (или список таблиц) для проверки
             
         Returns:
             True если дубликат найден, False иначе
         """
-        if not link or not self.client:
+        if not link:
             return False
         
         try:
-            query = f"""
-            SELECT count(*) as cnt
-            FROM news.{table_name}
-            WHERE link = %(link)s
-            """
-            
-            result = self.client.execute(query, {'link': link})
-            return result[0][0] > 0
+            found_links, _ = self._find_exact(table_name, links=[link])
+            return link in found_links
             
         except Exception as e:
             print(f"Ошибка проверки по ссылке: {e}")
@@ -117,43 +334,30 @@ class DuplicateChecker:
     def check_by_title_similarity(
         self,
         title: str,
-        table_name: str,
-        days_back: int = 7
+        table_name: Union[str, Sequence[str]],
+        days_back: Optional[float] = None
     ) -> Tuple[bool, Optional[str]]:
         """
         Проверяет наличие похожей статьи по заголовку
         
         Args:
             title: Заголовок статьи
-            table_name: Название таблицы для проверки
-            days_back: Сколько дней назад искать (по умолчанию 7)
+            table_name: Название таблицы (или список таблиц) для проверки
+            days_back: Сколько дней назад искать (по умолчанию TITLE_INDEX_WINDOW_DAYS)
             
         Returns:
             Tuple (is_duplicate, similar_title)
         """
-        if not title or not self.client:
+        if not title:
             return False, None
         
         try:
-            # Получаем последние заголовки за N дней
-            query = f"""
-            SELECT title
-            FROM news.{table_name}
-            WHERE published_date >= now() - INTERVAL {days_back} DAY
-            ORDER BY published_date DESC
-            LIMIT 1000
-            """
-            
-            results = self.client.execute(query)
-            
-            # Проверяем схожесть с каждым заголовком
-            for (existing_title,) in results:
-                similarity = self._calculate_text_similarity(title, existing_title)
-                
-                if similarity >= self.similarity_threshold:
-                    return True, existing_title
-            
-            return False, None
+            if self.title_index is not None:
+                similar_title = self._find_similar_indexed(title, table_name, days_back=days_back)
+            else:
+                days_back = days_back if days_back is not None else Config.TITLE_INDEX_WINDOW_DAYS
+                similar_title = self._find_similar_title(title, self._recent_titles(table_name, days_back))
+            return similar_title is not None, similar_title
             
         except Exception as e:
             print(f"Ошибка проверки по заголовку: {e}")
@@ -163,8 +367,8 @@ class DuplicateChecker:
         self,
         title: str,
         content: str,
-        table_name: str,
-        days_back: int = 7
+        table_name: Union[str, Sequence[str]],
+        days_back: Optional[int] = None
     ) -> bool:
         """
         Проверяет наличие статьи по хешу содержимого
@@ -172,50 +376,110 @@ class DuplicateChecker:
         Args:
             title: Заголовок статьи
             content: Содержимое статьи
-            table_name: Название таблицы для проверки
-            days_back: Сколько дней назад искать
+            table_name: Название таблицы (или список таблиц) для проверки
+            days_back: Сколько дней назад искать (None - за все время)
             
         Returns:
             True если дубликат найден, False иначе
         """
-        if not title or not content or not self.client:
+        if not title or not content:
             return False
         
         try:
-            content_hash = self._calculate_content_hash(title, content)
-            
-            # Получаем хеши существующих статей
-            query = f"""
-            SELECT title, content
-            FROM news.{table_name}
-            WHERE published_date >= now() - INTERVAL {days_back} DAY
-            LIMIT 1000
-            """
+            article_hash = content_hash(title, content)
+            _, found_hashes = self._find_exact(table_name, hashes=[article_hash], days_back=days_back)
+            return article_hash in found_hashes
             
-            results = self.client.execute(query)
+        except Exception as e:
+            print(f"Ошибка проверки по хешу: {e}")
+            return False
+    
+    def check_batch(
+        self,
+        articles: Sequence[Dict],
+        table_name: Union[str, Sequence[str]],
+        check_methods: Sequence[str] = ('link', 'title', 'content'),
+        days_back: Optional[float] = None
+    ) -> Dict[int, str]:
+        """
+        Проверяет пакет статей на дубликаты
+        
+        Ссылки и хеши всех статей проверяются одним запросом с IN по всем
+        таблицам, заголовки - по индексу похожих заголовков (без индекса -
+        по одной выборке последних заголовков на пакет).
+        
+        Args:
+            articles: Статьи - словари с ключами title, content, link
+                      (отсутствующие поля не проверяются)
+            table_name: Таблица или список таблиц для проверки
+            check_methods: Методы проверки ['link', 'title', 'content']
+            days_back: Сколько дней назад искать похожие заголовки (по умолчанию TITLE_INDEX_WINDOW_DAYS)
             
-            for (existing_title, existing_content) in results:
-                existing_hash = self._calculate_content_hash(
-                    existing_title,
-                    existing_content or ""
+        Returns:
+            Словарь {индекс статьи в articles: причина} только для дубликатов
+        """
+        if not articles:
+            return {}
+        
+        links = [article.get('link') for article in articles] if 'link' in check_methods else []
+        hashes = [
+            content_hash(article.get('title'), article.get('content'))
+            if 'content' in check_methods and article.get('title') and article.get('content') else None
+            for article in articles
+        ]
+        
+        try:
+            found_links, found_hashes = self._find_exact(table_name, links, hashes)
+        except Exception as e:
+            print(f"Ошибка проверки по ссылке и хешу: {e}")
+            found_links, found_hashes = set(), set()
+        
+        check_titles = 'title' in check_methods and any(article.get('title') for article in articles)
+        recent_titles = None
+        if check_titles and self.title_index is None:
+            try:
+                recent_titles = self._recent_titles(
+                    table_name, days_back if days_back is not None else Config.TITLE_INDEX_WINDOW_DAYS
                 )
-                
-                if content_hash == existing_hash:
-                    return True
+            except Exception as e:
+                print(f"Ошибка проверки по заголовку: {e}")
+        
+        duplicates = {}
+        for index, article in enumerate(articles):
+            # Порядок проверок и причины - как в is_duplicate
+            if links and links[index] in found_links:
+                duplicates[index] = "Дубликат по URL"
+                continue
             
-            return False
+            title = article.get('title')
+            similar_title = None
+            if check_titles and title:
+                if recent_titles is not None:
+                    similar_title = self._find_similar_title(title, recent_titles)
+                elif self.title_index is not None:
+                    try:
+                        similar_title = self._find_similar_indexed(
+                            title, table_name, article.get('content'), days_back
+                        )
+                    except Exception as e:
+                        print(f"Ошибка проверки по заголовку: {e}")
             
-        except Exception as e:
-            print(f"Ошибка проверки по хешу: {e}")
-            return False
+            if similar_title is not None:
+                duplicates[index] = f"Похожий заголовок: '{similar_title}'"
+                continue
+            
+            if hashes[index] in found_hashes:
+                duplicates[index] = "Дубликат по содержимому"
+        
+        return duplicates
     
     def is_duplicate(
         self,
         title: str,
         content: str,
         link: str,
-        table_name: str,
-        check_methods: list = ['link', 'title', 'content']
+        table_name: Union[str, Sequence[str]],
+        check_methods: Sequence[str] = ('link', 'title', 'content')
     ) -> Tuple[bool, str]:
         """
         Комплексная проверка на дубликаты
@@ -224,28 +488,20 @@ class DuplicateChecker:
             title: Заголовок статьи
             content: Содержимое статьи
             link: URL статьи
-            table_name: Название таблицы для проверки
+            table_name: Название таблицы (или список таблиц) для проверки
             check_methods: Методы проверки ['link', 'title', 'content']
             
         Returns:
             Tuple (is_duplicate, reason)
         """
-        # Проверка по ссылке
-        if 'link' in check_methods and link:
-            if self.check_by_link(link, table_name):
-                return True, "Дубликат по URL"
-        
-        # Проверка по заголовку
-        if 'title' in check_methods and title:
-            is_dup, similar_title = self.check_by_title_similarity(title, table_name)
-            if is_dup:
-                return True, f"Похожий заголовок: '{similar_title}'"
-        
-        # Проверка по содержимому
-        if 'content' in check_methods and content:
-            if self.check_by_content_hash(title, content, table_name):
-                return True, "Дубликат по содержимому"
+        duplicates = self.check_batch(
+            [{'title': title, 'content': content, 'link': link}],
+            table_name,
+            check_methods
+        )
         
+        if 0 in duplicates:
+            return True, duplicates[0]
         return False, ""
     
     def get_duplicate_stats(self, table_name: str, days: int = 7) -> dict:
@@ -259,9 +515,6 @@ class DuplicateChecker:
         Returns:
             Словарь со статистикой
         """
-        if not self.client:
-            return {}
-        
         try:
             # Ищем дубликаты по ссылкам
             query = f"""
@@ -273,7 +526,7 @@ class DuplicateChecker:
             HAVING cnt > 1
             """
             
-            results = self.client.execute(query)
+            results = self._get_client().execute(query)
             
             return {
                 'duplicates_by_link': len(results),
@@ -288,9 +541,13 @@ class DuplicateChecker:
 
 
 # Создаем глобальный экземпляр
-def create_duplicate_checker(similarity_threshold: float = 0.85) -> DuplicateChecker:
+def create_duplicate_checker(
+    similarity_threshold: float = 0.85,
+    client: Optional[Client] = None,
+    title_index: Optional[TitleIndex] = None
+) -> DuplicateChecker:
     """Фабричная функция для создания проверщика дубликатов"""
-    return DuplicateChecker(similarity_threshold)
+    return DuplicateChecker(similarity_threshold, client, title_index)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,187 @@
+"""
+Обнаружение статей по RSS/Atom-лентам и news-sitemap
+
+Лента или sitemap дает заголовок, ссылку, дату публикации, рубрику и
+анонс статьи без загрузки и разбора HTML-листингов. Многие ленты
+(формат Яндекс.Новостей, content:encoded) содержат и полный текст -
+тогда страница статьи не загружается вовсе.
+
+- parse_feed: элементы RSS/Atom (feedparser)
+- parse_sitemap: элементы news-sitemap / обычного sitemap и ссылки
+  на вложенные sitemap из индекса (xml.etree, без зависимостей)
+
+Элементы - словари в формате листингов парсеров: title, link, rubric,
+published_date (локальное время без часового пояса, как datetime.now()),
+summary и, если лента содержит полный текст, content.
+"""
+import calendar
+import html
+import logging
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+try:
+    import feedparser
+    FEEDPARSER_AVAILABLE = True
+except ImportError:
+    FEEDPARSER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def strip_markup(value: Optional[str]) -> str:
+    """Текст без HTML-тегов и сущностей, с одиночными пробелами"""
+    if not value:
+        return ''
+    return _WHITESPACE_RE.sub(' ', html.unescape(_HTML_TAG_RE.sub(' ', value))).strip()
+
+
+def _local_time(value: datetime) -> datetime:
+    """Дата в локальном времени без часового пояса"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def parse_w3c_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Разбирает дату sitemap (W3C Datetime: 2026-10-17, 2026-10-17T10:00:00+03:00)
+
+    Args:
+        value: Строка даты
+
+    Returns:
+        datetime или None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    try:
+        return _local_time(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def _entry_full_text(entry) -> str:
+    """Полный текст записи: content:encoded или yandex:full-text (и аналоги)"""
+    for content in entry.get('content') or ():
+        text = strip_markup(content.get('value'))
+        if text:
+            return text
+    for key, value in entry.items():
+        if isinstance(value, str) and key.replace('_', '-').endswith('full-text'):
+            return strip_markup(value)
+    return ''
+
+
+def parse_feed(content: bytes, base_url: str = '', content_type: Optional[str] = None) -> List[Dict]:
+    """
+    Разбирает RSS/Atom-ленту
+
+    Args:
+        content: Тело ответа
+        base_url: URL ленты (для относительных ссылок)
+        content_type: Заголовок Content-Type (кодировка ленты)
+
+    Returns:
+        Элементы ленты в порядке ленты (пустой список, если это не лента)
+    """
+    if not FEEDPARSER_AVAILABLE:
+        logger.warning("feedparser не установлен, RSS-ленты не разбираются")
+        return []
+
+    headers = {'content-type': content_type} if content_type else {}
+    feed = feedparser.parse(content, response_headers=headers)
+
+    items = []
+    for entry in feed.entries:
+        link = entry.get('link')
+        title = strip_markup(entry.get('title'))
+        if not link or not title:
+            continue
+
+        published = entry.get('published_parsed') or entry.get('updated_parsed')
+        tags = entry.get('tags') or []
+
+        item = {
+            'title': title,
+            'link': urljoin(base_url, link.strip()),
+            'rubric': (tags[0].get('term') or '').strip() if tags else '',
+            'published_date': datetime.fromtimestamp(calendar.timegm(published)) if published else None,
+            'summary': strip_markup(entry.get('summary'))
+        }
+        full_text = _entry_full_text(entry)
+        if full_text:
+            item['content'] = full_text
+        items.append(item)
+
+    return items
+
+
+def _local_name(tag: str) -> str:
+    """Имя элемента без пространства имен"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> str:
+    """Текст первого дочернего элемента (на любой глубине) с данным локальным именем"""
+    for child in element.iter():
+        if child is not element and _local_name(child.tag) == name:
+            return (child.text or '').strip()
+    return ''
+
+
+def parse_sitemap(content: bytes, base_url: str = '') -> Tuple[List[Dict], List[Tuple[str, Optional[datetime]]]]:
+    """
+    Разбирает sitemap (urlset, в том числе с расширением news) или индекс sitemap
+
+    Args:
+        content: Тело ответа
+        base_url: URL sitemap (для относительных ссылок)
+
+    Returns:
+        Tuple (элементы urlset, вложенные sitemap индекса [(url, lastmod)])
+
+    Raises:
+        ET.ParseError: если это не XML
+    """
+    root = ET.fromstring(content)
+    items, sitemaps = [], []
+
+    for element in root:
+        name = _local_name(element.tag)
+        loc = _child_text(element, 'loc')
+        if not loc:
+            continue
+        loc = urljoin(base_url, loc)
+
+        if name == 'sitemap':
+            sitemaps.append((loc, parse_w3c_date(_child_text(element, 'lastmod'))))
+        elif name == 'url':
+            # Дата и заголовок - из news:news, иначе lastmod
+            published = (
+                parse_w3c_date(_child_text(element, 'publication_date'))
+                or parse_w3c_date(_child_text(element, 'lastmod'))
+            )
+            items.append({
+                'title': strip_markup(_child_text(element, 'title')),
+                'link': loc,
+                'rubric': '',
+                'published_date': published,
+                'summary': strip_markup(_child_text(element, 'keywords'))
+            })
+
+    return items, sitemaps
+
+
+def newest_first(items: List[Dict]) -> List[Dict]:
+    """Элементы от новых к старым (без даты - в конце, в исходном порядке)"""
+    return sorted(items, key=lambda item: item.get('published_date') or datetime.min, reverse=True)
@@ -6,20 +6,35 @@ AI-классификатор новостей на базе gen-api.ru с Long-
 Этот модуль содержит функции для:
 - Классификации новостей по категориям с помощью gen-api.ru
 - Расчет индексов социальной напряженности и всплеска
-- Кэширование результатов для экономии токенов
-- Long-Polling для получения результатов
+- Кэширование результатов для экономии токенов (SQLite, см. classification_cache.py)
+- Локальная модель, отвечающая без запроса к API на уверенных примерах (см. local_classifier.py)
+- Общий Long-Polling для многих задач одновременно (см. gen_api_scheduler.py)
 """
 
 import os
+import sys
 import json
 import logging
 import hashlib
-import requests
-import time
-from typing import Dict, Optional, Tuple
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+try:
+    from parsers.classification_cache import get_classification_cache
+    from parsers.gen_api_scheduler import get_gen_api_scheduler
+    from parsers.local_classifier import get_local_classifier, make_text
+except ImportError:
+    from classification_cache import get_classification_cache
+    from gen_api_scheduler import get_gen_api_scheduler
+    from local_classifier import get_local_classifier, make_text
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
 # Загружаем переменные окружения
 load_dotenv()
 
@@ -28,6 +43,18 @@ logger = logging.getLogger(__name__)
 class GenApiNewsClassifier:
     """AI-классификатор новостей на базе gen-api.ru с Long-Polling"""
     
+    # Описание категорий и индексов, общее для одиночного и пакетного промпта
+    CATEGORIES_PROMPT = """КАТЕГОРИИ:
+1. military_operations - Военные операции, боевые действия, атаки
+2. humanitarian_crisis - Гуманитарные кризисы, беженцы, жертвы
+3. economic_consequences - Экономические последствия, санкции, торговля
+4. political_decisions - Политические решения, заявления, дипломатия
+5. information_social - Информационно-социальные аспекты
+
+ИНДЕКСЫ (0-100):
+- social_tension_index: Насколько новость может вызвать социальную напряженность
+- spike_index: Насколько новость может вызвать всплеск обсуждений"""
+    
     def __init__(self, api_key: Optional[str] = None):
         """
         Инициализация классификатора
@@ -55,10 +82,14 @@ class GenApiNewsClassifier:
             '5': 'information_social'
         }
         
-        # Кэш для результатов классификации
-        self.cache = {}
-        self.cache_file = "gen_api_classifier_cache.json"
-        self.load_cache()
+        # Персистентный кэш результатов классификации (общий для процесса)
+        self.cache = get_classification_cache()
+        
+        # Общий планировщик задач gen-api (создается при первом запросе)
+        self.scheduler = None
+        
+        # Локальная модель, обученная на метках gen-api (None, если не обучена)
+        self.local_model = get_local_classifier()
         
         # Статистика использования
         self.stats = {
@@ -66,30 +97,15 @@ class GenApiNewsClassifier:
             'cached_requests': 0,
             'tokens_used': 0,
             'errors': 0,
-            'api_requests': 0
+            'api_requests': 0,
+            'local_answers': 0,
+            'batch_requests': 0,
+            'batch_items_parsed': 0,
+            'batch_items_retried': 0
         }
         
         logger.info("GenApiNewsClassifier инициализирован с gen-api.ru")
     
-    def load_cache(self):
-        """Загружает кэш из файла"""
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.cache = json.load(f)
-                logger.info(f"Загружен кэш: {len(self.cache)} записей")
-        except Exception as e:
-            logger.warning(f"Ошибка при загрузке кэша: {e}")
-            self.cache = {}
-    
-    def save_cache(self):
-        """Сохраняет кэш в файл"""
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.warning(f"Ошибка при сохранении кэша: {e}")
-    
     def _get_cache_key(self, title: str, content: str) -> str:
         """Генерирует ключ кэша для заголовка и контента"""
         text = f"{title}|{content}"
@@ -103,16 +119,7 @@ class GenApiNewsClassifier:
 
 КОНТЕНТ: {content}
 
-КАТЕГОРИИ:
-1. military_operations - Военные операции, боевые действия, атаки
-2. humanitarian_crisis - Гуманитарные кризисы, беженцы, жертвы
-3. economic_consequences - Экономические последствия, санкции, торговля
-4. political_decisions - Политические решения, заявления, дипломатия
-5. information_social - Информационно-социальные аспекты
-
-ИНДЕКСЫ (0-100):
-- social_tension_index: Насколько новость может вызвать социальную напряженность
-- spike_index: Насколько новость может вызвать всплеск обсуждений
+{self.CATEGORIES_PROMPT}
 
 Ответь ТОЛЬКО в формате JSON:
 {{
@@ -125,6 +132,43 @@ class GenApiNewsClassifier:
         
         return prompt
     
+    def _create_batch_classification_prompt(self, items: Dict[str, Tuple[str, str]]) -> str:
+        """
+        Создает промпт для классификации нескольких новостей одним запросом
+        
+        Args:
+            items: Словарь {id: (заголовок, контент)}
+            
+        Returns:
+            str: Промпт
+        """
+        news_blocks = "\n\n".join(
+            f"[ID: {item_id}]\nЗАГОЛОВОК: {title}\nКОНТЕНТ: {content}"
+            for item_id, (title, content) in items.items()
+        )
+        
+        prompt = f"""Проанализируй каждую новость и определи её категорию, индексы социальной напряженности и всплеска.
+
+НОВОСТИ:
+
+{news_blocks}
+
+{self.CATEGORIES_PROMPT}
+
+Ответь ТОЛЬКО JSON-массивом, по одному объекту на каждую новость, сохраняя её id:
+[
+  {{
+    "id": "id_новости",
+    "category_id": "номер_категории",
+    "category_name": "название_категории",
+    "social_tension_index": число_от_0_до_100,
+    "spike_index": число_от_0_до_100,
+    "confidence": число_от_0_до_1
+  }}
+]"""
+        
+        return prompt
+    
     def _make_api_request(self, prompt: str, max_tokens: int = 1000) -> Dict:
         """
         Отправляет запрос к gen-api.ru и получает результат через Long-Polling
@@ -135,132 +179,86 @@ class GenApiNewsClassifier:
         Returns:
             Dict: Ответ от API
         """
-        if not self.api_key:
-            raise Exception("API ключ gen-api.ru не настроен")
-        
         try:
-            # Создаем задачу на генерацию
-            input_data = {
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "is_sync": False,      # Асинхронный режим для Long-Polling
-                "max_tokens": max_tokens,
-                "temperature": 0.3,
-                "top_p": 0.95
-            }
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json',
-                'Authorization': f'Bearer {self.api_key}'
-            }
-            
-            logger.info("Отправляем запрос к gen-api.ru...")
-            response = requests.post(self.api_url, json=input_data, headers=headers, timeout=30)
-            
-            if response.status_code != 200:
-                raise Exception(f"API вернул статус {response.status_code}: {response.text}")
-            
-            task_data = response.json()
-            request_id = task_data.get('request_id')
-            
-            if not request_id:
-                raise Exception(f"Не получен request_id: {task_data}")
-            
-            logger.info(f"Задача создана, request_id: {request_id}")
-            
-            # Long-Polling для получения результата
-            result = self._wait_for_result(request_id)
-            
-            # Подсчитываем токены (если есть информация о стоимости)
-            if 'cost' in result:
-                cost = result['cost']
-                estimated_tokens = int(cost * 1000)  # Примерная оценка
-                self.stats['tokens_used'] += estimated_tokens
-            
-            self.stats['api_requests'] += 1
-            return result
-            
+            return self._submit_prompt(prompt, max_tokens).result()
         except Exception as e:
             logger.error(f"Ошибка при обращении к gen-api.ru: {e}")
             raise Exception(f"Ошибка API: {e}")
     
-    def _wait_for_result(self, request_id: int, max_wait_time: int = 60) -> Dict:
+    def _submit_prompt(self, prompt: str, max_tokens: int = 1000) -> Future:
         """
-        Ожидает результат выполнения задачи через Long-Polling
+        Отправляет промпт через общий планировщик, не дожидаясь результата
         
         Args:
-            request_id: ID запроса
-            max_wait_time: Максимальное время ожидания в секундах
+            prompt: Промпт для отправки
+            max_tokens: Максимальное количество токенов в ответе
             
         Returns:
-            Dict: Результат выполнения
+            Future: Ответ от API (статус задачи 'success')
         """
-        headers = {
-            'Accept': 'application/json',
-            'Authorization': f'Bearer {self.api_key}'
-        }
+        if not self.api_key:
+            raise Exception("API ключ gen-api.ru не настроен")
         
-        # Правильный URL для проверки статуса согласно документации
-        status_url = f"https://api.gen-api.ru/api/v1/request/get/{request_id}"
+        if self.scheduler is None:
+            self.scheduler = get_gen_api_scheduler(self.api_key)
         
-        start_time = time.time()
+        future = self.scheduler.submit_prompt(prompt, max_tokens=max_tokens)
+        future.add_done_callback(self._account_api_request)
+        return future
+    
+    def _account_api_request(self, future: Future):
+        """Учитывает выполненный запрос в статистике"""
+        if future.exception() is not None:
+            return
         
-        while time.time() - start_time < max_wait_time:
-            try:
-                logger.info(f"Проверяем статус задачи {request_id}...")
-                response = requests.get(status_url, headers=headers, timeout=10)
-                
-                if response.status_code != 200:
-                    logger.warning(f"Ошибка при проверке статуса: {response.status_code}")
-                    time.sleep(5)  # Ждем 5 секунд перед следующей проверкой
-                    continue
-                
-                status_data = response.json()
-                status = status_data.get('status')
-                
-                logger.info(f"Статус задачи {request_id}: {status}")
-                
-                if status == 'success':
-                    logger.info("✅ Задача выполнена успешно!")
-                    return status_data
-                elif status == 'failed':
-                    error_msg = status_data.get('error', 'Неизвестная ошибка')
-                    raise Exception(f"Задача завершилась с ошибкой: {error_msg}")
-                elif status in ['starting', 'processing']:
-                    # Задача еще выполняется, ждем 5 секунд
-                    logger.info("Задача в работе, ждем 5 секунд...")
-                    time.sleep(5)
-                    continue
-                else:
-                    logger.warning(f"Неизвестный статус: {status}")
-                    time.sleep(5)
-                    continue
-                    
-            except requests.RequestException as e:
-                logger.warning(f"Ошибка при проверке статуса: {e}")
-                time.sleep(5)
-                continue
+        result = future.result()
+        
+        # Подсчитываем токены (если есть информация о стоимости)
+        if 'cost' in result:
+            cost = result['cost']
+            estimated_tokens = int(cost * 1000)  # Примерная оценка
+            self.stats['tokens_used'] += estimated_tokens
         
-        raise Exception(f"Превышено время ожидания результата ({max_wait_time} сек)")
+        self.stats['api_requests'] += 1
+    
+    def _response_text(self, response_data: Dict) -> str:
+        """Извлекает текст ответа модели"""
+        # Извлекаем ответ из result (формат Long-Polling)
+        result = response_data.get('result', [])
+        
+        if result and len(result) > 0:
+            # Берем первый элемент из массива result
+            return result[0]
+        
+        # Fallback для старого формата
+        output = response_data.get('output', '')
+        return str(output)
+    
+    def _normalize_classification(self, data: Dict) -> Dict:
+        """Проверяет поля классификации и приводит их к допустимым диапазонам"""
+        # Валидируем данные
+        required_fields = ['category_id', 'social_tension_index', 'spike_index', 'confidence']
+        for field in required_fields:
+            if field not in data:
+                raise ValueError(f"Отсутствует поле {field}")
+        
+        # Нормализуем данные
+        category_id = str(data['category_id'])
+        if category_id not in self.categories:
+            raise ValueError(f"Неизвестная категория: {category_id}")
+        
+        return {
+            'category_id': category_id,
+            'category_name': self.categories[category_id],
+            'social_tension_index': max(0, min(100, int(data['social_tension_index']))),
+            'spike_index': max(0, min(100, int(data['spike_index']))),
+            'confidence': max(0.0, min(1.0, float(data['confidence'])))
+        }
     
     def _parse_response(self, response_data: Dict) -> Dict:
         """Парсит ответ от API и извлекает данные классификации"""
         try:
-            # Извлекаем ответ из result (формат Long-Polling)
-            result = response_data.get('result', [])
-            
-            if result and len(result) > 0:
-                # Берем первый элемент из массива result
-                response_text = result[0]
-            else:
-                # Fallback для старого формата
-                output = response_data.get('output', '')
-                response_text = str(output)
+            response_text = self._response_text(response_data)
             
             # Пытаемся найти JSON в ответе
             start_idx = response_text.find('{')
@@ -272,30 +270,49 @@ class GenApiNewsClassifier:
             json_str = response_text[start_idx:end_idx]
             data = json.loads(json_str)
             
-            # Валидируем данные
-            required_fields = ['category_id', 'social_tension_index', 'spike_index', 'confidence']
-            for field in required_fields:
-                if field not in data:
-                    raise ValueError(f"Отсутствует поле {field}")
-            
-            # Нормализуем данные
-            category_id = str(data['category_id'])
-            if category_id not in self.categories:
-                raise ValueError(f"Неизвестная категория: {category_id}")
-            
-            return {
-                'category_id': category_id,
-                'category_name': self.categories[category_id],
-                'social_tension_index': max(0, min(100, int(data['social_tension_index']))),
-                'spike_index': max(0, min(100, int(data['spike_index']))),
-                'confidence': max(0.0, min(1.0, float(data['confidence'])))
-            }
+            return self._normalize_classification(data)
             
         except Exception as e:
             logger.error(f"Ошибка при парсинге ответа: {e}")
             logger.error(f"Ответ API: {response_data}")
             raise ValueError(f"Не удалось распарсить ответ: {e}")
     
+    def _parse_batch_response(self, response_data: Dict) -> Dict[str, Dict]:
+        """
+        Парсит ответ на пакетный промпт
+        
+        Элементы с ошибками пропускаются, чтобы их можно было
+        переклассифицировать отдельными запросами.
+        
+        Args:
+            response_data: Ответ от API
+            
+        Returns:
+            Dict: {id новости: результат классификации}
+        """
+        response_text = self._response_text(response_data)
+        
+        start_idx = response_text.find('[')
+        end_idx = response_text.rfind(']') + 1
+        
+        if start_idx == -1 or end_idx == 0:
+            raise ValueError("JSON-массив не найден в ответе")
+        
+        items = json.loads(response_text[start_idx:end_idx])
+        if not isinstance(items, list):
+            raise ValueError("Ответ не является JSON-массивом")
+        
+        results = {}
+        for item in items:
+            if not isinstance(item, dict) or 'id' not in item:
+                continue
+            try:
+                results[str(item['id'])] = self._normalize_classification(item)
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Некорректный элемент пакетного ответа {item.get('id')}: {e}")
+        
+        return results
+    
     def _fallback_classification(self, title: str, content: str) -> Dict:
         """Fallback классификация на основе ключевых слов"""
         logger.warning(f"Используется fallback классификация для: {title[:50]}...")
@@ -343,43 +360,253 @@ class GenApiNewsClassifier:
         Returns:
             Dict: Результат классификации
         """
+        return self.classify_async(title, content).result()
+    
+    def classify_async(self, title: str, content: str) -> Future:
+        """
+        Классифицирует новость, не дожидаясь ответа API
+        
+        Задача отправляется в gen-api.ru сразу, а ее статус проверяет
+        общий поток опроса, поэтому одновременно может выполняться
+        много классификаций. При ошибке Future получает результат
+        fallback классификации, а не исключение.
+        
+        Args:
+            title: Заголовок новости
+            content: Содержимое новости
+            
+        Returns:
+            Future: Результат классификации (тот же формат, что у classify)
+        """
         self.stats['total_requests'] += 1
         
         # Проверяем кэш
         cache_key = self._get_cache_key(title, content)
-        if cache_key in self.cache:
+        cached_result = self._cache_get(cache_key)
+        if cached_result is not None:
             self.stats['cached_requests'] += 1
-            result = self.cache[cache_key].copy()
+            result = cached_result
             result['cached'] = True
             logger.info(f"Результат получен из кэша для: {title[:50]}...")
-            return result
+            return self._resolved(result)
+        
+        # Уверенный ответ локальной модели - без запроса к API
+        local_result = self._local_predict(title, content)
+        if local_result is not None:
+            return self._resolved(local_result)
+        
+        return self._classify_uncached(title, content, cache_key)
+    
+    def _resolved(self, result: Dict) -> Future:
+        """Возвращает уже завершенный Future с результатом"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        future.set_result(result)
+        return future
+    
+    def _local_predict(self, title: str, content: str, min_confidence: Optional[float] = None) -> Optional[Dict]:
+        """
+        Классифицирует новость локальной моделью
+        
+        Args:
+            title: Заголовок новости
+            content: Содержимое новости
+            min_confidence: Порог уверенности (по умолчанию порог модели)
+            
+        Returns:
+            Dict: Результат или None, если модели нет или она не уверена
+        """
+        if self.local_model is None:
+            return None
         
         try:
-            # Создаем промпт
+            result = self.local_model.predict(title, content)
+        except Exception as e:
+            logger.warning(f"Ошибка локальной модели: {e}")
+            return None
+        
+        threshold = self.local_model.threshold if min_confidence is None else min_confidence
+        if result is None or result['confidence'] < threshold:
+            return None
+        
+        self.stats['local_answers'] += 1
+        logger.info(f"Новость классифицирована локальной моделью: {result['category_name']} ({result['confidence']:.2f})")
+        return result
+    
+    def _classify_uncached(self, title: str, content: str, cache_key: str) -> Future:
+        """Отправляет одну новость на классификацию (кэш уже проверен)"""
+        result_future = Future()
+        result_future.set_running_or_notify_cancel()
+        
+        def on_response(api_future: Future):
+            try:
+                # Парсим ответ
+                result = self._parse_response(api_future.result())
+                result['cached'] = False
+                
+                # Сохраняем в кэш (одна запись, без перезаписи всего кэша)
+                self._cache_set(cache_key, result, title, content)
+                
+                logger.info(f"Новость классифицирована: {result['category_name']} (напряженность: {result['social_tension_index']})")
+            except Exception as e:
+                result = self._classification_failed(title, content, e)
+            result_future.set_result(result)
+        
+        try:
+            # Создаем промпт и отправляем задачу
             prompt = self._create_classification_prompt(title, content)
+            self._submit_prompt(prompt).add_done_callback(on_response)
+        except Exception as e:
+            result_future.set_result(self._classification_failed(title, content, e))
+        
+        return result_future
+    
+    def classify_many(self, articles: List[Tuple[str, str]], batch_size: Optional[int] = None) -> List[Dict]:
+        """
+        Классифицирует несколько новостей пакетными запросами
+        
+        Args:
+            articles: Список пар (заголовок, содержимое)
+            batch_size: Новостей в одном запросе (по умолчанию GEN_API_BATCH_SIZE)
             
-            # Отправляем запрос к API
-            response = self._make_api_request(prompt)
+        Returns:
+            List[Dict]: Результаты в том же порядке
+        """
+        futures = self.classify_batch_async(articles, batch_size)
+        return [future.result() for future in futures]
+    
+    def classify_batch_async(self, articles: List[Tuple[str, str]], batch_size: Optional[int] = None) -> List[Future]:
+        """
+        Классифицирует новости, объединяя до batch_size новостей в один промпт
+        
+        Каждая новость получает стабильный id (префикс ключа кэша), модель
+        возвращает JSON-массив. Новости, которых нет в ответе или которые
+        не удалось разобрать, классифицируются отдельными запросами.
+        
+        Args:
+            articles: Список пар (заголовок, содержимое)
+            batch_size: Новостей в одном запросе (по умолчанию GEN_API_BATCH_SIZE)
             
-            # Парсим ответ
-            result = self._parse_response(response)
-            result['cached'] = False
+        Returns:
+            List[Future]: Результаты в формате classify, в том же порядке
+        """
+        batch_size = batch_size or Config.GEN_API_BATCH_SIZE
+        futures = []
+        
+        # Некэшированные новости: {ключ кэша: (заголовок, контент, [futures])}
+        pending: Dict[str, Tuple[str, str, List[Future]]] = {}
+        
+        for title, content in articles:
+            self.stats['total_requests'] += 1
+            future = Future()
+            future.set_running_or_notify_cancel()
+            futures.append(future)
             
-            # Сохраняем в кэш
-            self.cache[cache_key] = result.copy()
-            self.save_cache()
+            cache_key = self._get_cache_key(title, content)
             
-            logger.info(f"Новость классифицирована: {result['category_name']} (напряженность: {result['social_tension_index']})")
-            return result
+            # Одинаковые новости в пакете классифицируются один раз
+            if cache_key in pending:
+                pending[cache_key][2].append(future)
+                continue
             
-        except Exception as e:
-            self.stats['errors'] += 1
-            logger.error(f"Ошибка при классификации новости: {e}")
+            cached_result = self._cache_get(cache_key)
+            if cached_result is not None:
+                self.stats['cached_requests'] += 1
+                cached_result['cached'] = True
+                future.set_result(cached_result)
+                continue
+            
+            local_result = self._local_predict(title, content)
+            if local_result is not None:
+                future.set_result(local_result)
+                continue
             
-            # Используем fallback
-            result = self._fallback_classification(title, content)
-            result['cached'] = False
+            pending[cache_key] = (title, content, [future])
+        
+        items = list(pending.items())
+        for start in range(0, len(items), batch_size):
+            self._submit_batch(dict(items[start:start + batch_size]))
+        
+        return futures
+    
+    def _submit_batch(self, batch: Dict[str, Tuple[str, str, List[Future]]]):
+        """
+        Отправляет пакет новостей одним запросом
+        
+        Args:
+            batch: {ключ кэша: (заголовок, контент, [futures])}
+        """
+        def resolve(cache_key: str, result: Dict):
+            for future in batch[cache_key][2]:
+                future.set_result(dict(result))
+        
+        def classify_single(cache_key: str):
+            title, content, _ = batch[cache_key]
+            self._classify_uncached(title, content, cache_key).add_done_callback(
+                lambda future: resolve(cache_key, future.result())
+            )
+        
+        if len(batch) == 1:
+            classify_single(next(iter(batch)))
+            return
+        
+        ids = {cache_key[:12]: cache_key for cache_key in batch}
+        
+        def on_response(api_future: Future):
+            try:
+                response = api_future.result()
+            except Exception as e:
+                # API недоступен - отдельные запросы тоже не пройдут
+                for cache_key, (title, content, _) in batch.items():
+                    resolve(cache_key, self._classification_failed(title, content, e))
+                return
+            
+            try:
+                parsed = self._parse_batch_response(response)
+            except Exception as e:
+                logger.warning(f"Не удалось разобрать пакетный ответ: {e}")
+                parsed = {}
+            
+            self.stats['batch_items_parsed'] += len(parsed)
+            
+            for item_id, cache_key in ids.items():
+                result = parsed.get(item_id)
+                if result is None:
+                    self.stats['batch_items_retried'] += 1
+                    classify_single(cache_key)
+                    continue
+                
+                result['cached'] = False
+                self._cache_set(cache_key, result, *batch[cache_key][:2])
+                resolve(cache_key, result)
+        
+        try:
+            prompt = self._create_batch_classification_prompt(
+                {item_id: batch[cache_key][:2] for item_id, cache_key in ids.items()}
+            )
+            # Около 100 токенов ответа на новость
+            self.stats['batch_requests'] += 1
+            self._submit_prompt(prompt, max_tokens=100 * len(batch) + 100).add_done_callback(on_response)
+        except Exception as e:
+            for cache_key, (title, content, _) in batch.items():
+                resolve(cache_key, self._classification_failed(title, content, e))
+    
+    def _classification_failed(self, title: str, content: str, error: Exception) -> Dict:
+        """Учитывает ошибку и возвращает fallback классификацию"""
+        self.stats['errors'] += 1
+        logger.error(f"Ошибка при классификации новости: {error}")
+        
+        # Локальная модель точнее ключевых слов, поэтому при сбое API
+        # ее ответ принимается при любой уверенности
+        result = self._local_predict(title, content, min_confidence=0.0)
+        if result is not None:
             return result
+        
+        # Используем fallback
+        result = self._fallback_classification(title, content)
+        result['cached'] = False
+        result['classifier'] = 'keywords'
+        return result
     
     def generate_forecast(self, prompt: str, max_tokens: int = 2000) -> Dict:
         """
@@ -421,20 +648,31 @@ class GenApiNewsClassifier:
             logger.error(f"Ошибка генерации прогноза: {e}")
             raise
     
+    def _cache_get(self, cache_key: str) -> Optional[Dict]:
+        """Читает результат из кэша, ошибки кэша не прерывают классификацию"""
+        try:
+            return self.cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Ошибка чтения кэша: {e}")
+            return None
+    
+    def _cache_set(self, cache_key: str, result: Dict, title: str, content: str):
+        """Записывает результат в кэш вместе с текстом (обучающий пример для локальной модели)"""
+        try:
+            self.cache.set(cache_key, result, text=make_text(title, content))
+        except Exception as e:
+            logger.warning(f"Ошибка при сохранении кэша: {e}")
+    
     def get_stats(self) -> Dict:
-        """Возвращает статистику использования"""
-        return self.stats.copy()
+        """Возвращает статистику использования (включая статистику кэша)"""
+        stats = self.stats.copy()
+        try:
+            stats['cache'] = self.cache.get_stats()
+        except Exception as e:
+            logger.warning(f"Ошибка получения статистики кэша: {e}")
+        return stats
     
     def clear_cache(self):
         """Очищает кэш"""
-        self.cache = {}
-        if os.path.exists(self.cache_file):
-            os.remove(self.cache_file)
+        self.cache.clear()
         logger.info("Кэш очищен")
-    
-    def __del__(self):
-        """Деструктор - сохраняет кэш при завершении"""
-        try:
-            self.save_cache()
-        except:
-            pass
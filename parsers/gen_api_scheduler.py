@@ -0,0 +1,291 @@
+"""
+Планировщик асинхронных задач gen-api.ru с общим Long-Polling
+
+Вместо схемы "отправить задачу и ждать ее в цикле с паузой 5 секунд"
+задачи отправляются сразу, а все незавершенные request_id отслеживает
+один поток опроса. Интервал опроса каждой задачи растет адаптивно
+(от GEN_API_POLL_INITIAL_INTERVAL до GEN_API_POLL_MAX_INTERVAL),
+результаты возвращаются через concurrent.futures.Future.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+try:
+    from parsers.http_client import get_http_client
+except ImportError:
+    from http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+GEN_API_STATUS_URL = "https://api.gen-api.ru/api/v1/request/get/{request_id}"
+
+# Статусы задачи, при которых нужно продолжать опрос
+PENDING_STATUSES = {'starting', 'processing', 'queued', 'pending'}
+
+
+class GenApiError(Exception):
+    """Ошибка выполнения задачи gen-api.ru"""
+
+
+class _PendingTask:
+    """Отслеживаемая задача gen-api"""
+
+    __slots__ = ('request_id', 'future', 'deadline', 'next_poll', 'interval', 'polling')
+
+    def __init__(self, request_id, future: Future, deadline: float, interval: float):
+        self.request_id = request_id
+        self.future = future
+        self.deadline = deadline
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.polling = False
+
+
+class GenApiScheduler:
+    """Отправка задач gen-api и общий опрос их статусов"""
+
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str = "https://api.gen-api.ru/api/v1/networks/chat-gpt-3",
+        workers: Optional[int] = None,
+        initial_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            api_key: API ключ gen-api.ru
+            api_url: URL сети для создания задач
+            workers: Количество потоков для HTTP-запросов отправки и опроса
+            initial_interval: Первая пауза перед опросом задачи (сек)
+            max_interval: Максимальная пауза между опросами задачи (сек)
+            timeout: Максимальное время ожидания результата задачи (сек)
+        """
+        self.api_key = api_key
+        self.api_url = api_url
+        self.initial_interval = initial_interval or Config.GEN_API_POLL_INITIAL_INTERVAL
+        self.max_interval = max_interval or Config.GEN_API_POLL_MAX_INTERVAL
+        self.timeout = timeout or Config.GEN_API_POLL_TIMEOUT
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or Config.GEN_API_SCHEDULER_WORKERS,
+            thread_name_prefix='gen-api'
+        )
+        self._tasks: Dict[str, _PendingTask] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'polls': 0
+        }
+
+        self._poller = threading.Thread(target=self._poll_loop, name='gen-api-poller', daemon=True)
+        self._poller.start()
+
+    @property
+    def headers(self) -> Dict:
+        return {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {self.api_key}'
+        }
+
+    def submit(self, payload: Dict) -> Future:
+        """
+        Отправляет задачу, не дожидаясь результата
+
+        Args:
+            payload: Тело запроса к сети gen-api (messages, max_tokens и т.д.)
+
+        Returns:
+            Future с ответом статуса задачи (status == 'success')
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.stats['submitted'] += 1
+        self._executor.submit(self._create_task, payload, future)
+        return future
+
+    def submit_prompt(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.3) -> Future:
+        """
+        Отправляет текстовый промпт
+
+        Args:
+            prompt: Промпт
+            max_tokens: Максимум токенов ответа
+            temperature: Температура генерации
+
+        Returns:
+            Future с ответом статуса задачи
+        """
+        return self.submit({
+            "messages": [{"role": "user", "content": prompt}],
+            "is_sync": False,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": 0.95
+        })
+
+    def pending_count(self) -> int:
+        """Количество отслеживаемых задач"""
+        with self._cond:
+            return len(self._tasks)
+
+    def _create_task(self, payload: Dict, future: Future):
+        """Создает задачу и ставит ее на опрос"""
+        try:
+            response = get_http_client().post(self.api_url, json=payload, headers=self.headers)
+
+            if response.status_code != 200:
+                raise GenApiError(f"API вернул статус {response.status_code}: {response.text}")
+
+            task_data = response.json()
+            request_id = task_data.get('request_id')
+
+            if not request_id:
+                raise GenApiError(f"Не получен request_id: {task_data}")
+
+            logger.info(f"Задача gen-api создана, request_id: {request_id}")
+        except Exception as e:
+            self.stats['failed'] += 1
+            future.set_exception(e)
+            return
+
+        task = _PendingTask(
+            request_id,
+            future,
+            deadline=time.monotonic() + self.timeout,
+            interval=self.initial_interval
+        )
+
+        with self._cond:
+            self._tasks[str(request_id)] = task
+            self._cond.notify()
+
+    def _poll_loop(self):
+        """Поток опроса: раздает проверки статуса задач, у которых подошел срок"""
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+
+                now = time.monotonic()
+                due = [t for t in self._tasks.values() if not t.polling and t.next_poll <= now]
+
+                if not due:
+                    waiting = [t.next_poll for t in self._tasks.values() if not t.polling]
+                    timeout = max(0.0, min(waiting) - now) if waiting else None
+                    self._cond.wait(timeout)
+                    continue
+
+                for task in due:
+                    task.polling = True
+
+            for task in due:
+                self._executor.submit(self._poll_task, task)
+
+    def _finish(self, task: _PendingTask):
+        """Снимает задачу с опроса"""
+        with self._cond:
+            self._tasks.pop(str(task.request_id), None)
+
+    def _poll_task(self, task: _PendingTask):
+        """Проверяет статус одной задачи"""
+        self.stats['polls'] += 1
+        status_data = None
+
+        try:
+            response = get_http_client().get(
+                GEN_API_STATUS_URL.format(request_id=task.request_id),
+                headers=self.headers
+            )
+            if response.status_code == 200:
+                status_data = response.json()
+            else:
+                logger.warning(f"Ошибка при проверке статуса {task.request_id}: {response.status_code}")
+        except Exception as e:
+            logger.warning(f"Ошибка при проверке статуса {task.request_id}: {e}")
+
+        status = status_data.get('status') if status_data else None
+
+        if status == 'success':
+            self._finish(task)
+            self.stats['completed'] += 1
+            task.future.set_result(status_data)
+            return
+
+        if status in ('failed', 'error'):
+            self._finish(task)
+            self.stats['failed'] += 1
+            error_msg = status_data.get('error', 'Неизвестная ошибка')
+            task.future.set_exception(GenApiError(f"Задача завершилась с ошибкой: {error_msg}"))
+            return
+
+        if status is not None and status not in PENDING_STATUSES:
+            logger.warning(f"Неизвестный статус задачи {task.request_id}: {status}")
+
+        now = time.monotonic()
+        if now >= task.deadline:
+            self._finish(task)
+            self.stats['failed'] += 1
+            task.future.set_exception(
+                GenApiError(f"Превышено время ожидания результата ({self.timeout:.0f} сек)")
+            )
+            return
+
+        # Задача еще выполняется - увеличиваем интервал следующей проверки
+        with self._cond:
+            task.interval = min(self.max_interval, task.interval * 1.5)
+            task.next_poll = min(now + task.interval, task.deadline)
+            task.polling = False
+            self._cond.notify()
+
+    def shutdown(self):
+        """Останавливает опрос; незавершенные задачи получают ошибку"""
+        with self._cond:
+            self._stopped = True
+            tasks: List[_PendingTask] = list(self._tasks.values())
+            self._tasks.clear()
+            self._cond.notify_all()
+
+        for task in tasks:
+            if not task.future.done():
+                task.future.set_exception(GenApiError("Планировщик gen-api остановлен"))
+
+        self._executor.shutdown(wait=False)
+
+
+_schedulers: Dict[str, GenApiScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_gen_api_scheduler(api_key: str) -> GenApiScheduler:
+    """
+    Возвращает общий для процесса планировщик для API ключа
+
+    Args:
+        api_key: API ключ gen-api.ru
+
+    Returns:
+        GenApiScheduler
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(api_key)
+        if scheduler is None:
+            scheduler = GenApiScheduler(api_key)
+            _schedulers[api_key] = scheduler
+        return scheduler
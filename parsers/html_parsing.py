@@ -0,0 +1,316 @@
+"""
+Разбор HTML для парсеров новостей
+
+- make_soup: BeautifulSoup на самом быстром доступном построителе дерева
+  (lxml вместо html.parser); по списку контейнеров (простые CSS-селекторы
+  вида "div.article__text") строится SoupStrainer, и в дерево попадают
+  только эти контейнеры, а не вся страница
+- HtmlDocument: прямое извлечение по CSS-селекторам без BeautifulSoup
+  через selectolax (lexbor), если он установлен, иначе через BeautifulSoup
+- extract_paragraphs: текст абзацев первого найденного контейнера статьи
+
+Все функции принимают тело ответа (bytes) и уже определенную кодировку
+(response.encoding после HttpClient.download): страница не декодируется
+в отдельную строку перед разбором, а UTF-8 передается в lexbor как есть.
+
+Бэкенд выбирается настройкой HTML_PARSER_BACKEND (auto, selectolax,
+lxml, html.parser); auto - selectolax, затем lxml, затем html.parser.
+"""
+import os
+import re
+import sys
+from typing import List, Optional, Sequence, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+try:
+    from parsers.charset_detection import decode_html, detect_encoding
+except ImportError:
+    from charset_detection import decode_html, detect_encoding
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml  # noqa: F401 - построитель дерева для BeautifulSoup
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+Markup = Union[str, bytes]
+
+# Простой селектор: тег и/или классы ("div", "div.a.b", ".a")
+_SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$')
+
+
+def soup_builder() -> str:
+    """Построитель дерева BeautifulSoup для текущей настройки"""
+    if Config.HTML_PARSER_BACKEND != 'html.parser' and LXML_AVAILABLE:
+        return 'lxml'
+    return 'html.parser'
+
+
+def document_backend() -> str:
+    """Бэкенд HtmlDocument для текущей настройки: selectolax или soup"""
+    if Config.HTML_PARSER_BACKEND in ('auto', 'selectolax') and SELECTOLAX_AVAILABLE:
+        return 'selectolax'
+    return 'soup'
+
+
+def strainer_for(selectors: Optional[Sequence[str]]) -> Optional[SoupStrainer]:
+    """
+    SoupStrainer для частичного разбора по списку контейнеров
+
+    Поддерживаются простые селекторы (тег и классы, в том числе у
+    элементов с несколькими классами). Фильтр может пропустить лишние
+    элементы, но не теряет нужные; если селектор
+    сложнее (потомки, атрибуты), возвращается None - полный разбор.
+
+    Args:
+        selectors: CSS-селекторы контейнеров
+
+    Returns:
+        SoupStrainer или None
+    """
+    if not selectors:
+        return None
+
+    tags, classes = set(), set()
+    tagless = classless = False
+
+    for selector in selectors:
+        match = _SIMPLE_SELECTOR_RE.match(selector.strip())
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+
+        tag = match.group(1)
+        selector_classes = [name for name in match.group(2).split('.') if name]
+
+        if tag:
+            tags.add(tag.lower())
+        else:
+            tagless = True
+        if selector_classes:
+            classes.update(selector_classes)
+        else:
+            classless = True
+
+    if tagless and classless:
+        return None
+    return SoupStrainer(
+        None if tagless else sorted(tags),
+        attrs={} if classless else {'class': _class_matcher(frozenset(classes))}
+    )
+
+
+def _class_matcher(classes: frozenset):
+    """
+    Проверка атрибута class для SoupStrainer
+
+    При частичном разборе bs4 сравнивает фильтр с исходной строкой
+    атрибута ("card-full-news _x"), а не со списком классов, поэтому
+    список {'class': [...]} не находит элементы с несколькими классами.
+    """
+    def match(value) -> bool:
+        if not value:
+            return False
+        names = value.split() if isinstance(value, str) else value
+        return any(name in classes for name in names)
+    return match
+
+
+def make_soup(
+    html: Markup,
+    only: Optional[Sequence[str]] = None,
+    encoding: Optional[str] = None
+) -> BeautifulSoup:
+    """
+    BeautifulSoup на быстром построителе, при необходимости - частичный разбор
+
+    Args:
+        html: HTML (str или bytes ответа)
+        only: Контейнеры, которые нужны парсеру (остальная страница не разбирается)
+        encoding: Кодировка bytes (по умолчанию - по BOM, <meta> или статистически)
+
+    Returns:
+        BeautifulSoup
+    """
+    if isinstance(html, bytes) and encoding is None:
+        encoding = detect_encoding(html)[0]
+    from_encoding = encoding if isinstance(html, bytes) else None
+    return BeautifulSoup(html, soup_builder(), parse_only=strainer_for(only), from_encoding=from_encoding)
+
+
+class HtmlNode:
+    """Элемент документа с единым API для selectolax и BeautifulSoup"""
+
+    __slots__ = ('_node', '_selectolax')
+
+    def __init__(self, node, selectolax: bool):
+        self._node = node
+        self._selectolax = selectolax
+
+    def _wrap(self, nodes) -> List['HtmlNode']:
+        return [HtmlNode(node, self._selectolax) for node in nodes]
+
+    @property
+    def tag(self) -> str:
+        return self._node.tag if self._selectolax else self._node.name
+
+    def text(self, strip: bool = True) -> str:
+        """Текст элемента; strip - без пробелов по краям фрагментов (как get_text(strip=True))"""
+        if self._selectolax:
+            return self._node.text(strip=strip)
+        return self._node.get_text(strip=strip)
+
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Значение атрибута"""
+        if self._selectolax:
+            value = self._node.attributes.get(name)
+            return default if value is None else value
+        value = self._node.get(name)
+        if value is None:
+            return default
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def has_class(self, name: str) -> bool:
+        """Есть ли у элемента класс"""
+        return name in (self.attr('class') or '').split()
+
+    def select(self, selector: str) -> List['HtmlNode']:
+        """Все потомки, подходящие под CSS-селектор, в порядке документа"""
+        if self._selectolax:
+            # lexbor проверяет и сам элемент, BeautifulSoup - только потомков
+            return self._wrap(node for node in self._node.css(selector) if node != self._node)
+        return self._wrap(self._node.select(selector))
+
+    def select_one(self, selector: str) -> Optional['HtmlNode']:
+        """Первый потомок, подходящий под CSS-селектор"""
+        if self._selectolax:
+            node = self._node.css_first(selector)
+            if node is not None and node == self._node:
+                nodes = self.select(selector)
+                return nodes[0] if nodes else None
+        else:
+            node = self._node.select_one(selector)
+        return None if node is None else HtmlNode(node, self._selectolax)
+
+    def first(self, selectors: Sequence[str]) -> Optional['HtmlNode']:
+        """Первый найденный элемент по списку селекторов (в порядке приоритета)"""
+        for selector in selectors:
+            node = self.select_one(selector)
+            if node is not None:
+                return node
+        return None
+
+    def texts(self, selector: str) -> List[str]:
+        """Непустые тексты всех подходящих элементов"""
+        return [text for text in (node.text() for node in self.select(selector)) if text]
+
+
+class HtmlDocument(HtmlNode):
+    """Разобранная страница с извлечением по CSS-селекторам"""
+
+    __slots__ = ()
+
+    def __init__(
+        self,
+        html: Markup,
+        only: Optional[Sequence[str]] = None,
+        backend: Optional[str] = None,
+        encoding: Optional[str] = None
+    ):
+        """
+        Args:
+            html: HTML (str или bytes ответа)
+            only: Контейнеры для частичного разбора (для BeautifulSoup;
+                selectolax разбирает страницу целиком быстрее, чем
+                BeautifulSoup - один контейнер)
+            backend: selectolax или soup (по умолчанию из настройки)
+            encoding: Кодировка bytes (по умолчанию - по BOM, <meta> или статистически)
+        """
+        backend = backend or document_backend()
+        if backend == 'selectolax':
+            if isinstance(html, bytes):
+                encoding = encoding or detect_encoding(html)[0]
+                # lexbor читает bytes как UTF-8: декодируем только другие кодировки
+                if encoding != 'utf-8':
+                    html = decode_html(html, encoding=encoding)
+            super().__init__(LexborHTMLParser(html), True)
+        else:
+            super().__init__(make_soup(html, only, encoding), False)
+
+    @property
+    def title(self) -> str:
+        """Текст <title>"""
+        node = self.select_one('title')
+        return node.text() if node is not None else ''
+
+
+def parse_document(
+    html: Markup,
+    only: Optional[Sequence[str]] = None,
+    encoding: Optional[str] = None
+) -> HtmlDocument:
+    """Разбирает страницу для извлечения по CSS-селекторам"""
+    return HtmlDocument(html, only, encoding=encoding)
+
+
+def extract_paragraphs(
+    html: Markup,
+    containers: Sequence[str],
+    paragraph: str = 'p',
+    separator: str = ' ',
+    encoding: Optional[str] = None
+) -> Optional[str]:
+    """
+    Текст абзацев первого найденного контейнера статьи
+
+    Args:
+        html: HTML страницы статьи
+        containers: Селекторы контейнера текста в порядке приоритета
+        paragraph: Селектор абзацев внутри контейнера
+        separator: Разделитель абзацев
+        encoding: Кодировка bytes (response.encoding)
+
+    Returns:
+        Текст (может быть пустым) или None, если контейнер не найден
+    """
+    body = parse_document(html, only=containers, encoding=encoding).first(containers)
+    if body is None:
+        return None
+    return separator.join(body.texts(paragraph)).strip()
+
+
+if __name__ == '__main__':
+    # Проверка частичного разбора на разметке с несколькими классами
+    # (карточки Lenta "card-full-news _...", ленты RBC "news-feed__item js-...")
+    page = (
+        '<html><body>'
+        '<div class="news-feed__item js-news-feed-item"><a class="card-full-news _topnews" href="/a">A</a></div>'
+        '<a class="card-full-news" href="/b">B</a>'
+        '<a class="menu" href="/c">C</a>'
+        '</body></html>'
+    ).encode('utf-8')
+
+    cases = [
+        (['a.card-full-news'], ['/a', '/b']),
+        (['.card-full-news'], ['/a', '/b']),
+        (['div.news-feed__item'], ['/a']),
+        (['div.js-news-feed-item', 'a.card-full-news'], ['/a', '/b']),
+    ]
+
+    for builder in ('html.parser', 'lxml') if LXML_AVAILABLE else ('html.parser',):
+        Config.HTML_PARSER_BACKEND = builder
+        for only, expected in cases:
+            links = sorted({a['href'] for a in make_soup(page, only, 'utf-8').find_all('a', href=True)})
+            assert links == expected, f"{builder} {only}: {links} != {expected}"
+            print(f"✅ {builder} {only}: {links}")
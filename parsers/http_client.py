@@ -0,0 +1,477 @@
+"""
+Общий HTTP-клиент для парсеров и интеграций с социальными сетями
+
+Возможности:
+- Пул keep-alive соединений (одно TCP/TLS соединение на хост переиспользуется)
+- HTTP/2 через httpx, если установлен пакет h2 и включен HTTP_ENABLE_HTTP2
+- Ограничение частоты запросов к хосту (token bucket) из конфигурации
+- Повтор запросов с экспоненциальной задержкой и случайным разбросом
+- Единая политика таймаутов
+- Потоковая загрузка страниц с ограничением размера и дешевым определением
+  кодировки (download)
+
+Клиент всегда возвращает requests.Response и выбрасывает исключения
+requests, поэтому вызывающий код не зависит от выбранного транспорта.
+"""
+import logging
+import random
+import sys
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+try:
+    from parsers.charset_detection import detect_encoding
+except ImportError:
+    from charset_detection import detect_encoding
+
+try:
+    import httpx
+    import h2  # noqa: F401 - нужен httpx для HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Статусы, при которых имеет смысл повторить запрос
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Методы, которые можно безопасно повторять при любой ошибке
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+# Размер части тела при потоковой загрузке страницы
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+_SIZE_SUFFIXES = {'K': 1024, 'M': 1024 * 1024, 'G': 1024 * 1024 * 1024}
+
+
+class PageTooLarge(requests.RequestException):
+    """Тело ответа больше допустимого размера страницы"""
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket для ограничения частоты запросов"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Скорость пополнения (запросов в секунду), 0 - без ограничений
+            capacity: Максимальный запас токенов (размер всплеска)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Забирает один токен, при необходимости ожидая его появления
+
+        Returns:
+            Время ожидания в секундах
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Резервируем токен сразу, чтобы параллельные потоки вставали в очередь
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def parse_host_rates(spec: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Разбирает настройку лимитов хостов
+
+    Формат: "lenta.ru=2/4,api.vk.com=3", где 2 - запросов в секунду,
+    4 - размер всплеска (по умолчанию равен скорости)
+
+    Args:
+        spec: Строка настройки
+
+    Returns:
+        Словарь {хост: (rate, capacity)}
+    """
+    rates = {}
+
+    for part in (spec or '').split(','):
+        if '=' not in part:
+            continue
+
+        host, value = part.split('=', 1)
+        rate_str, _, burst_str = value.strip().partition('/')
+
+        try:
+            rate = float(rate_str)
+            burst = float(burst_str) if burst_str else rate
+        except ValueError:
+            logger.warning(f"Некорректный лимит для хоста: {part}")
+            continue
+
+        rates[host.strip().lower()] = (rate, burst)
+
+    return rates
+
+
+def parse_byte_size(value: str) -> int:
+    """
+    Разбирает размер в байтах с необязательным суффиксом K, M или G
+
+    Args:
+        value: Строка вида "524288", "512K", "3M"
+
+    Returns:
+        Размер в байтах
+
+    Raises:
+        ValueError: если строка не является размером
+    """
+    value = value.strip().upper().rstrip('B')
+    multiplier = _SIZE_SUFFIXES.get(value[-1:], 1)
+    if value[-1:] in _SIZE_SUFFIXES:
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+
+def parse_source_page_limits(spec: str) -> Dict[str, int]:
+    """
+    Разбирает настройку лимитов размера страницы источников
+
+    Формат: "universal=3M,rbc=8M"
+
+    Args:
+        spec: Строка настройки
+
+    Returns:
+        Словарь {источник: байт}
+    """
+    limits = {}
+
+    for part in (spec or '').split(','):
+        if '=' not in part:
+            continue
+
+        source, value = part.split('=', 1)
+        try:
+            limits[source.strip().lower()] = parse_byte_size(value)
+        except ValueError:
+            logger.warning(f"Некорректный лимит размера страницы: {part}")
+
+    return limits
+
+
+def max_page_bytes(source: Optional[str] = None) -> int:
+    """
+    Максимальный размер страницы источника
+
+    Args:
+        source: Источник (lenta, universal...), None - лимит по умолчанию
+
+    Returns:
+        Байт (0 - без ограничения)
+    """
+    limits = parse_source_page_limits(Config.HTTP_SOURCE_MAX_PAGE_BYTES)
+    return limits.get((source or '').lower(), Config.HTTP_MAX_PAGE_BYTES)
+
+
+class _HttpxRawStream:
+    """Тело потокового ответа httpx в виде response.raw для requests.Response.iter_content"""
+
+    def __init__(self, response):
+        self._response = response
+
+    def stream(self, chunk_size: int, decode_content: bool = True):
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(str(e))
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ChunkedEncodingError(str(e))
+
+    def close(self):
+        self._response.close()
+
+
+class HttpClient:
+    """HTTP-клиент с пулом соединений, лимитами хостов и повторами"""
+
+    def __init__(
+        self,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        max_retries: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+        pool_maxsize: int = None,
+        default_rate: float = None,
+        default_burst: float = None,
+        host_rates: Optional[Dict[str, Tuple[float, float]]] = None,
+        enable_http2: bool = None
+    ):
+        """
+        Все параметры по умолчанию берутся из Config
+
+        Args:
+            connect_timeout: Таймаут установки соединения (сек)
+            read_timeout: Таймаут чтения ответа (сек)
+            max_retries: Количество повторов после первой попытки
+            backoff_base: Базовая задержка экспоненциального повтора (сек)
+            backoff_max: Максимальная задержка между повторами (сек)
+            pool_maxsize: Размер пула соединений на хост
+            default_rate: Лимит запросов в секунду к хосту по умолчанию
+            default_burst: Размер всплеска по умолчанию
+            host_rates: Лимиты для отдельных хостов {хост: (rate, burst)}
+            enable_http2: Использовать HTTP/2, если доступен
+        """
+        self.timeout = (
+            connect_timeout if connect_timeout is not None else Config.HTTP_CONNECT_TIMEOUT,
+            read_timeout if read_timeout is not None else Config.HTTP_READ_TIMEOUT
+        )
+        self.max_retries = max_retries if max_retries is not None else Config.HTTP_MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else Config.HTTP_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.HTTP_BACKOFF_MAX
+        self.default_rate = default_rate if default_rate is not None else Config.HTTP_DEFAULT_RATE
+        self.default_burst = default_burst if default_burst is not None else Config.HTTP_DEFAULT_BURST
+        self.host_rates = host_rates if host_rates is not None else parse_host_rates(Config.HTTP_HOST_RATES)
+
+        pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = DEFAULT_USER_AGENT
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        use_http2 = enable_http2 if enable_http2 is not None else Config.HTTP_ENABLE_HTTP2
+        self.http2_client = None
+        if use_http2 and HTTP2_AVAILABLE:
+            self.http2_client = httpx.Client(
+                http2=True,
+                headers={'User-Agent': DEFAULT_USER_AGENT},
+                limits=httpx.Limits(max_keepalive_connections=pool_maxsize),
+                follow_redirects=True
+            )
+        elif use_http2:
+            logger.info("HTTP/2 недоступен (не установлен h2), используется HTTP/1.1")
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'errors': 0,
+            'rate_limited_wait': 0.0,
+            'oversized': 0,
+            'charset_detected': 0
+        }
+
+    def _get_bucket(self, host: str) -> TokenBucket:
+        """Возвращает token bucket для хоста (поддомены наследуют лимит домена)"""
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.default_rate, self.default_burst
+                for configured_host, limits in self.host_rates.items():
+                    if host == configured_host or host.endswith('.' + configured_host):
+                        rate, burst = limits
+                        break
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Вычисляет задержку перед повтором (full jitter, учитывает Retry-After)"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _send_http2(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Выполняет запрос через httpx и приводит ответ к requests.Response"""
+        timeout = kwargs.pop('timeout', self.timeout)
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        stream = kwargs.pop('stream', False)
+        kwargs.pop('allow_redirects', None)
+
+        try:
+            request = self.http2_client.build_request(method, url, timeout=timeout, **kwargs)
+            resp = self.http2_client.send(request, stream=bool(stream))
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(str(e))
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        except httpx.HTTPError as e:
+            raise requests.RequestException(str(e))
+
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.url = str(resp.url)
+        response.reason = resp.reason_phrase
+        response.encoding = resp.charset_encoding
+        if stream:
+            # Тело читается позже через iter_content
+            response.raw = _HttpxRawStream(resp)
+        else:
+            response._content = resp.content
+        return response
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Выполняет HTTP-запрос с лимитом хоста и повторами
+
+        Args:
+            method: HTTP метод
+            url: URL запроса
+            **kwargs: Параметры requests (headers, params, json, data, timeout...)
+
+        Returns:
+            requests.Response (после исчерпания повторов - последний ответ)
+
+        Raises:
+            requests.RequestException: если не удалось получить ответ
+        """
+        method = method.upper()
+        kwargs.setdefault('timeout', self.timeout)
+        bucket = self._get_bucket(urlparse(url).netloc.lower())
+        idempotent = method in IDEMPOTENT_METHODS
+        use_http2 = self.http2_client is not None
+
+        attempt = 0
+        while True:
+            self.stats['rate_limited_wait'] += bucket.acquire()
+            self.stats['requests'] += 1
+
+            try:
+                if use_http2:
+                    response = self._send_http2(method, url, **dict(kwargs))
+                else:
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # Неидемпотентные запросы повторяем только если соединение не установилось
+                retriable = idempotent or isinstance(e, requests.exceptions.ConnectTimeout)
+                if not retriable or attempt >= self.max_retries:
+                    self.stats['errors'] += 1
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.debug(f"Повтор {method} {url} через {delay:.1f} сек: {e}")
+            else:
+                retriable = response.status_code in RETRY_STATUSES and (
+                    idempotent or response.status_code in (429, 503)
+                )
+                if not retriable or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff_delay(attempt, response)
+                logger.debug(f"Повтор {method} {url} через {delay:.1f} сек: статус {response.status_code}")
+                response.close()
+
+            self.stats['retries'] += 1
+            attempt += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET-запрос"""
+        return self.request('GET', url, **kwargs)
+
+    def download(self, url: str, max_bytes: Optional[int] = None, **kwargs) -> requests.Response:
+        """
+        GET-запрос страницы: тело читается потоком не больше max_bytes,
+        кодировка определяется по BOM, Content-Type или <meta charset>
+        (статистически - только если она нигде не объявлена)
+
+        Args:
+            url: URL страницы
+            max_bytes: Максимальный размер тела (по умолчанию HTTP_MAX_PAGE_BYTES, 0 - без ограничения)
+            **kwargs: Параметры requests (headers, timeout...)
+
+        Returns:
+            requests.Response с прочитанным телом (content) и кодировкой (encoding);
+            text декодируется по ней без apparent_encoding
+
+        Raises:
+            PageTooLarge: если тело больше max_bytes
+            requests.RequestException: если не удалось получить ответ
+        """
+        if max_bytes is None:
+            max_bytes = Config.HTTP_MAX_PAGE_BYTES
+
+        response = self.request('GET', url, stream=True, **kwargs)
+        chunks = []
+        size = 0
+
+        try:
+            declared = response.headers.get('Content-Length', '')
+            if max_bytes and declared.isdigit() and int(declared) > max_bytes:
+                raise PageTooLarge(f"{url}: {declared} байт больше лимита {max_bytes}", response=response)
+
+            # Лимит проверяется по распакованному телу (защита и от сжатых "бомб")
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise PageTooLarge(f"{url}: тело больше лимита {max_bytes} байт", response=response)
+                chunks.append(chunk)
+        except PageTooLarge:
+            self.stats['oversized'] += 1
+            raise
+        finally:
+            response.close()
+
+        response._content = b''.join(chunks)
+        response._content_consumed = True
+        response.encoding, source = detect_encoding(response.content, response.headers.get('Content-Type'))
+        if source == 'detected':
+            self.stats['charset_detected'] += 1
+        return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """POST-запрос"""
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Закрывает все соединения"""
+        self.session.close()
+        if self.http2_client is not None:
+            self.http2_client.close()
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Возвращает общий для процесса экземпляр HTTP-клиента"""
+    global _http_client
+
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient()
+    return _http_client
@@ -2,9 +2,13 @@
 Улучшенный классификатор новостей на 5 категорий
 С расширенными ключевыми словами и лучшей точностью
 """
-import re
 from typing import Dict, List, Tuple, Optional
 
+try:
+    from parsers.lexicon_matcher import LexiconMatcher
+except ImportError:
+    from lexicon_matcher import LexiconMatcher
+
 class ImprovedNewsClassifier:
     """Улучшенный классификатор новостей"""
     
@@ -172,6 +176,17 @@ class ImprovedNewsClassifier:
         # Теперь это абсолютное количество совпадений * веса
         # Минимум 2 primary keyword или 6 secondary = score 6.0
         self.min_confidence_threshold = 2.0
+        
+        # Ключевые слова всех категорий ищутся за один проход по тексту
+        # (от начала слова: ключевые слова - основы слов)
+        self.keyword_matcher = LexiconMatcher(
+            {
+                f'{category}:{group}': data.get(group, [])
+                for category, data in self.category_keywords.items()
+                for group in ('primary', 'secondary')
+            },
+            boundary='start'
+        )
     
     def _normalize_text(self, text: str) -> str:
         """Нормализация текста для поиска ключевых слов"""
@@ -179,19 +194,6 @@ class ImprovedNewsClassifier:
             return ""
         return text.lower()
     
-    def _count_keyword_matches(self, text: str, keywords: List[str]) -> int:
-        """Подсчет количества совпадений ключевых слов"""
-        text_normalized = self._normalize_text(text)
-        matches = 0
-        
-        for keyword in keywords:
-            # Используем границы слов для точного поиска
-            pattern = r'\b' + re.escape(keyword)
-            if re.search(pattern, text_normalized):
-                matches += 1
-        
-        return matches
-    
     def classify(self, title: str, content: str) -> Tuple[str, float, Dict[str, float]]:
         """
         Классифицирует статью по одной из 5 категорий
@@ -206,22 +208,17 @@ class ImprovedNewsClassifier:
                 - confidence: Уверенность в классификации (0-1)
                 - all_scores: Словарь со всеми оценками
         """
-        full_text = f"{title} {content}"
+        full_text = self._normalize_text(f"{title} {content}")
+        matches = self.keyword_matcher.match(full_text)
         
         category_scores = {}
         
         for category, data in self.category_keywords.items():
             # Подсчитываем совпадения по primary keywords
-            primary_matches = self._count_keyword_matches(
-                full_text, 
-                data['primary']
-            )
+            primary_matches = matches.distinct(f'{category}:primary')
             
             # Подсчитываем совпадения по secondary keywords
-            secondary_matches = self._count_keyword_matches(
-                full_text,
-                data.get('secondary', [])
-            )
+            secondary_matches = matches.distinct(f'{category}:secondary')
             
             # Вычисляем score на основе абсолютного количества совпадений
             # Primary keywords важнее в 3 раза
@@ -0,0 +1,219 @@
+"""
+Общий движок поиска ключевых слов по словарям
+
+Все словари компилируются один раз в одно регулярное выражение в виде
+префиксного дерева (trie), которое находит вхождения всех ключевых слов
+за один проход по тексту, включая перекрывающиеся ("только что" и
+"только что произошло"), как автомат Ахо-Корасик.
+
+Граница совпадения задается для каждого словаря:
+- None    - подстрока (как `keyword in text`)
+- 'start' - начало слова (как r'\\b' + keyword)
+- 'word'  - слово целиком (как r'\\b' + keyword + r'\\b')
+
+Пример:
+    matcher = LexiconMatcher({'fear': ['страх', 'паника']}, boundary='word')
+    matches = matcher.match(text)
+    matches.count('fear'), matches.found('fear'), matches.hits('fear')
+
+count() считает каждое ключевое слово отдельно (как re.findall по каждому
+слову), count_longest() - вхождения без перекрытий (вложенная фраза
+считается один раз, как при re.findall по чередованию слов).
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+BOUNDARY_MODES = (None, 'start', 'word')
+
+
+def _is_word_char(ch: str) -> bool:
+    """Символ слова в смысле \\w регулярных выражений"""
+    return ch.isalnum() or ch == '_'
+
+
+def _at_boundary(text: str, index: int) -> bool:
+    """Проверяет границу слова (\\b) перед позицией index"""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Строит регулярное выражение-дерево для набора слов
+
+    В каждой позиции выражение совпадает с самым длинным словом,
+    начинающимся в ней; более короткие слова с той же позицией
+    являются его префиксами и восстанавливаются отдельно.
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+
+        alternation = '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Слово может закончиться здесь - продолжение необязательно (жадно)
+            return alternation + '?'
+        return branches[0] if len(branches) == 1 else alternation
+
+    return build(trie)
+
+
+class LexiconMatches:
+    """Результат поиска: вхождения ключевых слов по словарям"""
+
+    def __init__(self, matcher: 'LexiconMatcher', text: str, occurrences: Dict[str, List[int]]):
+        self.text = text
+        self._matcher = matcher
+        self._hits: Dict[str, Dict[str, List[int]]] = defaultdict(dict)
+
+        for keyword, positions in occurrences.items():
+            for lexicon in matcher._keyword_lexicons[keyword]:
+                boundary = matcher.boundaries[lexicon]
+                if boundary is None:
+                    filtered = positions
+                elif boundary == 'start':
+                    filtered = [p for p in positions if _at_boundary(text, p)]
+                else:
+                    end = len(keyword)
+                    filtered = [
+                        p for p in positions
+                        if _at_boundary(text, p) and _at_boundary(text, p + end)
+                    ]
+                if filtered:
+                    self._hits[lexicon][keyword] = filtered
+
+    def hits(self, lexicon: str) -> Dict[str, List[int]]:
+        """
+        Вхождения ключевых слов словаря
+
+        Returns:
+            Словарь {ключевое слово: позиции начала в тексте (в нижнем регистре)}
+        """
+        return self._hits.get(lexicon, {})
+
+    def count(self, lexicon: str) -> int:
+        """Общее количество вхождений ключевых слов словаря"""
+        multiplicity = self._matcher._multiplicity[lexicon]
+        return sum(len(positions) * multiplicity[keyword] for keyword, positions in self.hits(lexicon).items())
+
+    def count_longest(self, lexicon: str) -> int:
+        """
+        Количество вхождений без перекрытий: самое длинное в каждой позиции,
+        вхождения внутри предыдущего не считаются
+
+        "прямо сейчас" - одно вхождение, а не "прямо сейчас" и "сейчас",
+        как при re.findall по чередованию ключевых слов словаря.
+        """
+        count = 0
+        end = 0
+        for position, keyword in sorted(self.positions(lexicon), key=lambda hit: (hit[0], -len(hit[1]))):
+            if position >= end:
+                count += 1
+                end = position + len(keyword)
+        return count
+
+    def distinct(self, lexicon: str) -> int:
+        """Количество найденных ключевых слов словаря (как число проверок `keyword in text`)"""
+        multiplicity = self._matcher._multiplicity[lexicon]
+        return sum(multiplicity[keyword] for keyword in self.hits(lexicon))
+
+    def found(self, lexicon: str) -> List[str]:
+        """Найденные ключевые слова в исходном написании и порядке словаря"""
+        order = self._matcher._order[lexicon]
+        indices = sorted(index for keyword in self.hits(lexicon) for index in order[keyword])
+        keywords = self._matcher.lexicons[lexicon]
+        return [keywords[index] for index in indices]
+
+    def positions(self, lexicon: str) -> List[Tuple[int, str]]:
+        """Вхождения словаря в порядке текста: [(позиция, ключевое слово)]"""
+        return sorted(
+            (position, keyword)
+            for keyword, positions in self.hits(lexicon).items()
+            for position in positions
+        )
+
+
+class LexiconMatcher:
+    """Скомпилированный набор словарей ключевых слов"""
+
+    def __init__(
+        self,
+        lexicons: Dict[str, Iterable[str]],
+        boundary: Union[Optional[str], Dict[str, Optional[str]]] = None
+    ):
+        """
+        Args:
+            lexicons: Словари {название: список ключевых слов}
+            boundary: Граница совпадения для всех словарей (None, 'start', 'word')
+                      или словарь {название словаря: граница}
+        """
+        self.lexicons: Dict[str, List[str]] = {name: list(keywords) for name, keywords in lexicons.items()}
+
+        if isinstance(boundary, dict):
+            self.boundaries = {name: boundary.get(name) for name in self.lexicons}
+        else:
+            self.boundaries = {name: boundary for name in self.lexicons}
+
+        for name, mode in self.boundaries.items():
+            if mode not in BOUNDARY_MODES:
+                raise ValueError(f"Неизвестный режим границы для словаря {name}: {mode}")
+
+        # Ключевое слово -> словари, позиции в словаре и кратность (дубликаты в списке)
+        self._keyword_lexicons: Dict[str, List[str]] = defaultdict(list)
+        self._order: Dict[str, Dict[str, List[int]]] = {}
+        self._multiplicity: Dict[str, Dict[str, int]] = {}
+
+        for name, keywords in self.lexicons.items():
+            order = defaultdict(list)
+            for index, keyword in enumerate(keywords):
+                if keyword:
+                    order[keyword.lower()].append(index)
+            self._order[name] = dict(order)
+            self._multiplicity[name] = {keyword: len(indices) for keyword, indices in order.items()}
+            for keyword in order:
+                self._keyword_lexicons[keyword].append(name)
+
+        vocabulary = set(self._keyword_lexicons)
+
+        # Ключевые слова, которые являются префиксами другого ключевого слова:
+        # выражение возвращает самое длинное совпадение, короткие добавляются из этого списка
+        self._prefixes: Dict[str, List[str]] = {
+            keyword: [keyword[:i] for i in range(1, len(keyword)) if keyword[:i] in vocabulary]
+            for keyword in vocabulary
+        }
+
+        self._pattern = re.compile('(?=(' + trie_pattern(vocabulary) + '))') if vocabulary else None
+
+    def match(self, text: str) -> LexiconMatches:
+        """
+        Находит все ключевые слова всех словарей за один проход
+
+        Args:
+            text: Текст (приводится к нижнему регистру)
+
+        Returns:
+            LexiconMatches
+        """
+        text = (text or '').lower()
+        occurrences: Dict[str, List[int]] = defaultdict(list)
+
+        if self._pattern is not None:
+            prefixes = self._prefixes
+            for match in self._pattern.finditer(text):
+                keyword = match.group(1)
+                start = match.start()
+                occurrences[keyword].append(start)
+                for prefix in prefixes[keyword]:
+                    occurrences[prefix].append(start)
+
+        return LexiconMatches(self, text, occurrences)
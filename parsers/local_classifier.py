@@ -0,0 +1,282 @@
+"""
+Локальная модель классификации новостей перед запросом к gen-api.ru
+
+Модель обучается на метках, полученных от gen-api (кэш классификаций
+и таблицы ClickHouse), и отвечает за микросекунды:
+- признаки: хэширование слов (1-2 граммы) и символьных n-грамм (3-5) + TF-IDF
+- категория: логистическая регрессия (вероятность = уверенность)
+- индексы напряженности и всплеска: гребневая регрессия
+
+GenApiNewsClassifier использует ответ модели, если уверенность не ниже
+LOCAL_CLASSIFIER_THRESHOLD, а при недоступности API - вместо
+классификации по ключевым словам.
+"""
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+try:
+    import joblib
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+    from sklearn.linear_model import LogisticRegression, Ridge
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import FeatureUnion, make_pipeline
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Сколько символов контента учитывается (начало статьи наиболее информативно)
+MAX_CONTENT_CHARS = 3000
+
+# Категории gen-api: номер -> название
+CATEGORIES = {
+    '1': 'military_operations',
+    '2': 'humanitarian_crisis',
+    '3': 'economic_consequences',
+    '4': 'political_decisions',
+    '5': 'information_social'
+}
+
+
+def make_text(title: str, content: str) -> str:
+    """Текст для модели: заголовок и начало контента"""
+    return f"{title}\n{(content or '')[:MAX_CONTENT_CHARS]}"
+
+
+class LocalNewsClassifier:
+    """Линейная модель категорий и индексов, обученная на метках gen-api"""
+
+    def __init__(self, model_path: Optional[str] = None, threshold: Optional[float] = None):
+        """
+        Args:
+            model_path: Путь к файлу модели (joblib)
+            threshold: Минимальная уверенность для ответа без запроса к API
+        """
+        self.model_path = model_path or Config.LOCAL_CLASSIFIER_MODEL_PATH
+        self.threshold = threshold if threshold is not None else Config.LOCAL_CLASSIFIER_THRESHOLD
+
+        self.vectorizer = None
+        self.classifier = None
+        self.regressor = None
+        self.metadata: Dict = {}
+
+    @property
+    def is_ready(self) -> bool:
+        """Модель загружена или обучена"""
+        return self.classifier is not None
+
+    def _build_vectorizer(self):
+        """Создает извлечение признаков (не требует словаря, кроме весов IDF)"""
+        features = FeatureUnion([
+            ('words', HashingVectorizer(
+                analyzer='word',
+                ngram_range=(1, 2),
+                n_features=2 ** 18,
+                alternate_sign=False,
+                norm=None
+            )),
+            ('chars', HashingVectorizer(
+                analyzer='char_wb',
+                ngram_range=(3, 5),
+                n_features=2 ** 18,
+                alternate_sign=False,
+                norm=None
+            ))
+        ])
+        return make_pipeline(features, TfidfTransformer(sublinear_tf=True))
+
+    def train(self, samples: List[Tuple[str, Dict]], eval_size: float = 0.2) -> Dict:
+        """
+        Обучает модель
+
+        Args:
+            samples: Пары (текст из make_text, результат классификации gen-api)
+            eval_size: Доля выборки для оценки качества перед финальным обучением
+
+        Returns:
+            Метрики: точность, доля и точность ответов выше порога
+        """
+        if not SKLEARN_AVAILABLE:
+            raise RuntimeError("Для локальной модели нужен scikit-learn")
+
+        texts = [text for text, _ in samples]
+        labels = np.array([str(result['category_id']) for _, result in samples])
+        indices = np.array(
+            [[result['social_tension_index'], result['spike_index']] for _, result in samples],
+            dtype=float
+        )
+
+        if len(set(labels)) < 2:
+            raise ValueError("Для обучения нужны примеры хотя бы двух категорий")
+
+        metrics = {'samples': len(samples)}
+
+        # Оценка на отложенной выборке
+        _, counts = np.unique(labels, return_counts=True)
+        if eval_size and counts.min() >= 2 and len(samples) * eval_size >= len(counts):
+            train_idx, test_idx = train_test_split(
+                np.arange(len(samples)), test_size=eval_size, random_state=42, stratify=labels
+            )
+            self._fit([texts[i] for i in train_idx], labels[train_idx], indices[train_idx])
+            metrics.update(self._evaluate([texts[i] for i in test_idx], labels[test_idx], indices[test_idx]))
+
+        # Финальная модель на всей выборке
+        self._fit(texts, labels, indices)
+
+        self.metadata = {
+            'trained_at': datetime.now().isoformat(),
+            'metrics': metrics
+        }
+        return metrics
+
+    def _fit(self, texts: List[str], labels, indices):
+        """Обучает признаки, классификатор и регрессор индексов"""
+        self.vectorizer = self._build_vectorizer()
+        X = self.vectorizer.fit_transform(texts)
+
+        self.classifier = LogisticRegression(max_iter=1000, C=10.0, class_weight='balanced')
+        self.classifier.fit(X, labels)
+
+        self.regressor = Ridge(alpha=1.0)
+        self.regressor.fit(X, indices)
+
+    def _evaluate(self, texts: List[str], labels, indices) -> Dict:
+        """Считает метрики на отложенной выборке"""
+        X = self.vectorizer.transform(texts)
+        proba = self.classifier.predict_proba(X)
+        predicted = self.classifier.classes_[proba.argmax(axis=1)]
+        confident = proba.max(axis=1) >= self.threshold
+        index_error = np.abs(np.clip(self.regressor.predict(X), 0, 100) - indices).mean()
+
+        return {
+            'accuracy': float((predicted == labels).mean()),
+            'coverage_at_threshold': float(confident.mean()),
+            'accuracy_at_threshold': float((predicted[confident] == labels[confident]).mean()) if confident.any() else 0.0,
+            'index_mae': float(index_error)
+        }
+
+    def predict(self, title: str, content: str) -> Optional[Dict]:
+        """
+        Классифицирует новость
+
+        Args:
+            title: Заголовок
+            content: Содержимое
+
+        Returns:
+            Результат в формате GenApiNewsClassifier.classify или None, если модели нет
+        """
+        return self.predict_many([(title, content)])[0]
+
+    def predict_many(self, articles: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+        """
+        Классифицирует несколько новостей одной векторизацией
+
+        Args:
+            articles: Пары (заголовок, содержимое)
+
+        Returns:
+            Результаты в том же порядке (None, если модели нет)
+        """
+        if not self.is_ready or not articles:
+            return [None] * len(articles)
+
+        X = self.vectorizer.transform([make_text(title, content) for title, content in articles])
+        proba = self.classifier.predict_proba(X)
+        predicted_indices = np.clip(self.regressor.predict(X), 0, 100)
+
+        results = []
+        for row, (tension, spike) in zip(proba, predicted_indices):
+            best = int(row.argmax())
+            category_id = str(self.classifier.classes_[best])
+            results.append({
+                'category_id': category_id,
+                'category_name': CATEGORIES.get(category_id, 'information_social'),
+                'social_tension_index': int(round(tension)),
+                'spike_index': int(round(spike)),
+                'confidence': float(row[best]),
+                'cached': False,
+                'classifier': 'local'
+            })
+        return results
+
+    def save(self, filepath: Optional[str] = None):
+        """Сохраняет модель"""
+        if not self.is_ready:
+            raise RuntimeError("Модель не обучена")
+
+        filepath = filepath or self.model_path
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        joblib.dump({
+            'vectorizer': self.vectorizer,
+            'classifier': self.classifier,
+            'regressor': self.regressor,
+            'metadata': self.metadata
+        }, filepath)
+        logger.info(f"Локальная модель сохранена в {filepath}")
+
+    def load(self, filepath: Optional[str] = None) -> bool:
+        """
+        Загружает модель
+
+        Returns:
+            True если модель загружена
+        """
+        filepath = filepath or self.model_path
+
+        if not SKLEARN_AVAILABLE or not os.path.exists(filepath):
+            return False
+
+        try:
+            model_data = joblib.load(filepath)
+            self.vectorizer = model_data['vectorizer']
+            self.classifier = model_data['classifier']
+            self.regressor = model_data['regressor']
+            self.metadata = model_data.get('metadata', {})
+        except Exception as e:
+            logger.warning(f"Не удалось загрузить локальную модель {filepath}: {e}")
+            return False
+
+        logger.info(f"Локальная модель загружена из {filepath}")
+        return True
+
+
+_local_classifier = None
+_local_classifier_lock = threading.Lock()
+
+
+def get_local_classifier() -> Optional[LocalNewsClassifier]:
+    """
+    Возвращает общую для процесса локальную модель
+
+    Returns:
+        LocalNewsClassifier или None, если модель отключена, не обучена
+        или не установлен scikit-learn
+    """
+    global _local_classifier
+
+    if not Config.LOCAL_CLASSIFIER_ENABLED or not SKLEARN_AVAILABLE:
+        return None
+
+    if _local_classifier is None:
+        with _local_classifier_lock:
+            if _local_classifier is None:
+                model = LocalNewsClassifier()
+                model.load()
+                _local_classifier = model
+
+    return _local_classifier if _local_classifier.is_ready else None
@@ -19,7 +19,6 @@ import logging
 from clickhouse_driver import Client
 import sys
 import os
-import requests
 import json
 from flask import current_app
 
@@ -29,6 +28,9 @@ logger = logging.getLogger(__name__)
 # Добавляем корневую директорию проекта в sys.path для импорта config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from parsers.articles_table import create_articles_schema
+from parsers.http_client import get_http_client
+from parsers.lexicon_matcher import LexiconMatcher
 
 # Базовые ключевые слова для определения релевантности к украинскому конфликту
 UKRAINE_CONFLICT_KEYWORDS = [
@@ -183,6 +185,16 @@ INFO_SOCIAL_KEYWORDS = [
     'censorship', 'blocking', 'ban', 'restriction', 'control', 'filtering'
 ]
 
+# Все списки ключевых слов ищутся за один проход по тексту
+_KEYWORD_MATCHER = LexiconMatcher({
+    'ukraine_conflict': UKRAINE_CONFLICT_KEYWORDS,
+    'military_operations': MILITARY_OPERATIONS_KEYWORDS,
+    'humanitarian_crisis': HUMANITARIAN_CRISIS_KEYWORDS,
+    'economic_consequences': ECONOMIC_CONSEQUENCES_KEYWORDS,
+    'political_decisions': POLITICAL_DECISIONS_KEYWORDS,
+    'information_social': INFO_SOCIAL_KEYWORDS
+})
+
 
 def is_ukraine_conflict_relevant(title, content):
     """Определяет, относится ли новость к украинскому конфликту
@@ -194,16 +206,10 @@ def is_ukraine_conflict_relevant(title, content):
     Returns:
         bool: True если новость релевантна украинскому конфликту
     """
-    text = (title + " " + content).lower()
-    
-    # Подсчитываем количество совпадений с базовыми ключевыми словами
-    matches = 0
-    for keyword in UKRAINE_CONFLICT_KEYWORDS:
-        if keyword.lower() in text:
-            matches += 1
+    matches = _KEYWORD_MATCHER.match(title + " " + content)
     
-    # Считаем релевантным, если найдено хотя бы 2 совпадения
-    return matches >= 2
+    # Считаем релевантным, если найдено хотя бы 2 совпадения с базовыми ключевыми словами
+    return matches.distinct('ukraine_conflict') >= 2
 
 
 def classify_ukraine_news(title, content):
@@ -216,42 +222,24 @@ def classify_ukraine_news(title, content):
     Returns:
         str: Категория новости или None если не релевантна украинскому конфликту
     """
+    matches = _KEYWORD_MATCHER.match(title + " " + content)
+    
     # Сначала проверяем релевантность
-    if not is_ukraine_conflict_relevant(title, content):
+    if matches.distinct('ukraine_conflict') < 2:
         return None
     
-    text = (title + " " + content).lower()
-    
-    # Словарь для подсчета совпадений по каждой категории
+    # Подсчитываем совпадения по каждой категории
     category_matches = {
-        'military_operations': 0,
-        'humanitarian_crisis': 0,
-        'economic_consequences': 0,
-        'political_decisions': 0,
-        'information_social': 0
+        category: matches.distinct(category)
+        for category in (
+            'military_operations',
+            'humanitarian_crisis',
+            'economic_consequences',
+            'political_decisions',
+            'information_social'
+        )
     }
     
-    # Проверяем совпадения для каждой категории
-    for keyword in MILITARY_OPERATIONS_KEYWORDS:
-        if keyword.lower() in text:
-            category_matches['military_operations'] += 1
-    
-    for keyword in HUMANITARIAN_CRISIS_KEYWORDS:
-        if keyword.lower() in text:
-            category_matches['humanitarian_crisis'] += 1
-    
-    for keyword in ECONOMIC_CONSEQUENCES_KEYWORDS:
-        if keyword.lower() in text:
-            category_matches['economic_consequences'] += 1
-    
-    for keyword in POLITICAL_DECISIONS_KEYWORDS:
-        if keyword.lower() in text:
-            category_matches['political_decisions'] += 1
-    
-    for keyword in INFO_SOCIAL_KEYWORDS:
-        if keyword.lower() in text:
-            category_matches['information_social'] += 1
-    
     # Находим категорию с наибольшим количеством совпадений
     max_category = max(category_matches.items(), key=lambda x: x[1])
     
@@ -344,11 +332,10 @@ def ai_classify_ukraine_news(title, content):
             'temperature': 0.1
         }
         
-        response = requests.post(
+        response = get_http_client().post(
             'https://api.cloudru.ai/v1/chat/completions',
             headers=headers,
-            json=data,
-            timeout=30
+            json=data
         )
         
         if response.status_code == 200:
@@ -462,89 +449,14 @@ def create_ukraine_conflict_tables(client):
 
 
 def create_category_tables(client):
-    """Создает таблицы для каждой категории новостей"""
-    
-    # Список категорий
-    categories = ['ukraine', 'middle_east', 'fake_news', 'info_war', 'europe', 'usa', 'other']
-    
-    # Список всех источников новостей
-    sources = {
-        'ria': {'table_suffix': 'ria', 'default_source': 'ria.ru'},
-        'israil': {'table_suffix': 'israil', 'default_source': '7kanal.co.il'},
-        'telegram': {'table_suffix': 'telegram', 'default_source': 'telegram'},
-        'lenta': {'table_suffix': 'lenta', 'default_source': 'lenta.ru'},
-        'rbc': {'table_suffix': 'rbc', 'default_source': 'rbc.ru'},
-        'cnn': {'table_suffix': 'cnn', 'default_source': 'cnn.com'},
-        'aljazeera': {'table_suffix': 'aljazeera', 'default_source': 'aljazeera.com'},
-        'tsn': {'table_suffix': 'tsn', 'default_source': 'tsn.ua'},
-        'unian': {'table_suffix': 'unian', 'default_source': 'unian.net'},
-        'rt': {'table_suffix': 'rt', 'default_source': 'rt.com'},
-        'euronews': {'table_suffix': 'euronews', 'default_source': 'euronews.com'},
-        'reuters': {'table_suffix': 'reuters', 'default_source': 'reuters.com'},
-        'france24': {'table_suffix': 'france24', 'default_source': 'france24.com'},
-        'dw': {'table_suffix': 'dw', 'default_source': 'dw.com'},
-        'bbc': {'table_suffix': 'bbc', 'default_source': 'bbc.com'},
-        'gazeta': {'table_suffix': 'gazeta', 'default_source': 'gazeta.ru'},
-        'kommersant': {'table_suffix': 'kommersant', 'default_source': 'kommersant.ru'}
-    }
-    
-    print("\nСоздание таблиц категорий:")
-    
-    # Создаем таблицы для каждого источника и каждой категории
-    for source_key, source_info in sources.items():
-        for category in categories:
-            try:
-                # Специальная обработка для telegram
-                if source_key == 'telegram':
-                    query = f'''
-                        CREATE TABLE IF NOT EXISTS news.telegram_{category} (
-                            id UUID DEFAULT generateUUIDv4(),
-                            title String,
-                            content String,
-                            channel String,
-                            message_id Int64,
-                            message_link String,
-                            source String DEFAULT 'telegram',
-                            category String DEFAULT '{category}',
-                            published_date DateTime DEFAULT now()
-                        ) ENGINE = MergeTree()
-                        ORDER BY (published_date, id)
-                    '''
-                # Специальная обработка для israil
-                elif source_key == 'israil':
-                    query = f'''
-                        CREATE TABLE IF NOT EXISTS news.israil_{category} (
-                            id UUID DEFAULT generateUUIDv4(),
-                            title String,
-                            link String,
-                            content String,
-                            source_links String,
-                            source String DEFAULT '7kanal.co.il',
-                            category String DEFAULT '{category}',
-                            published_date DateTime DEFAULT now()
-                        ) ENGINE = MergeTree()
-                        ORDER BY (published_date, id)
-                    '''
-                # Стандартная структура для остальных источников
-                else:
-                    query = f'''
-                        CREATE TABLE IF NOT EXISTS news.{source_info["table_suffix"]}_{category} (
-                            id UUID DEFAULT generateUUIDv4(),
-                            title String,
-                            link String,
-                            content String,
-                            source String DEFAULT '{source_info["default_source"]}',
-                            category String DEFAULT '{category}',
-                            published_date DateTime DEFAULT now()
-                        ) ENGINE = MergeTree()
-                        ORDER BY (published_date, id)
-                    '''
-                
-                client.execute(query)
-                print(f"✓ Таблица {source_info['table_suffix']}_{category} создана")
-                
-            except Exception as e:
-                print(f"✗ Ошибка при создании таблицы {source_info['table_suffix']}_{category}: {e}")
+    """
+    Создает единую таблицу статей news.articles и представления
+    {source}_headlines и {source}_{category} над ней
+    """
+    views, legacy = create_articles_schema(client)
+    print(f"\n✓ Таблица news.articles и {views} представлений источников и категорий созданы")
+    if legacy:
+        print(f"⚠ Прежних таблиц источников: {len(legacy)} - запустите migrations/unify_articles_table.py")
 
 
 def get_category_display_name(category):
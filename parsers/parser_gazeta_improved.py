@@ -7,8 +7,6 @@
 import sys
 import os
 from datetime import datetime
-import time
-import random
 import argparse
 
 # Добавляем пути
@@ -21,6 +19,15 @@ from bs4 import BeautifulSoup
 class GazetaParser(BaseNewsParser):
     """Парсер для Gazeta.ru"""
     
+    # RSS-лента источника (обходится до HTML-листингов)
+    FEEDS = ('https://www.gazeta.ru/export/rss/lenta.xml',)
+    
+    # Контейнеры, которые разбираются на страницах (остальная разметка пропускается)
+    BODY_CONTAINERS = ("div.b_article-text", "div.article_text", 'div[itemprop="articleBody"]')
+    MAIN_PAGE_CONTAINERS = ("a.headline_main", "div.b_ear-inner")
+    POLITICS_CONTAINERS = ("div.b_ear-inner",)
+    NEWS_CONTAINERS = ("a.headline",)
+    
     def __init__(self, parse_period_hours: int = 24):
         super().__init__(
             source_name='gazeta',
@@ -42,46 +49,37 @@ class GazetaParser(BaseNewsParser):
         Returns:
             Текст статьи
         """
-        html = self.fetch_url(url)
-        if not html:
+        page = self.fetch_page(url)
+        if page is None:
             return ""
         
-        soup = self.parse_html(html)
-        
         # Поиск основного содержимого
-        article_body = soup.find("div", class_="b_article-text")
+        doc = self.parse_document(page.content, self.BODY_CONTAINERS, page.encoding)
+        article_body = doc.first(self.BODY_CONTAINERS)
         
-        if not article_body:
-            article_body = soup.find("div", class_="article_text")
-        
-        if not article_body:
-            article_body = soup.find("div", {"itemprop": "articleBody"})
-        
-        if not article_body:
+        if article_body is None:
             return "Содержимое статьи недоступно"
         
         # Извлекаем параграфы
-        paragraphs = article_body.find_all("p")
-        
-        content = "\n\n".join([
-            p.get_text(strip=True)
-            for p in paragraphs
-            if p.get_text(strip=True) and len(p.get_text(strip=True)) > 10
-        ])
+        content = "\n\n".join(text for text in article_body.texts("p") if len(text) > 10)
         
         return content[:5000]
     
     def parse_main_page(self):
-        """Парсит главную страницу Gazeta.ru"""
+        """Парсит главную страницу Gazeta.ru до уже обработанных статей"""
         print(f"\n🔍 Начинаем парсинг Gazeta.ru (период: {self.parse_period_hours} часов)...")
+        self.crawl_listing('main', self.base_url, self.main_page_items, only=self.MAIN_PAGE_CONTAINERS)
+    
+    def main_page_items(self, soup):
+        """
+        Статьи главной страницы в порядке ленты
         
-        html = self.fetch_url(self.base_url)
-        if not html:
-            print("❌ Не удалось загрузить главную страницу")
-            return
-        
-        soup = self.parse_html(html)
-        
+        Args:
+            soup: Разобранная страница
+            
+        Yields:
+            Словари с ключами title, link, rubric, published_date
+        """
         # Находим все ссылки на новости
         articles = soup.find_all("a", class_="headline_main")
         
@@ -109,19 +107,12 @@ class GazetaParser(BaseNewsParser):
                 if not link or not title or link == self.base_url:
                     continue
                 
-                # Получаем содержимое
-                content = self.get_article_content(link)
-                
-                # Обрабатываем статью
-                self.process_article(
-                    title=title,
-                    content=content,
-                    link=link,
-                    rubric="",
-                    published_date=datetime.now()
-                )
-                
-                time.sleep(random.uniform(0.5, 1.5))
+                yield {
+                    'title': title,
+                    'link': link,
+                    'rubric': "",
+                    'published_date': datetime.now()
+                }
                 
             except Exception as e:
                 print(f"⚠️  Ошибка обработки статьи: {e}")
@@ -129,16 +120,20 @@ class GazetaParser(BaseNewsParser):
                 continue
     
     def parse_politics(self):
-        """Парсит раздел политики"""
+        """Парсит раздел политики до уже обработанных статей"""
         print("\n📂 Парсинг раздела: Политика")
+        self.crawl_listing('politics', f"{self.base_url}/politics", self.politics_items, only=self.POLITICS_CONTAINERS)
+    
+    def politics_items(self, soup):
+        """
+        Статьи раздела политики от новых к старым
         
-        url = f"{self.base_url}/politics"
-        html = self.fetch_url(url)
-        
-        if not html:
-            return
-        
-        soup = self.parse_html(html)
+        Args:
+            soup: Разобранная страница
+            
+        Yields:
+            Словари с ключами title, link, rubric, published_date
+        """
         articles = soup.find_all("div", class_="b_ear-inner")[:30]
         
         print(f"📰 Найдено статей: {len(articles)}")
@@ -158,33 +153,32 @@ class GazetaParser(BaseNewsParser):
                 if not link or not title:
                     continue
                 
-                content = self.get_article_content(link)
-                
-                self.process_article(
-                    title=title,
-                    content=content,
-                    link=link,
-                    rubric="Политика",
-                    published_date=datetime.now()
-                )
-                
-                time.sleep(random.uniform(0.5, 1.5))
+                yield {
+                    'title': title,
+                    'link': link,
+                    'rubric': "Политика",
+                    'published_date': datetime.now()
+                }
                 
             except Exception as e:
                 print(f"⚠️  Ошибка: {e}")
                 continue
     
     def parse_news(self):
-        """Парсит раздел новостей"""
+        """Парсит раздел новостей до уже обработанных статей"""
         print("\n📂 Парсинг раздела: Новости")
+        self.crawl_listing('news', f"{self.base_url}/news", self.news_items, only=self.NEWS_CONTAINERS)
+    
+    def news_items(self, soup):
+        """
+        Статьи раздела новостей от новых к старым
         
-        url = f"{self.base_url}/news"
-        html = self.fetch_url(url)
-        
-        if not html:
-            return
-        
-        soup = self.parse_html(html)
+        Args:
+            soup: Разобранная страница
+            
+        Yields:
+            Словари с ключами title, link, rubric, published_date
+        """
         articles = soup.find_all("a", class_="headline")[:30]
         
         print(f"📰 Найдено статей: {len(articles)}")
@@ -200,24 +194,22 @@ class GazetaParser(BaseNewsParser):
                 if not link or not title:
                     continue
                 
-                content = self.get_article_content(link)
-                
-                self.process_article(
-                    title=title,
-                    content=content,
-                    link=link,
-                    rubric="Новости",
-                    published_date=datetime.now()
-                )
-                
-                time.sleep(random.uniform(0.5, 1.5))
+                yield {
+                    'title': title,
+                    'link': link,
+                    'rubric': "Новости",
+                    'published_date': datetime.now()
+                }
                 
             except Exception as e:
                 print(f"⚠️  Ошибка: {e}")
                 continue
     
     def parse(self):
-        """Основной метод парсинга"""
+        """Основной метод парсинга: RSS-лента, а если она недоступна - HTML-листинги"""
+        if self.crawl_feeds() is not None:
+            return
+        
         self.parse_main_page()
         self.parse_politics()
         self.parse_news()
@@ -242,6 +234,16 @@ def main():
         action='store_true',
         help='Отключить классификацию'
     )
+    parser.add_argument(
+        '--no-feeds',
+        action='store_true',
+        help='Не использовать RSS-ленту, обходить HTML-листинги'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Обойти листинги полностью, не останавливаясь на уже обработанных статьях'
+    )
     
     args = parser.parse_args()
     
@@ -259,6 +261,10 @@ def main():
                 gazeta_parser.enable_duplicate_check = False
             if args.no_classification:
                 gazeta_parser.enable_classification = False
+            if args.no_feeds:
+                gazeta_parser.feed_discovery = False
+            if args.full:
+                gazeta_parser.incremental = False
             
             gazeta_parser.parse()
         
@@ -3,7 +3,6 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
 from clickhouse_driver import Client
 from datetime import datetime, timedelta
 import re
@@ -16,8 +15,13 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from gen_api_classifier import GenApiNewsClassifier
+from articles_rollup import refresh_rollup
+from articles_table import ARTICLES_TABLE
+from html_parsing import make_soup
 from news_categories import classify_news, create_category_tables
 from ukraine_relevance_filter import filter_ukraine_relevance
+from seen_links import drop_seen_links, mark_links_seen
+from story_index import assign_stories
 
 # Добавляем корневую директорию проекта в sys.path для импорта config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -45,22 +49,7 @@ def create_ukraine_tables_if_not_exists():
     # Create database if not exists
     client.execute('CREATE DATABASE IF NOT EXISTS news')
     
-    # Create table if not exists - adding content and sources fields
-    client.execute('''
-        CREATE TABLE IF NOT EXISTS news.israil_headlines (
-            id UUID DEFAULT generateUUIDv4(),
-            title String,
-            link String,
-            content String,
-            source_links String,
-            source String DEFAULT '7kanal.co.il',
-            category String DEFAULT 'section32',
-            published_date DateTime DEFAULT now()
-        ) ENGINE = MergeTree()
-        ORDER BY (published_date, id)
-    ''')
-    
-    # Создаем таблицы для каждой категории
+    # Единая таблица статей и представления источников и категорий
     create_category_tables(client)
 
 def setup_webdriver():
@@ -111,7 +100,7 @@ def parse_israil_news(driver=None, limit=None):
             logger.error("Failed to get page content")
             return 0
             
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
         
         # Connect to ClickHouse
         client = Client(
@@ -121,15 +110,6 @@ def parse_israil_news(driver=None, limit=None):
             password=Config.CLICKHOUSE_PASSWORD
         )
         
-        # Get existing links to avoid duplicates
-        existing_links = set()
-        try:
-            result = client.execute('SELECT DISTINCT link FROM news.israil_headlines')
-            existing_links = {row[0] for row in result}
-            logger.info(f"Found {len(existing_links)} existing articles")
-        except Exception as e:
-            logger.warning(f"Could not fetch existing links: {e}")
-        
         headlines_data = []
         skipped_count = 0
         
@@ -142,6 +122,21 @@ def parse_israil_news(driver=None, limit=None):
             articles = articles[:limit]
             logger.info(f"Ограничение парсинга: обрабатываем только {len(articles)} статей")
         
+        # Get existing links of this page to avoid fetching duplicates
+        # (seen link filter confirmed by ClickHouse instead of loading the whole table)
+        existing_links = set()
+        page_links = []
+        for article in articles:
+            link_element = article.select_one('h2 a[href]')
+            if link_element:
+                href = link_element.get('href')
+                page_links.append(href if href.startswith('http') else 'https://www.7kanal.co.il' + href)
+        try:
+            existing_links = set(page_links) - set(drop_seen_links(client, 'israil_headlines', page_links))
+            logger.info(f"Found {len(existing_links)} existing articles")
+        except Exception as e:
+            logger.warning(f"Could not check existing links: {e}")
+        
         for article in articles:
             try:
                 # Extract title and link
@@ -173,7 +168,7 @@ def parse_israil_news(driver=None, limit=None):
                 try:
                     article_html = get_page_content(driver, link)
                     if article_html:
-                        article_soup = BeautifulSoup(article_html, 'html.parser')
+                        article_soup = make_soup(article_html)
                         
                         # Extract content
                         content_div = article_soup.find('div', class_='article-content')
@@ -247,6 +242,7 @@ def parse_israil_news(driver=None, limit=None):
                     'link': link,
                     'content': content,
                     'source_links': source_links_str,
+                    'source': 'israil',
                     'category': category,
                     'social_tension_index': social_tension_index,
                     'spike_index': spike_index,
@@ -262,9 +258,9 @@ def parse_israil_news(driver=None, limit=None):
         
         # Insert data into ClickHouse
         if headlines_data:
-            # Вставляем в общую таблицу
+            # Вставляем в единую таблицу (news.israil_{category} - представления над ней)
             client.execute(
-                'INSERT INTO news.israil_headlines (title, link, content, source_links, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
+                'INSERT INTO news.articles (title, link, content, source_links, source, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
                 headlines_data
             )
             
@@ -276,14 +272,8 @@ def parse_israil_news(driver=None, limit=None):
                     categorized_data[category] = []
                 categorized_data[category].append(item)
             
-            # Вставляем данные в соответствующие таблицы категорий
-            for category, data in categorized_data.items():
-                if data:
-                    client.execute(
-                        f'INSERT INTO news.israil_{category} (title, link, content, source_links, category, published_date) VALUES',
-                        data
-                    )
-            
+            mark_links_seen(item['link'] for item in headlines_data)
+            assign_stories(client, headlines_data)
             logger.info(f"Added {len(headlines_data)} articles to database")
             # Выводим статистику по категориям
             for category, data in categorized_data.items():
@@ -402,13 +392,14 @@ if __name__ == "__main__":
             password=Config.CLICKHOUSE_PASSWORD
         )
         
-        # Find duplicates
-        duplicates = client.execute("""
+        # Find duplicates (news.israil_headlines is a view over news.articles)
+        duplicates = client.execute(f"""
             SELECT 
                 link,
                 count(*) as count,
                 groupArray(id) as ids
-            FROM news.israil_headlines
+            FROM {ARTICLES_TABLE}
+            WHERE source = 'israil'
             GROUP BY link
             HAVING count > 1
         """)
@@ -416,18 +407,24 @@ if __name__ == "__main__":
         if duplicates:
             logger.info(f"Found {len(duplicates)} links with duplicates")
             
+            delete_ids = []
             for link, count, ids in duplicates:
                 # Keep the first entry (usually the one with data)
                 keep_id = ids[0]
-                delete_ids = ids[1:]
-                
-                # Delete duplicates
-                for delete_id in delete_ids:
-                    client.execute(f"ALTER TABLE news.israil_headlines DELETE WHERE id = '{delete_id}'")
-                
-                logger.info(f"Kept ID {keep_id} and deleted {len(delete_ids)} duplicates for link: {link}")
+                delete_ids.extend(ids[1:])
+                logger.info(f"Keeping ID {keep_id} and deleting {len(ids) - 1} duplicates for link: {link}")
+            
+            # Delete all duplicates in one mutation
+            client.execute(
+                f"ALTER TABLE {ARTICLES_TABLE} DELETE WHERE source = 'israil' AND id IN %(ids)s",
+                {'ids': tuple(delete_ids)},
+                settings={'mutations_sync': 1}
+            )
+            
+            # The hourly rollup only sees inserts, recount israil from the remaining rows
+            refresh_rollup(client, 'israil')
             
-            logger.info("Duplicate cleanup completed")
+            logger.info(f"Duplicate cleanup completed: deleted {len(delete_ids)} entries")
         else:
             logger.info("No duplicates found")
         
@@ -5,8 +5,6 @@
 
 import sys
 import os
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
 from clickhouse_driver import Client
@@ -14,6 +12,10 @@ from clickhouse_driver import Client
 # Добавляем путь к парсерам для импорта модулей
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 from gen_api_classifier import GenApiNewsClassifier
+from html_parsing import extract_paragraphs, make_soup
+from http_client import get_http_client
+from seen_links import drop_seen_links, mark_links_seen
+from story_index import assign_stories
 from ukraine_relevance_filter import filter_ukraine_relevance
 
 # Настройка логирования
@@ -57,19 +59,13 @@ def get_clickhouse_client():
 def get_article_content(url, headers):
     """Получает содержимое статьи по URL"""
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_client().get(url, headers=headers)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
         
-        # Ищем основной контент статьи
-        content_div = soup.find('div', class_='topic-body__content')
-        if not content_div:
-            content_div = soup.find('div', class_='b-text')
-        
-        if content_div:
-            paragraphs = content_div.find_all('p')
-            content = ' '.join([p.get_text(strip=True) for p in paragraphs])
-            return content.strip()
+        # Ищем основной контент статьи (разбираются только контейнеры текста)
+        content = extract_paragraphs(response.content, ('div.topic-body__content', 'div.b-text'))
+        if content is not None:
+            return content
         
         return "Не удалось извлечь содержимое статьи"
     except Exception as e:
@@ -91,10 +87,10 @@ def parse_lenta_news(limit=None):
         url = "https://lenta.ru/"
         logger.info(f"Получение новостей с {url}")
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_client().get(url, headers=headers)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = make_soup(response.content)
         
         # Ищем ссылки на новости
         news_links = []
@@ -107,6 +103,10 @@ def parse_lenta_news(limit=None):
         
         logger.info(f"Найдено {len(news_links)} новостных ссылок")
         
+        # Уже сохраненные статьи не загружаем
+        news_links = drop_seen_links(client, 'lenta_headlines', news_links)
+        logger.info(f"Новых ссылок: {len(news_links)}")
+        
         if limit:
             news_links = news_links[:limit]
             logger.info(f"Ограничение парсинга: обрабатываем только {len(news_links)} статей")
@@ -176,9 +176,11 @@ def parse_lenta_news(limit=None):
                 
                 # Сохранение в основную таблицу с новыми полями
                 client.execute(
-                    'INSERT INTO news.lenta_headlines (title, link, content, source, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
-                    [(title, link, content, 'lenta.ru', category, social_tension_index, spike_index, ai_category, ai_confidence, 'gen_api_classification', datetime.now())]
+                    'INSERT INTO news.articles (title, link, content, source, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
+                    [(title, link, content, 'lenta', category, social_tension_index, spike_index, ai_category, ai_confidence, 'gen_api_classification', datetime.now())]
                 )
+                mark_links_seen([link])
+                assign_stories(client, [{'link': link, 'title': title, 'source': 'lenta', 'content': content, 'category': category}])
                 
                 logger.info(f"Добавлена статья: {title[:50]}...")
                 new_count += 1
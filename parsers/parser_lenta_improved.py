@@ -21,6 +21,14 @@ from bs4 import BeautifulSoup
 class LentaParser(BaseNewsParser):
     """Парсер для Lenta.ru"""
     
+    # RSS-лента источника (обходится до HTML-листингов)
+    FEEDS = ('https://lenta.ru/rss/news',)
+    
+    # Контейнеры, которые разбираются на страницах (остальная разметка пропускается)
+    BODY_CONTAINERS = ("div.topic-body__content", "div.b-text", "div.js-topic__text")
+    MAIN_PAGE_CONTAINERS = ("a.card-full-news", "a.card-mini")
+    RUBRIC_CONTAINERS = ("li.archive-page__item",)
+    
     def __init__(self, parse_period_hours: int = 24):
         super().__init__(
             source_name='lenta',
@@ -42,50 +50,43 @@ class LentaParser(BaseNewsParser):
         Returns:
             Текст статьи
         """
-        html = self.fetch_url(url)
-        if not html:
+        page = self.fetch_page(url)
+        if page is None:
             return ""
         
-        soup = self.parse_html(html)
-        
-        # Поиск основного содержимого статьи
-        article_body = soup.find("div", class_="topic-body__content")
-        
-        if not article_body:
-            # Альтернативные селекторы
-            article_body = soup.find("div", class_="b-text")
-        
-        if not article_body:
-            article_body = soup.find("div", class_="js-topic__text")
+        # Поиск основного содержимого статьи (с альтернативными селекторами)
+        doc = self.parse_document(page.content, self.BODY_CONTAINERS, page.encoding)
+        article_body = doc.first(self.BODY_CONTAINERS)
         
-        if not article_body:
+        if article_body is None:
             return "Содержимое статьи недоступно"
         
-        # Извлекаем параграфы
-        paragraphs = article_body.find_all(
-            ["p", "div"],
-            class_=lambda x: x != "topic-header"
+        # Извлекаем параграфы (текст каждого считается один раз)
+        paragraphs = (
+            node.text()
+            for node in article_body.select("p, div")
+            if not node.has_class("topic-header")
         )
         
-        content = "\n\n".join([
-            p.get_text(strip=True)
-            for p in paragraphs
-            if p.get_text(strip=True)
-        ])
+        content = "\n\n".join(text for text in paragraphs if text)
         
         return content[:5000]  # Ограничиваем размер
     
     def parse_main_page(self):
-        """Парсит главную страницу Lenta.ru"""
+        """Парсит главную страницу Lenta.ru до уже обработанных статей"""
         print(f"\n🔍 Начинаем парсинг Lenta.ru (период: {self.parse_period_hours} часов)...")
+        self.crawl_listing('main', self.base_url, self.main_page_items, only=self.MAIN_PAGE_CONTAINERS)
+    
+    def main_page_items(self, soup):
+        """
+        Статьи главной страницы в порядке ленты
         
-        html = self.fetch_url(self.base_url)
-        if not html:
-            print("❌ Не удалось загрузить главную страницу")
-            return
-        
-        soup = self.parse_html(html)
-        
+        Args:
+            soup: Разобранная главная страница
+            
+        Yields:
+            Словари с ключами title, link, rubric, published_date
+        """
         # Находим все ссылки на статьи
         articles = soup.find_all("a", class_="card-full-news")
         
@@ -95,8 +96,6 @@ class LentaParser(BaseNewsParser):
         
         print(f"📰 Найдено статей на главной: {len(articles)}")
         
-        cutoff_date = self.get_cutoff_date()
-        
         for article in articles:
             try:
                 # Извлекаем данные
@@ -118,33 +117,25 @@ class LentaParser(BaseNewsParser):
                 if not link or link == self.base_url:
                     continue
                 
-                # Получаем содержимое статьи
-                content = self.get_article_content(link)
-                
                 # Извлекаем рубрику (если есть)
                 rubric_elem = article.find("span", class_="card-full-news__rubric")
                 rubric = rubric_elem.get_text(strip=True) if rubric_elem else ""
                 
-                # Обрабатываем статью
-                self.process_article(
-                    title=title,
-                    content=content,
-                    link=link,
-                    rubric=rubric,
-                    published_date=datetime.now()
-                )
-                
-                # Задержка между запросами
-                time.sleep(random.uniform(0.5, 1.5))
-                
             except Exception as e:
                 print(f"⚠️  Ошибка обработки статьи: {e}")
                 self.stats['errors'] += 1
                 continue
+            
+            yield {
+                'title': title,
+                'link': link,
+                'rubric': rubric,
+                'published_date': datetime.now()
+            }
     
     def parse_rubric(self, rubric_url: str, rubric_name: str):
         """
-        Парсит определенную рубрику
+        Парсит определенную рубрику до уже обработанных статей
         
         Args:
             rubric_url: URL рубрики
@@ -152,12 +143,24 @@ class LentaParser(BaseNewsParser):
         """
         print(f"\n📂 Парсинг рубрики: {rubric_name}")
         
-        html = self.fetch_url(rubric_url)
-        if not html:
-            return
-        
-        soup = self.parse_html(html)
+        listing = 'rubric:' + rubric_url.rstrip('/').rsplit('/', 1)[-1]
+        self.crawl_listing(
+            listing, rubric_url,
+            lambda soup: self.rubric_items(soup, rubric_name),
+            only=self.RUBRIC_CONTAINERS
+        )
+    
+    def rubric_items(self, soup, rubric_name: str):
+        """
+        Статьи рубрики от новых к старым
         
+        Args:
+            soup: Разобранная страница рубрики
+            rubric_name: Название рубрики
+            
+        Yields:
+            Словари с ключами title, link, rubric, published_date
+        """
         # Находим статьи в рубрике
         articles = soup.find_all("li", class_="archive-page__item")
         
@@ -178,26 +181,22 @@ class LentaParser(BaseNewsParser):
                 if not link:
                     continue
                 
-                # Получаем содержимое
-                content = self.get_article_content(link)
-                
-                # Обрабатываем
-                self.process_article(
-                    title=title,
-                    content=content,
-                    link=link,
-                    rubric=rubric_name,
-                    published_date=datetime.now()
-                )
-                
-                time.sleep(random.uniform(0.5, 1.5))
-                
             except Exception as e:
                 print(f"⚠️  Ошибка: {e}")
                 continue
+            
+            yield {
+                'title': title,
+                'link': link,
+                'rubric': rubric_name,
+                'published_date': datetime.now()
+            }
     
     def parse(self):
-        """Основной метод парсинга"""
+        """Основной метод парсинга: RSS-лента, а если она недоступна - HTML-листинги"""
+        if self.crawl_feeds() is not None:
+            return
+        
         # Парсим главную страницу
         self.parse_main_page()
         
@@ -232,6 +231,16 @@ def main():
         action='store_true',
         help='Отключить классификацию'
     )
+    parser.add_argument(
+        '--no-feeds',
+        action='store_true',
+        help='Не использовать RSS-ленту, обходить HTML-листинги'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Обойти листинги полностью, не останавливаясь на уже обработанных статьях'
+    )
     
     args = parser.parse_args()
     
@@ -250,6 +259,10 @@ def main():
                 lenta_parser.enable_duplicate_check = False
             if args.no_classification:
                 lenta_parser.enable_classification = False
+            if args.no_feeds:
+                lenta_parser.feed_discovery = False
+            if args.full:
+                lenta_parser.incremental = False
             
             # Запускаем парсинг
             lenta_parser.parse()
@@ -5,8 +5,6 @@
 
 import sys
 import os
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
 from clickhouse_driver import Client
@@ -14,6 +12,10 @@ from clickhouse_driver import Client
 # Добавляем путь к парсерам для импорта модулей
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 from gen_api_classifier import GenApiNewsClassifier
+from html_parsing import make_soup, parse_document
+from http_client import get_http_client
+from seen_links import drop_seen_links, mark_links_seen
+from story_index import assign_stories
 from ukraine_relevance_filter import filter_ukraine_relevance
 
 # Настройка логирования
@@ -40,9 +42,9 @@ def get_clickhouse_client():
 def get_article_content(url, headers):
     """Получает содержимое статьи по URL с множественными селекторами"""
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_client().get(url, headers=headers)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        doc = parse_document(response.content)
         
         # Множественные селекторы для поиска контента статьи
         content_selectors = [
@@ -63,19 +65,19 @@ def get_article_content(url, headers):
         
         content_div = None
         for selector in content_selectors:
-            content_div = soup.select_one(selector)
-            if content_div:
+            content_div = doc.select_one(selector)
+            if content_div is not None:
                 logger.info(f"Найден контент с селектором: {selector}")
                 break
         
-        if content_div:
+        if content_div is not None:
             # Ищем параграфы внутри найденного контейнера
-            paragraphs = content_div.find_all(['p', 'div'], recursive=True)
+            paragraphs = content_div.select('p, div')
             if not paragraphs:
                 # Если параграфов нет, берем весь текст контейнера
-                content = content_div.get_text(strip=True)
+                content = content_div.text()
             else:
-                content = ' '.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+                content = ' '.join(text for text in (p.text() for p in paragraphs) if text)
             
             content = content.strip()
             
@@ -87,7 +89,7 @@ def get_article_content(url, headers):
         
         # Fallback: ищем любой текст в статье
         logger.warning("Не удалось найти контент стандартными селекторами, пробуем fallback...")
-        all_text = soup.get_text()
+        all_text = doc.text(strip=False)
         if len(all_text) > 200:
             return all_text[:1000]  # Ограничиваем длину
         
@@ -111,10 +113,10 @@ def parse_rbc_news(limit=None):
         url = "https://www.rbc.ru/"
         logger.info(f"Получение новостей с {url}")
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_client().get(url, headers=headers)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = make_soup(response.content)
         
         # Ищем ссылки на новости
         news_links = []
@@ -127,6 +129,10 @@ def parse_rbc_news(limit=None):
         
         logger.info(f"Найдено {len(news_links)} новостных ссылок")
         
+        # Уже сохраненные статьи не загружаем
+        news_links = drop_seen_links(client, 'rbc_headlines', news_links)
+        logger.info(f"Новых ссылок: {len(news_links)}")
+        
         if limit:
             news_links = news_links[:limit]
             logger.info(f"Ограничение парсинга: обрабатываем только {len(news_links)} статей")
@@ -196,9 +202,11 @@ def parse_rbc_news(limit=None):
                 
                 # Сохранение в основную таблицу с новыми полями
                 client.execute(
-                    'INSERT INTO news.rbc_headlines (title, link, content, source, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
-                    [(title, link, content, 'rbc.ru', category, social_tension_index, spike_index, ai_category, ai_confidence, 'gen_api_classification', datetime.now())]
+                    'INSERT INTO news.articles (title, link, content, source, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
+                    [(title, link, content, 'rbc', category, social_tension_index, spike_index, ai_category, ai_confidence, 'gen_api_classification', datetime.now())]
                 )
+                mark_links_seen([link])
+                assign_stories(client, [{'link': link, 'title': title, 'source': 'rbc', 'content': content, 'category': category}])
                 
                 logger.info(f"Добавлена статья: {title[:50]}...")
                 new_count += 1
@@ -7,8 +7,6 @@
 import sys
 import os
 from datetime import datetime
-import time
-import random
 import argparse
 
 # Добавляем пути
@@ -21,6 +19,14 @@ from bs4 import BeautifulSoup
 class RBCParser(BaseNewsParser):
     """Парсер для RBC.ru"""
     
+    # RSS-лента источника (обходится до HTML-листингов)
+    FEEDS = ('https://rssexport.rbc.ru/rbcnews/news/30/full.rss',)
+    
+    # Контейнеры, которые разбираются на страницах (остальная разметка пропускается)
+    BODY_CONTAINERS = ("div.article__text", "div.article__content", 'div[itemprop="articleBody"]')
+    MAIN_PAGE_CONTAINERS = ("a.news-feed__item", "span.news-feed__item")
+    POLITICS_CONTAINERS = ("div.item__wrap",)
+    
     def __init__(self, parse_period_hours: int = 24):
         super().__init__(
             source_name='rbc',
@@ -42,46 +48,37 @@ class RBCParser(BaseNewsParser):
         Returns:
             Текст статьи
         """
-        html = self.fetch_url(url)
-        if not html:
+        page = self.fetch_page(url)
+        if page is None:
             return ""
         
-        soup = self.parse_html(html)
-        
         # Поиск основного содержимого
-        article_body = soup.find("div", class_="article__text")
-        
-        if not article_body:
-            article_body = soup.find("div", class_="article__content")
-        
-        if not article_body:
-            article_body = soup.find("div", {"itemprop": "articleBody"})
+        doc = self.parse_document(page.content, self.BODY_CONTAINERS, page.encoding)
+        article_body = doc.first(self.BODY_CONTAINERS)
         
-        if not article_body:
+        if article_body is None:
             return "Содержимое статьи недоступно"
         
         # Извлекаем параграфы
-        paragraphs = article_body.find_all("p")
-        
-        content = "\n\n".join([
-            p.get_text(strip=True)
-            for p in paragraphs
-            if p.get_text(strip=True)
-        ])
+        content = "\n\n".join(article_body.texts("p"))
         
         return content[:5000]
     
     def parse_main_page(self):
-        """Парсит главную страницу RBC.ru"""
+        """Парсит главную страницу RBC.ru до уже обработанных статей"""
         print(f"\n🔍 Начинаем парсинг RBC.ru (период: {self.parse_period_hours} часов)...")
+        self.crawl_listing('main', self.base_url, self.main_page_items, only=self.MAIN_PAGE_CONTAINERS)
+    
+    def main_page_items(self, soup):
+        """
+        Статьи ленты главной страницы от новых к старым
         
-        html = self.fetch_url(self.base_url)
-        if not html:
-            print("❌ Не удалось загрузить главную страницу")
-            return
-        
-        soup = self.parse_html(html)
-        
+        Args:
+            soup: Разобранная страница
+            
+        Yields:
+            Словари с ключами title, link, rubric, published_date
+        """
         # Находим все ссылки на новости
         articles = soup.find_all("a", class_="news-feed__item")
         
@@ -116,19 +113,12 @@ class RBCParser(BaseNewsParser):
                 if not link or link == self.base_url:
                     continue
                 
-                # Получаем содержимое
-                content = self.get_article_content(link)
-                
-                # Обрабатываем статью
-                self.process_article(
-                    title=title,
-                    content=content,
-                    link=link,
-                    rubric="",
-                    published_date=datetime.now()
-                )
-                
-                time.sleep(random.uniform(0.5, 1.5))
+                yield {
+                    'title': title,
+                    'link': link,
+                    'rubric': "",
+                    'published_date': datetime.now()
+                }
                 
             except Exception as e:
                 print(f"⚠️  Ошибка обработки статьи: {e}")
@@ -136,16 +126,20 @@ class RBCParser(BaseNewsParser):
                 continue
     
     def parse_politics(self):
-        """Парсит раздел политики"""
+        """Парсит раздел политики до уже обработанных статей"""
         print("\n📂 Парсинг раздела: Политика")
+        self.crawl_listing('politics', f"{self.base_url}/politics", self.politics_items, only=self.POLITICS_CONTAINERS)
+    
+    def politics_items(self, soup):
+        """
+        Статьи раздела политики от новых к старым
         
-        url = f"{self.base_url}/politics"
-        html = self.fetch_url(url)
-        
-        if not html:
-            return
-        
-        soup = self.parse_html(html)
+        Args:
+            soup: Разобранная страница
+            
+        Yields:
+            Словари с ключами title, link, rubric, published_date
+        """
         articles = soup.find_all("div", class_="item__wrap")[:30]
         
         print(f"📰 Найдено статей: {len(articles)}")
@@ -165,24 +159,22 @@ class RBCParser(BaseNewsParser):
                 if not link:
                     continue
                 
-                content = self.get_article_content(link)
-                
-                self.process_article(
-                    title=title,
-                    content=content,
-                    link=link,
-                    rubric="Политика",
-                    published_date=datetime.now()
-                )
-                
-                time.sleep(random.uniform(0.5, 1.5))
+                yield {
+                    'title': title,
+                    'link': link,
+                    'rubric': "Политика",
+                    'published_date': datetime.now()
+                }
                 
             except Exception as e:
                 print(f"⚠️  Ошибка: {e}")
                 continue
     
     def parse(self):
-        """Основной метод парсинга"""
+        """Основной метод парсинга: RSS-лента, а если она недоступна - HTML-листинги"""
+        if self.crawl_feeds() is not None:
+            return
+        
         self.parse_main_page()
         self.parse_politics()
 
@@ -206,6 +198,16 @@ def main():
         action='store_true',
         help='Отключить классификацию'
     )
+    parser.add_argument(
+        '--no-feeds',
+        action='store_true',
+        help='Не использовать RSS-ленту, обходить HTML-листинги'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Обойти листинги полностью, не останавливаясь на уже обработанных статьях'
+    )
     
     args = parser.parse_args()
     
@@ -223,6 +225,10 @@ def main():
                 rbc_parser.enable_duplicate_check = False
             if args.no_classification:
                 rbc_parser.enable_classification = False
+            if args.no_feeds:
+                rbc_parser.feed_discovery = False
+            if args.full:
+                rbc_parser.incremental = False
             
             rbc_parser.parse()
         
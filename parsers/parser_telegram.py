@@ -23,6 +23,9 @@ from config import Config
 # Добавляем путь к парсерам для импорта модулей
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 from gen_api_classifier import GenApiNewsClassifier
+from seen_links import drop_seen_links, mark_links_seen
+from story_index import assign_stories
+from articles_table import create_articles_schema
 from telethon import TelegramClient, events
 from telethon.tl.functions.messages import GetHistoryRequest
 
@@ -53,8 +56,8 @@ TELEGRAM_CHANNELS = [
 def create_ukraine_tables_if_not_exists():
     """Создание таблицы в ClickHouse для хранения Telegram новостей.
     
-    Создает базу данных 'news' и таблицу 'telegram_headlines'
-    с полями для хранения заголовков, контента, канала и метаданных.
+    Создает базу данных 'news', единую таблицу статей 'articles'
+    (с полями канала и ссылки на сообщение) и представление 'telegram_headlines'.
     """
     client = ClickHouseClient(
         host=Config.CLICKHOUSE_HOST,
@@ -66,21 +69,8 @@ def create_ukraine_tables_if_not_exists():
     # Create database if not exists
     client.execute('CREATE DATABASE IF NOT EXISTS news')
     
-    # Create table if not exists
-    client.execute('''
-    CREATE TABLE IF NOT EXISTS news.telegram_headlines (
-        id UUID DEFAULT generateUUIDv4(),
-        title String,
-        content String,
-        channel String,
-        message_id Int64,
-        message_link String,
-        source String DEFAULT 'telegram',
-        category String DEFAULT 'other',
-        published_date DateTime DEFAULT now()
-    ) ENGINE = MergeTree()
-    ORDER BY (published_date, id)
-    ''')
+    # Единая таблица статей и представления источников (в том числе telegram_headlines)
+    create_articles_schema(client)
 
 async def get_telegram_messages(client, channel, limit=100):
     """Получение сообщений из Telegram канала.
@@ -264,17 +254,8 @@ async def parse_telegram_channels(limit=None):
             password=Config.CLICKHOUSE_PASSWORD
         )
         
-        # Get existing message IDs to avoid duplicates
-        existing_messages = {}
-        for channel in TELEGRAM_CHANNELS:
-            try:
-                result = clickhouse_client.execute(
-                    f"SELECT message_id FROM news.telegram_headlines WHERE channel = '{channel}'"
-                )
-                existing_messages[channel] = {row[0] for row in result}
-            except Exception as e:
-                print(f"Warning: Could not get existing messages for {channel}: {e}")
-                existing_messages[channel] = set()
+        # Один классификатор на запуск (общий кэш и планировщик gen-api)
+        classifier = GenApiNewsClassifier()
         
         # Parse each channel
         for channel in TELEGRAM_CHANNELS:
@@ -292,6 +273,24 @@ async def parse_telegram_channels(limit=None):
                 headlines_data = []
                 skipped_count = 0
                 skipped_other_count = 0
+                candidates = []
+                
+                # Check which messages of this batch already exist in the database
+                # (seen link filter by message_link, confirmed by ClickHouse)
+                existing_ids = set()
+                try:
+                    if getattr(entity, 'username', None):
+                        message_links = {f"https://t.me/{entity.username}/{message.id}": message.id for message in messages}
+                        new_links = drop_seen_links(clickhouse_client, 'telegram_headlines', list(message_links), 'message_link')
+                        existing_ids = set(message_links.values()) - {message_links[link] for link in new_links}
+                    else:
+                        result = clickhouse_client.execute(
+                            "SELECT message_id FROM news.telegram_headlines WHERE channel = %(channel)s AND message_id IN %(ids)s",
+                            {'channel': channel, 'ids': [message.id for message in messages]}
+                        )
+                        existing_ids = {row[0] for row in result}
+                except Exception as e:
+                    print(f"Warning: Could not get existing messages for {channel}: {e}")
                 
                 for message in messages:
                     # Skip empty messages
@@ -299,7 +298,7 @@ async def parse_telegram_channels(limit=None):
                         continue
                     
                     # Check if this message already exists in the database
-                    if message.id in existing_messages.get(channel, set()):
+                    if message.id in existing_ids:
                         skipped_count += 1
                         continue
                     
@@ -314,11 +313,21 @@ async def parse_telegram_channels(limit=None):
                         print(f"Skipped spam/empty message: {message_text[:50]}...")
                         continue
                     
-                    # Дополнительная классификация через Gen-API для получения индексов напряженности
-                    try:
-                        classifier = GenApiNewsClassifier()
-                        ai_result = classifier.classify(title, content)
-                        
+                    candidates.append((message, title, content))
+                
+                # Классификация через Gen-API пакетами (несколько сообщений в одном запросе)
+                try:
+                    ai_results = await asyncio.get_running_loop().run_in_executor(
+                        None,
+                        classifier.classify_many,
+                        [(title, content) for _, title, content in candidates]
+                    )
+                except Exception as e:
+                    print(f"Ошибка Gen-API классификации: {e}")
+                    ai_results = [None] * len(candidates)
+                
+                for (message, title, content), ai_result in zip(candidates, ai_results):
+                    if ai_result is not None:
                         # Используем результаты Gen-API классификации
                         category = ai_result['category_name']
                         social_tension_index = ai_result['social_tension_index']
@@ -327,9 +336,7 @@ async def parse_telegram_channels(limit=None):
                         ai_category = ai_result['category_name']
                         
                         print(f"Gen-API классификация: {category} (напряженность: {social_tension_index}, всплеск: {spike_index})")
-                        
-                    except Exception as e:
-                        print(f"Ошибка Gen-API классификации: {e}")
+                    else:
                         # Fallback к результатам improved_classifier
                         category_result = determine_category(title, content, channel)
                         if isinstance(category_result, tuple):
@@ -382,9 +389,11 @@ async def parse_telegram_channels(limit=None):
                 # Insert data into ClickHouse if we have any
                 if headlines_data:
                     clickhouse_client.execute(
-                        'INSERT INTO news.telegram_headlines (title, content, channel, message_id, message_link, category, source, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
+                        'INSERT INTO news.articles (title, content, channel, message_id, message_link, category, source, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
                         headlines_data
                     )
+                    mark_links_seen(item['message_link'] for item in headlines_data)
+                    assign_stories(clickhouse_client, (dict(item, link=item['message_link']) for item in headlines_data))
                     print(f"Added {len(headlines_data)} records to database from channel {channel}")
                 
                 if skipped_count > 0:
@@ -21,6 +21,7 @@ import logging
 # Добавляем корневую директорию проекта в sys.path для импорта config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from parsers.http_client import get_http_client
 
 # Load environment variables from .env file
 load_dotenv()
@@ -121,11 +122,14 @@ class TwitterParser:
         """Выполнение запроса к Twitter API v2"""
         try:
             url = f"{self.base_url}/{endpoint}"
-            response = requests.get(url, headers=self.headers, params=params)
+            response = get_http_client().get(url, headers=self.headers, params=params)
             
             if response.status_code == 429:  # Rate limit
-                self.logger.warning("Rate limit reached, waiting...")
-                time.sleep(900)  # Ждем 15 минут
+                # Ждем до сброса окна лимита, если API его сообщил, иначе 15 минут
+                reset_at = response.headers.get('x-rate-limit-reset', '')
+                wait_time = max(1, int(reset_at) - int(time.time())) if reset_at.isdigit() else 900
+                self.logger.warning(f"Rate limit reached, waiting {wait_time}s...")
+                time.sleep(wait_time)
                 return self._make_request(endpoint, params)
             
             response.raise_for_status()
@@ -308,9 +312,6 @@ class TwitterParser:
                     
                     all_tweets_data.append(tweet_data)
                 
-                # Небольшая пауза между запросами
-                time.sleep(1)
-                
             except Exception as e:
                 self.logger.error(f"Ошибка при парсинге @{username}: {e}")
                 continue
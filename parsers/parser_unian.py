@@ -11,17 +11,18 @@
 """
 
 import requests
-from bs4 import BeautifulSoup
 from clickhouse_driver import Client
 from datetime import datetime
-import time
-import random
 import sys
 import os
 # Добавляем путь к парсерам для импорта модулей
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from gen_api_classifier import GenApiNewsClassifier
+from html_parsing import make_soup
+from http_client import get_http_client
+from seen_links import drop_seen_links, mark_links_seen
+from story_index import assign_stories
 from news_categories import classify_news, create_category_tables
 from ukraine_relevance_filter import filter_ukraine_relevance
 import sys
@@ -55,31 +56,16 @@ def create_ukraine_tables_if_not_exists():
     # Create database if not exists
     client.execute('CREATE DATABASE IF NOT EXISTS news')
     
-    # Create table if not exists
-    client.execute('''
-        CREATE TABLE IF NOT EXISTS news.unian_headlines (
-            id UUID DEFAULT generateUUIDv4(),
-            title String,
-            link String,
-            content String,
-            rubric String,
-            source String DEFAULT 'unian.ua',
-            category String DEFAULT 'other',
-            published_date DateTime DEFAULT now()
-        ) ENGINE = MergeTree()
-        ORDER BY (published_date, id)
-    ''')
-    
-    # Создаем таблицы для каждой категории
+    # Единая таблица статей и представления источников и категорий
     create_category_tables(client)
 
 def get_article_content(url, headers):
     """Извлечение полного содержимого статьи с UNIAN.ua"""
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = get_http_client().get(url, headers=headers)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = make_soup(response.content)
         
         # Поиск основного содержимого статьи
         article_body = soup.find("div", class_="article-text")
@@ -117,14 +103,14 @@ def parse_unian_news(limit=None):
     }
     
     try:
-        response = requests.get(base_url, headers=headers, timeout=15)
+        response = get_http_client().get(base_url, headers=headers)
         response.raise_for_status()
         logger.info(f"Успешно получена главная страница UNIAN.ua")
     except requests.RequestException as e:
         logger.error(f"Ошибка при получении данных с UNIAN.ua: {e}")
         return
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    soup = make_soup(response.content)
 
     # Поиск новостных блоков на главной странице
     articles = []
@@ -155,9 +141,6 @@ def parse_unian_news(limit=None):
         password=Config.CLICKHOUSE_PASSWORD
     )
     
-    # Получение существующих ссылок для избежания дубликатов
-    existing_links = set(row[0] for row in client.execute('SELECT link FROM news.unian_headlines'))
-    
     new_articles = 0
     
     # Применяем лимит если указан
@@ -165,6 +148,15 @@ def parse_unian_news(limit=None):
         articles = articles[:limit]
         logger.info(f"Ограничение парсинга: обрабатываем только {len(articles)} статей")
     
+    # Уже сохраненные ссылки страницы отсеиваются до загрузки статей
+    # (фильтр ссылок с подтверждением в ClickHouse вместо загрузки всей таблицы)
+    page_links = []
+    for article in articles:
+        href = article.get('href')
+        if href:
+            page_links.append(href if href.startswith('http') else base_url + href)
+    existing_links = set(page_links) - set(drop_seen_links(client, 'unian_headlines', page_links))
+    
     for article in articles:
         try:
             # Извлечение ссылки
@@ -250,28 +242,17 @@ def parse_unian_news(limit=None):
                 logger.info(f"Пропущено (категория 'other'): {title[:50]}...")
                 continue
             
-            # Сохранение в основную таблицу с новыми полями
+            # Сохранение в единую таблицу (news.unian_{category} - представление над ней)
             client.execute(
-                'INSERT INTO news.unian_headlines (title, link, content, rubric, source, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
-                [(title, link, content, rubric, 'unian.ua', category, social_tension_index, spike_index, ai_category, ai_confidence, 'gen_api_classification', datetime.now())]
+                'INSERT INTO news.articles (title, link, content, rubric, source, category, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata, published_date) VALUES',
+                [(title, link, content, rubric, 'unian', category, social_tension_index, spike_index, ai_category, ai_confidence, 'gen_api_classification', datetime.now())]
             )
             
-            # Сохранение в категорийную таблицу с новыми полями
-            category_table = f'news.unian_{category}'
-            try:
-                client.execute(
-                    f'INSERT INTO {category_table} (title, link, content, source, category, published_date, social_tension_index, spike_index, ai_category, ai_confidence, ai_classification_metadata) VALUES',
-                    [(title, link, content, 'unian.net', category, datetime.now(), social_tension_index, spike_index, ai_category, ai_confidence, 'gen_api_classification')]
-                )
-            except Exception as e:
-                logger.warning(f"Не удалось сохранить в категорийную таблицу {category_table}: {e}")
-            
+            mark_links_seen([link])
+            assign_stories(client, [{'link': link, 'title': title, 'source': 'unian', 'content': content, 'category': category}])
             new_articles += 1
             logger.info(f"Добавлена новость: {title[:50]}... (категория: {category})")
             
-            # Задержка между запросами
-            time.sleep(random.uniform(1, 3))
-            
         except Exception as e:
             logger.error(f"Ошибка при обработке статьи: {e}")
             continue
@@ -0,0 +1,429 @@
+"""
+Персистентный фильтр уже сохраненных ссылок (Bloom-фильтр в memory-mapped файле)
+
+Парсер проверяет ссылки списка статей по фильтру до загрузки их содержимого:
+- отрицательный ответ фильтра точен - статья новая, ее нужно загрузить
+- положительный ответ подтверждается одним индексированным запросом
+  к ClickHouse (ложные срабатывания не теряют статьи)
+
+Фильтр общий для всех парсеров и процессов, занимает фиксированный объем
+(SEEN_LINKS_CAPACITY ссылок при доле ложных срабатываний SEEN_LINKS_ERROR_RATE)
+и заменяет загрузку в память всех ссылок таблицы при каждом запуске.
+Таблица при первом обращении один раз загружается в фильтр из ClickHouse,
+дальше фильтр пополняется при сохранении статей.
+"""
+import hashlib
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b'SEENBLM1'
+# magic, количество бит, количество хеш-функций, резерв, количество добавленных ссылок
+_HEADER = struct.Struct('<8sQIIQ')
+_HEADER_SIZE = 64
+_SEED_BATCH = 10000
+
+
+def bloom_parameters(capacity: int, error_rate: float):
+    """
+    Размер фильтра и количество хеш-функций для заданной емкости
+
+    Args:
+        capacity: Ожидаемое количество ссылок
+        error_rate: Допустимая доля ложных срабатываний
+
+    Returns:
+        (количество бит, количество хеш-функций)
+    """
+    num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+    num_bits = max(64, (num_bits + 63) // 64 * 64)
+    num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+    return num_bits, num_hashes
+
+
+def bloom_positions(keys: Sequence[str], num_bits: int, num_hashes: int) -> np.ndarray:
+    """
+    Номера бит ключей Bloom-фильтра (двойное хеширование blake2b)
+
+    Args:
+        keys: Строки
+        num_bits: Размер фильтра в битах
+        num_hashes: Количество хеш-функций
+
+    Returns:
+        Матрица len(keys) x num_hashes
+    """
+    digests = b''.join(hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest() for key in keys)
+    halves = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+    steps = np.arange(num_hashes, dtype=np.uint64)
+    # Переполнение uint64 безопасно: нужен только остаток от деления
+    with np.errstate(over='ignore'):
+        positions = halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))
+    return positions % np.uint64(num_bits)
+
+
+class SeenLinkFilter:
+    """Bloom-фильтр ссылок в файле, отображенном в память"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None
+    ):
+        """
+        Args:
+            path: Путь к файлу фильтра
+            capacity: Емкость (используется при создании файла)
+            error_rate: Доля ложных срабатываний при заполнении до емкости
+        """
+        self.path = path or Config.SEEN_LINKS_PATH
+        self.capacity = capacity or Config.SEEN_LINKS_CAPACITY
+        self.error_rate = error_rate or Config.SEEN_LINKS_ERROR_RATE
+        self.tables_path = self.path + '.tables.json'
+
+        self._lock = threading.Lock()
+        self.stats = {'checked': 0, 'negatives': 0, 'confirmed': 0, 'false_positives': 0, 'added': 0}
+        self._capacity_warned = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._open()
+
+    def _open(self):
+        """Открывает файл фильтра, создавая его при отсутствии"""
+        if not os.path.exists(self.path):
+            self._create()
+
+        self._file = open(self.path, 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        magic, num_bits, num_hashes, _, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} не является файлом фильтра ссылок")
+
+        # Параметры берутся из файла: фильтр, созданный с другой емкостью, остается рабочим
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self._bits = np.frombuffer(self._mmap, dtype=np.uint8, count=num_bits // 8, offset=_HEADER_SIZE)
+
+    def _create(self):
+        """Создает пустой файл фильтра под capacity ссылок"""
+        num_bits, num_hashes = bloom_parameters(self.capacity, self.error_rate)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, num_bits, num_hashes, 0, 0).ljust(_HEADER_SIZE, b'\0'))
+            f.truncate(_HEADER_SIZE + num_bits // 8)
+        os.replace(tmp_path, self.path)
+
+        # Загруженные таблицы относятся к старому файлу
+        self._save_tables({})
+        logger.info(f"Создан фильтр ссылок {self.path}: {num_bits // 8 / 1024 / 1024:.1f} МБ, {num_hashes} хеш-функций")
+
+    def _positions(self, links: Sequence[str]) -> np.ndarray:
+        """Номера бит ссылок: матрица len(links) x num_hashes"""
+        return bloom_positions(links, self.num_bits, self.num_hashes)
+
+    def contains_many(self, links: Sequence[str]) -> np.ndarray:
+        """
+        Проверяет ссылки по фильтру
+
+        Args:
+            links: Ссылки
+
+        Returns:
+            Массив bool: False - ссылки точно нет, True - ссылка, вероятно, есть
+        """
+        if not links:
+            return np.zeros(0, dtype=bool)
+
+        positions = self._positions(links)
+        bits = self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return (bits & 1).all(axis=1)
+
+    def __contains__(self, link: str) -> bool:
+        return bool(self.contains_many([link])[0])
+
+    def add_many(self, links: Iterable[str]) -> int:
+        """
+        Добавляет ссылки в фильтр
+
+        Args:
+            links: Ссылки
+
+        Returns:
+            Количество ссылок, которых в фильтре не было
+        """
+        links = [link for link in links if link]
+        if not links:
+            return 0
+
+        positions = self._positions(links)
+        byte_index = (positions >> np.uint64(3)).astype(np.intp)
+        masks = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+
+        with self._lock, self._file_lock():
+            added = int((~self.contains_many(links)).sum())
+            np.bitwise_or.at(self._bits, byte_index.ravel(), masks.ravel())
+            count = self._count() + added
+            struct.pack_into('<Q', self._mmap, 24, count)
+
+        self.stats['added'] += added
+        if count > self.capacity and not self._capacity_warned:
+            self._capacity_warned = True
+            logger.warning(
+                f"Фильтр ссылок заполнен сверх емкости ({count} > {self.capacity}), "
+                f"доля ложных срабатываний растет: увеличьте SEEN_LINKS_CAPACITY "
+                f"и пересоздайте фильтр (scripts/build_seen_links.py --rebuild)"
+            )
+        return added
+
+    def add(self, link: str) -> bool:
+        """Добавляет одну ссылку; True если ее не было в фильтре"""
+        return self.add_many([link]) > 0
+
+    def _count(self) -> int:
+        return struct.unpack_from('<Q', self._mmap, 24)[0]
+
+    def _file_lock(self):
+        """Блокировка файла между процессами (там, где есть fcntl)"""
+        return _FileLock(self._file if FCNTL_AVAILABLE else None)
+
+    def filter_known(
+        self,
+        links: Sequence[str],
+        confirm: Callable[[List[str]], Iterable[str]]
+    ) -> Set[str]:
+        """
+        Находит уже сохраненные ссылки
+
+        Args:
+            links: Проверяемые ссылки
+            confirm: Функция, возвращающая из переданных ссылок сохраненные в БД;
+                вызывается один раз и только для положительных ответов фильтра
+
+        Returns:
+            Множество сохраненных ссылок
+        """
+        links = list(links)
+        positives = [link for link, hit in zip(links, self.contains_many(links)) if hit]
+
+        self.stats['checked'] += len(links)
+        self.stats['negatives'] += len(links) - len(positives)
+        if not positives:
+            return set()
+
+        known = set(confirm(positives))
+        self.stats['confirmed'] += len(known)
+        self.stats['false_positives'] += len(positives) - len(known)
+        return known
+
+    def _load_tables(self) -> Dict[str, float]:
+        try:
+            with open(self.tables_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_tables(self, tables: Dict[str, float]):
+        tmp_path = f"{self.tables_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(tables, f)
+        os.replace(tmp_path, self.tables_path)
+
+    def is_seeded(self, table_name: str) -> bool:
+        """Проверяет, загружены ли в фильтр ссылки таблицы"""
+        return table_name in self._load_tables()
+
+    def seed(self, client, table_name: str, link_column: str = 'link', force: bool = False) -> int:
+        """
+        Однократно загружает в фильтр ссылки таблицы ClickHouse
+
+        Args:
+            client: Клиент ClickHouse
+            table_name: Таблица в базе news
+            link_column: Колонка ссылки (message_link для telegram)
+            force: Загрузить, даже если таблица уже загружена
+
+        Returns:
+            Количество новых для фильтра ссылок
+        """
+        if not force and self.is_seeded(table_name):
+            return 0
+
+        start = time.perf_counter()
+        added = 0
+        batch = []
+        # Поток строк блоками: таблица не загружается в память целиком
+        for (link,) in client.execute_iter(f"SELECT {link_column} FROM news.{table_name}"):
+            batch.append(link)
+            if len(batch) >= _SEED_BATCH:
+                added += self.add_many(batch)
+                batch = []
+        added += self.add_many(batch)
+        self._mmap.flush()
+
+        with self._lock, self._file_lock():
+            tables = self._load_tables()
+            tables[table_name] = time.time()
+            self._save_tables(tables)
+
+        logger.info(f"Фильтр ссылок: {table_name} загружена ({added} ссылок, {time.perf_counter() - start:.1f} с)")
+        return added
+
+    def __len__(self) -> int:
+        return self._count()
+
+    def clear(self):
+        """Удаляет файл фильтра и создает пустой"""
+        with self._lock:
+            self.close()
+            os.remove(self.path)
+            self._open()
+
+    def get_stats(self) -> dict:
+        """Статистика фильтра"""
+        count = self._count()
+        return {
+            **self.stats,
+            'links': count,
+            'capacity': self.capacity,
+            'size_mb': round(self.num_bits / 8 / 1024 / 1024, 1),
+            'num_hashes': self.num_hashes,
+            # Ожидаемая доля ложных срабатываний при текущем заполнении
+            'expected_error_rate': round((1 - math.exp(-self.num_hashes * count / self.num_bits)) ** self.num_hashes, 6),
+            'tables': sorted(self._load_tables())
+        }
+
+    def close(self):
+        """Сбрасывает изменения на диск и закрывает файл"""
+        if getattr(self, '_mmap', None) is not None:
+            self._bits = None
+            self._mmap.flush()
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+
+
+class _FileLock:
+    """Эксклюзивная блокировка файла на время изменения фильтра"""
+
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        if self.file is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.file is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+
+def confirm_links(client, table_name: str, links: Sequence[str], link_column: str = 'link') -> Set[str]:
+    """
+    Ссылки из списка, сохраненные в таблице (один запрос по индексу idx_link)
+
+    Args:
+        client: Клиент ClickHouse
+        table_name: Таблица в базе news
+        links: Проверяемые ссылки
+        link_column: Колонка ссылки
+
+    Returns:
+        Множество найденных ссылок
+    """
+    if not links:
+        return set()
+    rows = client.execute(
+        f"SELECT DISTINCT {link_column} FROM news.{table_name} WHERE {link_column} IN %(links)s",
+        {'links': list(links)}
+    )
+    return {row[0] for row in rows}
+
+
+def drop_seen_links(client, table_name: str, links: Sequence[str], link_column: str = 'link') -> List[str]:
+    """
+    Оставляет из списка ссылки, которых еще нет в таблице, до загрузки статей
+
+    Для парсеров без BaseNewsParser: фильтр ссылок с подтверждением
+    в ClickHouse, а если фильтр выключен или недоступен - один запрос IN.
+
+    Args:
+        client: Клиент ClickHouse
+        table_name: Таблица в базе news
+        links: Ссылки со страницы списка
+        link_column: Колонка ссылки (message_link для telegram)
+
+    Returns:
+        Новые ссылки в исходном порядке
+    """
+    seen = None
+    try:
+        seen = get_seen_link_filter()
+        if seen is None:
+            raise RuntimeError("фильтр ссылок выключен")
+        seen.seed(client, table_name, link_column)
+        known = seen.filter_known(
+            links, lambda positives: confirm_links(client, table_name, positives, link_column)
+        )
+    except Exception as e:
+        if Config.SEEN_LINKS_ENABLED:
+            logger.warning(f"Фильтр ссылок недоступен, проверяем по таблице {table_name}: {e}")
+        known = confirm_links(client, table_name, links, link_column)
+
+    return [link for link in links if link not in known]
+
+
+def mark_links_seen(links: Iterable[str]):
+    """Добавляет сохраненные ссылки в фильтр (ошибки фильтра не прерывают парсинг)"""
+    try:
+        seen = get_seen_link_filter()
+        if seen is not None:
+            seen.add_many(links)
+    except Exception as e:
+        logger.warning(f"Не удалось добавить ссылки в фильтр: {e}")
+
+
+_filter_instance = None
+_filter_instance_lock = threading.Lock()
+
+
+def get_seen_link_filter() -> Optional[SeenLinkFilter]:
+    """Возвращает общий для процесса фильтр ссылок (None, если он выключен)"""
+    global _filter_instance
+
+    if not Config.SEEN_LINKS_ENABLED:
+        return None
+
+    if _filter_instance is None:
+        with _filter_instance_lock:
+            if _filter_instance is None:
+                _filter_instance = SeenLinkFilter()
+    return _filter_instance
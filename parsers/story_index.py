@@ -0,0 +1,418 @@
+"""
+Кластеризация новостей разных источников в сюжеты при загрузке
+
+Одно событие публикуют lenta, ria, telegram и другие источники; каждая
+копия хранится в своей таблице. StoryIndex при сохранении статьи ищет
+похожую статью любого источника в окне STORY_WINDOW_DAYS (MinHash/LSH
+индекс, см. title_index.py) и присваивает статье ее story_id или
+открывает новый сюжет.
+
+- Сюжеты (центроиды) и принадлежность статей хранятся в том же файле
+  SQLite и дублируются в ClickHouse (news.story_centroids,
+  news.story_members), чтобы аналитика могла считать сюжеты, а не копии
+- "Связанные публикации" статьи отдаются из индекса без сканирования таблиц
+- BaseNewsParser относит статью к сюжету в _assign_story, парсеры-функции
+  (parser_lenta, parser_telegram ...) - через assign_stories после вставки
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Union
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+try:
+    from parsers.title_index import TitleIndex
+except ImportError:
+    from title_index import TitleIndex
+
+logger = logging.getLogger(__name__)
+
+STORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    story_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    sources TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_stories_last_seen
+    ON stories (last_seen);
+CREATE TABLE IF NOT EXISTS story_members (
+    link TEXT PRIMARY KEY,
+    story_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    published_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_story_members_story
+    ON story_members (story_id);
+"""
+
+
+@dataclass
+class StoryAssignment:
+    """Результат отнесения статьи к сюжету"""
+    story_id: str
+    is_new: bool
+    similarity: float
+    story: Dict = field(default_factory=dict)
+    # Статья уже была в индексе (строки в ClickHouse записаны ранее)
+    existing: bool = False
+
+    def member_row(self, link: str, source: str, title: str, category: str,
+                   published_date: Optional[datetime]) -> Dict:
+        """Строка для news.story_members"""
+        return {
+            'story_id': self.story_id,
+            'link': link,
+            'source': source,
+            'title': title,
+            'category': category or '',
+            'similarity': float(self.similarity),
+            'published_date': published_date or datetime.now()
+        }
+
+    def centroid_row(self) -> Dict:
+        """Строка для news.story_centroids (ReplacingMergeTree по updated_at)"""
+        story = self.story
+        return {
+            'story_id': self.story_id,
+            'title': story['title'],
+            'category': story['category'],
+            'first_published': datetime.fromtimestamp(story['first_seen']),
+            'last_published': datetime.fromtimestamp(story['last_seen']),
+            'article_count': story['article_count'],
+            'source_count': len(story['sources']),
+            'sources': story['sources'],
+            'updated_at': datetime.now()
+        }
+
+
+class StoryIndex(TitleIndex):
+    """Индекс сюжетов поверх индекса похожих заголовков"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        window_days: Optional[float] = None,
+        lead_chars: Optional[int] = None
+    ):
+        """
+        Args:
+            path: Путь к файлу базы SQLite
+            threshold: Порог Жаккара, начиная с которого статья относится к сюжету
+            window_days: Сколько дней сюжет может пополняться
+            lead_chars: Сколько первых символов текста учитывать вместе с заголовком
+        """
+        super().__init__(
+            path=path or Config.STORY_INDEX_PATH,
+            threshold=threshold if threshold is not None else Config.STORY_SIMILARITY_THRESHOLD,
+            window_days=window_days if window_days is not None else Config.STORY_WINDOW_DAYS,
+            lead_chars=lead_chars if lead_chars is not None else Config.STORY_LEAD_CHARS
+        )
+        self._connect().executescript(STORY_SCHEMA)
+        self.stats.update({'assigned': 0, 'new_stories': 0})
+
+    def _story(self, conn, story_id: str) -> Optional[Dict]:
+        row = conn.execute(
+            "SELECT story_id, title, category, first_seen, last_seen, article_count, sources "
+            "FROM stories WHERE story_id = ?",
+            (story_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'story_id': row[0],
+            'title': row[1],
+            'category': row[2],
+            'first_seen': row[3],
+            'last_seen': row[4],
+            'article_count': row[5],
+            'sources': json.loads(row[6])
+        }
+
+    def assign(
+        self,
+        link: str,
+        title: str,
+        source: str,
+        published_at: Union[datetime, float, None] = None,
+        content: Optional[str] = None,
+        category: str = ''
+    ) -> StoryAssignment:
+        """
+        Относит статью к существующему сюжету или открывает новый
+
+        Args:
+            link: URL статьи
+            title: Заголовок
+            source: Источник (lenta, ria, telegram...)
+            published_at: Дата публикации
+            content: Текст статьи (используется, если включен STORY_LEAD_CHARS)
+            category: Категория статьи
+
+        Returns:
+            StoryAssignment
+        """
+        conn = self._connect()
+
+        member = conn.execute(
+            "SELECT story_id, similarity FROM story_members WHERE link = ?", (link,)
+        ).fetchone()
+        if member is not None:
+            return StoryAssignment(member[0], False, member[1], self._story(conn, member[0]) or {}, existing=True)
+
+        # Ближайшая статья другого (или того же) источника, уже отнесенная к сюжету
+        story_id, similarity = None, 1.0
+        for candidate in self.find_similar(title, content=content, limit=5):
+            row = conn.execute(
+                "SELECT story_id FROM story_members WHERE link = ?", (candidate.link,)
+            ).fetchone()
+            if row is not None:
+                story_id, similarity = row[0], candidate.similarity
+                break
+
+        is_new = story_id is None
+        if is_new:
+            story_id = uuid.uuid4().hex
+
+        published_ts = self._timestamp(published_at)
+        self.add(link, title, source, published_at, content)
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO story_members (link, story_id, source, title, similarity, published_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (link, story_id, source, title, similarity, published_ts)
+            )
+
+            story = self._story(conn, story_id)
+            if story is None:
+                story = {
+                    'story_id': story_id,
+                    'title': title,
+                    'category': category or '',
+                    'first_seen': published_ts,
+                    'last_seen': published_ts,
+                    'article_count': 0,
+                    'sources': []
+                }
+
+            story['article_count'] += 1
+            story['first_seen'] = min(story['first_seen'], published_ts)
+            story['last_seen'] = max(story['last_seen'], published_ts)
+            story['category'] = story['category'] or category or ''
+            if source not in story['sources']:
+                story['sources'].append(source)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO stories "
+                "(story_id, title, category, first_seen, last_seen, article_count, sources) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (story_id, story['title'], story['category'], story['first_seen'],
+                 story['last_seen'], story['article_count'], json.dumps(story['sources']))
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self.stats['assigned'] += 1
+        self.stats['new_stories'] += is_new
+        return StoryAssignment(story_id, is_new, similarity, story)
+
+    def story_of(self, link: str) -> Optional[str]:
+        """story_id статьи или None"""
+        row = self._connect().execute(
+            "SELECT story_id FROM story_members WHERE link = ?", (link,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def related(
+        self,
+        link: Optional[str] = None,
+        title: Optional[str] = None,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Связанные публикации других источников о том же событии
+
+        Args:
+            link: URL статьи из индекса
+            title: Заголовок (если статьи нет в индексе - сюжет ищется по схожести)
+            limit: Максимум публикаций
+
+        Returns:
+            Словарь {'story': сюжет или None, 'articles': [публикации]}
+        """
+        conn = self._connect()
+
+        story_id = self.story_of(link) if link else None
+        if story_id is None and title:
+            for candidate in self.find_similar(title, limit=5):
+                story_id = self.story_of(candidate.link)
+                if story_id:
+                    break
+
+        if story_id is None:
+            return {'story': None, 'articles': []}
+
+        rows = conn.execute(
+            "SELECT link, source, title, similarity, published_at FROM story_members "
+            "WHERE story_id = ? AND link != ? ORDER BY published_at LIMIT ?",
+            (story_id, link or '', limit)
+        ).fetchall()
+
+        return {
+            'story': self._story(conn, story_id),
+            'articles': [
+                {
+                    'link': row[0],
+                    'source': row[1],
+                    'title': row[2],
+                    'similarity': round(row[3], 3),
+                    'published_date': datetime.fromtimestamp(row[4]).isoformat()
+                }
+                for row in rows
+            ]
+        }
+
+    def evict(self) -> int:
+        """Удаляет записи индекса, сюжеты и принадлежность старше окна"""
+        removed = super().evict()
+        cutoff = self._cutoff()
+
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("DELETE FROM story_members WHERE published_at < ?", (cutoff,))
+            conn.execute("DELETE FROM stories WHERE last_seen < ?", (cutoff,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return removed
+
+    def clear(self):
+        """Очищает индекс, сюжеты и принадлежность"""
+        super().clear()
+        conn = self._connect()
+        conn.execute("DELETE FROM story_members")
+        conn.execute("DELETE FROM stories")
+
+    def get_stats(self) -> dict:
+        """Статистика индекса сюжетов"""
+        stats = super().get_stats()
+        stats['stories'] = self._connect().execute("SELECT count(*) FROM stories").fetchone()[0]
+        return stats
+
+
+def stories_available(client) -> bool:
+    """Проверяет, созданы ли в ClickHouse таблицы сюжетов"""
+    try:
+        return bool(client.execute("EXISTS TABLE news.story_members")[0][0])
+    except Exception:
+        return False
+
+
+def collapse_stories_query(inner_query: str, columns: str, hours: int, order: str = 'published_date DESC') -> str:
+    """
+    Оборачивает запрос так, чтобы на каждый сюжет осталась одна статья
+
+    Статьи без сюжета считаются отдельными сюжетами (ключ - ссылка).
+
+    Args:
+        inner_query: Запрос, возвращающий columns и колонку link
+        columns: Колонки результата через запятую
+        hours: Период запроса в часах (ограничивает выборку из news.story_members)
+        order: Порядок, определяющий, какая статья сюжета остается
+
+    Returns:
+        SQL-запрос
+    """
+    return f"""
+    SELECT {columns}
+    FROM ({inner_query}) AS items
+    LEFT JOIN (
+        SELECT link, any(story_id) AS story_id
+        FROM news.story_members
+        WHERE published_date >= now() - INTERVAL {int(hours)} HOUR
+        GROUP BY link
+    ) AS stories ON stories.link = items.link
+    ORDER BY {order}
+    LIMIT 1 BY if(stories.story_id = '', items.link, stories.story_id)
+    """
+
+
+def assign_stories(client, articles: Iterable[Dict]):
+    """
+    Относит сохраненные статьи к сюжетам (ошибки не прерывают парсинг)
+
+    Для парсеров, которые пишут в news.articles напрямую, а не через
+    BaseNewsParser: принадлежность и центроиды сюжетов вставляются в
+    news.story_members и news.story_centroids тем же клиентом.
+
+    Args:
+        client: clickhouse_driver.Client
+        articles: Словари с ключами link, title, source и необязательными
+            content, category, published_date
+    """
+    if not Config.STORY_CLUSTERING_ENABLED:
+        return
+
+    try:
+        index = get_story_index()
+        members, centroids = [], {}
+        for article in articles:
+            link, title, source = article['link'], article['title'], article['source']
+            if not link or not title:
+                continue
+
+            published_date = article.get('published_date')
+            category = article.get('category') or ''
+            assignment = index.assign(link, title, source, published_date, article.get('content'), category)
+            if assignment.existing:
+                continue
+            members.append(assignment.member_row(link, source, title, category, published_date))
+            # Центроид пишем один раз - последнюю версию сюжета
+            centroids[assignment.story_id] = assignment.centroid_row()
+
+        for table, rows in (('news.story_members', members), ('news.story_centroids', list(centroids.values()))):
+            if rows:
+                columns = list(rows[0])
+                client.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES",
+                    [tuple(row[column] for column in columns) for row in rows]
+                )
+    except Exception as e:
+        logger.warning(f"Не удалось отнести статьи к сюжетам: {e}")
+
+
+_index_instance = None
+_index_instance_lock = threading.Lock()
+
+
+def get_story_index() -> StoryIndex:
+    """Возвращает общий для процесса экземпляр индекса сюжетов"""
+    global _index_instance
+
+    if _index_instance is None:
+        with _index_instance_lock:
+            if _index_instance is None:
+                _index_instance = StoryIndex()
+    return _index_instance
@@ -10,11 +10,15 @@
 - Интеграция с AI-классификатором
 """
 
-import re
 import logging
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+try:
+    from parsers.lexicon_matcher import LexiconMatcher, LexiconMatches
+except ImportError:
+    from lexicon_matcher import LexiconMatcher, LexiconMatches
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -96,6 +100,27 @@ class TensionCalculator:
             'joy': ['радость', 'счастье', 'восторг', 'ликование', 'празднование'],
             'surprise': ['удивление', 'изумление', 'шок', 'потрясение', 'неожиданность']
         }
+        
+        # Временные маркеры (ищутся целыми словами)
+        self.time_markers = [
+            'сегодня', 'завтра', 'вчера',
+            'сейчас', 'сейчас же', 'прямо сейчас',
+            'только что', 'недавно', 'недавно произошло',
+            'в данный момент', 'в настоящее время',
+            'в ближайшее время', 'скоро', 'вскоре',
+            'в течение дня', 'на этой неделе'
+        ]
+        
+        # Все словари ищутся за один проход по тексту
+        lexicons = {'time': self.time_markers}
+        for prefix, groups in (
+            ('tension', self.tension_keywords),
+            ('urgency', self.urgency_keywords),
+            ('emotion', self.emotional_markers)
+        ):
+            for group, keywords in groups.items():
+                lexicons[f'{prefix}:{group}'] = keywords
+        self.lexicon_matcher = LexiconMatcher(lexicons, boundary={'time': 'word'})
     
     def calculate_social_tension(
         self,
@@ -118,15 +143,16 @@ class TensionCalculator:
         """
         try:
             full_text = f"{title} {content}".lower()
+            matches = self.lexicon_matcher.match(full_text)
             
             # Базовый вес категории
             category_weight = self.category_weights.get(category, 0.5)
             
             # Подсчет совпадений ключевых слов
-            keyword_score = self._calculate_keyword_score(full_text, self.tension_keywords)
+            keyword_score = self._calculate_keyword_score(matches, self.tension_keywords)
             
             # Анализ эмоциональной интенсивности
-            emotional_intensity = self._calculate_emotional_intensity(full_text)
+            emotional_intensity = self._calculate_emotional_intensity(matches)
             
             # Анализ заглавных букв и восклицательных знаков
             caps_ratio = self._calculate_caps_ratio(full_text)
@@ -180,9 +206,10 @@ class TensionCalculator:
         """
         try:
             full_text = f"{title} {content}".lower()
+            matches = self.lexicon_matcher.match(full_text)
             
             # Подсчет срочных слов
-            urgency_score = self._calculate_urgency_score(full_text)
+            urgency_score = self._calculate_urgency_score(matches)
             
             # Анализ заглавных букв в заголовке
             title_caps_ratio = self._calculate_caps_ratio(title)
@@ -191,7 +218,7 @@ class TensionCalculator:
             exclamation_ratio = self._calculate_exclamation_ratio(full_text)
             
             # Анализ временных маркеров
-            time_markers_score = self._calculate_time_markers_score(full_text)
+            time_markers_score = self._calculate_time_markers_score(matches)
             
             # Комбинированный расчет
             base_score = urgency_score * 40  # Вес срочных слов (0-40)
@@ -222,12 +249,12 @@ class TensionCalculator:
             logger.error(f"Ошибка при расчете индекса всплеска: {e}")
             return 50.0  # Среднее значение при ошибке
     
-    def _calculate_keyword_score(self, text: str, keyword_groups: Dict[str, List[str]]) -> float:
+    def _calculate_keyword_score(self, matches: LexiconMatches, keyword_groups: Dict[str, List[str]]) -> float:
         """
         Рассчитывает оценку на основе ключевых слов
         
         Args:
-            text: Текст для анализа
+            matches: Найденные в тексте ключевые слова
             keyword_groups: Группы ключевых слов с весами
             
         Returns:
@@ -236,24 +263,24 @@ class TensionCalculator:
         total_score = 0.0
         total_weight = 0.0
         
-        for group, keywords in keyword_groups.items():
+        for group in keyword_groups:
             weight = {'high': 1.0, 'medium': 0.6, 'low': 0.2}.get(group, 0.5)
             
-            matches = sum(1 for keyword in keywords if keyword in text)
-            if matches > 0:
+            group_matches = matches.distinct(f'tension:{group}')
+            if group_matches > 0:
                 # Нормализуем количество совпадений
-                normalized_matches = min(matches / 5, 1.0)  # Максимум 5 совпадений = 1.0
+                normalized_matches = min(group_matches / 5, 1.0)  # Максимум 5 совпадений = 1.0
                 total_score += normalized_matches * weight
                 total_weight += weight
         
         return total_score / max(total_weight, 1.0)
     
-    def _calculate_urgency_score(self, text: str) -> float:
+    def _calculate_urgency_score(self, matches: LexiconMatches) -> float:
         """
         Рассчитывает оценку срочности на основе ключевых слов
         
         Args:
-            text: Текст для анализа
+            matches: Найденные в тексте ключевые слова
             
         Returns:
             float: Оценка срочности (0-1)
@@ -261,23 +288,23 @@ class TensionCalculator:
         total_score = 0.0
         total_weight = 0.0
         
-        for group, keywords in self.urgency_keywords.items():
+        for group in self.urgency_keywords:
             weight = {'critical': 1.0, 'high': 0.7, 'medium': 0.4}.get(group, 0.5)
             
-            matches = sum(1 for keyword in keywords if keyword in text)
-            if matches > 0:
-                normalized_matches = min(matches / 3, 1.0)  # Максимум 3 совпадения = 1.0
+            group_matches = matches.distinct(f'urgency:{group}')
+            if group_matches > 0:
+                normalized_matches = min(group_matches / 3, 1.0)  # Максимум 3 совпадения = 1.0
                 total_score += normalized_matches * weight
                 total_weight += weight
         
         return total_score / max(total_weight, 1.0)
     
-    def _calculate_emotional_intensity(self, text: str) -> float:
+    def _calculate_emotional_intensity(self, matches: LexiconMatches) -> float:
         """
         Рассчитывает эмоциональную интенсивность текста
         
         Args:
-            text: Текст для анализа
+            matches: Найденные в тексте ключевые слова
             
         Returns:
             float: Эмоциональная интенсивность (0-1)
@@ -285,9 +312,9 @@ class TensionCalculator:
         total_intensity = 0.0
         emotion_count = 0
         
-        for emotion, keywords in self.emotional_markers.items():
-            matches = sum(1 for keyword in keywords if keyword in text)
-            if matches > 0:
+        for emotion in self.emotional_markers:
+            emotion_matches = matches.distinct(f'emotion:{emotion}')
+            if emotion_matches > 0:
                 # Разные эмоции имеют разный вес для напряженности
                 emotion_weights = {
                     'anger': 0.9,
@@ -298,7 +325,7 @@ class TensionCalculator:
                 }
                 
                 weight = emotion_weights.get(emotion, 0.5)
-                intensity = min(matches / 3, 1.0)  # Нормализуем
+                intensity = min(emotion_matches / 3, 1.0)  # Нормализуем
                 total_intensity += intensity * weight
                 emotion_count += 1
         
@@ -343,31 +370,19 @@ class TensionCalculator:
         # Нормализуем: максимум 5% восклицательных знаков = 1.0
         return min(exclamation_count / (total_chars * 0.05), 1.0)
     
-    def _calculate_time_markers_score(self, text: str) -> float:
+    def _calculate_time_markers_score(self, matches: LexiconMatches) -> float:
         """
         Рассчитывает оценку временных маркеров
         
         Args:
-            text: Текст для анализа
+            matches: Найденные в тексте ключевые слова
             
         Returns:
             float: Оценка временных маркеров (0-1)
         """
-        time_patterns = [
-            r'\b(сегодня|завтра|вчера)\b',
-            r'\b(сейчас|сейчас же|прямо сейчас)\b',
-            r'\b(только что|недавно|недавно произошло)\b',
-            r'\b(в данный момент|в настоящее время)\b',
-            r'\b(в ближайшее время|скоро|вскоре)\b',
-            r'\b(в течение дня|на этой неделе)\b'
-        ]
-        
-        matches = 0
-        for pattern in time_patterns:
-            matches += len(re.findall(pattern, text, re.IGNORECASE))
-        
+        # Вложенные фразы ("прямо сейчас", "сейчас же") - одно совпадение
         # Нормализуем: максимум 3 совпадения = 1.0
-        return min(matches / 3, 1.0)
+        return min(matches.count_longest('time') / 3, 1.0)
     
     def get_tension_factors(
         self,
@@ -391,14 +406,13 @@ class TensionCalculator:
             TensionFactors: Все факторы напряженности
         """
         full_text = f"{title} {content}".lower()
+        matches = self.lexicon_matcher.match(full_text)
         
         return TensionFactors(
             category_weight=self.category_weights.get(category, 0.5),
-            keyword_matches=sum(1 for keywords in self.tension_keywords.values() 
-                               for keyword in keywords if keyword in full_text),
-            emotional_intensity=self._calculate_emotional_intensity(full_text),
-            urgency_words=sum(1 for keywords in self.urgency_keywords.values() 
-                             for keyword in keywords if keyword in full_text),
+            keyword_matches=sum(matches.distinct(f'tension:{group}') for group in self.tension_keywords),
+            emotional_intensity=self._calculate_emotional_intensity(matches),
+            urgency_words=sum(matches.distinct(f'urgency:{group}') for group in self.urgency_keywords),
             caps_ratio=self._calculate_caps_ratio(full_text),
             exclamation_ratio=self._calculate_exclamation_ratio(full_text),
             ai_score=ai_social_tension
@@ -0,0 +1,478 @@
+"""
+Персистентный индекс похожих заголовков на MinHash/LSH (SQLite)
+
+- Заголовок (и, по настройке, начало текста) нормализуется и разбивается
+  на символьные n-граммы; MinHash-подпись режется на полосы (LSH), каждая
+  полоса хранится как ключ корзины в индексированной таблице
+- Поиск похожих - один индексированный запрос по корзинам полос и точная
+  проверка коэффициента Жаккара у найденных кандидатов, без перебора
+  последних N заголовков
+- Индекс пополняется при сохранении статьи и охватывает все записи
+  окна TITLE_INDEX_WINDOW_DAYS; записи старше окна вытесняются
+- Для каждой загруженной таблицы хранится метка loaded_until (самая
+  поздняя загруженная дата публикации): повторная загрузка читает из
+  ClickHouse только более новые строки
+- Безопасный доступ из нескольких потоков (соединение на поток)
+  и процессов (режим WAL + ожидание блокировки)
+"""
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS title_entries (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    link TEXT NOT NULL,
+    title TEXT NOT NULL,
+    text TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    UNIQUE (scope, link)
+);
+CREATE INDEX IF NOT EXISTS idx_title_entries_published
+    ON title_entries (published_at);
+CREATE TABLE IF NOT EXISTS title_buckets (
+    bucket INTEGER NOT NULL,
+    entry_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_title_buckets_bucket
+    ON title_buckets (bucket);
+CREATE INDEX IF NOT EXISTS idx_title_buckets_entry
+    ON title_buckets (entry_id);
+CREATE TABLE IF NOT EXISTS loaded_scopes (
+    scope TEXT PRIMARY KEY,
+    loaded_at REAL NOT NULL,
+    loaded_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+
+def normalize_text(text: str) -> str:
+    """Нижний регистр, без пунктуации, одиночные пробелы"""
+    return _NON_WORD_RE.sub(' ', (text or '').lower()).strip()
+
+
+def shingles(text: str, size: int = 4) -> Set[str]:
+    """
+    Символьные n-граммы нормализованного текста
+
+    Символьные n-граммы устойчивы к смене словоформ ("заявил" / "заявляет"),
+    чего не дают n-граммы слов на коротких заголовках.
+    """
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Коэффициент Жаккара двух множеств"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def optimal_bands(
+    threshold: float,
+    num_perm: int,
+    false_positive_weight: float = 0.1,
+    false_negative_weight: float = 0.9
+) -> Tuple[int, int]:
+    """
+    Подбирает число полос и строк в полосе для порога Жаккара
+
+    Минимизирует взвешенную сумму вероятностей ложного срабатывания
+    (ниже порога) и пропуска (выше порога) для S-кривой 1 - (1 - s^r)^b.
+    Кандидаты все равно проверяются точным коэффициентом Жаккара, поэтому
+    пропуск дубликата по умолчанию обходится дороже лишнего кандидата.
+
+    Returns:
+        Tuple (bands, rows)
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (num_perm, 1), float('inf')
+
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        probability = 1.0 - (1.0 - grid ** rows) ** bands
+        false_positive = probability[grid < threshold].sum()
+        false_negative = (1.0 - probability[grid >= threshold]).sum()
+        error = false_positive_weight * false_positive + false_negative_weight * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+
+    return best
+
+
+@dataclass
+class SimilarTitle:
+    """Найденный похожий заголовок"""
+    link: str
+    title: str
+    scope: str
+    similarity: float
+    published_at: float
+
+
+class TitleIndex:
+    """Индекс похожих заголовков в SQLite с вытеснением по окну времени"""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        window_days: Optional[float] = None,
+        num_perm: Optional[int] = None,
+        shingle_size: Optional[int] = None,
+        lead_chars: Optional[int] = None
+    ):
+        """
+        Args:
+            path: Путь к файлу базы SQLite
+            threshold: Порог коэффициента Жаккара для похожих заголовков (0-1)
+            window_days: Окно индекса в днях
+            num_perm: Количество хеш-функций MinHash
+            shingle_size: Длина символьной n-граммы
+            lead_chars: Сколько первых символов текста добавлять к заголовку (0 - только заголовок)
+        """
+        self.path = path or Config.TITLE_INDEX_PATH
+        self.threshold = threshold if threshold is not None else Config.TITLE_INDEX_THRESHOLD
+        self.window_days = window_days if window_days is not None else Config.TITLE_INDEX_WINDOW_DAYS
+        self.num_perm = num_perm or Config.TITLE_INDEX_NUM_PERM
+        self.shingle_size = shingle_size or Config.TITLE_INDEX_SHINGLE_SIZE
+        self.lead_chars = lead_chars if lead_chars is not None else Config.TITLE_INDEX_LEAD_CHARS
+
+        self.bands, self.rows = optimal_bands(self.threshold, self.num_perm)
+
+        # Фиксированное зерно: подписи должны совпадать во всех процессах и запусках
+        rng = np.random.RandomState(1)
+        self._perm_a = rng.randint(1, (1 << 32) - 1, size=self.num_perm, dtype=np.uint64)
+        self._perm_b = rng.randint(0, (1 << 32) - 1, size=self.num_perm, dtype=np.uint64)
+
+        self._local = threading.local()
+        self.stats = {'queries': 0, 'candidates': 0, 'matches': 0, 'writes': 0, 'evictions': 0}
+        self._writes_since_evict = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._ensure_loaded_until_column(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Возвращает соединение текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    def _ensure_loaded_until_column(self, conn: sqlite3.Connection):
+        """Добавляет колонку loaded_until в базы, созданные до ее появления"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(loaded_scopes)")}
+        if 'loaded_until' not in columns:
+            try:
+                # 0 - таблицы прежних баз при следующей загрузке читаются за все окно
+                conn.execute("ALTER TABLE loaded_scopes ADD COLUMN loaded_until REAL NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                # Колонку уже добавил другой процесс
+                pass
+
+    def make_text(self, title: str, content: Optional[str] = None) -> str:
+        """Нормализованный текст для индекса: заголовок и, по настройке, начало статьи"""
+        text = title or ''
+        if self.lead_chars and content:
+            text = f"{text} {content[:self.lead_chars]}"
+        return normalize_text(text)
+
+    def signature(self, shingle_set: Set[str]) -> np.ndarray:
+        """MinHash-подпись множества n-грамм"""
+        if not shingle_set:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+        values = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingle_set),
+            dtype=np.uint64,
+            count=len(shingle_set)
+        )
+        # Переполнение uint64 здесь допустимо - это часть хеш-функции
+        with np.errstate(over='ignore'):
+            hashed = (np.outer(values, self._perm_a) + self._perm_b) % _MERSENNE_PRIME
+        return (hashed & _MAX_HASH).min(axis=0)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """Ключи корзин LSH: номер полосы в старших битах, хеш полосы в младших"""
+        return [
+            (band << 32) | zlib.crc32(signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _cutoff(self, window_days: Optional[float] = None) -> float:
+        """Начало окна индекса (unix time)"""
+        days = window_days if window_days is not None else self.window_days
+        return time.time() - days * 86400
+
+    @staticmethod
+    def _timestamp(published_at: Union[datetime, float, None]) -> float:
+        if published_at is None:
+            return time.time()
+        if isinstance(published_at, datetime):
+            return published_at.timestamp()
+        return float(published_at)
+
+    def add(
+        self,
+        link: str,
+        title: str,
+        scope: Union[str, Sequence[str]],
+        published_at: Union[datetime, float, None] = None,
+        content: Optional[str] = None
+    ) -> bool:
+        """
+        Добавляет заголовок в индекс
+
+        Args:
+            link: URL статьи
+            title: Заголовок
+            scope: Таблица (или список таблиц), в которой сохранена статья
+            published_at: Дата публикации (по умолчанию - сейчас)
+            content: Текст статьи (используется, если включен TITLE_INDEX_LEAD_CHARS)
+
+        Returns:
+            True если добавлена хотя бы одна новая запись
+        """
+        return self.add_many([(link, title, scope, published_at, content)]) > 0
+
+    def add_many(self, items: Iterable[Tuple]) -> int:
+        """
+        Добавляет пакет заголовков одной транзакцией
+
+        Args:
+            items: Кортежи (link, title, scope, published_at, content)
+
+        Returns:
+            Количество добавленных записей
+        """
+        conn = self._connect()
+        cutoff = self._cutoff()
+        added = 0
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for link, title, scope, published_at, content in items:
+                published_ts = self._timestamp(published_at)
+                if not link or not title or published_ts < cutoff:
+                    continue
+
+                text = self.make_text(title, content)
+                keys = None
+                for table in [scope] if isinstance(scope, str) else scope:
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO title_entries (scope, link, title, text, published_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (table, link, title, text, published_ts)
+                    )
+                    if not cursor.rowcount:
+                        continue
+
+                    if keys is None:
+                        keys = self.band_keys(self.signature(shingles(text, self.shingle_size)))
+                    conn.executemany(
+                        "INSERT INTO title_buckets (bucket, entry_id) VALUES (?, ?)",
+                        [(key, cursor.lastrowid) for key in keys]
+                    )
+                    added += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self.stats['writes'] += added
+        self._writes_since_evict += added
+
+        # Вытесняем пачкой, чтобы не чистить окно на каждой записи
+        if self._writes_since_evict >= 500:
+            self._writes_since_evict = 0
+            self.evict()
+
+        return added
+
+    def find_similar(
+        self,
+        title: str,
+        scopes: Union[str, Sequence[str], None] = None,
+        content: Optional[str] = None,
+        threshold: Optional[float] = None,
+        window_days: Optional[float] = None,
+        limit: int = 1
+    ) -> List[SimilarTitle]:
+        """
+        Ищет похожие заголовки
+
+        Args:
+            title: Заголовок статьи
+            scopes: Таблица или список таблиц (None - во всех)
+            content: Текст статьи (используется, если включен TITLE_INDEX_LEAD_CHARS)
+            threshold: Порог Жаккара (по умолчанию - порог индекса)
+            window_days: Окно поиска в днях (по умолчанию - окно индекса)
+            limit: Максимум результатов
+
+        Returns:
+            Похожие заголовки по убыванию схожести
+        """
+        self.stats['queries'] += 1
+
+        text = self.make_text(title, content)
+        query_shingles = shingles(text, self.shingle_size)
+        if not query_shingles:
+            return []
+
+        keys = self.band_keys(self.signature(query_shingles))
+        threshold = threshold if threshold is not None else self.threshold
+
+        # CROSS JOIN фиксирует порядок: сначала корзины по индексу, затем записи по id
+        # (иначе SQLite может выбрать перебор всей таблицы по индексу scope)
+        sql = (
+            "SELECT DISTINCT e.link, e.title, e.scope, e.text, e.published_at "
+            "FROM title_buckets b CROSS JOIN title_entries e ON e.id = b.entry_id "
+            "WHERE b.bucket IN ({keys}) AND e.published_at >= ?"
+        ).format(keys=','.join('?' * len(keys)))
+        params = [*keys, self._cutoff(window_days)]
+
+        if scopes is not None:
+            scopes = [scopes] if isinstance(scopes, str) else list(scopes)
+            sql += " AND e.scope IN ({})".format(','.join('?' * len(scopes)))
+            params += scopes
+
+        results = []
+        for link, candidate_title, scope, candidate_text, published_at in self._connect().execute(sql, params):
+            self.stats['candidates'] += 1
+            similarity = jaccard(query_shingles, shingles(candidate_text, self.shingle_size))
+            if similarity >= threshold:
+                results.append(SimilarTitle(link, candidate_title, scope, similarity, published_at))
+
+        results.sort(key=lambda item: item.similarity, reverse=True)
+        self.stats['matches'] += bool(results)
+        return results[:limit]
+
+    def scope_state(self, scope: str) -> Optional[Tuple[float, float]]:
+        """
+        Состояние загрузки таблицы в индекс
+
+        Returns:
+            Tuple (loaded_at, loaded_until) - время последней загрузки и самая
+            поздняя загруженная дата публикации (unix time); None если
+            таблица еще не загружалась
+        """
+        return self._connect().execute(
+            "SELECT loaded_at, loaded_until FROM loaded_scopes WHERE scope = ?", (scope,)
+        ).fetchone()
+
+    def mark_loaded(self, scope: str, loaded_until: float):
+        """
+        Отмечает загрузку таблицы в индекс
+
+        Args:
+            scope: Таблица
+            loaded_until: Самая поздняя загруженная дата публикации (unix time)
+        """
+        self._connect().execute(
+            "INSERT OR REPLACE INTO loaded_scopes (scope, loaded_at, loaded_until) VALUES (?, ?, ?)",
+            (scope, time.time(), loaded_until)
+        )
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT count(*) FROM title_entries").fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        Удаляет записи старше окна индекса
+
+        Returns:
+            Количество удаленных записей
+        """
+        conn = self._connect()
+        cutoff = self._cutoff()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                "DELETE FROM title_buckets WHERE entry_id IN "
+                "(SELECT id FROM title_entries WHERE published_at < ?)",
+                (cutoff,)
+            )
+            removed = conn.execute(
+                "DELETE FROM title_entries WHERE published_at < ?", (cutoff,)
+            ).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self.stats['evictions'] += removed
+        return removed
+
+    def clear(self):
+        """Очищает индекс и отметки о загрузке таблиц"""
+        conn = self._connect()
+        conn.execute("DELETE FROM title_buckets")
+        conn.execute("DELETE FROM title_entries")
+        conn.execute("DELETE FROM loaded_scopes")
+
+    def get_stats(self) -> dict:
+        """Статистика индекса"""
+        return {
+            **self.stats,
+            'entries': len(self),
+            'bands': self.bands,
+            'rows': self.rows,
+            'threshold': self.threshold,
+            'window_days': self.window_days
+        }
+
+    def close(self):
+        """Закрывает соединение текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_index_instance = None
+_index_instance_lock = threading.Lock()
+
+
+def get_title_index() -> TitleIndex:
+    """Возвращает общий для процесса экземпляр индекса заголовков"""
+    global _index_instance
+
+    if _index_instance is None:
+        with _index_instance_lock:
+            if _index_instance is None:
+                _index_instance = TitleIndex()
+    return _index_instance
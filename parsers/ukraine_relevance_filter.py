@@ -1,10 +1,16 @@
 import os
 import logging
-import requests
 import json
-from typing import Optional, Dict, Any
+from typing import Dict, Any
 from dotenv import load_dotenv
 
+try:
+    from parsers.gen_api_scheduler import get_gen_api_scheduler
+    from parsers.lexicon_matcher import LexiconMatcher
+except ImportError:
+    from gen_api_scheduler import get_gen_api_scheduler
+    from lexicon_matcher import LexiconMatcher
+
 # Загружаем переменные окружения из .env файла
 load_dotenv()
 
@@ -103,6 +109,9 @@ class UkraineRelevanceFilter:
             ]
         }
         
+        # Все категории ключевых слов ищутся за один проход по тексту
+        self.keyword_matcher = LexiconMatcher(self.ukraine_keywords)
+        
         logger.info("UkraineRelevanceFilter инициализирован")
     
     def is_ukraine_relevant(self, title: str, content: str, use_ai: bool = True) -> Dict[str, Any]:
@@ -189,17 +198,14 @@ class UkraineRelevanceFilter:
         Returns:
             Dict[str, Any]: Результат проверки ключевых слов
         """
-        text = f"{title} {content}".lower()
+        matches = self.keyword_matcher.match(f"{title} {content}")
         found_keywords = []
         category_scores = {}
         
         # Проверяем каждую категорию ключевых слов
         for category, keywords in self.ukraine_keywords.items():
-            found_in_category = []
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    found_in_category.append(keyword)
-                    found_keywords.append(keyword)
+            found_in_category = matches.found(category)
+            found_keywords.extend(found_in_category)
             
             if found_in_category:
                 category_scores[category] = len(found_in_category) / len(keywords)
@@ -273,30 +279,14 @@ class UkraineRelevanceFilter:
                 "top_p": 0.95
             }
             
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"API вернул код {response.status_code}: {response.text}")
-            
-            response_data = response.json()
-            
-            # Получаем request_id для Long-Polling
-            request_id = response_data.get('request_id')
-            if not request_id:
-                raise Exception("Не получен request_id от API")
-            
-            # Ждем результат через Long-Polling
-            result = self._wait_for_result(request_id)
+            # Задачу отправляет и опрашивает общий планировщик gen-api
+            status_data = get_gen_api_scheduler(self.api_key).submit(data).result()
             
+            result = status_data.get('result', [])
             if not result:
                 raise Exception("Не удалось получить результат от API")
             
-            ai_response = result
+            ai_response = result[0]
             
             # Улучшенная обработка пустых ответов
             if not ai_response or ai_response.strip() == "":
@@ -315,56 +305,6 @@ class UkraineRelevanceFilter:
                 'reason': f'Ошибка AI-анализа: {str(e)}'
             }
     
-    def _wait_for_result(self, request_id: str) -> Optional[str]:
-        """Ожидает результат от Gen-API через Long-Polling"""
-        import time
-        
-        max_attempts = 12  # Максимум 1 минута ожидания
-        attempt = 0
-        
-        while attempt < max_attempts:
-            try:
-                status_url = f"https://api.gen-api.ru/api/v1/request/get/{request_id}"
-                
-                response = requests.get(
-                    status_url,
-                    headers=self.headers,
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if data.get('status') == 'success':
-                        result = data.get('result', [])
-                        if result and len(result) > 0:
-                            return result[0]
-                        else:
-                            logger.warning("Получен пустой результат от API")
-                            return None
-                    elif data.get('status') == 'error':
-                        logger.error(f"Ошибка API: {data.get('error', 'Неизвестная ошибка')}")
-                        return None
-                    else:
-                        # Статус 'starting' или 'processing' - продолжаем ждать
-                        time.sleep(5)
-                        attempt += 1
-                        continue
-                else:
-                    logger.warning(f"Ошибка при проверке статуса: {response.status_code}")
-                    time.sleep(5)
-                    attempt += 1
-                    continue
-                    
-            except Exception as e:
-                logger.warning(f"Ошибка при проверке статуса: {e}")
-                time.sleep(5)
-                attempt += 1
-                continue
-        
-        logger.error("Превышено время ожидания результата от API")
-        return None
-    
     def _create_relevance_prompt(self, title: str, content: str) -> str:
         """Создает промпт для анализа релевантности
         
@@ -486,19 +426,16 @@ class UkraineRelevanceFilter:
         """
         try:
             # Объединяем заголовок и содержание для анализа
-            text = f"{title} {content}".lower()
+            matches = self.keyword_matcher.match(f"{title} {content}")
             
             # Подсчитываем совпадения по категориям
             category_scores = {}
             found_keywords = []
             
-            for category, keywords in self.ukraine_keywords.items():
-                score = 0
-                for keyword in keywords:
-                    if keyword.lower() in text:
-                        score += 1
-                        found_keywords.append(keyword)
-                category_scores[category] = score
+            for category in self.ukraine_keywords:
+                found_in_category = matches.found(category)
+                category_scores[category] = len(found_in_category)
+                found_keywords.extend(found_in_category)
             
             # Определяем лучшую категорию
             best_category = max(category_scores, key=category_scores.get) if category_scores else None
@@ -15,7 +15,6 @@ from ukraine_relevance_filter import filter_ukraine_relevance
 """
 
 import requests
-from bs4 import BeautifulSoup
 from clickhouse_driver import Client
 from datetime import datetime
 import time
@@ -27,12 +26,19 @@ import re
 from urllib.parse import urljoin, urlparse
 from typing import List, Dict, Optional, Set
 import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 
 # Добавляем корневую директорию проекта в sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
 from parsers.news_categories import classify_news, create_custom_site_tables, get_site_table_name
+from parsers.concurrent_fetcher import ConcurrentFetcher
+from parsers.crawl_frontier import CrawlFrontier, FrontierItem, article_score
+from parsers.html_parsing import HtmlDocument, parse_document
+from parsers.http_client import get_http_client, max_page_bytes
+from parsers.seen_links import drop_seen_links, mark_links_seen
+from parsers.universal_tables import create_universal_schema
 
 # Настройка логирования
 logging.basicConfig(
@@ -64,8 +70,11 @@ class UniversalParser:
     
     def __init__(self):
         self.session = requests.Session()
-        self.visited_urls: Set[str] = set()
         self.parsed_articles: List[Dict] = []
+        # Страницы, уже загруженные при автоопределении структуры (используются один раз)
+        self._prefetched: Dict[str, HtmlDocument] = {}
+        # Страницы больше лимита не загружаются (HTTP_SOURCE_MAX_PAGE_BYTES)
+        self.max_page_bytes = max_page_bytes('universal')
         self.client = None
         self._setup_clickhouse()
         
@@ -85,44 +94,9 @@ class UniversalParser:
             logger.error(f"Ошибка подключения к ClickHouse: {e}")
             
     def _create_universal_table(self):
-        """Создание универсальной таблицы для хранения новостей"""
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS news.universal_news (
-            id UUID DEFAULT generateUUIDv4(),
-            site_name String,
-            url String,
-            title String,
-            content String,
-            category String,
-            published_date DateTime DEFAULT now(),
-            language String DEFAULT 'unknown',
-            tags Array(String) DEFAULT [],
-            metadata String DEFAULT '{}'
-        ) ENGINE = MergeTree()
-        ORDER BY (site_name, published_date)
-        """
-        self.client.execute(create_table_query)
-        self._create_universal_category_tables()
-        
-    def _create_universal_category_tables(self):
-        """Создание стандартных таблиц категорий для универсального парсера"""
-        categories = ['ukraine', 'middle_east', 'fake_news', 'info_war', 'europe', 'usa', 'other']
-        
+        """Создание универсальной таблицы, таблиц категорий и представлений переноса"""
         try:
-            for category in categories:
-                self.client.execute(f'''
-                    CREATE TABLE IF NOT EXISTS news.universal_{category} (
-                        id UUID DEFAULT generateUUIDv4(),
-                        title String,
-                        link String,
-                        content String,
-                        source String,
-                        category String DEFAULT '{category}',
-                        published_date DateTime DEFAULT now()
-                    ) ENGINE = MergeTree()
-                    ORDER BY (published_date, id)
-                ''')
-            
+            create_universal_schema(self.client)
             logger.info("Стандартные таблицы категорий созданы успешно")
         except Exception as e:
             logger.error(f"Ошибка создания таблиц категорий: {e}")
@@ -171,8 +145,10 @@ class UniversalParser:
     def auto_detect_structure(self, url: str) -> SiteConfig:
         """Автоматическое определение структуры сайта"""
         try:
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            response = get_http_client().download(url, self.max_page_bytes, timeout=10)
+            doc = parse_document(response.content, encoding=response.encoding)
+            if response.ok:
+                self._prefetched[url] = doc
             
             # Определяем домен
             domain = urlparse(url).netloc.lower()
@@ -185,23 +161,23 @@ class UniversalParser:
             
             # Поиск статей
             for selector in ['article', '.article', '.news-item', '.story', '.post']:
-                if soup.select(selector):
+                if doc.select_one(selector) is not None:
                     article_selectors.append(selector)
                     
             # Поиск заголовков
             for selector in ['h1', 'h2', 'h3', '.title', '.headline', '.header']:
-                if soup.select(selector):
+                if doc.select_one(selector) is not None:
                     title_selectors.append(selector)
                     
             # Поиск контента
             for selector in ['p', '.content', '.body', '.text', 'article p']:
-                if soup.select(selector):
+                if doc.select_one(selector) is not None:
                     content_selectors.append(selector)
                     
             # Поиск ссылок на статьи
-            links = soup.find_all('a', href=True)
+            links = doc.select('a[href]')
             for link in links[:20]:  # Анализируем первые 20 ссылок
-                href = link.get('href')
+                href = link.attr('href')
                 if href and any(keyword in href.lower() for keyword in ['news', 'article', 'story', 'post']):
                     link_selectors.append(f'a[href*="{keyword}"]')
                     
@@ -228,42 +204,50 @@ class UniversalParser:
                 exclude_patterns=[]
             )
             
+    def fetch_page(self, url: str, config: SiteConfig) -> HtmlDocument:
+        """Загрузка и разбор страницы (страница из автоопределения не загружается повторно)"""
+        doc = self._prefetched.pop(url, None)
+        if doc is not None:
+            return doc
+        
+        # Устанавливаем заголовки если указаны
+        headers = config.headers or {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        
+        response = get_http_client().download(url, self.max_page_bytes, headers=headers, timeout=15)
+        response.raise_for_status()
+        
+        return parse_document(response.content, encoding=response.encoding)
+        
     def extract_article_content(self, url: str, config: SiteConfig) -> Optional[Dict]:
         """Извлечение содержимого статьи"""
         try:
-            if url in self.visited_urls:
-                return None
-                
-            self.visited_urls.add(url)
-            
-            # Устанавливаем заголовки если указаны
-            headers = config.headers or {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = self.session.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return self.extract_article(url, self.fetch_page(url, config), config)
+        except Exception as e:
+            logger.error(f"Ошибка извлечения контента из {url}: {e}")
+            return None
             
+    def extract_article(self, url: str, doc: HtmlDocument, config: SiteConfig) -> Optional[Dict]:
+        """Извлечение статьи из уже загруженной страницы"""
+        try:
             # Извлекаем заголовок
             title = None
             for selector in config.title_selectors:
-                title_elem = soup.select_one(selector)
-                if title_elem and title_elem.get_text(strip=True):
-                    title = title_elem.get_text(strip=True)
-                    break
+                title_elem = doc.select_one(selector)
+                if title_elem is not None:
+                    title = title_elem.text()
+                    if title:
+                        break
                     
             if not title:
-                title = soup.title.get_text(strip=True) if soup.title else url
+                title = doc.title or url
                 
             # Извлекаем контент
             content_parts = []
             for selector in config.content_selectors:
-                elements = soup.select(selector)
-                for elem in elements:
-                    text = elem.get_text(strip=True)
-                    if text and len(text) > 50:  # Игнорируем короткие фрагменты
+                for text in doc.texts(selector):
+                    if len(text) > 50:  # Игнорируем короткие фрагменты
                         content_parts.append(text)
                         
             content = ' '.join(content_parts[:10])  # Берем первые 10 абзацев
@@ -313,8 +297,8 @@ class UniversalParser:
                     'content_length': len(content),
                     'title_length': len(title),
                     'selectors_used': {
-                        'title': [s for s in config.title_selectors if soup.select_one(s)],
-                        'content': [s for s in config.content_selectors if soup.select(s)]
+                        'title': [s for s in config.title_selectors if doc.select_one(s) is not None],
+                        'content': [s for s in config.content_selectors if doc.select_one(s) is not None]
                     }
                 })
             }
@@ -324,67 +308,129 @@ class UniversalParser:
             return None
             
     def crawl_site(self, config: SiteConfig, max_articles: int = 50, max_depth: int = None) -> List[Dict]:
-        """Краулинг сайта для поиска и парсинга статей"""
+        """
+        Краулинг сайта для поиска и парсинга статей
+        
+        Обход в ширину по приоритетной очереди (crawl_frontier.py): каждая
+        страница загружается один раз и используется и для извлечения статьи,
+        и для поиска ссылок. Страницы загружаются UNIVERSAL_CRAWL_WORKERS
+        потоками с ограничением параллельности и паузой между запросами
+        к одному домену (config.delay_range), уже сохраненные статьи
+        отсекаются фильтром ссылок до загрузки.
+        """
         articles = []
-        urls_to_visit = [config.base_url]
-        depth = 0
         
         # Используем переданную глубину или глубину из конфигурации
         effective_max_depth = max_depth if max_depth is not None else config.max_depth
         
-        while urls_to_visit and len(articles) < max_articles and depth < effective_max_depth:
-            current_urls = urls_to_visit[:10]  # Обрабатываем по 10 URL за раз
-            urls_to_visit = urls_to_visit[10:]
-            
-            for url in current_urls:
-                try:
-                    # Задержка между запросами
-                    delay = random.uniform(*config.delay_range)
-                    time.sleep(delay)
+        frontier = CrawlFrontier(
+            effective_max_depth,
+            max_urls=Config.UNIVERSAL_CRAWL_MAX_URLS,
+            max_queued=Config.UNIVERSAL_CRAWL_MAX_QUEUED
+        )
+        frontier.push(config.base_url)
+        
+        fetcher = ConcurrentFetcher(
+            max_workers=Config.UNIVERSAL_CRAWL_WORKERS,
+            per_host_concurrency=Config.UNIVERSAL_CRAWL_PER_HOST,
+            delay_range=config.delay_range
+        )
+        
+        pages = 0
+        in_flight = {}
+        executor = ThreadPoolExecutor(max_workers=fetcher.max_workers)
+        
+        try:
+            while len(articles) < max_articles:
+                # Держим занятыми все потоки, пока есть URL и не исчерпан лимит страниц
+                while len(in_flight) < fetcher.max_workers and pages < Config.UNIVERSAL_CRAWL_MAX_PAGES:
+                    item = frontier.pop()
+                    if item is None:
+                        break
                     
                     # Проверяем исключения
-                    if any(pattern in url for pattern in config.exclude_patterns):
+                    if any(pattern in item.url for pattern in config.exclude_patterns):
+                        continue
+                    
+                    pages += 1
+                    in_flight[executor.submit(self._crawl_page, item, config, fetcher, frontier.max_depth)] = item
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    try:
+                        article, links = future.result()
+                    except Exception as e:
+                        logger.error(f"Ошибка при обработке {item.url}: {e}")
                         continue
-                        
-                    logger.info(f"Парсинг: {url}")
                     
-                    # Извлекаем контент статьи
-                    article = self.extract_article_content(url, config)
-                    if article:
+                    if article and len(articles) < max_articles:
                         articles.append(article)
                         logger.info(f"Добавлена статья: {article['title'][:100]}...")
-                        
-                    # Ищем новые ссылки для краулинга
-                    if depth < effective_max_depth - 1:
-                        new_urls = self._find_article_links(url, config)
-                        urls_to_visit.extend(new_urls)
-                        
-                except Exception as e:
-                    logger.error(f"Ошибка при обработке {url}: {e}")
-                    continue
                     
-            depth += 1
-            
-        logger.info(f"Краулинг завершен. Найдено {len(articles)} статей")
+                    for link in self._drop_known_links(frontier, links):
+                        frontier.push(link, item.depth + 1, item.url)
+        finally:
+            # Не начинаем загрузку оставшихся страниц, если статей уже достаточно
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        logger.info(f"Краулинг завершен. Загружено страниц: {pages}, найдено {len(articles)} статей")
+        logger.info(f"Очередь обхода: {frontier.get_stats()}")
         return articles
+    
+    def _crawl_page(self, item: FrontierItem, config: SiteConfig, fetcher: ConcurrentFetcher, max_depth: int):
+        """
+        Загружает страницу (с учетом лимитов домена) и разбирает ее один раз
+        
+        Returns:
+            Tuple (статья или None, ссылки для следующего уровня)
+        """
+        logger.info(f"Парсинг: {item.url} (глубина {item.depth})")
+        
+        with fetcher.get_limiter(item.url):
+            doc = self.fetch_page(item.url, config)
+        
+        article = self.extract_article(item.url, doc, config)
+        
+        # Ищем новые ссылки для краулинга
+        links = []
+        if item.depth + 1 < max_depth:
+            links = self._find_article_links(item.url, config, doc)
+        return article, links
+    
+    def _drop_known_links(self, frontier: CrawlFrontier, links: List[str]) -> List[str]:
+        """Отбрасывает ссылки, уже поставленные в очередь или сохраненные в news.universal_news"""
+        links = [link for link in links if not frontier.seen(link)]
+        if not links or not self.client:
+            return links
         
-    def _find_article_links(self, url: str, config: SiteConfig) -> List[str]:
-        """Поиск ссылок на статьи на странице"""
         try:
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            return drop_seen_links(self.client, 'universal_news', links, link_column='url')
+        except Exception as e:
+            logger.warning(f"Не удалось проверить сохраненные ссылки: {e}")
+            return links
+            
+    def _find_article_links(self, url: str, config: SiteConfig, doc: Optional[HtmlDocument] = None) -> List[str]:
+        """Поиск ссылок на статьи на странице (наиболее похожие на статьи - первыми)"""
+        try:
+            if doc is None:
+                doc = self.fetch_page(url, config)
             
-            links = set()
+            links = {}
             for selector in config.link_selectors:
-                elements = soup.select(selector)
+                elements = doc.select(selector)
                 for elem in elements:
-                    href = elem.get('href')
+                    href = elem.attr('href')
                     if href:
-                        full_url = urljoin(url, href)
-                        if full_url not in self.visited_urls and self._is_valid_article_url(full_url, config):
-                            links.add(full_url)
+                        full_url = urljoin(url, href).split('#', 1)[0]
+                        if full_url not in links and self._is_valid_article_url(full_url, config):
+                            links[full_url] = article_score(full_url)
                             
-            return list(links)[:20]  # Ограничиваем количество ссылок
+            # Ограничиваем количество ссылок
+            return sorted(links, key=links.get, reverse=True)[:20]
             
         except Exception as e:
             logger.error(f"Ошибка поиска ссылок на {url}: {e}")
@@ -405,23 +451,16 @@ class UniversalParser:
         return any(indicator in url.lower() for indicator in article_indicators)
         
     def save_articles(self, articles: List[Dict], site_url: str = None):
-        """Сохранение статей в ClickHouse в стандартные таблицы категорий"""
+        """Сохранение статей в ClickHouse (одна вставка в news.universal_news)"""
         if not articles or not self.client:
             return
             
         try:
-            # Проверяем существующие URL
-            existing_urls = set()
-            if articles:
-                urls_to_check = [article['url'] for article in articles]
-                result = self.client.execute(
-                    "SELECT url FROM news.universal_news WHERE url IN %(urls)s",
-                    {'urls': urls_to_check}
-                )
-                existing_urls = {row[0] for row in result}
-                
-            # Фильтруем новые статьи
-            new_articles = [article for article in articles if article['url'] not in existing_urls]
+            # Фильтруем новые статьи (фильтр ссылок с подтверждением по таблице)
+            new_urls = set(drop_seen_links(
+                self.client, 'universal_news', [article['url'] for article in articles], link_column='url'
+            ))
+            new_articles = [article for article in articles if article['url'] in new_urls]
             
             if new_articles:
                 # Сохраняем в универсальную таблицу
@@ -429,44 +468,9 @@ class UniversalParser:
                     "INSERT INTO news.universal_news (site_name, url, title, content, category, language, metadata) VALUES",
                     new_articles
                 )
-                
-                # Добавляем статьи в стандартные таблицы категорий
-                # Группируем статьи по категориям
-                articles_by_category = {}
-                for article in new_articles:
-                    category = article.get('category', 'other')
-                    if not category or category is None:
-                        category = 'other'
-                    
-                    # Пропускаем статьи с категорией 'other'
-                    if category == 'other':
-                        continue
-                    
-                    if category not in articles_by_category:
-                        articles_by_category[category] = []
-                    
-                    # Подготавливаем данные для вставки в стандартную таблицу категории
-                    article_data = {
-                        'title': article['title'],
-                        'link': article['url'],
-                        'content': article['content'],
-                        'source': article['site_name'],
-                        'category': category
-                    }
-                    articles_by_category[category].append(article_data)
-                
-                # Сохраняем в стандартные таблицы категорий
-                for category, category_articles in articles_by_category.items():
-                    try:
-                        # Сохраняем в стандартную таблицу категории universal_{category}
-                        self.client.execute(
-                            f"INSERT INTO news.universal_{category} (title, link, content, source, category) VALUES",
-                            category_articles
-                        )
-                        logger.info(f"Сохранено {len(category_articles)} статей в стандартную категорию {category}")
-                    except Exception as e:
-                        logger.warning(f"Не удалось сохранить в стандартную таблицу universal_{category}: {e}")
-                
+                mark_links_seen(article['url'] for article in new_articles)
+                # Таблицы категорий universal_{category} заполняют
+                # материализованные представления universal_news
                 logger.info(f"Сохранено {len(new_articles)} новых статей")
             else:
                 logger.info("Новых статей для сохранения не найдено")
@@ -0,0 +1,106 @@
+"""
+Таблицы универсального парсера
+
+Универсальный парсер пишет каждую статью один раз - в news.universal_news.
+Таблицы категорий news.universal_{category} заполняет ClickHouse:
+материализованное представление news.universal_{category}_mv при каждой
+вставке в universal_news переносит в свою таблицу строки этой категории.
+Парсеру не нужно группировать статьи по категориям и делать отдельную
+вставку на каждую категорию.
+
+Статьи категории 'other' в таблицу universal_other не переносятся
+(как и раньше, при записи из парсера).
+"""
+UNIVERSAL_TABLE = 'news.universal_news'
+
+# Стандартные категории универсального парсера
+UNIVERSAL_CATEGORIES = ('ukraine', 'middle_east', 'fake_news', 'info_war', 'europe', 'usa', 'other')
+
+# Категории, которые переносятся в таблицы категорий
+FANOUT_CATEGORIES = tuple(category for category in UNIVERSAL_CATEGORIES if category != 'other')
+
+
+def create_universal_table_sql() -> str:
+    """DDL основной таблицы универсального парсера"""
+    return f'''
+        CREATE TABLE IF NOT EXISTS {UNIVERSAL_TABLE} (
+            id UUID DEFAULT generateUUIDv4(),
+            site_name String,
+            url String,
+            title String,
+            content String,
+            category String,
+            published_date DateTime DEFAULT now(),
+            language String DEFAULT 'unknown',
+            tags Array(String) DEFAULT [],
+            metadata String DEFAULT '{{}}'
+        ) ENGINE = MergeTree()
+        ORDER BY (site_name, published_date)
+    '''
+
+
+def create_category_table_sql(category: str) -> str:
+    """DDL таблицы категории news.universal_{category}"""
+    return f'''
+        CREATE TABLE IF NOT EXISTS news.universal_{category} (
+            id UUID DEFAULT generateUUIDv4(),
+            title String,
+            link String,
+            content String,
+            source String,
+            category String DEFAULT '{category}',
+            published_date DateTime DEFAULT now()
+        ) ENGINE = MergeTree()
+        ORDER BY (published_date, id)
+    '''
+
+
+def fanout_view_name(category: str) -> str:
+    """Имя материализованного представления категории"""
+    return f"universal_{category}_mv"
+
+
+def create_fanout_view_sql(category: str) -> str:
+    """
+    DDL материализованного представления universal_news -> universal_{category}
+
+    Args:
+        category: Категория
+
+    Returns:
+        CREATE MATERIALIZED VIEW ... TO news.universal_{category}
+    """
+    return f'''
+        CREATE MATERIALIZED VIEW IF NOT EXISTS news.{fanout_view_name(category)}
+        TO news.universal_{category}
+        AS SELECT
+            title,
+            url AS link,
+            content,
+            site_name AS source,
+            category,
+            published_date
+        FROM {UNIVERSAL_TABLE}
+        WHERE category = '{category}'
+    '''
+
+
+def create_universal_schema(client) -> int:
+    """
+    Создает universal_news, таблицы категорий и представления переноса
+
+    Представление создается после своей таблицы категории: TO-таблица
+    должна существовать.
+
+    Args:
+        client: clickhouse_driver.Client
+
+    Returns:
+        int: Количество созданных представлений
+    """
+    client.execute(create_universal_table_sql())
+    for category in UNIVERSAL_CATEGORIES:
+        client.execute(create_category_table_sql(category))
+    for category in FANOUT_CATEGORIES:
+        client.execute(create_fanout_view_sql(category))
+    return len(FANOUT_CATEGORIES)
@@ -0,0 +1,780 @@
+"""
+Пул прогретых процессов-исполнителей парсеров
+
+Раньше каждый запуск парсера был отдельным `python parser_x.py`: старт
+интерпретатора, импорт bs4, clickhouse_driver, selenium, telethon
+и новое соединение с БД на каждый запуск. Теперь парсеры выполняются
+в долгоживущих процессах:
+- процесс-исполнитель при старте один раз импортирует модули парсеров
+  и между запусками сохраняет общие ресурсы (HTTP-клиент, кэш
+  классификации, фильтр ссылок, индексы заголовков)
+- задания принимаются через локальную очередь, одновременно выполняется
+  не больше PARSER_POOL_PER_SOURCE заданий одного источника
+- вывод парсера (print и logging) построчно передается подписчикам
+  пула (parser_api отправляет его в Socket.IO); у каждого процесса своя
+  очередь событий
+- остановка задания (отмена или таймаут) посылает процессу SIGINT:
+  KeyboardInterrupt прерывает парсер, BaseNewsParser.__exit__ сбрасывает
+  буфер записи, процесс завершается сам. Если он не завершился за
+  PARSER_POOL_CANCEL_GRACE секунд, процесс завершается принудительно, а
+  его очередь событий больше не читается (запись в нее могла оборваться
+  посередине). Вместо остановленного процесса запускается новый
+"""
+import atexit
+import importlib
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Добавляем путь к корневой директории
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PARSERS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Сколько последних строк вывода хранится в задании и сколько заданий в истории
+LOG_TAIL = 200
+JOB_HISTORY = 200
+
+# Пауза диспетчера, когда ни в одной очереди событий нет сообщений (сек)
+EVENT_POLL = 0.1
+
+FINAL_STATUSES = ('success', 'error', 'cancelled')
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """Описание парсера, который умеет запускать пул"""
+    key: str
+    name: str
+    # Модуль в каталоге parsers и его функция запуска
+    module: str
+    entry: str = 'main'
+    # Функция этого модуля, вызывающая парсер (module, **kwargs), если entry не подходит
+    adapter: Optional[str] = None
+    accepts_limit: bool = True
+
+
+PARSER_SPECS: Dict[str, ParserSpec] = {spec.key: spec for spec in (
+    ParserSpec('lenta', 'Lenta.ru', 'parser_lenta'),
+    ParserSpec('rbc', 'RBC.ru', 'parser_rbc'),
+    ParserSpec('gazeta', 'Gazeta.ru', 'parser_gazeta'),
+    ParserSpec('kommersant', 'Kommersant.ru', 'parser_kommersant'),
+    ParserSpec('ria', 'РИА Новости', 'parser_ria'),
+    ParserSpec('rt', 'RT.com', 'parser_rt'),
+    ParserSpec('tsn', 'TSN.ua', 'parser_tsn'),
+    ParserSpec('unian', 'UNIAN.ua', 'parser_unian'),
+    ParserSpec('israil', '7kanal.co.il', 'parser_israil', adapter='run_israil'),
+    ParserSpec('telegram', 'Telegram каналы', 'parser_telegram'),
+    ParserSpec('twitter', 'Twitter', 'parser_twitter', accepts_limit=False),
+    ParserSpec('universal', 'Универсальный парсер', 'universal_parser', adapter='run_universal'),
+)}
+
+
+def run_israil(module, limit: Optional[int] = None):
+    """Однократный запуск парсера 7kanal.co.il (как parser_israil.py без аргументов)"""
+    if not module.test_clickhouse_connection():
+        raise RuntimeError("Нет соединения с ClickHouse")
+    module.create_ukraine_tables_if_not_exists()
+    return module.parse_israil_news(limit=limit)
+
+
+def run_universal(module, url: str, limit: Optional[int] = None):
+    """Запуск универсального парсера для сайта"""
+    parser = module.UniversalParser()
+    result = parser.parse_site(url, max_articles=limit or 50)
+    print(f"Парсинг {url} завершен: найдено статей {result['articles_found']} за {result['execution_time']} с")
+    return result
+
+
+def message_type(line: str) -> str:
+    """Тип сообщения для журнала в интерфейсе по тексту строки вывода парсера"""
+    if 'Ошибка' in line or 'Error' in line:
+        return 'error'
+    if 'Найдена новая статья' in line or 'Добавлено' in line or 'Получено' in line:
+        return 'success'
+    return 'info'
+
+
+def _plain_result(result: Any) -> Any:
+    """Итог запуска без больших вложенных данных (например, списка статей)"""
+    if result is None or isinstance(result, (bool, int, float, str)):
+        return result
+    if isinstance(result, dict):
+        return {key: value for key, value in result.items() if isinstance(value, (bool, int, float, str))}
+    return str(result)
+
+
+# --- Процесс-исполнитель ---
+
+class _EventStream:
+    """sys.stdout/sys.stderr исполнителя: полные строки уходят в очередь событий"""
+
+    encoding = 'utf-8'
+    errors = 'replace'
+
+    def __init__(self, events, worker_id: int, original):
+        self.events = events
+        self.worker_id = worker_id
+        self.original = original
+        self.job_id = None
+        self._buffer = ''
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        if self.original is not None:
+            try:
+                self.original.write(text)
+            except Exception:
+                pass
+
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split('\n')
+
+        if self.job_id is not None:
+            for line in lines:
+                if line.strip():
+                    self.events.put(('log', self.worker_id, self.job_id, line.rstrip()))
+        return len(text)
+
+    def flush(self):
+        if self.original is not None:
+            self.original.flush()
+
+    def end_job(self):
+        """Отправляет незавершенную строку и отвязывает поток от задания"""
+        with self._lock:
+            rest, self._buffer = self._buffer, ''
+        if rest.strip() and self.job_id is not None:
+            self.events.put(('log', self.worker_id, self.job_id, rest.rstrip()))
+        self.job_id = None
+
+    def isatty(self) -> bool:
+        return False
+
+    def fileno(self) -> int:
+        return self.original.fileno()
+
+
+def _load(spec: ParserSpec):
+    if PARSERS_DIR not in sys.path:
+        sys.path.insert(0, PARSERS_DIR)
+    return importlib.import_module(spec.module)
+
+
+def _run(spec: ParserSpec, kwargs: dict):
+    module = _load(spec)
+    kwargs = dict(kwargs)
+    if not spec.accepts_limit:
+        kwargs.pop('limit', None)
+    if spec.adapter:
+        return globals()[spec.adapter](module, **kwargs)
+    return getattr(module, spec.entry)(**kwargs)
+
+
+def _worker_main(worker_id: int, jobs, events, preload: List[str]):
+    """Цикл процесса-исполнителя: прогрев и выполнение заданий по одному"""
+    # Перехват вывода до импорта парсеров: logging.basicConfig в модулях
+    # запоминает поток в момент импорта
+    stream = _EventStream(events, worker_id, sys.__stdout__)
+    sys.stdout = sys.stderr = stream
+
+    # Остановка задания пулом - SIGINT (обработчик мог быть унаследован отключенным)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    failed = {}
+    for key in preload:
+        try:
+            _load(PARSER_SPECS[key])
+        except KeyboardInterrupt:
+            # Задание остановлено до начала выполнения
+            return
+        except BaseException as e:
+            failed[key] = f"{type(e).__name__}: {e}"
+    events.put(('ready', worker_id, None, {'pid': os.getpid(), 'failed': failed}))
+
+    try:
+        while True:
+            job = jobs.get()
+            if job is None:
+                break
+
+            job_id, source, kwargs = job
+            stream.job_id = job_id
+            events.put(('started', worker_id, job_id, None))
+
+            start = time.perf_counter()
+            status, result, error = 'success', None, None
+            try:
+                result = _run(PARSER_SPECS[source], kwargs)
+            except KeyboardInterrupt:
+                status, error = 'cancelled', 'Остановлен пулом'
+            except SystemExit as e:
+                # Функции main парсеров завершаются через sys.exit
+                if e.code not in (None, 0):
+                    status, error = 'error', f"Код завершения: {e.code}"
+            except BaseException as e:
+                status, error = 'error', f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+
+            stream.end_job()
+            events.put(('finished', worker_id, job_id, {
+                'status': status,
+                'result': _plain_result(result),
+                'error': error,
+                'duration': round(time.perf_counter() - start, 2)
+            }))
+
+            # Остановленный процесс в пул не возвращается
+            if status == 'cancelled':
+                break
+    except KeyboardInterrupt:
+        pass
+
+
+# --- Пул ---
+
+@dataclass
+class ParseJob:
+    """Задание на запуск парсера"""
+    job_id: str
+    source: str
+    # Имя в журнале и ключ ограничения параллельности (source или universal_<url>)
+    label: str
+    kwargs: dict
+    status: str = 'queued'
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+    duration: Optional[float] = None
+    worker_id: Optional[int] = None
+    lines: int = 0
+    log: deque = field(default_factory=lambda: deque(maxlen=LOG_TAIL))
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def to_dict(self, with_log: bool = False) -> dict:
+        data = {
+            'job_id': self.job_id,
+            'source': self.source,
+            'label': self.label,
+            'kwargs': self.kwargs,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration': self.duration,
+            'result': self.result,
+            'error': self.error,
+            'lines': self.lines,
+            'worker_id': self.worker_id
+        }
+        if with_log:
+            data['log'] = list(self.log)
+        return data
+
+
+@dataclass
+class _Worker:
+    worker_id: int
+    process: Any
+    jobs: Any
+    events: Any
+    pid: Optional[int] = None
+    ready: bool = False
+    job_id: Optional[str] = None
+    jobs_done: int = 0
+    # Процесс остановлен пулом (остановка задания или таймаут), замену запускаем без ошибки
+    retired: bool = False
+    # Когда остановленный процесс завершается принудительно
+    stop_deadline: Optional[float] = None
+    # Процесс завершен принудительно, его очередь событий не читается
+    killed: bool = False
+
+
+class ParserWorkerPool:
+    """Пул процессов-исполнителей с очередью заданий и событиями вывода"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        per_source: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+        preload: Optional[bool] = None,
+        cancel_grace: Optional[float] = None
+    ):
+        """
+        Args:
+            workers: Количество процессов-исполнителей
+            per_source: Сколько заданий одного источника выполняется одновременно
+            job_timeout: Максимальная длительность задания в секундах
+            preload: Импортировать модули парсеров при старте процесса
+            cancel_grace: Сколько секунд остановленный процесс может завершаться сам
+        """
+        self.num_workers = workers or Config.PARSER_POOL_WORKERS
+        self.per_source = per_source or Config.PARSER_POOL_PER_SOURCE
+        self.job_timeout = job_timeout if job_timeout is not None else Config.PARSER_POOL_JOB_TIMEOUT
+        preload = Config.PARSER_POOL_PRELOAD if preload is None else preload
+        self.preload = list(PARSER_SPECS) if preload else []
+        self.cancel_grace = cancel_grace if cancel_grace is not None else Config.PARSER_POOL_CANCEL_GRACE
+
+        self._ctx = multiprocessing.get_context(Config.PARSER_POOL_START_METHOD)
+        self._workers: Dict[int, _Worker] = {}
+        self._jobs: Dict[str, ParseJob] = {}
+        self._pending: deque = deque()
+        self._listeners: List[Callable[[dict], None]] = []
+        self._outbox: List[dict] = []
+
+        self._lock = threading.RLock()
+        self._job_ids = itertools.count(1)
+        self._worker_ids = itertools.count(1)
+        self._thread = None
+        self._running = False
+
+        self.stats = {'submitted': 0, 'succeeded': 0, 'failed': 0, 'cancelled': 0, 'worker_restarts': 0}
+
+    # Подписчики
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """
+        Подписывает функцию на события заданий
+
+        Событие: {'job_id', 'source' (label задания), 'status', 'type', 'message'}
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[dict], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, job: ParseJob, message: str, message_type: str = 'info'):
+        self._outbox.append({
+            'job_id': job.job_id,
+            'source': job.label,
+            'status': job.status,
+            'type': message_type,
+            'message': message
+        })
+
+    def _flush_outbox(self):
+        """Отправляет события подписчикам вне блокировки пула"""
+        with self._lock:
+            events, self._outbox = self._outbox, []
+            listeners = list(self._listeners)
+
+        for event in events:
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    logger.warning(f"Ошибка подписчика пула парсеров: {e}")
+
+    # Жизненный цикл
+
+    def start(self):
+        """Запускает процессы-исполнители и поток диспетчера"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for _ in range(self.num_workers):
+                self._spawn_worker()
+
+        self._thread = threading.Thread(target=self._loop, name='parser-pool', daemon=True)
+        self._thread.start()
+        logger.info(f"Пул парсеров запущен: {self.num_workers} процессов")
+
+    def _spawn_worker(self):
+        worker_id = next(self._worker_ids)
+        jobs = self._ctx.Queue()
+        events = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, jobs, events, self.preload),
+            name=f'parser-worker-{worker_id}',
+            daemon=True
+        )
+        process.start()
+        self._workers[worker_id] = _Worker(worker_id, process, jobs, events, pid=process.pid)
+
+    def _stop_worker(self, worker: _Worker):
+        """
+        Прерывает задание процесса и выводит процесс из пула
+
+        Процесс получает SIGINT и завершается сам после сброса буфера
+        записи парсера; через cancel_grace секунд _check_workers завершает
+        его принудительно.
+        """
+        worker.retired = True
+        worker.job_id = None
+        worker.stop_deadline = time.time() + self.cancel_grace
+        try:
+            # Если парсер перехватит KeyboardInterrupt сам, процесс выйдет после задания
+            worker.jobs.put(None)
+        except Exception:
+            pass
+
+        if os.name == 'nt':
+            # В Windows os.kill с SIGINT завершает процесс сразу
+            self._kill_worker(worker)
+            return
+        try:
+            os.kill(worker.process.pid, signal.SIGINT)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _kill_worker(worker: _Worker):
+        """Завершает процесс принудительно; его очередь событий больше не читается"""
+        worker.killed = True
+        worker.process.terminate()
+
+    @staticmethod
+    def _read_events(worker: _Worker, limit: int = 500) -> list:
+        """События процесса из его очереди (без ожидания)"""
+        events = []
+        if worker.killed:
+            return events
+        try:
+            while len(events) < limit:
+                events.append(worker.events.get_nowait())
+        except (queue.Empty, EOFError, OSError):
+            pass
+        return events
+
+    @staticmethod
+    def _close_queues(worker: _Worker):
+        """Освобождает очереди завершившегося процесса"""
+        for channel in (worker.jobs, worker.events):
+            channel.cancel_join_thread()
+            channel.close()
+
+    def shutdown(self, timeout: float = 5):
+        """Останавливает пул: задания в очереди отменяются, процессы завершаются"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+
+            for job in list(self._pending):
+                self._finish(job, 'cancelled', error='Пул парсеров остановлен')
+            self._pending.clear()
+
+            workers = list(self._workers.values())
+            for worker in workers:
+                try:
+                    worker.jobs.put(None)
+                except Exception:
+                    pass
+
+        deadline = time.time() + timeout
+        for worker in workers:
+            worker.process.join(max(0, deadline - time.time()))
+            if worker.process.is_alive():
+                self._kill_worker(worker)
+
+        with self._lock:
+            for worker in workers:
+                if worker.job_id in self._jobs:
+                    self._finish(self._jobs[worker.job_id], 'cancelled', error='Пул парсеров остановлен')
+                self._close_queues(worker)
+            self._workers.clear()
+        self._flush_outbox()
+
+    # Задания
+
+    def submit(self, source: str, limit: Optional[int] = None, **kwargs) -> ParseJob:
+        """
+        Ставит запуск парсера в очередь
+
+        Повторный запрос того же запуска, пока он ждет в очереди,
+        возвращает уже поставленное задание.
+
+        Args:
+            source: Ключ парсера из PARSER_SPECS
+            limit: Ограничение количества статей (тестовый режим)
+            **kwargs: Параметры парсера (url для универсального)
+
+        Returns:
+            ParseJob
+        """
+        if source not in PARSER_SPECS:
+            raise ValueError(f"Неизвестный парсер: {source}")
+        if limit is not None:
+            kwargs['limit'] = limit
+        label = f"universal_{kwargs['url']}" if source == 'universal' else source
+
+        self.start()
+        with self._lock:
+            for job in self._pending:
+                if job.label == label and job.kwargs == kwargs:
+                    return job
+
+            job = ParseJob(job_id=f"{int(time.time())}-{next(self._job_ids)}", source=source, label=label, kwargs=kwargs)
+            self._jobs[job.job_id] = job
+            self._pending.append(job)
+            self.stats['submitted'] += 1
+            self._trim_history()
+
+            busy = self._running_count(label) >= self.per_source
+            self._notify(job, f"Парсер {label} поставлен в очередь" + (" (ожидает завершения предыдущего запуска)" if busy else ""))
+            self._dispatch()
+        self._flush_outbox()
+        return job
+
+    def cancel(self, target: str) -> List[ParseJob]:
+        """
+        Отменяет задания
+
+        Args:
+            target: job_id, label задания (например 'ria') или 'all'
+
+        Returns:
+            Отмененные задания
+        """
+        cancelled = []
+        with self._lock:
+            for job in list(self._jobs.values()):
+                if job.status in FINAL_STATUSES:
+                    continue
+                if target not in ('all', job.job_id, job.label):
+                    continue
+
+                if job in self._pending:
+                    self._pending.remove(job)
+                else:
+                    worker = self._workers.get(job.worker_id)
+                    if worker is not None and worker.job_id == job.job_id:
+                        # Поток парсера нельзя прервать извне - прерываем процесс
+                        self._stop_worker(worker)
+
+                self._finish(job, 'cancelled')
+                self._notify(job, f"Парсер {job.label} остановлен пользователем")
+                cancelled.append(job)
+        self._flush_outbox()
+        return cancelled
+
+    def get_job(self, job_id: str) -> Optional[ParseJob]:
+        return self._jobs.get(job_id)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[ParseJob]:
+        """Ждет завершения задания и возвращает его"""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def active_jobs(self) -> List[ParseJob]:
+        """Задания в очереди и выполняющиеся"""
+        with self._lock:
+            return [job for job in self._jobs.values() if job.status not in FINAL_STATUSES]
+
+    def active_sources(self) -> List[str]:
+        """label заданий в очереди и выполняющихся"""
+        return list(dict.fromkeys(job.label for job in self.active_jobs()))
+
+    def get_status(self) -> dict:
+        """Состояние процессов, заданий и статистика пула"""
+        with self._lock:
+            return {
+                'running': self._running,
+                'workers': [
+                    {
+                        'worker_id': worker.worker_id,
+                        'pid': worker.pid,
+                        'ready': worker.ready,
+                        'job_id': worker.job_id,
+                        'jobs_done': worker.jobs_done
+                    }
+                    for worker in self._workers.values()
+                ],
+                'queued': len(self._pending),
+                'jobs': [job.to_dict() for job in sorted(self._jobs.values(), key=lambda j: j.submitted_at, reverse=True)],
+                'stats': dict(self.stats)
+            }
+
+    # Диспетчер
+
+    def _loop(self):
+        while self._running:
+            with self._lock:
+                workers = list(self._workers.values())
+
+            events = []
+            for worker in workers:
+                events.extend(self._read_events(worker))
+            if not events:
+                time.sleep(EVENT_POLL)
+
+            with self._lock:
+                for event in events:
+                    self._handle_event(*event)
+                self._check_workers()
+                self._dispatch()
+            self._flush_outbox()
+
+    def _handle_event(self, kind: str, worker_id: int, job_id: Optional[str], payload: Any):
+        worker = self._workers.get(worker_id)
+
+        if kind == 'ready':
+            if worker is not None:
+                worker.ready = True
+                worker.pid = payload['pid']
+            for key, error in payload['failed'].items():
+                logger.warning(f"Исполнитель {worker_id}: парсер {key} не загружен: {error}")
+            return
+
+        job = self._jobs.get(job_id)
+        # События процесса, завершенного вместе с отмененным заданием
+        if job is None or job.status in FINAL_STATUSES:
+            return
+
+        if kind == 'started':
+            job.status = 'running'
+            job.started_at = time.time()
+            self._notify(job, f"Запуск парсера {job.label}...")
+        elif kind == 'log':
+            job.lines += 1
+            job.log.append(payload)
+            self._notify(job, payload, message_type(payload))
+        elif kind == 'finished':
+            if worker is not None:
+                worker.job_id = None
+                worker.jobs_done += 1
+            self._finish(job, payload['status'], payload['result'], payload['error'], payload['duration'])
+            if job.status == 'success':
+                self._notify(job, f"Парсер {job.label} завершен успешно", 'success')
+            else:
+                self._notify(job, f"Парсер {job.label} завершен с ошибкой: {job.error}", 'error')
+
+    def _finish(self, job: ParseJob, status: str, result: Any = None,
+                error: Optional[str] = None, duration: Optional[float] = None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.duration = duration if duration is not None else (
+            round(job.finished_at - job.started_at, 2) if job.started_at else None
+        )
+        self.stats[{'success': 'succeeded', 'error': 'failed', 'cancelled': 'cancelled'}[status]] += 1
+        job.done.set()
+
+    def _check_workers(self):
+        """Заменяет завершившиеся процессы и останавливает зависшие задания"""
+        if not self._running:
+            return
+        now = time.time()
+
+        for worker in list(self._workers.values()):
+            job = self._jobs.get(worker.job_id) if worker.job_id else None
+
+            if job is not None and job.started_at and self.job_timeout and now - job.started_at > self.job_timeout:
+                self._stop_worker(worker)
+                self._finish(job, 'error', error=f"Превышено время выполнения ({self.job_timeout:.0f} с)")
+                self._notify(job, f"Парсер {job.label} завершен с ошибкой: {job.error}", 'error')
+                continue
+
+            if worker.process.is_alive():
+                if worker.stop_deadline is not None and now >= worker.stop_deadline and not worker.killed:
+                    logger.warning(
+                        f"Исполнитель {worker.worker_id} не остановился за {self.cancel_grace:.0f} с, "
+                        f"завершаем процесс"
+                    )
+                    self._kill_worker(worker)
+                continue
+
+            worker.process.join(0)
+            # Процесс, завершившийся сам, успел дописать очередь - дочитываем ее
+            if worker.process.exitcode == 0:
+                for event in self._read_events(worker, limit=LOG_TAIL * 10):
+                    self._handle_event(*event)
+            if job is not None and job.status not in FINAL_STATUSES:
+                self._finish(job, 'error', error=f"Процесс-исполнитель завершился аварийно (код {worker.process.exitcode})")
+                self._notify(job, f"Парсер {job.label} завершен с ошибкой: {job.error}", 'error')
+            if not worker.retired:
+                logger.warning(f"Исполнитель {worker.worker_id} завершился (код {worker.process.exitcode}), перезапуск")
+
+            del self._workers[worker.worker_id]
+            self._close_queues(worker)
+            self.stats['worker_restarts'] += 1
+            if self._running:
+                self._spawn_worker()
+
+    def _running_count(self, label: str) -> int:
+        return sum(
+            1 for worker in self._workers.values()
+            if worker.job_id and self._jobs[worker.job_id].label == label
+        )
+
+    def _dispatch(self):
+        """Передает задания из очереди свободным процессам с учетом лимита на источник"""
+        if not self._pending:
+            return
+
+        # Прогретые процессы в первую очередь
+        idle = sorted(
+            (worker for worker in self._workers.values()
+             if worker.job_id is None and not worker.retired and worker.process.is_alive()),
+            key=lambda worker: not worker.ready
+        )
+
+        for job in list(self._pending):
+            if not idle:
+                break
+            if self._running_count(job.label) >= self.per_source:
+                continue
+
+            worker = idle.pop(0)
+            worker.job_id = job.job_id
+            job.worker_id = worker.worker_id
+            self._pending.remove(job)
+            worker.jobs.put((job.job_id, job.source, job.kwargs))
+
+    def _trim_history(self):
+        finished = [job for job in self._jobs.values() if job.status in FINAL_STATUSES]
+        for job in sorted(finished, key=lambda j: j.submitted_at)[:max(0, len(self._jobs) - JOB_HISTORY)]:
+            del self._jobs[job.job_id]
+
+
+def as_completed(jobs: Iterable[ParseJob], poll: float = 0.2) -> Iterator[ParseJob]:
+    """Возвращает задания по мере их завершения"""
+    pending = list(jobs)
+    while pending:
+        for job in list(pending):
+            if job.done.wait(poll / max(1, len(pending))):
+                pending.remove(job)
+                yield job
+
+
+_pool_instance = None
+_pool_instance_lock = threading.Lock()
+
+
+def get_worker_pool() -> ParserWorkerPool:
+    """Возвращает общий для процесса пул (процессы запускаются при первом задании)"""
+    global _pool_instance
+
+    if _pool_instance is None:
+        with _pool_instance_lock:
+            if _pool_instance is None:
+                _pool_instance = ParserWorkerPool()
+                atexit.register(_pool_instance.shutdown)
+    return _pool_instance
@@ -3,6 +3,10 @@
 Удаляет все существующие таблицы и создает только необходимые для проекта
 """
 from app.models import get_clickhouse_client
+from clickhouse_driver import Client
+from config import Config
+from parsers.articles_rollup import create_rollup_schema
+from parsers.articles_table import create_articles_schema
 import sys
 
 def drop_all_tables():
@@ -35,190 +39,40 @@ def drop_all_tables():
         client.close()
 
 
-def create_news_tables():
-    """Создает основные таблицы для хранения новостей"""
-    client = get_clickhouse_client()
-    
-    try:
-        print("\n" + "=" * 60)
-        print("ШАГ 2: СОЗДАНИЕ ОСНОВНЫХ ТАБЛИЦ НОВОСТЕЙ")
-        print("=" * 60)
-        
-        # Определяем таблицы для основных источников новостей
-        sources = {
-            'ria': {
-                'name': 'ria_headlines',
-                'default_source': 'ria.ru'
-            },
-            'lenta': {
-                'name': 'lenta_headlines',
-                'default_source': 'lenta.ru'
-            },
-            'rbc': {
-                'name': 'rbc_headlines',
-                'default_source': 'rbc.ru'
-            },
-            'gazeta': {
-                'name': 'gazeta_headlines',
-                'default_source': 'gazeta.ru'
-            },
-            'kommersant': {
-                'name': 'kommersant_headlines',
-                'default_source': 'kommersant.ru'
-            },
-            'tsn': {
-                'name': 'tsn_headlines',
-                'default_source': 'tsn.ua'
-            },
-            'unian': {
-                'name': 'unian_headlines',
-                'default_source': 'unian.ua'
-            },
-            'rt': {
-                'name': 'rt_headlines',
-                'default_source': 'rt.com'
-            },
-            'cnn': {
-                'name': 'cnn_headlines',
-                'default_source': 'cnn.com'
-            },
-            'bbc': {
-                'name': 'bbc_headlines',
-                'default_source': 'bbc.com'
-            },
-            'aljazeera': {
-                'name': 'aljazeera_headlines',
-                'default_source': 'aljazeera.com'
-            },
-            'reuters': {
-                'name': 'reuters_headlines',
-                'default_source': 'reuters.com'
-            },
-            'france24': {
-                'name': 'france24_headlines',
-                'default_source': 'france24.com'
-            },
-            'dw': {
-                'name': 'dw_headlines',
-                'default_source': 'dw.com'
-            },
-            'euronews': {
-                'name': 'euronews_headlines',
-                'default_source': 'euronews.com'
-            },
-            'israil': {
-                'name': 'israil_headlines',
-                'default_source': '7kanal.co.il'
-            }
-        }
-        
-        created_count = 0
-        for source_key, source_info in sources.items():
-            table_name = source_info['name']
-            default_source = source_info['default_source']
-            
-            create_query = f"""
-            CREATE TABLE IF NOT EXISTS news.{table_name} (
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String,
-                content String,
-                rubric String DEFAULT '',
-                source String DEFAULT '{default_source}',
-                category String DEFAULT 'other',
-                published_date DateTime DEFAULT now()
-            ) ENGINE = MergeTree()
-            ORDER BY published_date
-            """
-            
-            try:
-                client.query(create_query)
-                print(f"✓ Создана таблица: {table_name}")
-                created_count += 1
-            except Exception as e:
-                print(f"✗ Ошибка при создании таблицы {table_name}: {str(e)}")
-        
-        print(f"\n✓ Создано таблиц: {created_count}")
-        
-    finally:
-        client.close()
-
-
-def create_telegram_tables():
-    """Создает таблицы для Telegram"""
-    client = get_clickhouse_client()
+def create_articles_tables():
+    """
+    Создает единую таблицу статей news.articles, представления с прежними
+    именами {source}_headlines и {source}_{category} и почасовые агрегаты
+    """
+    client = Client(
+        host=Config.CLICKHOUSE_HOST,
+        port=Config.CLICKHOUSE_NATIVE_PORT,
+        user=Config.CLICKHOUSE_USER,
+        password=Config.CLICKHOUSE_PASSWORD,
+        database='news'
+    )
     
     try:
         print("\n" + "=" * 60)
-        print("ШАГ 3: СОЗДАНИЕ ТАБЛИЦ TELEGRAM")
+        print("ШАГ 2: СОЗДАНИЕ ЕДИНОЙ ТАБЛИЦЫ СТАТЕЙ")
         print("=" * 60)
         
-        # Категории для Telegram
-        categories = [
-            'military_operations',
-            'humanitarian_crisis',
-            'economic_consequences',
-            'political_decisions',
-            'information_social'
-        ]
-        
-        created_count = 0
-        
-        # Создаем таблицы для каждой категории
-        for category in categories:
-            table_name = f'telegram_{category}'
-            
-            create_query = f"""
-            CREATE TABLE IF NOT EXISTS news.{table_name} (
-                id UUID DEFAULT generateUUIDv4(),
-                title String,
-                link String DEFAULT '',
-                content String,
-                channel String,
-                message_id Int64,
-                message_link String,
-                source String DEFAULT 'telegram',
-                category String DEFAULT '{category}',
-                published_date DateTime DEFAULT now()
-            ) ENGINE = MergeTree()
-            ORDER BY published_date
-            """
-            
-            try:
-                client.query(create_query)
-                print(f"✓ Создана таблица: {table_name}")
-                created_count += 1
-            except Exception as e:
-                print(f"✗ Ошибка при создании таблицы {table_name}: {str(e)}")
-        
-        # Создаем общую таблицу telegram_headlines
-        create_headlines_query = """
-        CREATE TABLE IF NOT EXISTS news.telegram_headlines (
-            id UUID DEFAULT generateUUIDv4(),
-            title String,
-            link String DEFAULT '',
-            content String,
-            channel String,
-            message_id Int64,
-            message_link String,
-            source String DEFAULT 'telegram',
-            category String DEFAULT 'other',
-            published_date DateTime DEFAULT now()
-        ) ENGINE = MergeTree()
-        ORDER BY published_date
-        """
-        
         try:
-            client.query(create_headlines_query)
-            print(f"✓ Создана таблица: telegram_headlines")
-            created_count += 1
+            views, _ = create_articles_schema(client)
+            print(f"✓ Создана таблица: articles")
+            print(f"✓ Создано представлений с прежними именами таблиц: {views}")
         except Exception as e:
-            print(f"✗ Ошибка при создании таблицы telegram_headlines: {str(e)}")
+            print(f"✗ Ошибка при создании таблицы articles: {str(e)}")
+            return
         
-        print(f"\n✓ Создано Telegram таблиц: {created_count}")
+        try:
+            create_rollup_schema(client)
+            print(f"✓ Создана таблица: articles_hourly")
+        except Exception as e:
+            print(f"✗ Ошибка при создании таблицы articles_hourly: {str(e)}")
         
     finally:
-        client.close()
+        client.disconnect()
 
 
 def create_universal_tables():
@@ -227,7 +81,7 @@ def create_universal_tables():
     
     try:
         print("\n" + "=" * 60)
-        print("ШАГ 4: СОЗДАНИЕ УНИВЕРСАЛЬНЫХ ТАБЛИЦ")
+        print("ШАГ 3: СОЗДАНИЕ УНИВЕРСАЛЬНЫХ ТАБЛИЦ")
         print("=" * 60)
         
         categories = [
@@ -277,74 +131,13 @@ def create_universal_tables():
         client.close()
 
 
-def create_category_tables():
-    """Создает категорийные таблицы для каждого источника"""
-    client = get_clickhouse_client()
-    
-    try:
-        print("\n" + "=" * 60)
-        print("ШАГ 4.5: СОЗДАНИЕ КАТЕГОРИЙНЫХ ТАБЛИЦ")
-        print("=" * 60)
-        
-        # Источники, которым нужны категорийные таблицы
-        sources = ['lenta', 'rbc', 'gazeta', 'kommersant', 'tsn', 'unian', 'rt', 'cnn', 'bbc', 
-                   'aljazeera', 'reuters', 'france24', 'dw', 'euronews', 'ria', 'israil']
-        
-        # Категории
-        categories = [
-            'military_operations',
-            'humanitarian_crisis',
-            'economic_consequences',
-            'political_decisions',
-            'information_social',
-            'ukraine',
-            'middle_east',
-            'fake_news',
-            'info_war',
-            'europe',
-            'usa',
-            'other'
-        ]
-        
-        created_count = 0
-        
-        for source in sources:
-            for category in categories:
-                table_name = f'{source}_{category}'
-                
-                create_query = f"""
-                CREATE TABLE IF NOT EXISTS news.{table_name} (
-                    id UUID DEFAULT generateUUIDv4(),
-                    title String,
-                    link String,
-                    content String,
-                    rubric String DEFAULT '',
-                    source String,
-                    category String DEFAULT '{category}',
-                    published_date DateTime DEFAULT now()
-                ) ENGINE = MergeTree()
-                ORDER BY published_date
-                """
-                
-                try:
-                    client.query(create_query)
-                    created_count += 1
-                except Exception as e:
-                    print(f"✗ Ошибка при создании таблицы {table_name}: {str(e)}")
-        
-        print(f"✓ Создано категорийных таблиц: {created_count} ({len(sources)} источников × {len(categories)} категорий)")
-        
-    finally:
-        client.close()
-
-
 def create_analytics_tables():
     """Создает аналитические таблицы"""
     client = get_clickhouse_client()
     
     try:
         print("\n" + "=" * 60)
-        print("ШАГ 5: СОЗДАНИЕ АНАЛИТИЧЕСКИХ ТАБЛИЦ")
+        print("ШАГ 4: СОЗДАНИЕ АНАЛИТИЧЕСКИХ ТАБЛИЦ")
         print("=" * 60)
         
         created_count = 0
@@ -420,7 +213,7 @@ def create_social_media_tables():
     
     try:
         print("\n" + "=" * 60)
-        print("ШАГ 6: СОЗДАНИЕ ТАБЛИЦ СОЦИАЛЬНЫХ СЕТЕЙ")
+        print("ШАГ 5: СОЗДАНИЕ ТАБЛИЦ СОЦИАЛЬНЫХ СЕТЕЙ")
         print("=" * 60)
         
         created_count = 0
@@ -512,10 +305,8 @@ def reset_database():
     drop_all_tables()
     
     # Создаем новые таблицы
-    create_news_tables()
-    create_telegram_tables()
+    create_articles_tables()
     create_universal_tables()
-    create_category_tables()  # Новый шаг - категорийные таблицы
     create_analytics_tables()
     create_social_media_tables()
     
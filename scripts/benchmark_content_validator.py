@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк ContentValidator: время валидации в зависимости от длины текста
+
+Генерирует синтетические статьи разной длины (с ссылками, эмодзи и
+повторяющимися фразами), измеряет validate_content и оценивает
+показатель роста времени по логарифмической регрессии
+(1.0 - линейный рост, 2.0 - квадратичный).
+"""
+
+import sys
+import os
+import argparse
+import logging
+import math
+import random
+import time
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.content_validator import ContentValidator
+
+WORDS = (
+    'сегодня власти города объявили о начале масштабного ремонта дорог жители '
+    'района ожидают завершения работ к осени глава администрации сообщил '
+    'подробности проекта бюджет которого составит несколько миллионов рублей'
+).split()
+
+EXTRAS = ['https://example.org/page', 'ria.ru/news/1', '🔥', 'ВАЖНО', '...', '<b>текст</b>']
+
+
+def make_article(word_count, rng):
+    """Синтетическая статья: обычный текст с редкими ссылками, эмодзи и разметкой"""
+    words = []
+    for _ in range(word_count):
+        if rng.random() < 0.02:
+            words.append(rng.choice(EXTRAS))
+        else:
+            words.append(f"{rng.choice(WORDS)}{rng.randint(0, 999)}")
+    return ' '.join(words)
+
+
+def measure(validator, content, repeat):
+    """Лучшее время validate_content из repeat запусков (мс)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        validator.validate_content("Заголовок тестовой новости", content)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк валидации контента")
+    parser.add_argument('--sizes', default='250,500,1000,2000,4000,8000,16000',
+                        help="Длины статей в словах через запятую")
+    parser.add_argument('--repeat', type=int, default=5, help="Запусков на каждую длину")
+    parser.add_argument('--seed', type=int, default=42, help="Зерно генератора текста")
+    args = parser.parse_args()
+
+    # Предупреждения о невалидном контенте не нужны в выводе бенчмарка
+    logging.disable(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    validator = ContentValidator()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'слов':>8} {'символов':>10} {'мс':>10} {'мс/1000 слов':>14}")
+    points = []
+    for size in sizes:
+        content = make_article(size, rng)
+        elapsed = measure(validator, content, args.repeat)
+        points.append((math.log(size), math.log(max(elapsed, 1e-6))))
+        print(f"{size:>8} {len(content):>10} {elapsed:>10.2f} {elapsed / size * 1000:>14.2f}")
+
+    # Наклон прямой в координатах log(длина) - log(время)
+    if len(points) >= 2:
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        slope = (
+            sum((x - mean_x) * (y - mean_y) for x, y in points)
+            / sum((x - mean_x) ** 2 for x, _ in points)
+        )
+        print(f"\nПоказатель роста времени: {slope:.2f} (1.0 - линейный, 2.0 - квадратичный)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разбора HTML: прежний путь (BeautifulSoup + html.parser) против
+бэкендов parsers/html_parsing.py
+
+Две задачи на синтетических страницах размером с главную новостного
+сайта (меню, сотни карточек, скрипты, подвал) или на сохраненной странице:
+- листинг: ссылки и заголовки карточек
+- статья: текст абзацев контейнера статьи
+
+Для каждого пути печатается лучшее время из --repeat запусков, ускорение
+относительно html.parser и совпадение извлеченного результата.
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from parsers.html_parsing import (
+    LXML_AVAILABLE, SELECTOLAX_AVAILABLE, HtmlDocument, extract_paragraphs, make_soup
+)
+
+WORDS = (
+    'сегодня власти города объявили о начале масштабного ремонта дорог жители '
+    'района ожидают завершения работ к осени глава администрации сообщил '
+    'подробности проекта бюджет которого составит несколько миллионов рублей'
+).split()
+
+BODY_CONTAINERS = ('div.topic-body__content', 'div.b-text')
+LISTING_CONTAINERS = ('a.card-full-news',)
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_page(rng, cards, paragraphs):
+    """Синтетическая страница: меню, карточки листинга, статья, скрипты и подвал"""
+    parts = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Новости</title>']
+    parts += [f'<script>var config{i} = {{"key": "{sentence(rng, 20)}"}};</script>' for i in range(20)]
+    parts.append('</head><body><nav class="menu">')
+    parts += [f'<a class="menu__item" href="/rubrics/{i}/">{rng.choice(WORDS)}</a>' for i in range(60)]
+    parts.append('</nav><main><section class="feed">')
+    for i in range(cards):
+        parts.append(
+            f'<a class="card-full-news" href="/news/2026/10/17/item{i}/">'
+            f'<span class="card-full-news__title">{sentence(rng, 8)}</span>'
+            f'<span class="card-full-news__rubric">{rng.choice(WORDS)}</span>'
+            f'<img src="/img/{i}.jpg" alt="{sentence(rng, 4)}"></a>'
+            f'<div class="banner"><iframe src="/ads/{i}"></iframe></div>'
+        )
+    parts.append('</section><div class="topic-body__content">')
+    parts += [f'<p class="topic-body__content-text">{sentence(rng, 40)}</p>' for _ in range(paragraphs)]
+    parts.append('</div></main><footer>')
+    parts += [f'<div class="footer__col"><a href="/about/{i}">{sentence(rng, 3)}</a></div>' for i in range(80)]
+    parts.append('</footer></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def listing_baseline(html):
+    """Прежний путь: полный разбор html.parser и find_all"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return [
+        (article.get('href'), article.find('span', class_='card-full-news__title').get_text(strip=True))
+        for article in soup.find_all('a', class_='card-full-news')
+    ]
+
+
+def listing_soup(html, only):
+    soup = make_soup(html, only)
+    return [
+        (article.get('href'), article.find('span', class_='card-full-news__title').get_text(strip=True))
+        for article in soup.find_all('a', class_='card-full-news')
+    ]
+
+
+def listing_document(html, backend):
+    doc = HtmlDocument(html, LISTING_CONTAINERS, backend=backend)
+    return [
+        (card.attr('href'), card.select_one('span.card-full-news__title').text())
+        for card in doc.select('a.card-full-news')
+    ]
+
+
+def article_baseline(html):
+    """Прежний путь: полный разбор html.parser, get_text дважды на абзац"""
+    soup = BeautifulSoup(html, 'html.parser')
+    body = soup.find('div', class_='topic-body__content') or soup.find('div', class_='b-text')
+    return ' '.join([p.get_text(strip=True) for p in body.find_all('p') if p.get_text(strip=True)])
+
+
+def article_soup(html, only):
+    body = make_soup(html, only).find('div', class_='topic-body__content')
+    return ' '.join(text for text in (p.get_text(strip=True) for p in body.find_all('p')) if text)
+
+
+def extract_paragraphs_soup(html, containers, builder):
+    """Текст абзацев первого контейнера через BeautifulSoup на заданном построителе"""
+    only = containers if builder != 'html.parser' else None
+    soup = BeautifulSoup(html, builder) if only is None else make_soup(html, only)
+    for selector in containers:
+        body = soup.select_one(selector)
+        if body is not None:
+            return ' '.join(text for text in (p.get_text(strip=True) for p in body.select('p')) if text)
+    return None
+
+
+def measure(func, repeat):
+    """Лучшее время из repeat запусков (мс) и результат"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def run_task(name, html, cases, repeat):
+    print(f"\n{name} ({len(html) / 1024:.0f} КБ)")
+    print(f"{'путь':<40} {'мс':>9} {'ускорение':>10}  результат")
+
+    baseline_ms, expected = None, None
+    for label, func in cases:
+        elapsed, result = measure(func, repeat)
+        if baseline_ms is None:
+            baseline_ms, expected = elapsed, result
+        same = 'совпадает' if result == expected else 'ОТЛИЧАЕТСЯ'
+        print(f"{label:<40} {elapsed:>9.2f} {baseline_ms / elapsed:>9.1f}x  {same}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк разбора HTML")
+    parser.add_argument('--cards', type=int, default=300, help="Карточек на синтетической странице")
+    parser.add_argument('--paragraphs', type=int, default=30, help="Абзацев статьи на синтетической странице")
+    parser.add_argument('--file', help="Сохраненная страница статьи вместо синтетической")
+    parser.add_argument('--body', default=','.join(BODY_CONTAINERS),
+                        help="Селекторы контейнера статьи через запятую (для --file)")
+    parser.add_argument('--repeat', type=int, default=5, help="Запусков на каждый путь")
+    parser.add_argument('--seed', type=int, default=42, help="Зерно генератора страницы")
+    args = parser.parse_args()
+
+    print(f"lxml: {'да' if LXML_AVAILABLE else 'нет'}, selectolax: {'да' if SELECTOLAX_AVAILABLE else 'нет'}")
+
+    if args.file:
+        with open(args.file, 'rb') as f:
+            html = f.read()
+        body = [selector.strip() for selector in args.body.split(',') if selector.strip()]
+        cases = [('BeautifulSoup html.parser, select', lambda: extract_paragraphs_soup(html, body, 'html.parser'))]
+        if LXML_AVAILABLE:
+            cases.append(('BeautifulSoup lxml, контейнеры', lambda: extract_paragraphs_soup(html, body, 'lxml')))
+        if SELECTOLAX_AVAILABLE:
+            cases.append(('extract_paragraphs (selectolax)', lambda: extract_paragraphs(html, body)))
+        run_task("Статья из файла", html, cases, args.repeat)
+        return 0
+
+    html = make_page(random.Random(args.seed), args.cards, args.paragraphs)
+
+    listing_cases = [('BeautifulSoup html.parser (прежний путь)', lambda: listing_baseline(html))]
+    if LXML_AVAILABLE:
+        listing_cases.append(('BeautifulSoup lxml', lambda: listing_soup(html, None)))
+        listing_cases.append(('BeautifulSoup lxml + SoupStrainer', lambda: listing_soup(html, LISTING_CONTAINERS)))
+    listing_cases.append(('HtmlDocument soup + SoupStrainer', lambda: listing_document(html, 'soup')))
+    if SELECTOLAX_AVAILABLE:
+        listing_cases.append(('HtmlDocument selectolax', lambda: listing_document(html, 'selectolax')))
+    run_task("Листинг", html, listing_cases, args.repeat)
+
+    article_cases = [('BeautifulSoup html.parser (прежний путь)', lambda: article_baseline(html))]
+    if LXML_AVAILABLE:
+        article_cases.append(('BeautifulSoup lxml', lambda: article_soup(html, None)))
+        article_cases.append(('BeautifulSoup lxml + SoupStrainer', lambda: article_soup(html, BODY_CONTAINERS)))
+    if SELECTOLAX_AVAILABLE:
+        article_cases.append(('extract_paragraphs (selectolax)', lambda: extract_paragraphs(html, BODY_CONTAINERS)))
+    run_task("Статья", html, article_cases, args.repeat)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
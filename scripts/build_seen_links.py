@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Заполнение фильтра сохраненных ссылок (parsers/seen_links.py) из ClickHouse
+
+Парсеры загружают ссылки своей таблицы в фильтр при первом обращении.
+Скрипт загружает все таблицы *_headlines заранее и нужен для пересоздания
+фильтра (например, после увеличения SEEN_LINKS_CAPACITY).
+"""
+
+import sys
+import os
+import argparse
+import logging
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clickhouse_driver import Client
+from config import Config
+from parsers.seen_links import SeenLinkFilter
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def get_clickhouse_client():
+    """Получение клиента ClickHouse"""
+    return Client(
+        host=Config.CLICKHOUSE_HOST,
+        port=Config.CLICKHOUSE_NATIVE_PORT,
+        user=Config.CLICKHOUSE_USER,
+        password=Config.CLICKHOUSE_PASSWORD,
+        database=Config.CLICKHOUSE_DATABASE
+    )
+
+
+def find_tables(client):
+    """Таблицы *_headlines и колонка ссылки в каждой (link или message_link)"""
+    rows = client.execute(
+        "SELECT table, groupArray(name) FROM system.columns "
+        "WHERE database = %(db)s AND table LIKE '%%\\_headlines' "
+        "GROUP BY table ORDER BY table",
+        {'db': Config.CLICKHOUSE_DATABASE}
+    )
+
+    tables = {}
+    for table, columns in rows:
+        if 'link' in columns:
+            tables[table] = 'link'
+        elif 'message_link' in columns:
+            tables[table] = 'message_link'
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заполнение фильтра сохраненных ссылок")
+    parser.add_argument('--tables', help="Таблицы через запятую (по умолчанию все таблицы *_headlines)")
+    parser.add_argument('--rebuild', action='store_true', help="Пересоздать фильтр с текущими SEEN_LINKS_CAPACITY и SEEN_LINKS_ERROR_RATE")
+    args = parser.parse_args()
+
+    seen = SeenLinkFilter()
+    if args.rebuild:
+        seen.clear()
+        logger.info("Фильтр пересоздан")
+
+    client = get_clickhouse_client()
+    tables = find_tables(client)
+    if args.tables:
+        tables = {table: tables.get(table, 'link') for table in args.tables.split(',')}
+
+    for table, link_column in tables.items():
+        try:
+            seen.seed(client, table, link_column, force=True)
+        except Exception as e:
+            logger.warning(f"Пропускаем таблицу {table}: {e}")
+
+    client.disconnect()
+    logger.info(f"Фильтр ссылок: {seen.get_stats()}")
+    seen.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Кластеризация в сюжеты статей, уже сохраненных в ClickHouse
+
+Парсеры относят статьи к сюжетам при сохранении (BaseNewsParser -
+в _assign_story, парсеры-функции - через story_index.assign_stories).
+Скрипт нужен для первичного заполнения: проходит по единой таблице
+статей news.articles и пользовательским таблицам *_headlines в порядке
+публикации за окно STORY_WINDOW_DAYS и заполняет индекс сюжетов,
+news.story_members и news.story_centroids.
+"""
+
+import sys
+import os
+import argparse
+import logging
+import time
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clickhouse_driver import Client
+from config import Config
+from parsers.articles_table import ARTICLES_TABLE, SOURCES, view_name
+from parsers.clickhouse_writer import BufferedClickHouseWriter
+from parsers.story_index import get_story_index
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def get_clickhouse_client():
+    """Получение клиента ClickHouse"""
+    return Client(
+        host=Config.CLICKHOUSE_HOST,
+        port=Config.CLICKHOUSE_NATIVE_PORT,
+        user=Config.CLICKHOUSE_USER,
+        password=Config.CLICKHOUSE_PASSWORD,
+        database=Config.CLICKHOUSE_DATABASE
+    )
+
+
+def find_tables(client):
+    """
+    Пользовательские таблицы *_headlines и колонка ссылки в каждой (link или message_link)
+
+    Таблицы источников из SOURCES - представления над news.articles,
+    их статьи читаются из news.articles напрямую.
+    """
+    source_views = {view_name(source) for source in SOURCES}
+    rows = client.execute(
+        "SELECT table, groupArray(name) FROM system.columns "
+        "WHERE database = %(db)s AND table LIKE '%%\\_headlines' "
+        "GROUP BY table ORDER BY table",
+        {'db': Config.CLICKHOUSE_DATABASE}
+    )
+
+    tables = {}
+    for table, columns in rows:
+        if table in source_views or 'title' not in columns:
+            continue
+        if 'link' in columns:
+            tables[table] = 'link'
+        elif 'message_link' in columns:
+            tables[table] = 'message_link'
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Кластеризация сохраненных статей в сюжеты")
+    parser.add_argument('--rebuild', action='store_true', help="Очистить индекс сюжетов и построить заново")
+    parser.add_argument('--days', type=float, default=Config.STORY_WINDOW_DAYS, help="Период в днях")
+    args = parser.parse_args()
+
+    index = get_story_index()
+    if args.rebuild:
+        index.clear()
+        logger.info("Индекс сюжетов очищен")
+
+    client = get_clickhouse_client()
+    tables = find_tables(client)
+
+    # Все источники одним потоком в порядке публикации, чтобы сюжеты
+    # открывались первой публикацией события
+    period = f"published_date >= now() - INTERVAL {int(args.days * 86400)} SECOND"
+    lead = f"substring(content, 1, {int(index.lead_chars)}) AS content"
+    union = " UNION ALL ".join(
+        [
+            f"SELECT link, title, {lead}, category, published_date, "
+            f"toString(source) AS source_name "
+            f"FROM {ARTICLES_TABLE} WHERE {period}"
+        ] + [
+            f"SELECT {link_column} AS link, title, {lead}, category, published_date, "
+            f"'{table[:-len('_headlines')]}' AS source_name "
+            f"FROM news.{table} WHERE {period}"
+            for table, link_column in tables.items()
+        ]
+    )
+    query = f"SELECT link, title, content, category, published_date, source_name FROM ({union}) ORDER BY published_date"
+
+    writer = BufferedClickHouseWriter(get_clickhouse_client)
+    centroids = {}
+    start = time.perf_counter()
+    processed = 0
+
+    for link, title, content, category, published_date, source in client.execute_iter(query):
+        if not link or not title:
+            continue
+
+        assignment = index.assign(link, title, source, published_date, content, category)
+        if assignment.existing:
+            continue
+        writer.add("news.story_members", assignment.member_row(link, source, title, category, published_date))
+        # Центроид пишем один раз - последнюю версию сюжета
+        centroids[assignment.story_id] = assignment.centroid_row()
+        processed += 1
+
+        if processed % 5000 == 0:
+            logger.info(f"Обработано {processed} статей, сюжетов: {len(centroids)}")
+
+    for row in centroids.values():
+        writer.add("news.story_centroids", row)
+    writer.close()
+    client.disconnect()
+
+    logger.info(
+        f"Обработано {processed} статей из {len(tables) + 1} таблиц за {time.perf_counter() - start:.1f} с, "
+        f"сюжетов: {len(centroids)}"
+    )
+    logger.info(f"Индекс сюжетов: {index.get_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
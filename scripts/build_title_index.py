@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Заполнение индекса похожих заголовков (parsers/title_index.py) из ClickHouse
+
+Парсеры на BaseNewsParser загружают окно своих таблиц при первой проверке,
+дальше пополняют индекс при сохранении и подгружают строки новее метки
+loaded_until. Скрипт нужен для таблиц, которые не проверяются через
+DuplicateChecker, и для полной перестройки индекса
+(например, после смены порога, TITLE_INDEX_SHINGLE_SIZE или TITLE_INDEX_LEAD_CHARS).
+"""
+
+import sys
+import os
+import argparse
+import logging
+import time
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from parsers.duplicate_checker import create_duplicate_checker
+from parsers.title_index import get_title_index
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def find_tables(client):
+    """Таблицы базы news с колонками link и title"""
+    rows = client.execute(
+        "SELECT table FROM system.columns "
+        "WHERE database = %(db)s AND name IN ('link', 'title') "
+        "GROUP BY table HAVING count() = 2 ORDER BY table",
+        {'db': Config.CLICKHOUSE_DATABASE}
+    )
+    return [table for (table,) in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Заполнение индекса похожих заголовков")
+    parser.add_argument('--tables', help="Таблицы через запятую (по умолчанию все таблицы новостей)")
+    parser.add_argument('--rebuild', action='store_true', help="Очистить индекс и загрузить заново")
+    args = parser.parse_args()
+
+    index = get_title_index()
+    if args.rebuild:
+        index.clear()
+        logger.info("Индекс очищен")
+
+    with create_duplicate_checker(title_index=index) as checker:
+        tables = args.tables.split(',') if args.tables else find_tables(checker.client)
+
+        for table in tables:
+            start = time.perf_counter()
+            try:
+                added = checker.index_tables(table, force=True)
+            except Exception as e:
+                logger.warning(f"Пропускаем таблицу {table}: {e}")
+                continue
+            logger.info(f"{table}: добавлено {added} записей за {time.perf_counter() - start:.1f} с")
+
+    removed = index.evict()
+    logger.info(f"Удалено записей старше окна: {removed}")
+    logger.info(f"Индекс: {index.get_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Проверка parsers/lexicon_matcher.py против прежнего подсчета через re.findall
+
+Словари, которые раньше считались через re.findall, сравниваются на
+случайных текстах из их же ключевых слов (с вложенными фразами,
+повторами, пунктуацией и словами-продолжениями):
+- временные маркеры TensionCalculator - re.findall по группам-чередованиям
+  r'\\b(сейчас|сейчас же|прямо сейчас)\\b' против count_longest()
+- словари SocialTensionAnalyzer, UkraineSentimentAnalyzer и
+  ExtremistContentClassifier - re.findall(r'\\b' + слово + r'\\b') по каждому
+  слову против count()
+
+Ключевые слова экстремистского словаря с заглавными буквами раньше не
+находились в тексте в нижнем регистре (известное изменение), поэтому
+эталон ищет их в нижнем регистре. Словари модулей, которые не удалось
+импортировать (нет зависимостей), пропускаются.
+"""
+
+import sys
+import os
+import argparse
+import random
+import re
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.tension_calculator import TensionCalculator
+
+# Прежние шаблоны TensionCalculator._calculate_time_markers_score
+TIME_PATTERNS = [
+    r'\b(сегодня|завтра|вчера)\b',
+    r'\b(сейчас|сейчас же|прямо сейчас)\b',
+    r'\b(только что|недавно|недавно произошло)\b',
+    r'\b(в данный момент|в настоящее время)\b',
+    r'\b(в ближайшее время|скоро|вскоре)\b',
+    r'\b(в течение дня|на этой неделе)\b'
+]
+
+FILLER = 'власти заявили о ситуации в регионе жители ждут новостей же прямо'.split()
+SEPARATORS = (' ', ' ', ' ', ', ', '. ', '! ', '-', '')
+
+
+def make_text(rng, keywords, words=40):
+    """Случайный текст из ключевых слов словаря и обычных слов"""
+    parts = []
+    for _ in range(words):
+        word = rng.choice(keywords) if rng.random() < 0.5 else rng.choice(FILLER)
+        if rng.random() < 0.1:
+            word += rng.choice(('ы', 'ами', '1', '_'))
+        parts.append(word + rng.choice(SEPARATORS))
+    return ''.join(parts).lower()
+
+
+def findall_words(text, keywords):
+    """Прежний подсчет: re.findall по каждому слову с границами"""
+    return sum(len(re.findall(r'\b' + re.escape(keyword.lower()) + r'\b', text)) for keyword in keywords)
+
+
+def word_lexicon_sources():
+    """(название, matcher, {словарь: ключевые слова}) для словарей, считавшихся по словам"""
+    try:
+        from app.utils.social_tension_analyzer import SocialTensionAnalyzer
+        analyzer = SocialTensionAnalyzer()
+        names = [name for name in analyzer.keyword_matcher.lexicons if name != 'time']
+        yield 'SocialTensionAnalyzer', analyzer.keyword_matcher, names
+    except ImportError as e:
+        print(f"⚠️  SocialTensionAnalyzer пропущен: {e}")
+
+    try:
+        from app.utils.ukraine_sentiment_analyzer import UkraineSentimentAnalyzer
+        analyzer = UkraineSentimentAnalyzer()
+        yield 'UkraineSentimentAnalyzer', analyzer.keyword_matcher, list(analyzer.keyword_matcher.lexicons)
+    except ImportError as e:
+        print(f"⚠️  UkraineSentimentAnalyzer пропущен: {e}")
+
+    try:
+        from app.ai.content_classifier import ExtremistContentClassifier
+        classifier = ExtremistContentClassifier()
+        yield 'ExtremistContentClassifier', classifier.keyword_matcher, list(classifier.extremist_keywords)
+    except ImportError as e:
+        print(f"⚠️  ExtremistContentClassifier пропущен: {e}")
+
+
+def check_time_markers(rng, texts):
+    """Временные маркеры TensionCalculator: группы-чередования против count_longest"""
+    calculator = TensionCalculator()
+    keywords = calculator.time_markers
+    mismatches = 0
+
+    for _ in range(texts):
+        text = make_text(rng, keywords)
+        expected = sum(len(re.findall(pattern, text, re.IGNORECASE)) for pattern in TIME_PATTERNS)
+        actual = calculator.lexicon_matcher.match(text).count_longest('time')
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"   {expected} != {actual}: {text!r}")
+
+    return mismatches
+
+
+def check_word_lexicons(rng, texts):
+    """Словари с подсчетом по словам: re.findall по каждому слову против count"""
+    mismatches = 0
+
+    for source, matcher, names in word_lexicon_sources():
+        for name in names:
+            keywords = matcher.lexicons[name]
+            for _ in range(texts):
+                text = make_text(rng, keywords)
+                expected = findall_words(text, keywords)
+                actual = matcher.match(text).count(name)
+                if expected != actual:
+                    mismatches += 1
+                    if mismatches <= 3:
+                        print(f"   {source}.{name}: {expected} != {actual}: {text!r}")
+        print(f"{source}: проверено словарей {len(names)}")
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Сравнение LexiconMatcher с прежним подсчетом re.findall')
+    parser.add_argument('--texts', type=int, default=500, help='Случайных текстов на словарь')
+    parser.add_argument('--seed', type=int, default=1, help='Зерно генератора')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    time_mismatches = check_time_markers(rng, args.texts)
+    print(f"{'✅' if not time_mismatches else '❌'} Временные маркеры TensionCalculator: расхождений {time_mismatches}")
+
+    word_mismatches = check_word_lexicons(rng, args.texts)
+    print(f"{'✅' if not word_mismatches else '❌'} Словари с подсчетом по словам: расхождений {word_mismatches}")
+
+    return 0 if not (time_mismatches or word_mismatches) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,8 @@ from clickhouse_driver import Client
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Config
+from parsers.articles_rollup import ROLLUP_TABLE, refresh_rollup
+from parsers.articles_table import ARTICLES_TABLE
 
 def cleanup_articles_without_spike():
     """Удаляет статьи без spike_index из всех таблиц"""
@@ -35,11 +37,14 @@ def cleanup_articles_without_spike():
         return
     
     try:
-        # Получаем список всех таблиц в базе news
+        # Получаем список всех таблиц в базе news. Представления пропускаем:
+        # прежние таблицы источников - представления над news.articles,
+        # удалять строки нужно из самой news.articles
         tables_query = """
         SELECT name 
         FROM system.tables 
         WHERE database = 'news'
+        AND engine NOT LIKE '%View'
         ORDER BY name
         """
         
@@ -100,6 +105,12 @@ def cleanup_articles_without_spike():
                 print(f"⚠️  Ошибка при обработке таблицы {table_name}: {e}")
                 continue
         
+        # Почасовые агрегаты не видят удалений - пересчитываем их
+        if total_deleted > 0 and ARTICLES_TABLE.split('.')[1] in tables and ROLLUP_TABLE.split('.')[1] in tables:
+            print(f"\n🔄 Пересчитываем агрегаты {ROLLUP_TABLE}...")
+            refresh_rollup(client)
+            print(f"✅ Агрегаты {ROLLUP_TABLE} пересчитаны")
+        
         print("\n" + "=" * 60)
         print("📊 ИТОГОВАЯ СТАТИСТИКА")
         print("=" * 60)
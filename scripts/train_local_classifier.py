@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Обучение локальной модели классификации на метках gen-api
+
+Источники обучающей выборки:
+- кэш классификаций (записи, сохраненные вместе с текстом новости)
+- таблицы {source}_headlines в ClickHouse (флаг --clickhouse): строки,
+  классифицированные gen-api, без fallback и ответов локальной модели
+
+Старые записи из gen_api_classifier_cache.json содержат только md5 текста,
+поэтому в обучение не попадают.
+"""
+
+import sys
+import os
+import argparse
+import logging
+
+# Добавляем корневую директорию в путь
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from parsers.classification_cache import get_classification_cache
+from parsers.local_classifier import CATEGORIES, LocalNewsClassifier, make_text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Категория -> номер категории gen-api
+CATEGORY_IDS = {name: category_id for category_id, name in CATEGORIES.items()}
+
+
+def load_cache_samples(min_confidence):
+    """Загружает примеры из кэша классификаций"""
+    samples = []
+    for text, result in get_classification_cache().iter_labelled():
+        if result.get('confidence', 0) >= min_confidence:
+            samples.append((text, result))
+    logger.info(f"Из кэша классификаций: {len(samples)} примеров")
+    return samples
+
+
+def load_clickhouse_samples(min_confidence, limit_per_table):
+    """Загружает примеры с метками gen-api из таблиц *_headlines"""
+    from clickhouse_driver import Client
+
+    client = Client(
+        host=Config.CLICKHOUSE_HOST,
+        port=Config.CLICKHOUSE_NATIVE_PORT,
+        user=Config.CLICKHOUSE_USER,
+        password=Config.CLICKHOUSE_PASSWORD,
+        database=Config.CLICKHOUSE_DATABASE
+    )
+
+    tables = client.execute(
+        "SELECT table FROM system.columns "
+        "WHERE database = %(db)s AND table LIKE '%%\\_headlines' AND name = 'ai_classification_metadata'",
+        {'db': Config.CLICKHOUSE_DATABASE}
+    )
+
+    samples = []
+    for (table,) in tables:
+        try:
+            rows = client.execute(
+                f"SELECT title, content, ai_category, ai_confidence, social_tension_index, spike_index "
+                f"FROM {Config.CLICKHOUSE_DATABASE}.{table} "
+                f"WHERE ai_confidence >= %(min_confidence)s "
+                f"AND position(ai_classification_metadata, 'fallback') = 0 "
+                f"AND position(ai_classification_metadata, 'local') = 0 "
+                f"AND position(ai_classification_metadata, 'keywords') = 0 "
+                f"ORDER BY published_date DESC LIMIT %(limit)s",
+                {'min_confidence': min_confidence, 'limit': limit_per_table}
+            )
+        except Exception as e:
+            logger.warning(f"Пропускаем таблицу {table}: {e}")
+            continue
+
+        for title, content, category, confidence, tension, spike in rows:
+            if category not in CATEGORY_IDS:
+                continue
+            samples.append((make_text(title, content), {
+                'category_id': CATEGORY_IDS[category],
+                'category_name': category,
+                'social_tension_index': tension,
+                'spike_index': spike,
+                'confidence': confidence
+            }))
+
+    client.disconnect()
+    logger.info(f"Из ClickHouse: {len(samples)} примеров")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обучение локальной модели классификации новостей")
+    parser.add_argument('--clickhouse', action='store_true', help="Добавить примеры из таблиц ClickHouse")
+    parser.add_argument('--limit-per-table', type=int, default=20000, help="Максимум строк из одной таблицы")
+    parser.add_argument('--min-confidence', type=float, default=0.5, help="Минимальная уверенность метки gen-api")
+    parser.add_argument('--output', default=Config.LOCAL_CLASSIFIER_MODEL_PATH, help="Файл модели")
+    args = parser.parse_args()
+
+    samples = load_cache_samples(args.min_confidence)
+    if args.clickhouse:
+        samples += load_clickhouse_samples(args.min_confidence, args.limit_per_table)
+
+    # Одинаковые тексты из разных источников учитываем один раз
+    samples = list({text: (text, result) for text, result in samples}.values())
+
+    if len(samples) < Config.LOCAL_CLASSIFIER_MIN_SAMPLES:
+        logger.error(
+            f"Недостаточно примеров для обучения: {len(samples)} "
+            f"(нужно не меньше {Config.LOCAL_CLASSIFIER_MIN_SAMPLES})"
+        )
+        return 1
+
+    model = LocalNewsClassifier(model_path=args.output)
+    metrics = model.train(samples)
+    model.save()
+
+    logger.info(f"Метрики: {metrics}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
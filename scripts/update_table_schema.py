@@ -22,8 +22,9 @@ def update_table_schema():
         
         print(f"✅ Подключение к ClickHouse: {Config.CLICKHOUSE_HOST}:{Config.CLICKHOUSE_PORT}")
         
-        # Получаем список всех таблиц
-        tables_query = f"SELECT name FROM system.tables WHERE database = '{Config.CLICKHOUSE_DATABASE}'"
+        # Получаем список всех таблиц. Представления (прежние таблицы источников
+        # над news.articles) пропускаем: их колонки берутся из news.articles
+        tables_query = f"SELECT name FROM system.tables WHERE database = '{Config.CLICKHOUSE_DATABASE}' AND engine NOT LIKE '%View'"
         
         response = requests.get(
             f"{base_url}/",